@@ -0,0 +1,210 @@
+"""
+Throughput benchmarks of the simulation hot path: MatrixMath primitives, Rotations, the vehicle models, the closed loop
+controller, the trim and a full Chapter8Simulate step. Each benchmark reports microseconds and calls per second (best
+of several repeats) and the memory allocated while calling it (tracemalloc peak above the starting point, and what is
+still held at the end per call).
+
+Results are stored as JSON so a later run can be compared against them:
+
+	python benchmarkSimulation.py --save baseline.json		# record a baseline
+	python benchmarkSimulation.py --compare baseline.json	# exit code 1 if anything got slower than the tolerance
+
+Timings are also stored relative to a pure Python calibration loop, and comparisons use those relative numbers by
+default, so a baseline recorded on one machine is still meaningful on another (use --absolute to compare raw times).
+"""
+#%% Initialization of benchmarks and helpers:
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Constants.VehiclePhysicalConstants as VPC
+import ece163.Containers.Inputs as Inputs
+import ece163.Controls.VehicleClosedLoopControl as VehicleClosedLoopControl
+import ece163.Controls.VehicleControlGains as VehicleControlGains
+import ece163.Controls.VehiclePerturbationModels as VehiclePerturbationModels
+import ece163.Controls.VehicleTrim as VehicleTrim
+import ece163.Containers.Controls as Controls
+import ece163.Containers.States as States
+import ece163.Modeling.VehicleAerodynamicsModel as VehicleAerodynamicsModel
+import ece163.Modeling.VehicleDynamicsModel as VehicleDynamicsModel
+import ece163.Modeling.WindModel as WindModel
+import ece163.Sensors.SensorsModel as SensorsModel
+import ece163.Simulation.Chapter8Simulate as Chapter8Simulate
+import ece163.Utilities.MatrixMath as mm
+import ece163.Utilities.Rotations as Rotations
+from ece163.Simulation.__main__ import defaultTuning
+
+"""Straight and level trim, shared by the benchmarks that need a flying vehicle:"""
+trim = VehicleTrim.VehicleTrim()
+trim.computeTrim(VPC.InitialSpeed, 0.0, 0.0)
+trimState = trim.getTrimState()
+trimControls = trim.getTrimControls()
+trimGains = VehicleControlGains.computeGains(defaultTuning, VehiclePerturbationModels.CreateTransferFunction(trimState, trimControls))
+
+A = [[0.9, -0.2, 0.1], [0.3, 0.8, -0.4], [-0.1, 0.5, 0.7]]
+B = [[0.2, 0.1, -0.3], [0.6, -0.5, 0.4], [0.1, 0.9, 0.2]]
+v = [[1.0], [-2.0], [0.5]]
+w = [[0.3], [0.2], [-1.0]]
+dcm = Rotations.euler2DCM(0.3, 0.1, -0.2)
+
+def calibration():
+	"""Pure Python loop that the timings are expressed relative to"""
+	total = 0.0
+	for i in range(100):
+		total += i * 0.5
+	return total
+
+def vehicleDynamicsUpdate():
+	model = VehicleDynamicsModel.VehicleDynamicsModel()
+	model.setVehicleState(States.vehicleState(u=25.0, p=0.01, q=0.02, r=-0.01))
+	forcesMoments = Inputs.forcesMoments(1.0, 0.0, -1.0, 0.01, 0.0, 0.0)
+	return lambda: model.Update(forcesMoments)
+
+def vehicleAerodynamicsUpdate():
+	model = VehicleAerodynamicsModel.VehicleAerodynamicsModel()
+	model.setVehicleState(trimState.copy())
+	return lambda: model.Update(trimControls)
+
+def windModelUpdate():
+	model = WindModel.WindModel(drydenParameters=VPC.DrydenLowAltitudeLight)
+	return model.Update
+
+def sensorsModelUpdate():
+	model = SensorsModel.SensorsModel()
+	return model.update
+
+def closedLoopUpdate():
+	model = VehicleClosedLoopControl.VehicleClosedLoopControl()
+	model.setTrimInputs(trimControls)
+	model.setControlGains(trimGains)
+	model.setVehicleState(trimState.copy())
+	commands = Controls.referenceCommands(0.0, -trimState.pd, VPC.InitialSpeed)
+	return lambda: model.update(commands)
+
+def computeTrim():
+	model = VehicleTrim.VehicleTrim()
+	return lambda: model.computeTrim(VPC.InitialSpeed, 1 / 200, math.radians(2))
+
+def chapter8Step():
+	simulateInstance = Chapter8Simulate.Chapter8Simulate()
+	simulateInstance.underlyingModel.setTrimInputs(trimControls)
+	simulateInstance.underlyingModel.setControlGains(trimGains)
+	return simulateInstance.takeStep
+
+"""(name, setup, calls per repeat): setup returns the function to call, and is run again for every repeat so stateful
+models always start from the same place (calls per repeat is kept to a few seconds of flight for those)."""
+benchmarks = [('calibration', lambda: calibration, 20000),
+			  ('MatrixMath.multiply 3x3', lambda: (lambda: mm.multiply(A, B)), 20000),
+			  ('MatrixMath.multiply 3x1', lambda: (lambda: mm.multiply(A, v)), 20000),
+			  ('MatrixMath.transpose', lambda: (lambda: mm.transpose(A)), 20000),
+			  ('MatrixMath.add', lambda: (lambda: mm.add(A, B)), 20000),
+			  ('MatrixMath.scalarMultiply', lambda: (lambda: mm.scalarMultiply(2.0, A)), 20000),
+			  ('MatrixMath.skew', lambda: (lambda: mm.skew(1.0, 2.0, 3.0)), 20000),
+			  ('MatrixMath.crossProduct', lambda: (lambda: mm.crossProduct(v, w)), 20000),
+			  ('Rotations.euler2DCM', lambda: (lambda: Rotations.euler2DCM(0.3, 0.1, -0.2)), 20000),
+			  ('Rotations.dcm2Euler', lambda: (lambda: Rotations.dcm2Euler(dcm)), 20000),
+			  ('VehicleDynamicsModel.Update', vehicleDynamicsUpdate, 1000),
+			  ('VehicleAerodynamicsModel.Update', vehicleAerodynamicsUpdate, 1000),
+			  ('WindModel.Update', windModelUpdate, 5000),
+			  ('SensorsModel.update', sensorsModelUpdate, 1000),
+			  ('VehicleClosedLoopControl.update', closedLoopUpdate, 1000),
+			  ('VehicleTrim.computeTrim', computeTrim, 3),
+			  ('Chapter8Simulate.takeStep', chapter8Step, 500)]
+
+def timeBenchmark(setup, calls, repeats):
+	"""Best time per call in seconds over repeats, each repeat calling a freshly set up function calls times"""
+	best = math.inf
+	for repeat in range(repeats):
+		function = setup()
+		startTime = time.perf_counter()
+		for call in range(calls):
+			function()
+		best = min(best, (time.perf_counter() - startTime) / calls)
+	return best
+
+def measureAllocations(setup, calls):
+	"""Peak memory above the start while calling the function calls times [kB], and bytes still held per call"""
+	function = setup()
+	calls = min(calls, 200)
+	tracemalloc.start()
+	startMemory = tracemalloc.get_traced_memory()[0]
+	tracemalloc.reset_peak()
+	for call in range(calls):
+		function()
+	currentMemory, peakMemory = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return (peakMemory - startMemory) / 1024, (currentMemory - startMemory) / calls
+
+def runBenchmarks(names=None, repeats=5):
+	"""Runs the benchmarks (all of them, or those whose name contains one of names) and returns the results dictionary"""
+	results = {'python': platform.python_version(), 'machine': platform.machine(), 'platform': platform.platform(),
+			   'matrixMathBackend': mm.backendName, 'benchmarks': dict()}
+	calibrationTime = None
+	for name, setup, calls in benchmarks:
+		if names and name != 'calibration' and not any([part in name for part in names]):
+			continue
+		secondsPerCall = timeBenchmark(setup, calls, repeats)
+		if name == 'calibration':
+			calibrationTime = secondsPerCall
+		peakKB, heldBytesPerCall = measureAllocations(setup, calls)
+		results['benchmarks'][name] = {'usPerCall': 1e6 * secondsPerCall, 'callsPerSecond': 1 / secondsPerCall,
+									   'relativeToCalibration': secondsPerCall / calibrationTime,
+									   'peakKB': peakKB, 'heldBytesPerCall': heldBytesPerCall}
+		print("   {:34s} {:12.3f} us {:14.0f} /s   peak {:8.1f} kB   held {:8.1f} B/call".format(
+			name, 1e6 * secondsPerCall, 1 / secondsPerCall, peakKB, heldBytesPerCall))
+	return results
+
+def compareResults(results, baseline, tolerance=0.5, absolute=False):
+	"""Benchmarks that are more than tolerance slower than the baseline, as a list of (name, baseline, current, ratio)"""
+	measure = 'usPerCall' if absolute else 'relativeToCalibration'
+	regressions = list()
+	for name, current in results['benchmarks'].items():
+		if name == 'calibration' or name not in baseline['benchmarks']:
+			continue
+		ratio = current[measure] / baseline['benchmarks'][name][measure]
+		print("   {:34s} {:6.2f}x baseline".format(name, ratio))
+		if ratio > 1 + tolerance:
+			regressions.append((name, baseline['benchmarks'][name][measure], current[measure], ratio))
+	return regressions
+
+def buildParser():
+	parser = argparse.ArgumentParser(description="Throughput benchmarks of the ece163 simulation")
+	parser.add_argument('--filter', nargs='*', default=None, help='only run benchmarks whose name contains one of these')
+	parser.add_argument('--repeats', type=int, default=5, help='repeats per benchmark, the best one is reported (default 5)')
+	parser.add_argument('--save', default=None, help='write the results to this JSON file')
+	parser.add_argument('--compare', default=None, help='compare against this JSON baseline')
+	parser.add_argument('--tolerance', type=float, default=0.5, help="allowed slow down before a regression (default 0.5, timings on a busy machine vary by a few tens of percent)")
+	parser.add_argument('--absolute', action='store_true', help='compare raw times instead of times relative to the calibration')
+	return parser
+
+
+if __name__ == '__main__':
+	arguments = buildParser().parse_args()
+
+	print("Beginning benchmarks")
+	results = runBenchmarks(arguments.filter, arguments.repeats)
+
+	if arguments.save:
+		with open(arguments.save, 'w') as f:
+			json.dump(results, f, indent=1)
+		print(f"Results saved to {arguments.save}")
+
+	#%% Compare against the baseline:
+
+	if arguments.compare:
+		with open(arguments.compare) as f:
+			baseline = json.load(f)
+		print(f"\n---\nComparing against {arguments.compare}")
+		regressions = compareResults(results, baseline, arguments.tolerance, arguments.absolute)
+		if regressions:
+			print(f"{len(regressions)} regressions beyond {100 * arguments.tolerance:.0f}%:")
+			[print(f"   {name}: {current:.3g} vs {previous:.3g} ({ratio:.2f}x)") for name, previous, current, ratio in regressions]
+			sys.exit(1)
+		print("No regressions")
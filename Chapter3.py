@@ -55,6 +55,7 @@ class Chapter3(baseInterface.baseInterface):
 				newSlider = ece163.Display.SliderWithValue.SliderWithValue(name, minValue, maxValue, startValue)
 				self.inputSliders.append(newSlider)
 				self.inputGrid.addWidget(newSlider, row, col)
+		self.updateInputSlidersSignal.connect(self.setInputSliders)	# joystick values come from the worker thread
 
 		# self.playButton.setDisabled(True)
 		self.showMaximized()
@@ -83,6 +84,11 @@ class Chapter3(baseInterface.baseInterface):
 			slider.resetSlider()
 		return
 
+	def setInputSliders(self, inputs):
+		for slider in self.inputSliders:
+			slider.setSlider(getattr(inputs, slider.name))
+		return
+
 	def updateStatePlots(self, newState):
 		stateList = list()
 		for key in stateNamesofInterest:
@@ -91,7 +97,7 @@ class Chapter3(baseInterface.baseInterface):
 				newVal = math.degrees(newVal)
 			stateList.append([newVal])
 
-		self.stateGrid.addNewAllData(stateList, [self.simulateInstance.time]*len(stateNamesofInterest))
+		self.stateGrid.addNewAllData(stateList, [self.currentTime]*len(stateNamesofInterest))
 		return
 
 	def getVehicleState(self):
@@ -126,8 +132,7 @@ class Chapter3(baseInterface.baseInterface):
 					forceInputs.My = -(joystick_values.control_axes.Elevator/JSC.MAX_THROW) * JSC.CHAPTER3_MAX_MOMENT
 					forceInputs.Mx = (joystick_values.control_axes.Aileron/JSC.MAX_THROW) * JSC.CHAPTER3_MAX_MOMENT
 
-				for slider in self.inputSliders:
-					slider.setSlider(getattr(forceInputs,slider.name))
+				self.updateInputSlidersSignal.emit(forceInputs)
 		else:
 			#Use sliders if controller not active
 			for control in self.inputSliders:
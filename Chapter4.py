@@ -67,6 +67,7 @@ class Chapter4(baseInterface.baseInterface):
 				newSlider = ece163.Display.SliderWithValue.SliderWithValue(name, minValue, maxValue, startValue)
 				self.inputSliders.append(newSlider)
 				self.inputGrid.addWidget(newSlider, row, col)
+		self.updateInputSlidersSignal.connect(self.setInputSliders)	# joystick values come from the worker thread
 
 		# self.playButton.setDisabled(True)
 		self.showMaximized()
@@ -97,6 +98,11 @@ class Chapter4(baseInterface.baseInterface):
 			slider.resetSlider()
 		return
 
+	def setInputSliders(self, inputs):
+		for slider in self.inputSliders:
+			slider.setSlider(getattr(inputs, slider.name))
+		return
+
 	def updateStatePlots(self, newState):
 		self.updatePlotsOff()
 		stateList = list()
@@ -107,7 +113,7 @@ class Chapter4(baseInterface.baseInterface):
 			stateList.append([newVal])
 		stateList.append([newState.Va, math.hypot(newState.u, newState.v, newState.w)])
 
-		self.stateGrid.addNewAllData(stateList, [self.simulateInstance.time]*(len(stateNamesofInterest) + 1))
+		self.stateGrid.addNewAllData(stateList, [self.currentTime]*(len(stateNamesofInterest) + 1))
 		self.updatePlotsOn()
 		return
 
@@ -124,8 +130,7 @@ class Chapter4(baseInterface.baseInterface):
 			inputControls.Elevator = joystick_vals.Elevator * JSC.CHAPTER4_MAX_THROW
 			inputControls.Rudder = -joystick_vals.Rudder * JSC.CHAPTER4_MAX_THROW
 			inputControls.Throttle = joystick_vals.Throttle
-			for slider in self.inputSliders:
-				slider.setSlider(getattr(inputControls,slider.name))
+			self.updateInputSlidersSignal.emit(inputControls)
 		
 		else:
 			for control in self.inputSliders:
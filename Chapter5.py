@@ -79,7 +79,7 @@ class Chapter5(baseInterface.baseInterface):
 			stateList.append([newVal])
 		stateList.append([newState.Va, math.hypot(newState.u, newState.v, newState.w)])
 
-		self.stateGrid.addNewAllData(stateList, [self.simulateInstance.time]*(len(stateNamesofInterest) + 1))
+		self.stateGrid.addNewAllData(stateList, [self.currentTime]*(len(stateNamesofInterest) + 1))
 		self.updatePlotsOn()
 		return
 
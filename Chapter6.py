@@ -1,3 +1,4 @@
+import copy
 import math
 import sys
 
@@ -70,6 +71,7 @@ class Chapter6(baseInterface.baseInterface):
 
 		self.referenceControl = ReferenceControlWidget()
 		self.inputTabs.addTab(self.referenceControl, "Reference Control")
+		self.updateInputSlidersSignal.connect(self.referenceControl.setSliders)	# joystick references come from the worker thread
 
 		self.windControl = WindControl.WindControl(self.simulateInstance.underlyingModel.getVehicleAerodynamicsModel())
 		self.inputTabs.addTab(self.windControl, WindControl.widgetName)
@@ -128,13 +130,19 @@ class Chapter6(baseInterface.baseInterface):
 			stateList.append([newVal])
 		stateList.append([newState.Va, math.hypot(newState.u, newState.v, newState.w)])
 
-		self.stateGrid.addNewAllData(stateList, [self.simulateInstance.time]*(len(stateNamesofInterest) + 1))
+		self.stateGrid.addNewAllData(stateList, [self.currentTime]*(len(stateNamesofInterest) + 1))
 		self.updatePlotsOn()
 		return
 
 	def getVehicleState(self):
 		return self.simulateInstance.underlyingModel.getVehicleState()
 
+	def simulationSnapshot(self):
+		snapshot = super().simulationSnapshot()
+		snapshot['reference'] = copy.copy(self.referenceControl.currentReference)
+		snapshot['controlSurfaces'] = copy.copy(self.simulateInstance.underlyingModel.getVehicleControlSurfaces())
+		return snapshot
+
 	def runUpdate(self):
 		#If wanting to use the controller for the reference input, modify here
 		if self.joystick.active:
@@ -150,7 +158,7 @@ class Chapter6(baseInterface.baseInterface):
 					altitudeCommand=(inputs.Elevator/JSC.MAX_THROW/-2.0 + 0.5) * (JSC.CHAPTER6_MAX_ALTITUDE-JSC.CHAPTER6_MIN_ALTITUDE) + JSC.CHAPTER6_MIN_ALTITUDE, 
 					courseCommand=math.radians((inputs.Aileron/JSC.MAX_THROW/2.0 + 1.0) * (JSC.CHAPTER6_MAX_COURSE-JSC.CHAPTER6_MIN_COURSE) + JSC.CHAPTER6_MIN_COURSE) - math.pi
 				)
-				self.referenceControl.setSliders(self.referenceControl.currentReference)
+				self.updateInputSlidersSignal.emit(self.referenceControl.currentReference)
 		self.simulateInstance.takeStep(self.referenceControl.currentReference)
 
 		return
@@ -181,23 +189,23 @@ class Chapter6(baseInterface.baseInterface):
 		inputToGrid = list()
 
 		#Update the commanded commands appropriately if a controller is active
-		Commanded = self.referenceControl.currentReference
+		Commanded = self.displayedSnapshot['reference']
 
 
-		vehicleState = self.simulateInstance.getVehicleState()
+		vehicleState = self.displayedSnapshot['state']
 		inputToGrid.append([math.degrees(Commanded.commandedCourse), math.degrees(vehicleState.chi)])  # Course
 		inputToGrid.append([Commanded.commandedAirspeed, vehicleState.Va])  # Speed
 		inputToGrid.append([Commanded.commandedAltitude, -vehicleState.pd])  # Height
 		inputToGrid.append([math.degrees(x) for x in [Commanded.commandedPitch, vehicleState.pitch]])  # pitch
 		inputToGrid.append([math.degrees(x) for x in [Commanded.commandedRoll, vehicleState.roll]])  # pitch
-		ActualControl = self.simulateInstance.underlyingModel.getVehicleControlSurfaces()
+		ActualControl = self.displayedSnapshot['controlSurfaces']
 		trimSettings = self.trimCalcWidget.currentTrimControls
 		inputToGrid.append([trimSettings.Throttle, ActualControl.Throttle])  # Throttle
 		inputToGrid.append([math.degrees(x) for x in [trimSettings.Aileron, ActualControl.Aileron]])  # Throttle
 		inputToGrid.append([math.degrees(x) for x in [trimSettings.Elevator, ActualControl.Elevator]])  # Throttle
 		inputToGrid.append([math.degrees(x) for x in [trimSettings.Rudder, ActualControl.Rudder]])  # Throttle
 		# print(inputToGrid)
-		self.controlResponseGrid.addNewAllData(inputToGrid, [self.simulateInstance.time]*len(inputToGrid))
+		self.controlResponseGrid.addNewAllData(inputToGrid, [self.currentTime]*len(inputToGrid))
 		self.updatePlotsOn()
 
 		return
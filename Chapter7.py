@@ -1,3 +1,4 @@
+import copy
 import math
 import sys
 
@@ -78,6 +79,7 @@ class Chapter6(baseInterface.baseInterface):
 
 		self.referenceControl = ReferenceControlWidget()
 		self.inputTabs.addTab(self.referenceControl, "Reference Control")
+		self.updateInputSlidersSignal.connect(self.referenceControl.setSliders)	# joystick references come from the worker thread
 
 		self.windControl = WindControl.WindControl(self.simulateInstance.underlyingModel.getVehicleAerodynamicsModel())
 		self.inputTabs.addTab(self.windControl, WindControl.widgetName)
@@ -141,13 +143,21 @@ class Chapter6(baseInterface.baseInterface):
 			stateList.append([newVal])
 		stateList.append([newState.Va, math.hypot(newState.u, newState.v, newState.w)])
 
-		self.stateGrid.addNewAllData(stateList, [self.simulateInstance.time]*(len(stateNamesofInterest) + 1))
+		self.stateGrid.addNewAllData(stateList, [self.currentTime]*(len(stateNamesofInterest) + 1))
 		self.updatePlotsOn()
 		return
 
 	def getVehicleState(self):
 		return self.simulateInstance.underlyingModel.getVehicleState()
 
+	def simulationSnapshot(self):
+		snapshot = super().simulationSnapshot()
+		snapshot['reference'] = copy.copy(self.referenceControl.currentReference)
+		snapshot['controlSurfaces'] = copy.copy(self.simulateInstance.underlyingModel.getVehicleControlSurfaces())
+		snapshot['sensorsTrue'] = copy.copy(self.simulateInstance.sensorModel.getSensorsTrue())
+		snapshot['sensorsNoisy'] = copy.copy(self.simulateInstance.sensorModel.getSensorsNoisy())
+		return snapshot
+
 	def runUpdate(self):
 		#If wanting to use the controller for the reference input, modify here
 		if self.joystick.active:
@@ -163,7 +173,7 @@ class Chapter6(baseInterface.baseInterface):
 					altitudeCommand=(inputs.Elevator/JSC.MAX_THROW/-2.0 + 0.5) * (JSC.CHAPTER6_MAX_ALTITUDE-JSC.CHAPTER6_MIN_ALTITUDE) + JSC.CHAPTER6_MIN_ALTITUDE, 
 					courseCommand=math.radians((inputs.Aileron/JSC.MAX_THROW/2.0 + 1.0) * (JSC.CHAPTER6_MAX_COURSE-JSC.CHAPTER6_MIN_COURSE) + JSC.CHAPTER6_MIN_COURSE) - math.pi
 				)
-				self.referenceControl.setSliders(self.referenceControl.currentReference)
+				self.updateInputSlidersSignal.emit(self.referenceControl.currentReference)
 		self.simulateInstance.takeStep(self.referenceControl.currentReference)
 
 		return
@@ -203,22 +213,22 @@ class Chapter6(baseInterface.baseInterface):
 		inputToGrid = list()
 
 		#Update the commanded commands appropriately if a controller is active
-		Commanded = self.referenceControl.currentReference
+		Commanded = self.displayedSnapshot['reference']
 
-		vehicleState = self.simulateInstance.getVehicleState()
+		vehicleState = self.displayedSnapshot['state']
 		inputToGrid.append([math.degrees(Commanded.commandedCourse), math.degrees(vehicleState.chi)])  # Course
 		inputToGrid.append([Commanded.commandedAirspeed, vehicleState.Va])  # Speed
 		inputToGrid.append([Commanded.commandedAltitude, -vehicleState.pd])  # Height
 		inputToGrid.append([math.degrees(x) for x in [Commanded.commandedPitch, vehicleState.pitch]])  # pitch
 		inputToGrid.append([math.degrees(x) for x in [Commanded.commandedRoll, vehicleState.roll]])  # pitch
-		ActualControl = self.simulateInstance.underlyingModel.getVehicleControlSurfaces()
+		ActualControl = self.displayedSnapshot['controlSurfaces']
 		trimSettings = self.trimCalcWidget.currentTrimControls
 		inputToGrid.append([trimSettings.Throttle, ActualControl.Throttle])  # Throttle
 		inputToGrid.append([math.degrees(x) for x in [trimSettings.Aileron, ActualControl.Aileron]])  # Throttle
 		inputToGrid.append([math.degrees(x) for x in [trimSettings.Elevator, ActualControl.Elevator]])  # Throttle
 		inputToGrid.append([math.degrees(x) for x in [trimSettings.Rudder, ActualControl.Rudder]])  # Throttle
 		# print(inputToGrid)
-		self.controlResponseGrid.addNewAllData(inputToGrid, [self.simulateInstance.time]*len(inputToGrid))
+		self.controlResponseGrid.addNewAllData(inputToGrid, [self.currentTime]*len(inputToGrid))
 		self.updatePlotsOn()
 
 		return
@@ -226,8 +236,8 @@ class Chapter6(baseInterface.baseInterface):
 	def updateSensorPlots(self):
 		self.updatePlotsOff()
 		inputToGrid = list()
-		noisySensors = self.simulateInstance.sensorModel.getSensorsNoisy()
-		trueSensors = self.simulateInstance.sensorModel.getSensorsTrue()
+		noisySensors = self.displayedSnapshot['sensorsNoisy']
+		trueSensors = self.displayedSnapshot['sensorsTrue']
 
 		inputToGrid.append([math.degrees(trueSensors.gyro_x), math.degrees(noisySensors.gyro_x)])
 		inputToGrid.append([math.degrees(trueSensors.gyro_y), math.degrees(noisySensors.gyro_y)])
@@ -250,7 +260,7 @@ class Chapter6(baseInterface.baseInterface):
 		inputToGrid.append([trueSensors.gps_sog, noisySensors.gps_sog])
 
 
-		self.sensorsPlotGrid.addNewAllData(inputToGrid, [self.simulateInstance.time]*len(inputToGrid))
+		self.sensorsPlotGrid.addNewAllData(inputToGrid, [self.currentTime]*len(inputToGrid))
 		self.updatePlotsOn()
 		return
 
@@ -0,0 +1,28 @@
+import sys
+
+import PyQt5.QtWidgets as QtWidgets
+
+import ece163.Display.ReplayInterface as ReplayInterface
+
+
+sys._excepthook = sys.excepthook
+
+def my_exception_hook(exctype, value, tracevalue):
+	# Print the error and traceback
+	import traceback
+	with open("LastCrash.txt", 'w') as f:
+		traceback.print_exception(exctype, value, tracevalue, file=f)
+	print(exctype, value, tracevalue)
+	# Call the normal Exception hook after
+	sys._excepthook(exctype, value, tracevalue)
+	sys.exit(0)
+
+# Set the exception hook to our wrapping function
+sys.excepthook = my_exception_hook
+
+
+
+qtApp = QtWidgets.QApplication(sys.argv)
+ourWindow = ReplayInterface.ReplayInterface(sys.argv[1] if len(sys.argv) > 1 else None)	# python Replay.py [recording]
+ourWindow.showMaximized()
+qtApp.exec()
@@ -0,0 +1,137 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import os
+import tempfile
+import time
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Constants.VehiclePhysicalConstants as VPC
+import ece163.Containers.Inputs as Inputs
+import ece163.Modeling.AerodynamicsTables as AerodynamicsTables
+import ece163.Modeling.VehicleAerodynamicsModel as VehicleAerodynamicsModel
+import ece163.Simulation.Chapter3Simulate as Chapter3Simulate
+import ece163.Simulation.Chapter4Simulate as Chapter4Simulate
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+analyticModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel()
+tables = AerodynamicsTables.AerodynamicsTables()
+
+#%% Accuracy against the analytic model
+
+print("Beginning testing of AerodynamicsTables lookups")
+
+cur_test = "tables are built within their error bounds"
+evaluateTest(cur_test, tables.coefficientError <= tables.coefficientErrorBound and tables.propellerError <= tables.propellerErrorBound)
+
+cur_test = "coefficients are within the bound at random angles of attack"
+alphas = numpy.random.default_rng(4).uniform(-math.pi, math.pi, 2000)
+coefficientError = max([max([abs(table - analytic) for table, analytic in zip(tables.CalculateCoeff_alpha(alpha), analyticModel.CalculateCoeff_alpha(alpha))])
+						for alpha in alphas])
+evaluateTest(cur_test, coefficientError <= tables.coefficientErrorBound)
+
+cur_test = "thrust and torque are within the bound at random airspeeds and throttles"
+points = numpy.random.default_rng(5).uniform([0.0, 0.0], [60.0, 1.0], (2000, 2))
+propellerError = max([max([abs(table - analytic) for table, analytic in zip(tables.CalculatePropForces(Va, throttle), analyticModel.CalculatePropForces(Va, throttle))])
+					  for Va, throttle in points])
+evaluateTest(cur_test, propellerError <= tables.propellerErrorBound)
+
+cur_test = "grid ends are looked up, points off the grid are analytic"
+evaluateTest(cur_test, numpy.allclose(tables.CalculatePropForces(60.0, 1.0), analyticModel.CalculatePropForces(60.0, 1.0), atol=1e-12) and
+			 numpy.allclose(tables.CalculateCoeff_alpha(math.pi), analyticModel.CalculateCoeff_alpha(math.pi), atol=1e-12) and
+			 numpy.allclose(tables.CalculatePropForces(80.0, 0.5), analyticModel.CalculatePropForces(80.0, 0.5), rtol=1e-12, atol=0.0) and
+			 numpy.allclose(tables.CalculatePropForces(20.0, -0.1), analyticModel.CalculatePropForces(20.0, -0.1), rtol=1e-12, atol=0.0))
+
+cur_test = "an unreachable bound raises"
+try:
+	AerodynamicsTables.AerodynamicsTables(coefficientErrorBound=1e-12, maxRefinements=1)
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+#%% File cache
+
+print("Beginning testing of AerodynamicsTables files")
+
+directory = tempfile.mkdtemp()
+tableFile = os.path.join(directory, 'aeroTables.npz')
+
+cur_test = "tables are saved and loaded with their file"
+savedTables = AerodynamicsTables.AerodynamicsTables(tableFile)
+loadedTables = AerodynamicsTables.AerodynamicsTables(tableFile)
+evaluateTest(cur_test, not savedTables.loaded and loadedTables.loaded and numpy.array_equal(loadedTables.propeller, savedTables.propeller)
+			 and loadedTables.CalculateCoeff_alpha(0.1) == savedTables.CalculateCoeff_alpha(0.1))
+
+cur_test = "a file of other settings or constants is rebuilt"
+otherSettings = AerodynamicsTables.AerodynamicsTables(tableFile, propellerErrorBound=1e-2)
+originalRho = VPC.rho
+VPC.rho = originalRho * 0.9
+try:
+	otherConstants = AerodynamicsTables.AerodynamicsTables(tableFile)
+finally:
+	VPC.rho = originalRho
+evaluateTest(cur_test, not otherSettings.loaded and not otherConstants.loaded and not AerodynamicsTables.AerodynamicsTables(tableFile).loaded)
+
+#%% Table driven simulation
+
+print("Beginning testing of VehicleAerodynamicsModel with AerodynamicsTables")
+
+def runChapter4(aeroTables, steps=1000):
+	"""Chapter4Simulate run with fixed controls, returns the final state and the wall time"""
+	simulateInstance = Chapter4Simulate.Chapter4Simulate()
+	simulateInstance.setAerodynamicsTables(aeroTables)
+	controls = Inputs.controlInputs(Throttle=0.7, Aileron=0.01, Elevator=-0.05, Rudder=0.0)
+	startTime = time.perf_counter()
+	for step in range(steps):
+		simulateInstance.takeStep(controls)
+	return simulateInstance.getVehicleState(), time.perf_counter() - startTime, simulateInstance
+
+analyticState, analyticTime, analyticInstance = runChapter4(None)
+tableState, tableTime, tableInstance = runChapter4(tables)
+
+cur_test = "table driven flight stays close to the analytic one"
+evaluateTest(cur_test, abs(tableState.pn - analyticState.pn) < 0.1 and abs(tableState.pd - analyticState.pd) < 0.1 and abs(tableState.Va - analyticState.Va) < 0.01)
+
+cur_test = "tables are kept across a reset and dropped with None"
+tableInstance.reset()
+keptAfterReset = tableInstance.underlyingModel.getAerodynamicsTables() is tables
+tableInstance.setAerodynamicsTables(None)
+evaluateTest(cur_test, keptAfterReset and tableInstance.underlyingModel.getAerodynamicsTables() is None and
+			 not Chapter3Simulate.Chapter3Simulate().setAerodynamicsTables(tables))
+
+cur_test = "coefficient lookups are faster than the analytic model"
+startTime = time.perf_counter()
+for alpha in alphas:
+	tables.CalculateCoeff_alpha(alpha)
+tableLookupTime = time.perf_counter() - startTime
+startTime = time.perf_counter()
+for alpha in alphas:
+	analyticModel.CalculateCoeff_alpha(alpha)
+evaluateTest(cur_test, tableLookupTime < time.perf_counter() - startTime)
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
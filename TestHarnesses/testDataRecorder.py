@@ -0,0 +1,218 @@
+#%% Initialization of test harness and helpers:
+
+import csv
+import os
+import pickle
+import tempfile
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Containers.Inputs as Inputs
+import ece163.Simulation.Chapter4Simulate as Chapter4Simulate
+import ece163.Simulation.DataRecorder as DataRecorder
+import ece163.Simulation.DataSinks as DataSinks
+import ece163.Simulation.FlightLog as FlightLog
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+#%% DataRecorder
+
+print("Beginning testing of DataRecorder")
+
+rows = [[float(i), 2.0 * i, -1.0 * i] for i in range(10)]
+recorder = DataRecorder.DataRecorder(['time', 'x', 'y'], chunkSize=4)
+for row in rows:
+	recorder.append(row)
+
+cur_test = "rows read back across chunk boundaries"
+evaluateTest(cur_test, len(recorder) == 10 and list(recorder) == rows and recorder.toList() == rows and len(recorder.chunks) == 3)
+
+cur_test = "indexing and slicing rows"
+evaluateTest(cur_test, recorder[5] == rows[5] and recorder[-1] == rows[-1] and recorder[2:7] == rows[2:7])
+
+cur_test = "index past the end raises an IndexError"
+try:
+	recorder[10]
+	evaluateTest(cur_test, False)
+except IndexError:
+	evaluateTest(cur_test, True)
+
+cur_test = "named columns"
+columns = recorder.columns()
+evaluateTest(cur_test, numpy.array_equal(recorder.column('x'), [row[1] for row in rows]) and
+			 numpy.array_equal(columns['y'], [row[2] for row in rows]) and recorder.asArray().shape == (10, 3))
+
+cur_test = "columns cannot change while holding rows"
+try:
+	recorder.setColumnNames(['time', 'x'])
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+cur_test = "clear empties and keeps the names"
+recorder.clear()
+evaluateTest(cur_test, len(recorder) == 0 and list(recorder) == [] and recorder.column('x').shape == (0,) and recorder.columnNames == ['time', 'x', 'y'])
+
+cur_test = "width comes from the first row without names"
+recorder = DataRecorder.DataRecorder()
+recorder.append([1.0, 2.0])
+evaluateTest(cur_test, recorder.asArray().shape == (1, 2))
+
+#%% Simulate recording
+
+print("Beginning testing of Simulate.recordData()")
+
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+controls = Inputs.controlInputs(0.6, 0.01, -0.05, 0.0)
+northPositions = []
+for step in range(20):
+	simulateInstance.takeStep(controls)
+	northPositions.append(simulateInstance.getVehicleState().pn)
+
+cur_test = "state columns match the vehicle states"
+evaluateTest(cur_test, simulateInstance.takenData.column('state.pn').tolist() == northPositions)
+
+cur_test = "input columns hold the inputs"
+evaluateTest(cur_test, numpy.all(simulateInstance.takenData.column('Throttle') == 0.6) and simulateInstance.takenData.columnNames[0] == 'time')
+
+directory = tempfile.mkdtemp()
+cur_test = "pickle export is still a header and a list of rows"
+simulateInstance.exportToPickle(os.path.join(directory, 'data.pickle'))
+with open(os.path.join(directory, 'data.pickle'), 'rb') as f:
+	header, data = pickle.load(f)
+evaluateTest(cur_test, header == simulateInstance.takenData.columnNames and isinstance(data, list) and data == list(simulateInstance.takenData))
+
+cur_test = "csv export has the header and every row"
+simulateInstance.exportToCSV(os.path.join(directory, 'data.csv'))
+with open(os.path.join(directory, 'data.csv'), newline='') as f:
+	lines = list(csv.reader(f))
+evaluateTest(cur_test, lines[0] == header and len(lines) == 21 and float(lines[-1][header.index('state.pn')]) == northPositions[-1])
+
+cur_test = "reset clears the recorder"
+simulateInstance.reset()
+simulateInstance.takeStep(controls)
+evaluateTest(cur_test, len(simulateInstance.takenData) == 1)
+
+#%% Streaming to files
+
+print("Beginning testing of Simulate.streamToFile()")
+
+def readCSV(filename):
+	"""All of the lines of a csv file"""
+	with open(filename, newline='') as f:
+		return list(csv.reader(f))
+
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+simulateInstance.streamToFile(os.path.join(directory, 'stream.csv'), chunkSize=8)
+simulateInstance.streamToFile(os.path.join(directory, 'stream.npz'))
+for step in range(20):
+	simulateInstance.takeStep(controls)
+
+cur_test = "streamed files can be read while running"
+header, columns = DataSinks.loadNpz(os.path.join(directory, 'stream.npz'))
+evaluateTest(cur_test, len(readCSV(os.path.join(directory, 'stream.csv'))) == 17 and len(columns['time']) == 16)
+
+simulateInstance.closeStream()
+simulateInstance.exportToCSV(os.path.join(directory, 'export.csv'))
+cur_test = "streamed csv is the same as the export"
+evaluateTest(cur_test, readCSV(os.path.join(directory, 'stream.csv')) == readCSV(os.path.join(directory, 'export.csv')))
+
+cur_test = "streamed npz has the header and every row"
+header, columns = DataSinks.loadNpz(os.path.join(directory, 'stream.npz'))
+evaluateTest(cur_test, header == simulateInstance.takenData.columnNames and
+			 all([numpy.array_equal(columns[name], simulateInstance.takenData.column(name)) for name in header]))
+
+cur_test = "memory stays at a chunk when the data is not kept, and the recorded attributes are only looked up once"
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+simulateInstance.streamToFile(os.path.join(directory, 'bounded.npz'), keepData=False, chunkSize=8)
+simulateInstance.takeStep(controls)
+northPositions.append(simulateInstance.getVehicleState().pn)
+recordAccessors = simulateInstance.recordAccessors
+for step in range(49):
+	simulateInstance.takeStep(controls)
+	northPositions.append(simulateInstance.getVehicleState().pn)
+heldRows = len(simulateInstance.takenData)
+simulateInstance.closeStream()
+header, columns = DataSinks.loadNpz(os.path.join(directory, 'bounded.npz'))
+evaluateTest(cur_test, heldRows == 2 and len(simulateInstance.takenData.chunks) == 1 and simulateInstance.recordAccessors is recordAccessors and
+			 columns['state.pn'].tolist() == northPositions[-50:])
+
+cur_test = "a sink added late gets the rows already recorded"
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+simulateInstance.takenData.setChunkSize(8)
+for step in range(10):
+	simulateInstance.takeStep(controls)
+simulateInstance.streamToFile(os.path.join(directory, 'late.csv'))
+for step in range(10):
+	simulateInstance.takeStep(controls)
+simulateInstance.closeStream()
+evaluateTest(cur_test, len(readCSV(os.path.join(directory, 'late.csv'))) == 21)
+
+cur_test = "a stream closed before any row is recorded still has the header"
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+header = ['time', 'Throttle', 'Aileron', 'Elevator', 'Rudder'] + ['state.' + name for name in simulateInstance.variableList[0][2]]
+for extension in ['csv', 'npz', 'flog']:
+	simulateInstance.streamToFile(os.path.join(directory, 'unused.' + extension))
+simulateInstance.closeStream()
+emptyLog = FlightLog.FlightLog(os.path.join(directory, 'unused.flog'))
+evaluateTest(cur_test, readCSV(os.path.join(directory, 'unused.csv')) == [header] and DataSinks.loadNpz(os.path.join(directory, 'unused.npz'))[0] == header and
+			 emptyLog.columnNames == header and len(emptyLog) == 0)
+
+cur_test = "exporting after the streamed rows were dropped raises a ValueError naming the stream"
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+simulateInstance.streamToFile(os.path.join(directory, 'dropped.flog'), keepData=False, chunkSize=100)
+for step in range(250):
+	simulateInstance.takeStep(controls)
+simulateInstance.closeStream()
+messages = list()
+for export in [simulateInstance.exportToPickle, simulateInstance.exportToCSV, simulateInstance.exportToFlightLog]:
+	try:
+		export(os.path.join(directory, 'dropped.export'))
+	except ValueError as e:
+		messages.append(str(e))
+evaluateTest(cur_test, len(messages) == 3 and all(['dropped.flog' in message for message in messages]) and
+			 not os.path.exists(os.path.join(directory, 'dropped.export')) and len(FlightLog.FlightLog(os.path.join(directory, 'dropped.flog'))) == 250)
+
+cur_test = "reset closes the stream instead of appending the next run to it"
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+simulateInstance.streamToFile(os.path.join(directory, 'firstRun.flog'), chunkSize=8)
+for step in range(20):
+	simulateInstance.takeStep(controls)
+simulateInstance.reset()
+for step in range(20):
+	simulateInstance.takeStep(controls)
+firstRun = FlightLog.FlightLog(os.path.join(directory, 'firstRun.flog'))
+evaluateTest(cur_test, len(firstRun) == 20 and numpy.all(numpy.diff(firstRun.column('time')) > 0) and simulateInstance.takenData.sinks == [] and
+			 simulateInstance.exportToPickle(os.path.join(directory, 'secondRun.pickle')) and len(simulateInstance.takenData) == 20)
+
+cur_test = "unknown stream format raises a ValueError"
+try:
+	simulateInstance.streamToFile(os.path.join(directory, 'stream.txt'))
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
@@ -0,0 +1,145 @@
+#%% Initialization of test harness and helpers:
+
+import math
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Display.DisplayBuffers as DisplayBuffers
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def samples(count, start=0):
+	"""count samples of two lines, the time and its square root, at times start, start + 1, ..."""
+	times = numpy.arange(start, start + count, dtype=float)
+	return times, numpy.stack((times, numpy.sqrt(times)), axis=1)
+
+#%% Ring buffer
+
+print("Beginning testing of DisplayBuffers.RingBuffer")
+
+buffer = DisplayBuffers.RingBuffer(2, capacity=100)
+times, values = samples(250)
+for t, value in zip(times, values):
+	buffer.append(t, value)
+cur_test = "keeps the last capacity samples in order"
+bufferTimes, bufferValues = buffer.getData()
+evaluateTest(cur_test, len(buffer) == 100 and numpy.array_equal(bufferTimes, times[150:]) and numpy.array_equal(bufferValues, values[150:]) and
+			 buffer.lastTime() == 249.0)
+
+cur_test = "extend matches appending one sample at a time, across the wrap and beyond the capacity"
+matches = True
+for chunks in [[30, 90, 45], [260], [99, 1, 100, 7]]:
+	extended = DisplayBuffers.RingBuffer(2, capacity=100)
+	appended = DisplayBuffers.RingBuffer(2, capacity=100)
+	start = 0
+	for chunk in chunks:
+		chunkTimes, chunkValues = samples(chunk, start)
+		extended.extend(chunkTimes, chunkValues)
+		for t, value in zip(chunkTimes, chunkValues):
+			appended.append(t, value)
+		start += chunk
+	matches = matches and all([numpy.array_equal(a, b) for a, b in zip(extended.getData(), appended.getData())]) and extended.count == appended.count
+evaluateTest(cur_test, matches)
+
+cur_test = "time window returns only the latest samples"
+windowTimes, windowValues = buffer.getData(timeWindow=20.0)
+evaluateTest(cur_test, numpy.array_equal(windowTimes, times[229:]) and numpy.array_equal(windowValues, values[229:]))
+
+cur_test = "clear empties the buffer"
+buffer.clear()
+evaluateTest(cur_test, len(buffer) == 0 and buffer.lastTime() is None and buffer.getData(timeWindow=5.0)[0].shape == (0,))
+
+#%% Decimation
+
+print("Beginning testing of DisplayBuffers.decimate")
+
+cur_test = "short data is drawn as is"
+times, values = samples(500)
+x, y = DisplayBuffers.decimate(times, values, 1000)
+evaluateTest(cur_test, x.shape == (500, 2) and numpy.array_equal(x[:, 1], times) and numpy.array_equal(y, values))
+
+cur_test = "long data is thinned to about maxPoints, keeping spikes and the envelope"
+times = numpy.arange(100003, dtype=float)
+values = numpy.stack((numpy.sin(times / 1000), numpy.cos(times / 3000)), axis=1)
+values[54321, 0] = 5.0
+values[777, 1] = -7.0
+x, y = DisplayBuffers.decimate(times, values, 1000)
+indices = x.astype(int)
+evaluateTest(cur_test, x.shape[0] <= 1002 and y.shape == x.shape and 5.0 in y[:, 0] and -7.0 in y[:, 1] and
+			 all([numpy.all(numpy.diff(x[:, column]) >= 0) for column in range(2)]) and
+			 numpy.array_equal(y, numpy.take_along_axis(values, indices, axis=0)) and
+			 math.isclose(y[:, 1].max(), values[:, 1].max()) and math.isclose(y[:, 0].min(), values[:, 0].min()))
+
+cur_test = "drawn points stay bounded however long the history"
+buffer = DisplayBuffers.RingBuffer(2, capacity=20000)
+pointCounts = list()
+for chunk in range(10):
+	buffer.extend(*samples(10000, 10000 * chunk))
+	pointCounts.append(DisplayBuffers.decimate(*buffer.getData(), DisplayBuffers.defaultDisplayPoints)[0].shape[0])
+evaluateTest(cur_test, max(pointCounts) <= DisplayBuffers.defaultDisplayPoints + 2 and len(buffer) == 20000)
+
+#%% Trail
+
+print("Beginning testing of DisplayBuffers.TrailBuffer")
+
+cur_test = "straight flight keeps a point every maxDistance and the head follows the vehicle"
+trail = DisplayBuffers.TrailBuffer(maxDistance=10.0)
+for step in range(1001):
+	trail.addPoint([0.5 * step, 0.0, 100.0])
+points = trail.getPoints()
+evaluateTest(cur_test, trail.count == 51 and len(points) == 52 and numpy.array_equal(points[-1], [500.0, 0.0, 100.0]) and
+			 numpy.array_equal(points[0:2, 0], [0.0, 0.5]) and numpy.allclose(numpy.diff(points[1:-1, 0]), 10.0))
+
+cur_test = "turns keep a point every maxAngle, staying on the path flown"
+trail = DisplayBuffers.TrailBuffer(maxDistance=1000.0, maxAngle=math.radians(2))
+radius = 150.0
+headings = numpy.arange(0, 2 * math.pi, 0.5 / radius)	# 0.5 m a frame
+for heading in headings:
+	trail.addPoint([radius * math.cos(heading), radius * math.sin(heading), 50.0])
+points = trail.getPoints()
+midpoints = (points[1:] + points[:-1]) / 2
+deviation = numpy.max(numpy.abs(numpy.hypot(midpoints[:, 0], midpoints[:, 1]) - radius))
+evaluateTest(cur_test, 150 < trail.count < 250 and deviation < radius * (1 - math.cos(math.radians(2))) + 1e-9)
+
+cur_test = "hovering does not add points"
+trail = DisplayBuffers.TrailBuffer()
+random = numpy.random.default_rng(22)
+for step in range(1000):
+	trail.addPoint(random.normal(0.0, 0.01, 3))
+evaluateTest(cur_test, trail.count == 1 and len(trail) == 2 and trail.getColors().shape == (2, 4))
+
+cur_test = "grows in place up to maxLength, then drops the oldest points"
+trail = DisplayBuffers.TrailBuffer(maxDistance=1.0, maxLength=1000, initialCapacity=16)
+for step in range(5000):
+	trail.addPoint([float(step), 0.0, 0.0])
+points = trail.getPoints()
+evaluateTest(cur_test, len(trail.points) == 1001 and 750 <= trail.count <= 1000 and points[-1][0] == 4999.0 and numpy.all(numpy.diff(points[:, 0]) == 1.0))
+
+cur_test = "clear empties the trail"
+trail.clear()
+evaluateTest(cur_test, len(trail) == 0 and trail.getPoints().shape == (0, 3) and trail.addPoint([1.0, 2.0, 3.0]) and len(trail) == 1)
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
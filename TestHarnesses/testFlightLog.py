@@ -0,0 +1,125 @@
+#%% Initialization of test harness and helpers:
+
+import os
+import tempfile
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Containers.Inputs as Inputs
+import ece163.Simulation.Chapter4Simulate as Chapter4Simulate
+import ece163.Simulation.FlightLog as FlightLog
+import ece163.Simulation.MonteCarloSweep as MonteCarloSweep
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+directory = tempfile.mkdtemp()
+
+#%% Writing and reading logs
+
+print("Beginning testing of FlightLog")
+
+columnNames = ['time', 'state.pn', 'state.pd']
+data = numpy.column_stack([numpy.arange(100) * 0.01, numpy.arange(100) * 2.0, -100.0 - numpy.arange(100)])
+filename = os.path.join(directory, 'test.flog')
+FlightLog.writeFlightLog(filename, columnNames, data)
+log = FlightLog.FlightLog(filename)
+
+cur_test = "header and rows read back"
+evaluateTest(cur_test, log.columnNames == columnNames and len(log) == 100 and numpy.array_equal(log.rows(), data))
+
+cur_test = "rows start on the data alignment"
+evaluateTest(cur_test, log.dataOffset % FlightLog.dataAlignment == 0 and os.path.getsize(filename) == log.dataOffset + data.nbytes)
+
+cur_test = "columns are views into the file"
+column = log.column('state.pn')
+evaluateTest(cur_test, numpy.array_equal(column, data[:, 1]) and isinstance(log.data, numpy.memmap) and numpy.shares_memory(column, log.data))
+
+cur_test = "time slices use startTime <= time < endTime"
+timeSlice = log.timeSlice(0.25, 0.5)
+evaluateTest(cur_test, log.timeRange(0.25, 0.5) == slice(25, 50) and numpy.array_equal(timeSlice['state.pd'], data[25:50, 2]))
+
+cur_test = "unknown column raises a KeyError"
+try:
+	log['state.pe']
+	evaluateTest(cur_test, False)
+except KeyError:
+	evaluateTest(cur_test, True)
+log.close()
+
+cur_test = "file that is not a log raises a ValueError"
+with open(os.path.join(directory, 'other.flog'), 'wb') as f:
+	f.write(b'time,state.pn\n0.0,1.0\n0.1,2.0\n')
+try:
+	FlightLog.FlightLog(os.path.join(directory, 'other.flog'))
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+cur_test = "refresh picks up appended rows and leaves out a partial row"
+sink = FlightLog.FlightLogSink(os.path.join(directory, 'growing.flog'))
+sink.write(columnNames, data[0:10])
+log = FlightLog.FlightLog(os.path.join(directory, 'growing.flog'))
+rowsBefore = len(log)
+sink.write(columnNames, data[10:30])
+sink.logFile.write(b'\x00' * 12)
+sink.logFile.flush()
+rowsAfter = log.refresh()
+sink.close()
+evaluateTest(cur_test, rowsBefore == 10 and rowsAfter == 30 and numpy.array_equal(log.rows(), data[0:30]))
+
+cur_test = "empty log opens with no rows"
+sink = FlightLog.FlightLogSink(os.path.join(directory, 'empty.flog'))
+sink.write(columnNames, numpy.empty((0, 3)))
+sink.close()
+evaluateTest(cur_test, len(FlightLog.FlightLog(os.path.join(directory, 'empty.flog'))) == 0)
+
+#%% Simulate logs
+
+print("Beginning testing of flight logs from Simulate")
+
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+simulateInstance.streamToFile(os.path.join(directory, 'streamed.flog'), chunkSize=16)
+controls = Inputs.controlInputs(0.6, 0.01, -0.05, 0.0)
+for step in range(50):
+	simulateInstance.takeStep(controls)
+simulateInstance.closeStream()
+simulateInstance.exportToFlightLog(os.path.join(directory, 'exported.flog'))
+
+cur_test = "exported log matches the recorded data"
+log = FlightLog.FlightLog(os.path.join(directory, 'exported.flog'))
+evaluateTest(cur_test, log.columnNames == simulateInstance.takenData.columnNames and numpy.array_equal(log.rows(), simulateInstance.takenData.asArray()))
+
+cur_test = "streamed log matches the exported log"
+streamedLog = FlightLog.FlightLog(os.path.join(directory, 'streamed.flog'))
+evaluateTest(cur_test, streamedLog.columnNames == log.columnNames and numpy.array_equal(streamedLog.rows(), log.rows()))
+
+cur_test = "Monte Carlo runs write a log each"
+settings = MonteCarloSweep.buildSettings(duration=0.5, logDirectory=os.path.join(directory, 'sweep'))
+summaries = MonteCarloSweep.runSweep(2, 1, settings, processes=0)
+logs = [FlightLog.FlightLog(os.path.join(directory, 'sweep', 'run_{:06d}.flog'.format(index))) for index in range(2)]
+evaluateTest(cur_test, all([len(runLog) == 50 and runLog['state.pn'][-1] == summary['finalNorth'] for runLog, summary in zip(logs, summaries)]))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
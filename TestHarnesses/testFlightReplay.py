@@ -0,0 +1,145 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import os
+import tempfile
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Containers.Inputs as Inputs
+import ece163.Simulation.Chapter4Simulate as Chapter4Simulate
+import ece163.Simulation.FlightReplay as FlightReplay
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+directory = tempfile.mkdtemp()
+
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+simulateInstance.streamToFile(os.path.join(directory, 'flight.npz'), chunkSize=64)
+controls = Inputs.controlInputs(0.6, 0.01, -0.05, 0.0)
+states = list()
+for step in range(500):
+	simulateInstance.takeStep(controls)
+	states.append(simulateInstance.getVehicleState().copy())
+simulateInstance.closeStream()
+simulateInstance.exportToFlightLog(os.path.join(directory, 'flight.flog'))
+simulateInstance.exportToCSV(os.path.join(directory, 'flight.csv'))
+simulateInstance.exportToPickle(os.path.join(directory, 'flight.pickle'))
+recorded = simulateInstance.takenData.asArray()
+times = recorded[:, 0]
+
+#%% Opening recordings
+
+print("Beginning testing of FlightReplay.openLog")
+
+for extension in ['flog', 'csv', 'pickle', 'npz']:
+	log = FlightReplay.openLog(os.path.join(directory, 'flight.' + extension))
+	cur_test = "{} recording reads back the recorded rows".format(extension)
+	evaluateTest(cur_test, log.columnNames == simulateInstance.takenData.columnNames and len(log) == 500 and
+				 numpy.array_equal(log.rows(), recorded) and numpy.array_equal(log.rows(123, 321), recorded[123:321]) and
+				 numpy.array_equal(log.column('state.pd'), recorded[:, log.columnNames.index('state.pd')]))
+
+cur_test = "csv recording only parses the rows asked for, seeking by byte offset"
+log = FlightReplay.openLog(os.path.join(directory, 'flight.csv'))
+with open(os.path.join(directory, 'flight.csv'), 'rb') as csvFile:
+	csvFile.seek(log.offsets[250])
+	line = csvFile.readline()
+evaluateTest(cur_test, isinstance(log, FlightReplay.CSVLog) and float(line.split(b',')[0]) == times[250] and
+			 log.rows(499, 600).shape == (1, len(log.columnNames)) and log.rows(10, 10).shape == (0, len(log.columnNames)))
+
+cur_test = "unknown format raises a ValueError"
+try:
+	FlightReplay.openLog(os.path.join(directory, 'flight.txt'))
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+cur_test = "columns are grouped by the model they were recorded from"
+evaluateTest(cur_test, [name for name, columns in FlightReplay.groupColumns(log.columnNames)] == ['inputs', 'state'] and
+			 FlightReplay.groupColumns(log.columnNames)[0][1] == ['Throttle', 'Aileron', 'Elevator', 'Rudder'])
+
+#%% Seeking
+
+print("Beginning testing of FlightReplay seeking")
+
+replay = FlightReplay.FlightReplay(FlightReplay.openLog(os.path.join(directory, 'flight.flog')))
+
+cur_test = "replay starts at the first row"
+evaluateTest(cur_test, replay.index == 0 and replay.time == times[0] and replay.getEndTime() == times[-1] and len(replay) == 500)
+
+cur_test = "seek shows the last row at or before the time, clamped to the recording"
+seeks = [(times[200], 200), ((times[200] + times[201]) / 2, 200), (-5.0, 0), (1000.0, 499)]
+evaluateTest(cur_test, all([replay.seek(seekTime) == index and replay.index == index for seekTime, index in seeks]) and replay.time == times[-1] and
+			 replay.isFinished())
+
+cur_test = "state of a row matches the simulated state"
+evaluateTest(cur_test, all([replay.getState(index).toArray() == states[index].toArray() for index in [0, 77, 499]]) and
+			 replay.seekIndex(1234) == 499 and replay.getState() == states[499])
+
+#%% Playing
+
+print("Beginning testing of FlightReplay playback")
+
+cur_test = "advancing at any speed passes every row once, in order"
+matches = True
+for speed in [0.5, 1.0, 7.3]:
+	replay.seekIndex(0)
+	replay.setSpeed(speed)
+	passedRows = [0]
+	frames = 0
+	while not replay.isFinished():
+		rows = replay.advance(0.02)
+		passedRows.extend(range(rows.start, rows.stop))
+		frames += 1
+	matches = matches and passedRows == list(range(500)) and abs(frames * 0.02 * speed - (times[-1] - times[0])) <= 0.02 * speed
+evaluateTest(cur_test, matches)
+
+cur_test = "non-positive speed raises a ValueError"
+try:
+	replay.setSpeed(0.0)
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+cur_test = "history and values give the rows to plot after a seek"
+replay.seekIndex(300)
+history = replay.history(100)
+historyTimes, values = replay.getValues(['state.pn', 'Throttle'], history)
+evaluateTest(cur_test, history == slice(201, 301) and replay.history() == slice(0, 301) and numpy.array_equal(historyTimes, times[201:301]) and
+			 numpy.array_equal(values[:, 0], recorded[201:301, replay.columnIndex['state.pn']]) and numpy.all(values[:, 1] == 0.6))
+
+cur_test = "refresh picks up rows streamed after opening"
+sink = FlightReplay.FlightLog.FlightLogSink(os.path.join(directory, 'growing.flog'))
+sink.write(simulateInstance.takenData.columnNames, recorded[0:100])
+replay = FlightReplay.FlightReplay(FlightReplay.openLog(os.path.join(directory, 'growing.flog')))
+rowsBefore = len(replay)
+replay.seek(math.inf)
+sink.write(simulateInstance.takenData.columnNames, recorded[100:250])
+sink.close()
+evaluateTest(cur_test, rowsBefore == 100 and replay.isFinished() and replay.refresh() == 250 and not replay.isFinished() and
+			 replay.advance(0.505) == slice(100, 150))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
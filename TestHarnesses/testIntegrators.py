@@ -0,0 +1,149 @@
+#%% Initialization of test harness and helpers:
+
+import math
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Containers.Inputs as Inputs
+import ece163.Containers.States as States
+import ece163.Controls.VehicleTrim as VehicleTrim
+import ece163.Modeling.VehicleAerodynamicsModel as VAM
+import ece163.Modeling.VehicleDynamicsModel as VDM
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def stateError(state, reference):
+	"""Largest difference in positions, velocities, rates and DCM entries between two states"""
+	members = max([abs(getattr(state, member) - getattr(reference, member)) for member in ['pn', 'pe', 'pd', 'u', 'v', 'w', 'p', 'q', 'r']])
+	return max(members, max([abs(state.R[i][j] - reference.R[i][j]) for i in range(3) for j in range(3)]))
+
+def orthonormalError(R):
+	"""Largest entry of R*R' - I"""
+	return max([abs(sum([R[i][k] * R[j][k] for k in range(3)]) - (1.0 if i == j else 0.0)) for i in range(3) for j in range(3)])
+
+"""Trimmed in a climbing turn, then flown with the aileron and elevator off trim so all of the states move:"""
+trim = VehicleTrim.VehicleTrim()
+trim.computeTrim(25.0, 1 / 150, math.radians(3))
+trimState = trim.getTrimState()
+trimControls = trim.getTrimControls()
+controls = Inputs.controlInputs(trimControls.Throttle, trimControls.Aileron + 0.02, trimControls.Elevator - 0.02, trimControls.Rudder)
+duration = 5.0
+
+def fly(integrator, dT, rtol=None, atol=None):
+	"""Flies the test manoeuvre for duration, returns the final state and the derivative evaluations used"""
+	model = VAM.VehicleAerodynamicsModel(dT=dT, integrator=integrator)
+	if rtol is not None:
+		model.getVehicleDynamicsModel().setIntegrator(integrator, rtol, atol)
+	model.setVehicleState(trimState.copy())
+	evaluations = 0
+	for step in range(int(round(duration / dT))):
+		model.Update(controls)
+		evaluations += model.getVehicleDynamicsModel().evaluationCount if integrator != 'ForwardEuler' else 1
+	return model.getVehicleState(), evaluations
+
+reference, referenceEvaluations = fly('RK4', 0.002)
+
+#%% Integrator selection
+
+print("Beginning testing of VehicleDynamicsModel.setIntegrator()")
+
+cur_test = "forward Euler is the default"
+evaluateTest(cur_test, VDM.VehicleDynamicsModel().getIntegrator() == 'ForwardEuler')
+
+cur_test = "forward Euler Update is unchanged"
+model = VDM.VehicleDynamicsModel()
+model.setVehicleState(States.vehicleState(u=25.0, p=0.1, q=-0.2, r=0.3))
+forcesMoments = Inputs.forcesMoments(1.0, 2.0, 3.0, 0.1, 0.2, 0.3)
+dot = model.derivative(model.getVehicleState(), forcesMoments)
+expected = model.IntegrateState(model.dT, model.getVehicleState(), dot)
+model.Update(forcesMoments)
+evaluateTest(cur_test, model.getVehicleState().toArray() == expected.toArray() and model.getVehicleState().R == expected.R)
+
+cur_test = "unknown integrator raises a ValueError"
+try:
+	VDM.VehicleDynamicsModel(integrator='Midpoint')
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+cur_test = "reset keeps the integrator"
+model = VAM.VehicleAerodynamicsModel(dT=0.05, integrator='RK4')
+model.reset()
+evaluateTest(cur_test, model.getVehicleDynamicsModel().getIntegrator() == 'RK4' and model.getVehicleDynamicsModel().dT == 0.05)
+
+#%% Accuracy against the reference trajectory
+
+print("Beginning testing of integrator accuracy")
+
+eulerState, eulerEvaluations = fly('ForwardEuler', 0.01)
+rk4State, rk4Evaluations = fly('RK4', 0.05)
+rk4HalfState, rk4HalfEvaluations = fly('RK4', 0.025)
+dpState, dpEvaluations = fly('DormandPrince', 0.5)
+dpTightState, dpTightEvaluations = fly('DormandPrince', 0.5, 1e-9, 1e-11)
+
+cur_test = "RK4 is fourth order"
+evaluateTest(cur_test, stateError(rk4State, reference) / stateError(rk4HalfState, reference) > 12.0)
+
+cur_test = "RK4 at 0.05 s is within 1e-4 of the reference"
+evaluateTest(cur_test, stateError(rk4State, reference) < 1e-4)
+
+cur_test = "RK4 at 0.05 s beats forward Euler at 0.01 s with fewer evaluations"
+evaluateTest(cur_test, stateError(rk4State, reference) < stateError(eulerState, reference) / 100 and rk4Evaluations < eulerEvaluations)
+
+cur_test = "Dormand-Prince at 0.5 s is within 1e-5 of the reference"
+evaluateTest(cur_test, stateError(dpState, reference) < 1e-5)
+
+cur_test = "Dormand-Prince error follows the tolerance"
+evaluateTest(cur_test, stateError(dpTightState, reference) < 1e-7)
+
+cur_test = "DCM stays orthonormal"
+evaluateTest(cur_test, all([orthonormalError(state.R) < 1e-12 for state in [rk4State, dpState, dpTightState]]))
+
+#%% Adaptive step failures
+
+print("Beginning testing of VehicleDynamicsModel.DormandPrince() failures")
+
+cur_test = "NaN forces raise an ArithmeticError instead of shrinking the step forever"
+dynamics = VDM.VehicleDynamicsModel(integrator='DormandPrince')
+dynamics.setVehicleState(trimState.copy())
+try:
+	dynamics.Update(Inputs.forcesMoments(Fx=math.nan))
+	evaluateTest(cur_test, False)
+except ArithmeticError:
+	evaluateTest(cur_test, dynamics.adaptiveStep == dynamics.dT)
+
+cur_test = "unreachable tolerance stops at hmin or maxSteps"
+results = list()
+for hmin, maxSteps in [(1e-4, 10000), (0.0, 50)]:
+	dynamics = VDM.VehicleDynamicsModel(integrator='DormandPrince')
+	dynamics.setIntegrator('DormandPrince', 0.0, 1e-30, hmin, maxSteps)
+	dynamics.setVehicleState(trimState.copy())
+	try:
+		dynamics.Update(Inputs.forcesMoments(Fx=10.0, My=1.0))
+		results.append(False)
+	except ArithmeticError:
+		results.append(dynamics.evaluationCount <= 1 + 6 * maxSteps)
+evaluateTest(cur_test, all(results))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
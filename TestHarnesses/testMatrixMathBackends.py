@@ -0,0 +1,126 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import random
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Utilities.MatrixMath as mm
+import ece163.Utilities.MatrixMathUnrolled as mmUnrolled
+import ece163.Utilities.MatrixMathNumpy as mmNumpy
+
+"""math.isclose doesn't work well for comparing things near 0 unless we
+use an absolute tolerance, so we make our own isclose:"""
+isclose = lambda  a,b : math.isclose(a, b, abs_tol= 1e-12)
+
+def compareMatrices(A, B):
+	"""Element by element comparison of two matrices (lists of lists or 2D arrays)"""
+	if len(A) != len(B) or len(A[0]) != len(B[0]):
+		return False
+	return all(isclose(float(A[i][j]), float(B[i][j])) for i in range(len(A)) for j in range(len(A[0])))
+
+def exactlyEqual(A, B):
+	"""Exact equality of two list of lists matrices"""
+	return [list(row) for row in A] == [list(row) for row in B]
+
+#of course, you should test your testing tools too:
+assert(compareMatrices([[0], [0], [-1]],[[1e-13], [0], [-1+1e-9]]))
+assert(not compareMatrices([[0], [0], [-1]],[[1e-11], [0], [-1]]))
+assert(not exactlyEqual([[1.0, 2.0]], [[1.0, 2.0 + 1e-15]]))
+
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def raisesArithmeticError(function, *args):
+	"""Returns True if calling function(*args) raises an ArithmeticError"""
+	try:
+		function(*args)
+	except ArithmeticError:
+		return True
+	return False
+
+random.seed(163)
+randomMatrix = lambda m, n : [[random.uniform(-10, 10) for j in range(n)] for i in range(m)]
+
+"""Every backend is checked against the native list functions (mm.nativeFunctions), which are kept even when
+ECE163_MATRIXMATH selects a different backend for the rest of the code."""
+native = mm.nativeFunctions
+
+#%% Unrolled backend, must be bit identical to native
+
+print("Beginning testing of MatrixMathUnrolled")
+
+for (m, n, r) in [(3, 3, 3), (3, 3, 1), (1, 3, 3), (3, 1, 3), (2, 4, 5), (4, 3, 3)]:
+	A = randomMatrix(m, n)
+	B = randomMatrix(n, r)
+	evaluateTest(f"unrolled multiply [{m}x{n}]*[{n}x{r}]", exactlyEqual(mmUnrolled.multiply(A, B), native['multiply'](A, B)))
+
+for (m, n) in [(3, 3), (3, 1), (2, 5)]:
+	A = randomMatrix(m, n)
+	B = randomMatrix(m, n)
+	evaluateTest(f"unrolled transpose [{m}x{n}]", exactlyEqual(mmUnrolled.transpose(A), native['transpose'](A)))
+	evaluateTest(f"unrolled add [{m}x{n}]", exactlyEqual(mmUnrolled.add(A, B), native['add'](A, B)))
+	evaluateTest(f"unrolled subtract [{m}x{n}]", exactlyEqual(mmUnrolled.subtract(A, B), native['subtract'](A, B)))
+	evaluateTest(f"unrolled dotProduct [{m}x{n}]", exactlyEqual(mmUnrolled.dotProduct(A, B), native['multiply'](native['transpose'](A), B)))
+
+A = randomMatrix(3, 1)
+B = randomMatrix(3, 1)
+evaluateTest("unrolled crossProduct", compareMatrices(mmUnrolled.crossProduct(A, B), native['crossProduct'](A, B)))
+evaluateTest("unrolled vectorNorm", exactlyEqual(mmUnrolled.vectorNorm(A), native['vectorNorm'](A)))
+evaluateTest("unrolled multiply dimension error", raisesArithmeticError(mmUnrolled.multiply, randomMatrix(3, 3), randomMatrix(2, 1)))
+evaluateTest("unrolled add dimension error", raisesArithmeticError(mmUnrolled.add, randomMatrix(3, 1), randomMatrix(3, 3)))
+
+#%% NumPy backend, must agree with native to tolerance
+
+print("Beginning testing of MatrixMathNumpy")
+
+for (m, n, r) in [(3, 3, 3), (3, 3, 1), (2, 4, 5)]:
+	A = randomMatrix(m, n)
+	B = randomMatrix(n, r)
+	evaluateTest(f"numpy multiply [{m}x{n}]*[{n}x{r}]", compareMatrices(mmNumpy.multiply(A, B), native['multiply'](A, B)))
+
+A = randomMatrix(3, 3)
+B = randomMatrix(3, 3)
+evaluateTest("numpy transpose", compareMatrices(mmNumpy.transpose(A), native['transpose'](A)))
+evaluateTest("numpy add", compareMatrices(mmNumpy.add(A, B), native['add'](A, B)))
+evaluateTest("numpy subtract", compareMatrices(mmNumpy.subtract(A, B), native['subtract'](A, B)))
+evaluateTest("numpy scalarMultiply", compareMatrices(mmNumpy.scalarMultiply(2.5, A), native['scalarMultiply'](2.5, A)))
+evaluateTest("numpy scalarDivide", compareMatrices(mmNumpy.scalarDivide(2.5, A), native['scalarDivide'](2.5, A)))
+evaluateTest("numpy skew", compareMatrices(mmNumpy.skew(1, 2, 3), native['skew'](1, 2, 3)))
+evaluateTest("numpy offset", compareMatrices(mmNumpy.offset(A, 1, 2, 3), native['offset'](A, 1, 2, 3)))
+
+AT = mmNumpy.transpose(A)
+AT[0][1] = 1000.0
+evaluateTest("numpy transpose returns a copy", A[1][0] != 1000.0)
+
+A = randomMatrix(3, 1)
+B = randomMatrix(3, 1)
+evaluateTest("numpy crossProduct", compareMatrices(mmNumpy.crossProduct(A, B), native['crossProduct'](A, B)))
+evaluateTest("numpy dotProduct", compareMatrices(mmNumpy.dotProduct(A, B), native['dotProduct'](A, B)))
+evaluateTest("numpy vectorNorm", compareMatrices(mmNumpy.vectorNorm(A), native['vectorNorm'](A)))
+evaluateTest("numpy vectorNorm of zero", compareMatrices(mmNumpy.vectorNorm([[0], [0], [0]]), [[0], [0], [0]]))
+evaluateTest("numpy size", mmNumpy.size(randomMatrix(2, 5)) == [2, 5])
+evaluateTest("numpy multiply dimension error", raisesArithmeticError(mmNumpy.multiply, randomMatrix(3, 3), randomMatrix(2, 1)))
+evaluateTest("numpy crossProduct dimension error", raisesArithmeticError(mmNumpy.crossProduct, randomMatrix(3, 3), B))
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
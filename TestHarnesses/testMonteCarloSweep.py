@@ -0,0 +1,116 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import os
+import random
+import tempfile
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Constants.VehiclePhysicalConstants as VPC
+import ece163.Modeling.WindModel as WM
+import ece163.Sensors.SensorsModel as SM
+import ece163.Simulation.MonteCarloSweep as MonteCarloSweep
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def metrics(summary):
+	"""Run summary without the wall clock time, which is the only member allowed to differ between repeats"""
+	return {name: value for name, value in summary.items() if name != 'wallTime'}
+
+
+if __name__ == '__main__':	# the pool re-imports this file in its workers on platforms that spawn
+
+	#%% Per instance random number generators
+
+	print("Beginning testing of the rng arguments")
+
+	cur_test = "seeded WindModel gusts repeat"
+	gustWinds = []
+	for repeat in range(2):
+		windModel = WM.WindModel(drydenParameters=VPC.DrydenLowAltitudeLight, rng=random.Random(11))
+		for step in range(50):
+			windModel.Update()
+		gustWinds.append((windModel.getWind().Wu, windModel.getWind().Wv, windModel.getWind().Ww))
+	evaluateTest(cur_test, gustWinds[0] == gustWinds[1] and gustWinds[0] != (0.0, 0.0, 0.0))
+
+	cur_test = "seeded SensorsModel ignores the global random module"
+	noisy = []
+	for globalSeed in [1, 2]:
+		random.seed(globalSeed)
+		sensorsModel = SM.SensorsModel(rng=random.Random(11))
+		for step in range(50):
+			sensorsModel.update()
+		noisy.append(vars(sensorsModel.getSensorsNoisy()))
+	evaluateTest(cur_test, noisy[0] == noisy[1])
+
+	cur_test = "default SensorsModel still draws from the global random module"
+	noisy = []
+	for globalSeed in [1, 1, 2]:
+		random.seed(globalSeed)
+		sensorsModel = SM.SensorsModel()
+		sensorsModel.update()
+		noisy.append(vars(sensorsModel.getSensorsNoisy()))
+	evaluateTest(cur_test, noisy[0] == noisy[1] and noisy[0] != noisy[2])
+
+	cur_test = "seeded GaussMarkov repeats"
+	gaussMarkovs = [SM.GaussMarkov(tau=100.0, eta=0.1, rng=random.Random(5)) for repeat in range(2)]
+	evaluateTest(cur_test, [gaussMarkovs[0].update() for step in range(10)] == [gaussMarkovs[1].update() for step in range(10)])
+
+	#%% Sweep
+
+	print("Beginning testing of MonteCarloSweep")
+
+	settings = MonteCarloSweep.buildSettings(duration=2.0, drydenParameters=VPC.DrydenLowAltitudeLight)
+
+	serial = MonteCarloSweep.runSweep(4, 163, settings, processes=0)
+	outputFile = os.path.join(tempfile.mkdtemp(), 'sweep.csv')
+	arrived = []
+	pooled = MonteCarloSweep.runSweep(4, 163, settings, processes=2, output=outputFile, callback=arrived.append)
+
+	cur_test = "pool gives the same runs as serial"
+	evaluateTest(cur_test, [metrics(summary) for summary in serial] == [metrics(summary) for summary in pooled])
+
+	cur_test = "runs are sorted by index and streamed to the callback"
+	evaluateTest(cur_test, [summary['index'] for summary in pooled] == [0, 1, 2, 3] and len(arrived) == 4)
+
+	cur_test = "a run repeats on its own from its index"
+	evaluateTest(cur_test, metrics(MonteCarloSweep.runSample((2, 163, settings))) == metrics(serial[2]))
+
+	cur_test = "different runs are dispersed"
+	evaluateTest(cur_test, len(set([summary['rmsAltitudeError'] for summary in serial])) == 4)
+
+	cur_test = "different sweep seeds differ"
+	other = MonteCarloSweep.runSweep(1, 164, settings, processes=0)
+	evaluateTest(cur_test, other[0]['Wn'] != serial[0]['Wn'] and other[0]['seed'] == '164-0')
+
+	cur_test = "closed loop holds altitude"
+	evaluateTest(cur_test, all([math.isfinite(summary['finalAltitude']) and summary['maxAltitudeError'] < 5.0 for summary in serial]))
+
+	cur_test = "csv has a header and a line per run"
+	with open(outputFile) as f:
+		lines = f.read().splitlines()
+	evaluateTest(cur_test, lines[0].split(',') == MonteCarloSweep.summaryNames and len(lines) == 5)
+
+
+	#%% Print results:
+
+	total = len(passed) + len(failed)
+	print(f"\n---\nPassed {len(passed)}/{total} tests")
+	[print("   " + test) for test in passed]
+
+	if failed:
+		print(f"Failed {len(failed)}/{total} tests:")
+		[print("   " + test) for test in failed]
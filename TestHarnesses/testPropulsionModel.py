@@ -0,0 +1,114 @@
+#%% Initialization of test harness and helpers:
+
+import itertools
+import math
+import timeit
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Constants.VehiclePhysicalConstants as VPC
+import ece163.Controls.VehiclePerturbationModels as VehiclePerturbationModels
+import ece163.Controls.VehicleTrim as VehicleTrim
+import ece163.Modeling.PropulsionModel as PropulsionModel
+import ece163.Modeling.VectorizedAerodynamics as VectorizedAerodynamics
+import ece163.Modeling.VehicleAerodynamicsModel as VehicleAerodynamicsModel
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def isclose(a, b, tolerance=1e-9):
+	return all([math.isclose(x, y, rel_tol=tolerance, abs_tol=tolerance) for x, y in zip(a, b)])
+
+propulsionModel = PropulsionModel.PropulsionModel()
+operatingPoints = list(itertools.product([0.0, 5.0, 18.0, 25.0, 40.0, 60.0], [0.0, 0.2, 0.6, 1.0]))
+
+#%% Thrust and torque
+
+print("Beginning testing of PropulsionModel.CalculatePropForces()")
+
+cur_test = "thrust and torque match the propeller model"
+evaluateTest(cur_test, all([isclose(propulsionModel.CalculatePropForces(Va, throttle), [float(value) for value in VectorizedAerodynamics.CalculatePropForces(Va, throttle)], 1e-12)
+							for Va, throttle in operatingPoints + [(0.0, -10.0), (5.0, -10.0)]]))
+
+cur_test = "the aerodynamics model uses the propulsion model"
+aeroModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel()
+evaluateTest(cur_test, aeroModel.CalculatePropForces(25.0, 0.6) == aeroModel.getPropulsionModel().CalculatePropForces(25.0, 0.6))
+
+cur_test = "constant terms are derived again after a constant changes"
+originalRho = VPC.rho
+sameBefore = propulsionModel.refresh()
+VPC.rho = originalRho * 0.8
+try:
+	derived = propulsionModel.refresh()
+	aeroModel.reset()
+	changedThrust = propulsionModel.CalculatePropForces(25.0, 0.6)
+	expectedThrust = [float(value) for value in VectorizedAerodynamics.CalculatePropForces(25.0, 0.6)]
+	resetThrust = aeroModel.CalculatePropForces(25.0, 0.6)
+finally:
+	VPC.rho = originalRho
+	propulsionModel.refresh()
+	aeroModel.reset()
+evaluateTest(cur_test, not sameBefore and derived and isclose(changedThrust, expectedThrust, 1e-12) and isclose(resetThrust, expectedThrust, 1e-12))
+
+cur_test = "lookups are faster than the previous per call derivation"
+def derivedPerCall(Va, Throttle):
+	"""The constant terms worked out on every call, as CalculatePropForces did before"""
+	KT = 60 / (2 * math.pi * VPC.KV)
+	a = (VPC.rho * (VPC.D_prop ** 5) * VPC.C_Q0) / (4 * (math.pi ** 2))
+	b = ((VPC.rho * (VPC.D_prop ** 4) * Va * VPC.C_Q1) / (2 * math.pi)) + ((KT * KT) / (VPC.R_motor))
+	c = (VPC.rho * (VPC.D_prop ** 3) * (Va ** 2) * VPC.C_Q2) - (KT * ((VPC.V_max * Throttle) / VPC.R_motor)) + (KT * VPC.i0)
+	omega = ((-1 * b) + math.sqrt((b ** 2) - (4 * a * c))) / (2 * a)
+	J = (2 * math.pi * Va) / (omega * VPC.D_prop)
+	CT = VPC.C_T0 + (VPC.C_T1 * J) + (VPC.C_T2 * (J ** 2))
+	CQ = VPC.C_Q0 + (VPC.C_Q1 * J) + (VPC.C_Q2 * (J ** 2))
+	return (VPC.rho * (omega ** 2) * (VPC.D_prop ** 4) * CT) / (4 * (math.pi ** 2)), -1 * ((VPC.rho * (omega ** 2) * (VPC.D_prop ** 5) * CQ) / (4 * (math.pi ** 2)))
+modelTime = min(timeit.repeat(lambda: propulsionModel.CalculatePropForces(25.0, 0.6), number=20000, repeat=5))
+perCallTime = min(timeit.repeat(lambda: derivedPerCall(25.0, 0.6), number=20000, repeat=5))
+evaluateTest(cur_test, isclose(derivedPerCall(25.0, 0.6), propulsionModel.CalculatePropForces(25.0, 0.6), 1e-12) and modelTime < perCallTime)
+
+#%% Derivatives
+
+print("Beginning testing of PropulsionModel.CalculatePropDerivatives()")
+
+def centralDifference(Va, Throttle, step=1e-6):
+	"""Thrust and torque partials by central differences"""
+	dVa = [(plus - minus) / (2 * step) for plus, minus in zip(propulsionModel.CalculatePropForces(Va + step, Throttle), propulsionModel.CalculatePropForces(Va - step, Throttle))]
+	dThrottle = [(plus - minus) / (2 * step) for plus, minus in zip(propulsionModel.CalculatePropForces(Va, Throttle + step), propulsionModel.CalculatePropForces(Va, Throttle - step))]
+	return dVa + dThrottle
+
+cur_test = "derivatives match finite differences"
+evaluateTest(cur_test, all([isclose(sum(propulsionModel.CalculatePropDerivatives(Va, throttle), ()), centralDifference(Va, throttle), 1e-5)
+							for Va, throttle in operatingPoints]))
+
+cur_test = "derivatives hold the propeller speed where it is imaginary"
+evaluateTest(cur_test, isclose(sum(propulsionModel.CalculatePropDerivatives(5.0, -10.0), ()), centralDifference(5.0, -10.0), 1e-5) and
+			 propulsionModel.dThrust_dThrottle(5.0, -10.0) == 0.0)
+
+cur_test = "transfer functions use the analytic derivatives"
+trim = VehicleTrim.VehicleTrim()
+trim.computeTrim(25.0, 0.0, 0.0)
+trimState, trimControls = trim.getTrimState(), trim.getTrimControls()
+transferFunction = VehiclePerturbationModels.CreateTransferFunction(trimState, trimControls)
+evaluateTest(cur_test, math.isclose(transferFunction.a_V2, propulsionModel.dThrust_dThrottle(trimState.Va, trimControls.Throttle) / VPC.mass, rel_tol=1e-12))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
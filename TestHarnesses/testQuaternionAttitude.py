@@ -0,0 +1,130 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import random
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Containers.Inputs as Inputs
+import ece163.Containers.States as States
+import ece163.Modeling.VehicleAerodynamicsModel as VAM
+import ece163.Modeling.VehicleDynamicsModel as VDM
+import ece163.Utilities.Rotations as Rotations
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def matrixDifference(A, B):
+	"""Largest difference between the entries of two 3x3 matrices"""
+	return max([abs(A[i][j] - B[i][j]) for i in range(3) for j in range(3)])
+
+def orthonormalError(R):
+	"""Largest entry of R*R' - I"""
+	return max([abs(sum([R[i][k] * R[j][k] for k in range(3)]) - (1.0 if i == j else 0.0)) for i in range(3) for j in range(3)])
+
+def fly(integrator, attitude, steps):
+	"""Tumbles the vehicle with no forces for steps, returns the final state"""
+	model = VDM.VehicleDynamicsModel(integrator=integrator, attitude=attitude)
+	model.setVehicleState(States.vehicleState(u=25.0, yaw=0.3, pitch=0.1, roll=-0.2, p=0.4, q=-0.3, r=0.5))
+	forcesMoments = Inputs.forcesMoments()
+	for step in range(steps):
+		model.Update(forcesMoments)
+	return model.getVehicleState()
+
+rng = random.Random(19)
+angles = [(rng.uniform(-math.pi, math.pi), rng.uniform(-1.5, 1.5), rng.uniform(-math.pi, math.pi)) for sample in range(50)]
+
+#%% Quaternion kernels
+
+print("Beginning testing of the quaternion kernels")
+
+cur_test = "quaternionMultiply composes the DCMs"
+evaluateTest(cur_test, max([matrixDifference(Rotations.quaternion2DCM(Rotations.quaternionMultiply(Rotations.euler2Quaternion(*first), Rotations.euler2Quaternion(*second))),
+											 Rotations.multiply3x3(Rotations.euler2DCM(*second), Rotations.euler2DCM(*first))) for first, second in zip(angles, angles[1:])]) < 1e-14)
+
+cur_test = "ExpQuaternion is the quaternion of ExpSO3"
+model = VDM.VehicleDynamicsModel()
+thetas = [[0.3, -0.2, 0.5], [2.0, 1.0, -1.5], [1e-4, -2e-4, 3e-4], [0.0, 0.0, 0.0]]
+evaluateTest(cur_test, max([matrixDifference(Rotations.quaternion2DCM(model.ExpQuaternion(theta)), model.ExpSO3(theta)) for theta in thetas]) < 1e-15)
+
+#%% States built from a quaternion
+
+print("Beginning testing of vehicleState with a quaternion")
+
+yaw, pitch, roll = angles[0]
+quaternion = Rotations.euler2Quaternion(yaw, pitch, roll)
+state = States.vehicleState(1.0, 2.0, 3.0, 25.0, 0.5, 1.0, p=0.1, q=0.2, r=0.3, quaternion=quaternion)
+
+cur_test = "Euler angles come from the quaternion, the DCM only when read"
+evaluateTest(cur_test, max([abs(a - b) for a, b in zip((state.yaw, state.pitch, state.roll), (yaw, pitch, roll))]) < 1e-12 and state._R is None and
+			 matrixDifference(state.R, Rotations.euler2DCM(yaw, pitch, roll)) < 1e-15 and state.quaternion is quaternion)
+
+cur_test = "quaternion of a state is read from its DCM, and follows an assigned DCM"
+state = States.vehicleState(yaw=yaw, pitch=pitch, roll=roll)
+readQuaternion = state.quaternion
+state.R = Rotations.euler2DCM(*angles[1])
+evaluateTest(cur_test, max([abs(a - b) for a, b in zip(readQuaternion, quaternion)]) < 1e-15 and
+			 max([abs(a - b) for a, b in zip(state.quaternion, Rotations.euler2Quaternion(*angles[1]))]) < 1e-15)
+
+cur_test = "assigned quaternion moves the Euler angles and the DCM with it"
+state = States.vehicleState(yaw=0.5)
+state.R
+state.quaternion = Rotations.euler2Quaternion(1.2, 0.0, 0.0)
+evaluateTest(cur_test, abs(state.yaw - 1.2) < 1e-12 and abs(state.pitch) < 1e-12 and abs(state.roll) < 1e-12 and
+			 matrixDifference(state.R, Rotations.euler2DCM(1.2, 0.0, 0.0)) < 1e-15)
+
+#%% Attitude selection
+
+print("Beginning testing of VehicleDynamicsModel.setAttitude()")
+
+cur_test = "DCM is the default"
+evaluateTest(cur_test, VDM.VehicleDynamicsModel().getAttitude() == 'DCM')
+
+cur_test = "unknown attitude representation raises a ValueError"
+try:
+	VDM.VehicleDynamicsModel(attitude='Euler')
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+cur_test = "aerodynamics model keeps the attitude representation through reset"
+aeroModel = VAM.VehicleAerodynamicsModel(attitude='Quaternion')
+aeroModel.reset()
+evaluateTest(cur_test, aeroModel.getVehicleDynamicsModel().getAttitude() == 'Quaternion')
+
+#%% Propagation
+
+print("Beginning testing of quaternion attitude propagation")
+
+for integrator, steps in [('ForwardEuler', 20000), ('RK4', 2000), ('DormandPrince', 2000)]:
+	dcmState = fly(integrator, 'DCM', steps)
+	quaternionState = fly(integrator, 'Quaternion', steps)
+	cur_test = "{} quaternion propagation matches the DCM over {} steps".format(integrator, steps)
+	evaluateTest(cur_test, max([abs(a - b) for a, b in zip(dcmState.toArray(), quaternionState.toArray())]) < 1e-9 and
+				 matrixDifference(dcmState.R, quaternionState.R) < 1e-9)
+	if integrator == 'ForwardEuler':
+		cur_test = "quaternion stays unit and its DCM orthonormal, closer than the propagated DCM"
+		evaluateTest(cur_test, abs(sum([q * q for q in quaternionState.quaternion]) - 1) < 1e-15 and
+					 orthonormalError(quaternionState.R) < 1e-15 and orthonormalError(quaternionState.R) <= orthonormalError(dcmState.R))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
@@ -0,0 +1,143 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import random
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Modeling.VehicleBatchModel as VehicleBatchModel
+import ece163.Modeling.VehicleGeometry as VehicleGeometry
+import ece163.Utilities.MatrixMath as MatrixMath
+import ece163.Utilities.Rotations as Rotations
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def maxDifference(A, B):
+	return float(numpy.max(numpy.abs(numpy.array(A, dtype=float) - numpy.array(B, dtype=float))))
+
+rng = random.Random(18)
+angles = [(rng.uniform(-math.pi, math.pi), rng.uniform(-1.5, 1.5), rng.uniform(-math.pi, math.pi)) for sample in range(200)]
+
+#%% DCM kernels
+
+print("Beginning testing of the Rotations DCM kernels")
+
+cur_test = "euler2DCM is the product of the three rotations"
+def elementaryDCM(yaw, pitch, roll):
+	"""R = R(roll) R(pitch) R(yaw), built with MatrixMath"""
+	Ryaw = [[math.cos(yaw), math.sin(yaw), 0], [-math.sin(yaw), math.cos(yaw), 0], [0, 0, 1]]
+	Rpitch = [[math.cos(pitch), 0, -math.sin(pitch)], [0, 1, 0], [math.sin(pitch), 0, math.cos(pitch)]]
+	Rroll = [[1, 0, 0], [0, math.cos(roll), math.sin(roll)], [0, -math.sin(roll), math.cos(roll)]]
+	return MatrixMath.multiply(Rroll, MatrixMath.multiply(Rpitch, Ryaw))
+evaluateTest(cur_test, max([maxDifference(Rotations.euler2DCM(*angle), elementaryDCM(*angle)) for angle in angles]) < 1e-15)
+
+cur_test = "dcm2Euler clamps without changing the DCM given"
+DCM = Rotations.euler2DCM(0.3, math.pi / 2, 0.0)
+DCM[0][2] = -1.0000000001
+original = [row[:] for row in DCM]
+yaw, pitch, roll = Rotations.dcm2Euler(DCM)
+evaluateTest(cur_test, DCM == original and pitch == math.pi / 2)
+
+cur_test = "multiply3x3 and bodyToInertial give the same sums as MatrixMath"
+A, B = Rotations.euler2DCM(*angles[0]), Rotations.euler2DCM(*angles[1])
+evaluateTest(cur_test, Rotations.multiply3x3(A, B) == MatrixMath.multiply(A, B) and
+			 list(Rotations.bodyToInertial(A, 1.5, -2.0, 3.0)) == [row[0] for row in MatrixMath.multiply(MatrixMath.transpose(A), [[1.5], [-2.0], [3.0]])])
+
+#%% Points
+
+print("Beginning testing of Rotations.ned2enu() and bodyToENU()")
+
+cur_test = "ned2enu takes lists and numpy arrays"
+points = [[rng.uniform(-5, 5) for axis in range(3)] for point in range(10)]
+evaluateTest(cur_test, Rotations.ned2enu(points) == [[point[1], point[0], -point[2]] for point in points] and
+			 numpy.array_equal(Rotations.ned2enu(numpy.array(points)), numpy.array(Rotations.ned2enu(points))))
+
+cur_test = "bodyToENU rotates, moves and converts like the MatrixMath pipeline"
+DCM = Rotations.euler2DCM(*angles[2])
+expected = Rotations.ned2enu(MatrixMath.add(MatrixMath.multiply(points, DCM), [[10.0, -20.0, -100.0]] * len(points)))
+evaluateTest(cur_test, maxDifference(Rotations.bodyToENU(points, DCM, 10.0, -20.0, -100.0), expected) < 1e-12 and
+			 maxDifference(Rotations.bodyToENU(numpy.array(points), DCM, 10.0, -20.0, -100.0), expected) < 1e-12)
+
+cur_test = "vehicle points are rotated and moved"
+geometry = VehicleGeometry.VehicleGeometry()
+newPoints = geometry.getNewPoints(10.0, -20.0, -100.0, *angles[3])
+expected = Rotations.ned2enu(MatrixMath.add(MatrixMath.multiply(geometry.vertices, Rotations.euler2DCM(*angles[3])), [[10.0, -20.0, -100.0]] * len(geometry.vertices)))
+evaluateTest(cur_test, maxDifference(newPoints, expected) < 1e-12)
+
+cur_test = "array vehicle points match getNewPoints, scaled, written into the buffer given"
+output = numpy.empty((len(geometry.vertices), 3))
+scaledPoints = geometry.getNewPointsArray(10.0, -20.0, -100.0, *angles[3], scale=2.5, out=output)
+evaluateTest(cur_test, scaledPoints is output and maxDifference(scaledPoints, numpy.array(newPoints) * 2.5) < 1e-12 and
+			 maxDifference(geometry.getNewPointsArray(10.0, -20.0, -100.0, *angles[3]), newPoints) < 1e-12)
+
+cur_test = "vertex array is built once per scale and shared"
+evaluateTest(cur_test, geometry.getVertexArray(2.5) is geometry.getVertexArray(2.5) and not geometry.getVertexArray(2.5).flags.writeable and
+			 maxDifference(geometry.getVertexArray(), geometry.vertices) == 0.0)
+
+cur_test = "euler2DCMArray matches euler2DCM for arrays of angles, broadcasting a scalar"
+angleArray = numpy.array(angles)
+evaluateTest(cur_test, maxDifference(Rotations.euler2DCMArray(angleArray[:, 0], angleArray[:, 1], angleArray[:, 2]), [Rotations.euler2DCM(*angle) for angle in angles]) == 0.0 and
+			 Rotations.euler2DCMArray(angleArray[:, 0], 0.0, angleArray[:, 2]).shape == (len(angles), 3, 3))
+
+cur_test = "batch of vehicle points matches each vehicle's, straight from the batch model arrays"
+batch = VehicleBatchModel.VehicleBatchModel(numVehicles=20, seed=24)
+batch.state[:, 0:3] += numpy.random.default_rng(24).uniform(-50.0, 50.0, (20, 3))
+controls = numpy.tile([0.6, 0.02, -0.03, 0.01], (20, 1))
+for step in range(50):
+	batch.Update(controls)
+batchPoints = geometry.getBatchPointsArray(batch.state[:, 0:3], batch.R, scale=2.5)
+evaluateTest(cur_test, batchPoints.shape == (20, len(geometry.vertices), 3) and
+			 max([maxDifference(batchPoints[index], geometry.getNewPointsArray(*batch.state[index, 0:3], *batch.state[index, 6:9], scale=2.5)) for index in range(20)]) < 1e-9)
+
+cur_test = "merged batch faces index each vehicle's copy of the mesh, with per vehicle colors"
+faces = geometry.getBatchFaces(3)
+vehicleColors = [[1., 0., 0., 1.], [0., 1., 0., 1.], [0., 0., 1., 1.]]
+colors = geometry.getBatchColors(3, vehicleColors)
+evaluateTest(cur_test, faces.shape == (3 * len(geometry.faces), 3) and maxDifference(faces[len(geometry.faces):2 * len(geometry.faces)], numpy.array(geometry.faces) + len(geometry.vertices)) == 0 and
+			 colors.shape == (3 * len(geometry.faces), 4) and maxDifference(colors[-1], vehicleColors[2]) == 0 and maxDifference(geometry.getBatchColors(3)[0:len(geometry.faces)], geometry.colors) == 0)
+
+#%% Quaternions
+
+print("Beginning testing of the Rotations quaternion conversions")
+
+cur_test = "quaternions are unit length with a positive scalar part"
+quaternions = [Rotations.euler2Quaternion(*angle) for angle in angles]
+evaluateTest(cur_test, all([math.isclose(math.fsum([q * q for q in quaternion]), 1.0, rel_tol=1e-14) and quaternion[0] >= 0 for quaternion in quaternions]))
+
+cur_test = "quaternion and DCM conversions agree"
+evaluateTest(cur_test, max([maxDifference(Rotations.quaternion2DCM(quaternion), Rotations.euler2DCM(*angle)) for quaternion, angle in zip(quaternions, angles)]) < 1e-14 and
+			 max([maxDifference(Rotations.dcm2Quaternion(Rotations.euler2DCM(*angle)), quaternion) for quaternion, angle in zip(quaternions, angles)]) < 1e-14)
+
+cur_test = "quaternion to Euler angles round trips"
+evaluateTest(cur_test, max([maxDifference(Rotations.quaternion2Euler(quaternion), angle) for quaternion, angle in zip(quaternions, angles)]) < 1e-12)
+
+cur_test = "quaternion conversions take arrays of angles"
+angleArray = numpy.array(angles)
+quaternionArray = Rotations.euler2Quaternion(angleArray[:, 0], angleArray[:, 1], angleArray[:, 2])
+evaluateTest(cur_test, quaternionArray.shape == (200, 4) and maxDifference(quaternionArray, quaternions) < 1e-15 and
+			 maxDifference(numpy.stack(Rotations.quaternion2Euler(quaternionArray), axis=1), angleArray) < 1e-12)
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
@@ -0,0 +1,116 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import json
+import os
+import random
+import tempfile
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Constants.VehiclePhysicalConstants as VPC
+import ece163.Simulation.__main__ as Runner
+
+"""math.isclose doesn't work well for comparing things near 0 unless we 
+use an absolute tolerance, so we make our own isclose:"""
+isclose = lambda  a,b : math.isclose(a, b, abs_tol= 1e-12)
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two 
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+tempDirectory = tempfile.mkdtemp()
+def writeSchedule(entries):
+	"""Writes a schedule to a temporary JSON file and returns its path"""
+	path = os.path.join(tempDirectory, 'schedule.json')
+	with open(path, 'w') as f:
+		json.dump(entries, f)
+	return path
+
+
+#%% Schedules
+
+print("Beginning testing of the headless runner schedule")
+
+schedulePath = writeSchedule([{"time": 0.5, "Throttle": 0.9}, {"time": 0.0, "Throttle": 0.4, "Elevator": -0.1}])
+schedule = Runner.loadSchedule(schedulePath, 4)
+cur_test = "schedule is sorted by time"
+evaluateTest(cur_test, [entryTime for entryTime, values in schedule] == [0.0, 0.5])
+
+simulateInstance = Runner.simulateClasses[4]()
+numSteps, wallTime = Runner.runSimulation(simulateInstance, 4, 1.0, schedule)
+cur_test = "runs the requested duration"
+evaluateTest(cur_test, numSteps == 100 and len(simulateInstance.takenData) == 100)
+
+cur_test = "schedule entries take effect at their time and hold"
+throttles = [row[1] for row in simulateInstance.takenData]
+elevators = [row[3] for row in simulateInstance.takenData]
+evaluateTest(cur_test, throttles[0] == 0.4 and throttles[49] == 0.4 and throttles[50] == 0.9 and throttles[-1] == 0.9
+			 and all([isclose(elevator, -0.1) for elevator in elevators]))
+
+cur_test = "unknown schedule input raises a ValueError"
+try:
+	Runner.loadSchedule(writeSchedule([{"time": 0.0, "commandedCourse": 1.0}]), 5)
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+#%% Trim, gains and export
+
+print("Beginning testing of the headless runner closed loop")
+
+simulateInstance = Runner.simulateClasses[6]()
+Runner.setupTrimAndGains(simulateInstance, 6)
+cur_test = "closed loop chapters are trimmed and given gains"
+evaluateTest(cur_test, simulateInstance.underlyingModel.getControlGains().kp_roll != 0.0
+			 and simulateInstance.underlyingModel.getTrimInputs().Throttle != 0.5)
+
+schedule = [(0.0, {'commandedAltitude': 110.0})]
+Runner.runSimulation(simulateInstance, 6, 20.0, schedule)
+cur_test = "default gains climb to the commanded altitude"
+evaluateTest(cur_test, abs(-simulateInstance.getVehicleState().pd - 110.0) < 1.0)
+
+csvPath = os.path.join(tempDirectory, 'flight.csv')
+cur_test = "main writes the csv"
+exitCode = Runner.main(['4', '--duration', '0.5', '--trim', str(VPC.InitialSpeed), '0', 'inf', '--output', csvPath])
+with open(csvPath) as f:
+	lines = f.readlines()
+evaluateTest(cur_test, exitCode == 0 and lines[0].startswith('time,Throttle') and len(lines) == 51)
+
+cur_test = "zero trim turn radius is rejected as a usage error"
+try:
+	Runner.main(['4', '--trim', str(VPC.InitialSpeed), '0', '0'])
+	evaluateTest(cur_test, False)
+except SystemExit as e:
+	evaluateTest(cur_test, e.code == 2)
+
+cur_test = "seeded runs repeat without touching the random module"
+randomState = random.getstate()
+seededRuns = list()
+for seed in [5, 5, 6]:
+	simulateInstance = Runner.buildSimulate(8, seed)
+	Runner.setupTrimAndGains(simulateInstance, 8)
+	Runner.runSimulation(simulateInstance, 8, 1.0)
+	seededRuns.append(simulateInstance.takenData.toList())
+evaluateTest(cur_test, seededRuns[0] == seededRuns[1] and seededRuns[0] != seededRuns[2] and random.getstate() == randomState)
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
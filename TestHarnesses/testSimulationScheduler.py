@@ -0,0 +1,140 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import time
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Constants.VehiclePhysicalConstants as VPC
+import ece163.Containers.Inputs as Inputs
+import ece163.Simulation.Chapter4Simulate as Chapter4Simulate
+import ece163.Simulation.SimulationScheduler as SimulationScheduler
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+class countingStep:
+	"""Step function that counts its calls, optionally taking stepTime of wall clock time every slowEvery calls"""
+	def __init__(self, stepTime=0.0, slowEvery=1):
+		self.count = 0
+		self.stepTime = stepTime
+		self.slowEvery = slowEvery
+		self.snapshots = 0
+	def __call__(self):
+		self.count += 1
+		if self.stepTime > 0 and self.count % self.slowEvery == 0:
+			time.sleep(self.stepTime)
+	def snapshot(self):
+		self.snapshots += 1
+		return self.count
+
+def runFor(scheduler, duration):
+	"""Runs the scheduler for duration seconds of wall clock time, returns the wall clock time it actually ran"""
+	startTime = time.perf_counter()
+	scheduler.start()
+	time.sleep(duration)
+	scheduler.stop()
+	return time.perf_counter() - startTime
+
+dT = 0.01
+
+#%% Settings
+
+print("Beginning testing of SimulationScheduler settings")
+
+cur_test = "unknown mode and non-positive speed raise a ValueError"
+raised = 0
+for badSetting in [{'mode': 'Fast'}, {'speed': 0.0}]:
+	try:
+		SimulationScheduler.SimulationScheduler(countingStep(), dT, **badSetting)
+	except ValueError:
+		raised += 1
+evaluateTest(cur_test, raised == 2)
+
+#%% Real time
+
+print("Beginning testing of SimulationScheduler real time mode")
+
+for speed in [1.0, 4.0]:
+	step = countingStep()
+	scheduler = SimulationScheduler.SimulationScheduler(step, dT, speed=speed, reportInterval=0.25)
+	wallTime = runFor(scheduler, 1.0)
+	cur_test = "real time at {}x keeps the simulated time with the wall clock".format(speed)
+	evaluateTest(cur_test, abs(step.count * dT - speed * wallTime) < 0.05 * speed * wallTime and scheduler.stepCount == step.count and
+				 abs(scheduler.getRealTimeFactor() - speed) < 0.1 * speed)
+
+step = countingStep(stepTime=0.03, slowEvery=10)
+scheduler = SimulationScheduler.SimulationScheduler(step, dT)
+wallTime = runFor(scheduler, 1.0)
+cur_test = "late steps are caught up rather than drifting"
+evaluateTest(cur_test, abs(step.count * dT - wallTime) < 0.05 * wallTime and scheduler.droppedTime == 0.0)
+
+step = countingStep(stepTime=0.02)
+scheduler = SimulationScheduler.SimulationScheduler(step, dT, maxLag=0.1)
+wallTime = runFor(scheduler, 1.0)
+cur_test = "a step slower than real time drops the time it cannot catch up"
+evaluateTest(cur_test, scheduler.droppedTime > 0.2 and step.count * dT < 0.75 * wallTime and scheduler.getRealTimeFactor() < 0.75)
+
+#%% Max speed and publishing
+
+print("Beginning testing of SimulationScheduler max speed mode and snapshots")
+
+step = countingStep()
+scheduler = SimulationScheduler.SimulationScheduler(step, dT, mode='MaxSpeed', snapshotFunction=step.snapshot, displayRate=20.0)
+wallTime = runFor(scheduler, 0.5)
+cur_test = "max speed runs faster than real time"
+evaluateTest(cur_test, step.count * dT > 10 * wallTime and scheduler.getRealTimeFactor() > 10)
+
+cur_test = "snapshots are published at the display rate, the last when the worker stops"
+evaluateTest(cur_test, 5 <= step.snapshots <= 20.0 * wallTime + 2 and scheduler.getLatestSnapshot() == step.count)
+
+def failingStep():
+	raise ZeroDivisionError("step failed")
+scheduler = SimulationScheduler.SimulationScheduler(failingStep, dT)
+scheduler.start()
+scheduler.thread.join()
+cur_test = "an exception in the step stops the worker and keeps the traceback"
+evaluateTest(cur_test, not scheduler.isRunning() and 'ZeroDivisionError' in scheduler.error and scheduler.stepCount == 0)
+
+#%% Simulation
+
+print("Beginning testing of SimulationScheduler with a simulation")
+
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+controls = Inputs.controlInputs()
+scheduler = SimulationScheduler.SimulationScheduler(lambda: simulateInstance.takeStep(controls), VPC.dT, mode='MaxSpeed',
+													snapshotFunction=lambda: (simulateInstance.getVehicleState().copy(), simulateInstance.time))
+scheduler.start()
+time.sleep(0.2)
+with scheduler.lock:	# change the inputs between two steps
+	stepsBefore = scheduler.stepCount
+	controls.Throttle = 0.8
+scheduler.stop()
+throttles = [row[1] for row in simulateInstance.takenData]
+latestState, latestTime = scheduler.getLatestSnapshot()
+cur_test = "simulation steps on the worker and inputs change between steps"
+evaluateTest(cur_test, math.isclose(simulateInstance.time, scheduler.stepCount * VPC.dT) and len(throttles) == scheduler.stepCount and
+			 all([throttle == 0.5 for throttle in throttles[:stepsBefore]]) and all([throttle == 0.8 for throttle in throttles[stepsBefore:]]) and
+			 latestTime == simulateInstance.time and latestState == simulateInstance.getVehicleState())
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
@@ -0,0 +1,114 @@
+#%% Initialization of test harness and helpers:
+
+import random
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Containers.Inputs as Inputs
+import ece163.Simulation.Chapter4Simulate as Chapter4Simulate
+import ece163.Simulation.Chapter8Simulate as Chapter8Simulate
+import ece163.Utilities.StageProfiler as StageProfiler
+from ece163.Containers.Controls import referenceCommands
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+class stepClock:
+	"""Clock that moves on by one second every time it is read"""
+	def __init__(self):
+		self.now = 0.0
+	def __call__(self):
+		self.now += 1.0
+		return self.now
+
+#%% StageProfiler
+
+print("Beginning testing of StageProfiler")
+
+profiler = StageProfiler.StageProfiler(clock=stepClock())
+startTime = profiler.start()
+startTime = profiler.stop('sensors', startTime)
+profiler.stop('autopilot', startTime)
+profiler.stop('sensors', profiler.start())
+profiler.stop('custom', profiler.start())
+
+cur_test = "stages accumulate time and calls"
+evaluateTest(cur_test, profiler.summary() == {'sensors': (2, 2.0), 'autopilot': (1, 1.0), 'custom': (1, 1.0)})
+
+cur_test = "summary keeps the stage order with unknown stages last"
+evaluateTest(cur_test, list(profiler.summary()) == ['sensors', 'autopilot', 'custom'])
+
+cur_test = "report has a line per stage and one for the rest of the wall time"
+lines = profiler.report(wallTime=8.0).splitlines()
+evaluateTest(cur_test, len(lines) == 5 and lines[1].split()[0] == 'sensors' and lines[-1].split()[0] == 'other' and lines[-1].split()[1] == '4.0000')
+
+cur_test = "reset forgets everything"
+profiler.reset()
+evaluateTest(cur_test, profiler.summary() == dict())
+
+#%% Profiling a simulation
+
+print("Beginning testing of Simulate.enableProfiling()")
+
+def runChapter8(steps, profile, seed=3):
+	"""Seeded Chapter8Simulate run, returns the instance and its final state"""
+	simulateInstance = Chapter8Simulate.Chapter8Simulate(rng=random.Random(seed))
+	if profile:
+		simulateInstance.enableProfiling()
+	commands = referenceCommands(0.2, 110.0, 25.0)
+	for step in range(steps):
+		simulateInstance.takeStep(commands)
+	return simulateInstance, simulateInstance.getVehicleState()
+
+simulateInstance, profiledState = runChapter8(50, True)
+summary = simulateInstance.getProfiler().summary()
+
+cur_test = "every stage of the closed loop is timed once per step"
+evaluateTest(cur_test, list(summary) == StageProfiler.stageNames and all([calls == 50 for calls, total in summary.values()]))
+
+cur_test = "stage times are positive"
+evaluateTest(cur_test, all([total > 0 for calls, total in summary.values()]))
+
+cur_test = "profiling does not change the simulation"
+plainInstance, plainState = runChapter8(50, False)
+evaluateTest(cur_test, [profiledState.pn, profiledState.pd, profiledState.roll, profiledState.Va] == [plainState.pn, plainState.pd, plainState.roll, plainState.Va]
+			 and plainInstance.getProfiler() is None)
+
+cur_test = "profiling survives a reset"
+simulateInstance.reset()
+simulateInstance.takeStep(referenceCommands(0.0, 100.0, 25.0))
+evaluateTest(cur_test, simulateInstance.getProfiler().summary()['integration'][0] == 51 and simulateInstance.getProfiler().summary()['aeroForces'][0] == 51)
+
+cur_test = "disabling stops the timing and keeps the profile"
+profiler = simulateInstance.disableProfiling()
+simulateInstance.takeStep(referenceCommands(0.0, 100.0, 25.0))
+evaluateTest(cur_test, profiler.summary()['sensors'][0] == 51 and simulateInstance.underlyingModel.getVehicleAerodynamicsModel().profiler is None)
+
+cur_test = "open loop simulation times its forces, integration and recording"
+simulateInstance = Chapter4Simulate.Chapter4Simulate()
+profiler = simulateInstance.enableProfiling(StageProfiler.StageProfiler())
+for step in range(10):
+	simulateInstance.takeStep(Inputs.controlInputs())
+evaluateTest(cur_test, list(profiler.summary()) == ['aeroForces', 'integration', 'recording'] and profiler.summary()['recording'][0] == 10)
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
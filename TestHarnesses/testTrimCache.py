@@ -0,0 +1,120 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import os
+import tempfile
+import time
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Constants.VehiclePhysicalConstants as VPC
+import ece163.Controls.TrimCache as TrimCache
+import ece163.Controls.VehicleTrim as VehicleTrim
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def trimValues(trimInstance):
+	"""The trim state and controls that the optimization decides"""
+	state = trimInstance.getTrimState()
+	controls = trimInstance.getTrimControls()
+	return [state.u, state.v, state.w, state.pitch, state.roll, state.p, state.q, state.r,
+			controls.Throttle, controls.Aileron, controls.Elevator, controls.Rudder]
+
+def isclose(a, b, tolerance):
+	return all([math.isclose(x, y, abs_tol=tolerance) for x, y in zip(a, b)])
+
+#%% Cache hits and warm starts
+
+print("Beginning testing of VehicleTrim with a TrimCache")
+
+directory = tempfile.mkdtemp()
+cacheFile = os.path.join(directory, 'trimCache.json')
+cache = TrimCache.TrimCache(cacheFile)
+cachedTrim = VehicleTrim.VehicleTrim(cache=cache)
+plainTrim = VehicleTrim.VehicleTrim()
+
+conditions = (25.0, 1 / 200, math.radians(2))
+plainTrim.computeTrim(*conditions)
+cachedTrim.computeTrim(*conditions)
+cur_test = "first trim is computed and cached"
+evaluateTest(cur_test, trimValues(cachedTrim) == trimValues(plainTrim) and len(cache) == 1 and cache.misses == 1)
+
+cur_test = "repeated trim comes from the cache"
+cachedTrim.computeTrim(*conditions)
+startTime = time.perf_counter()
+inRange = VehicleTrim.VehicleTrim(cache=cache).computeTrim(conditions[0] + 1e-5, *conditions[1:])
+evaluateTest(cur_test, inRange and time.perf_counter() - startTime < 0.01 and cache.hits == 2 and trimValues(cachedTrim) == trimValues(plainTrim))
+
+cur_test = "cached trim starts from the initial position"
+state = cachedTrim.getTrimState()
+evaluateTest(cur_test, [state.pn, state.pe, state.pd, state.yaw] == [VPC.InitialNorthPosition, VPC.InitialEastPosition, VPC.InitialDownPosition, VPC.InitialYawAngle])
+
+cur_test = "neighbouring trim is warm started and matches a cold one"
+conditions = (26.0, 1 / 180, math.radians(3))
+plainTrim.computeTrim(*conditions)
+cachedTrim.computeTrim(*conditions)
+evaluateTest(cur_test, cache.warmStarts == 1 and len(cache) == 2 and isclose(trimValues(cachedTrim), trimValues(plainTrim), 1e-5))
+
+cur_test = "useCache False optimizes from scratch"
+cachedTrim.computeTrim(*conditions, useCache=False)
+evaluateTest(cur_test, cache.hits == 2 and cache.warmStarts == 1 and isclose(trimValues(cachedTrim), trimValues(plainTrim), 1e-5))
+
+cur_test = "changing a physical constant misses the cache"
+originalMass = VPC.mass
+VPC.mass = originalMass + 1.0
+try:
+	changedHit = cache.lookup(*conditions)
+	changedNearest = cache.nearest(*conditions)
+finally:
+	VPC.mass = originalMass
+evaluateTest(cur_test, changedHit is None and changedNearest is None and cache.lookup(*conditions) is not None)
+
+cur_test = "a cached trim is checked against the current control limits"
+originalThrottle = VPC.maxControls.Throttle
+hitsBefore = cache.hits
+VPC.maxControls.Throttle = cachedTrim.getTrimControls().Throttle / 2
+try:
+	limitedInRange = cachedTrim.computeTrim(*conditions)
+	limitedHits = cache.hits
+finally:
+	VPC.maxControls.Throttle = originalThrottle
+evaluateTest(cur_test, not limitedInRange and limitedHits == hitsBefore + 1 and cachedTrim.computeTrim(*conditions))
+
+#%% Persistence
+
+print("Beginning testing of TrimCache persistence")
+
+cur_test = "cache is saved and loaded with its file"
+reloaded = TrimCache.TrimCache(cacheFile)
+evaluateTest(cur_test, len(reloaded) == 2 and reloaded.lookup(*conditions) == cache.lookup(*conditions))
+
+cur_test = "a file of another quantization is ignored"
+evaluateTest(cur_test, len(TrimCache.TrimCache(cacheFile, quanta=(1e-2, 1e-5, 1e-4))) == 0)
+
+cur_test = "an unreadable file gives an empty cache"
+with open(cacheFile, 'w') as f:
+	f.write('not json')
+evaluateTest(cur_test, len(TrimCache.TrimCache(cacheFile)) == 0)
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
@@ -0,0 +1,106 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import os
+import tempfile
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Controls.VehiclePerturbationModels as VehiclePerturbationModels
+import ece163.Controls.VehicleTrim as VehicleTrim
+import ece163.Controls.VehicleTrimEnvelope as VehicleTrimEnvelope
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+#%% Building the envelope
+
+print("Beginning testing of VehicleTrimEnvelope.computeEnvelope()")
+
+airspeeds = [25.0, 32.0]
+curvatures = [0.0, 1 / 200]
+climbAngles = [0.0, math.radians(6)]
+envelope = VehicleTrimEnvelope.computeEnvelope(airspeeds, curvatures, climbAngles, processes=0)
+
+trim = VehicleTrim.VehicleTrim()
+feasible = trim.computeTrim(32.0, 1 / 200, math.radians(6))
+cur_test = "grid point holds the trim state, controls and feasibility"
+evaluateTest(cur_test, numpy.allclose(envelope.states[1, 1, 1], trim.getTrimState().toArray(), atol=1e-5) and
+			 math.isclose(envelope.controls[1, 1, 1][0], trim.getTrimControls().Throttle, abs_tol=1e-5) and envelope.feasible[1, 1, 1] == feasible)
+
+cur_test = "grid point holds the transfer function about its trim"
+transferFunction = VehiclePerturbationModels.CreateTransferFunction(trim.getTrimState(), trim.getTrimControls())
+evaluateTest(cur_test, envelope.getTransferFunction(32.0, 1 / 200, math.radians(6)) == transferFunction)
+
+cur_test = "the grid has feasible and infeasible trims"
+evaluateTest(cur_test, envelope.feasible[0, 0, 0] and not numpy.all(envelope.feasible))
+
+cur_test = "pool gives the same envelope as the serial run"
+pooledEnvelope = VehicleTrimEnvelope.computeEnvelope(airspeeds, curvatures, climbAngles, processes=2)
+evaluateTest(cur_test, numpy.allclose(pooledEnvelope.table, envelope.table, atol=1e-5) and numpy.array_equal(pooledEnvelope.feasible, envelope.feasible))
+
+cur_test = "axes must be increasing"
+try:
+	VehicleTrimEnvelope.computeEnvelope([25.0, 20.0], [0.0], [0.0], processes=0)
+	evaluateTest(cur_test, False)
+except ValueError:
+	evaluateTest(cur_test, True)
+
+#%% Lookups
+
+print("Beginning testing of TrimEnvelope.lookup()")
+
+cur_test = "lookup on a grid point returns the table"
+values, pointFeasible = envelope.interpolate(25.0, 1 / 200, 0.0)
+evaluateTest(cur_test, numpy.array_equal(values, envelope.table[0, 1, 0]))
+
+cur_test = "lookup between grid points interpolates linearly"
+state, controls, transferFunction, lookupFeasible = envelope.lookup(28.5, 0.0, 0.0)
+evaluateTest(cur_test, math.isclose(state.u, (envelope.states[0, 0, 0][3] + envelope.states[1, 0, 0][3]) / 2) and
+			 math.isclose(controls.Elevator, (envelope.controls[0, 0, 0][2] + envelope.controls[1, 0, 0][2]) / 2))
+
+cur_test = "interpolated trim is close to the computed one"
+trim.computeTrim(25.0, 1 / 400, math.radians(3))
+state, controls, transferFunction, lookupFeasible = envelope.lookup(25.0, 1 / 400, math.radians(3))
+evaluateTest(cur_test, lookupFeasible and math.isclose(state.pitch, trim.getTrimState().pitch, abs_tol=0.01) and
+			 math.isclose(controls.Throttle, trim.getTrimControls().Throttle, abs_tol=0.01))
+
+cur_test = "feasible only if every grid point around it is and it is inside the grid"
+evaluateTest(cur_test, envelope.isFeasible(25.0, 0.0, 0.0) and envelope.isFeasible(31.9, 1 / 250, math.radians(5)) == bool(numpy.all(envelope.feasible))
+			 and not envelope.isFeasible(24.0, 0.0, 0.0))
+
+cur_test = "single point axes are allowed"
+flatEnvelope = VehicleTrimEnvelope.TrimEnvelope(airspeeds, [0.0], [0.0], envelope.states[:, 0:1, 0:1], envelope.controls[:, 0:1, 0:1],
+												envelope.transferFunctions[:, 0:1, 0:1], envelope.feasible[:, 0:1, 0:1])
+evaluateTest(cur_test, numpy.allclose(flatEnvelope.interpolate(28.5, 0.0, 0.0)[0], envelope.interpolate(28.5, 0.0, 0.0)[0]))
+
+cur_test = "envelope saved and loaded"
+filename = os.path.join(tempfile.mkdtemp(), 'envelope.npz')
+envelope.save(filename)
+loadedEnvelope = VehicleTrimEnvelope.loadEnvelope(filename)
+evaluateTest(cur_test, numpy.array_equal(loadedEnvelope.table, envelope.table) and numpy.array_equal(loadedEnvelope.feasible, envelope.feasible)
+			 and numpy.array_equal(loadedEnvelope.climbAngles, envelope.climbAngles))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
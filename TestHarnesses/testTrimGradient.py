@@ -0,0 +1,114 @@
+#%% Initialization of test harness and helpers:
+
+import math
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Controls.VehicleTrim as VehicleTrim
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def centralDifference(trim, x, conditions, step=1e-6):
+	"""Gradient of the trim objective by central differences"""
+	return numpy.array([(trim.trim_objective_fun(x + delta, *conditions) - trim.trim_objective_fun(x - delta, *conditions)) / (2 * step)
+						for delta in numpy.eye(len(x)) * step])
+
+def gradientMatches(trim, x, conditions, tolerance=1e-6):
+	"""True if the analytic gradient is within tolerance (relative to its largest element) of the differenced one"""
+	analytic = trim.trim_objective_grad(x, *conditions)
+	numeric = centralDifference(trim, x, conditions)
+	return numpy.max(numpy.abs(analytic - numeric)) <= tolerance * max(numpy.max(numpy.abs(numeric)), 1.0)
+
+class countingTrim(VehicleTrim.VehicleTrim):
+	"""VehicleTrim that counts its objective evaluations"""
+	def __init__(self, useGradient=True):
+		super().__init__()
+		self.evaluations = 0
+		if not useGradient:	# SLSQP differences the objective itself when it has no jac
+			self.trim_objective_grad = None
+	def trim_objective_fun(self, x, Vastar, Kappastar, Gammastar):
+		self.evaluations += 1
+		return super().trim_objective_fun(x, Vastar, Kappastar, Gammastar)
+
+#%% Gradient against finite differences
+
+print("Beginning testing of VehicleTrim.trim_objective_grad()")
+
+trim = VehicleTrim.VehicleTrim()
+rng = numpy.random.default_rng(163)
+nominal = numpy.array([0.0, 0.0, -100.0, 25.0, 1.0, 2.0, 0.3, 0.1, 0.2, 0.05, -0.03, 0.02, 0.6, 0.01, -0.1, 0.02])
+spread = numpy.array([0, 0, 0, 10, 5, 5, 0.5, 0.2, 0.5, 0.2, 0.2, 0.2, 0.3, 0.1, 0.1, 0.1])
+
+cur_test = "gradient matches finite differences at random points"
+evaluateTest(cur_test, all([gradientMatches(trim, nominal + spread * rng.uniform(-1, 1, 16), (25.0, 1 / 200, math.radians(3)))
+							for sample in range(10)]))
+
+cur_test = "gradient matches finite differences past the stall"
+stalled = nominal.copy()
+stalled[5] = 20.0
+evaluateTest(cur_test, gradientMatches(trim, stalled, (25.0, 0.0, 0.0)))
+
+cur_test = "gradient matches finite differences at zero throttle and negative airspeed"
+reversed = nominal.copy()
+reversed[3] = -5.0
+reversed[12] = 0.0
+evaluateTest(cur_test, gradientMatches(trim, reversed, (15.0, -1 / 100, math.radians(-5))))
+
+cur_test = "gradient is zero for the position and heading"
+gradient = trim.trim_objective_grad(nominal, 25.0, 1 / 200, 0.0)
+evaluateTest(cur_test, numpy.all(gradient[[0, 1, 2, 6]] == 0.0))
+
+cur_test = "gradient is differenced with no angle of attack defined"
+sideways = nominal.copy()
+sideways[3] = sideways[5] = 0.0
+gradient = trim.trim_objective_grad(sideways, 25.0, 0.0, 0.0)
+evaluateTest(cur_test, gradient.shape == (16,) and numpy.all(numpy.isfinite(gradient)) and numpy.any(gradient != 0.0))
+
+#%% Trim with the gradient
+
+print("Beginning testing of VehicleTrim.computeTrim() with the gradient")
+
+conditionsList = [(25.0, 0.0, 0.0), (25.0, 1 / 200, math.radians(2)), (30.0, -1 / 150, math.radians(-3)), (35.0, 0.0, math.radians(8))]
+gradientMatchesAtTrim = True
+sameTrims = True
+fewerEvaluations = True
+for conditions in conditionsList:
+	gradientTrim = countingTrim()
+	differencedTrim = countingTrim(useGradient=False)
+	gradientInRange = gradientTrim.computeTrim(*conditions)
+	differencedInRange = differencedTrim.computeTrim(*conditions)
+	trimArray = numpy.array(gradientTrim.getTrimState().toArray()[3:12] + [gradientTrim.getTrimControls().Throttle])
+	differencedArray = numpy.array(differencedTrim.getTrimState().toArray()[3:12] + [differencedTrim.getTrimControls().Throttle])
+	sameTrims = sameTrims and gradientInRange == differencedInRange and numpy.allclose(trimArray, differencedArray, atol=1e-5)
+	fewerEvaluations = fewerEvaluations and gradientTrim.evaluations * 2 < differencedTrim.evaluations
+
+cur_test = "trims are the same as with a differenced gradient"
+evaluateTest(cur_test, sameTrims)
+
+cur_test = "trims take fewer objective evaluations"
+evaluateTest(cur_test, fewerEvaluations)
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
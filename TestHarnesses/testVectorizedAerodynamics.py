@@ -0,0 +1,82 @@
+#%% Initialization of test harness and helpers:
+
+import math
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Modeling.VehicleAerodynamicsModel as VehicleAerodynamicsModel
+import ece163.Modeling.VectorizedAerodynamics as VectorizedAerodynamics
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+aeroModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel()
+
+#%% Coefficients
+
+print("Beginning testing of VectorizedAerodynamics.CalculateCoeff_alpha()")
+
+alphas = numpy.linspace(-math.pi / 2, math.pi / 2, 181)
+CL, CD, CM = VectorizedAerodynamics.CalculateCoeff_alpha(alphas)
+scalarCoefficients = numpy.array([aeroModel.CalculateCoeff_alpha(alpha) for alpha in alphas])
+
+cur_test = "coefficients match the scalar model from -90 to 90 degrees"
+evaluateTest(cur_test, numpy.allclose(numpy.stack([CL, CD, CM], axis=1), scalarCoefficients, rtol=1e-12, atol=1e-14))
+
+cur_test = "given trig terms give the same coefficients"
+withTrig = VectorizedAerodynamics.CalculateCoeff_alpha(alphas, numpy.sin(alphas), numpy.cos(alphas))
+evaluateTest(cur_test, all([numpy.array_equal(a, b) for a, b in zip(withTrig, (CL, CD, CM))]))
+
+cur_test = "scalar and grid shaped angles are accepted"
+grid = alphas.reshape(-1, 1) * numpy.ones((1, 3))
+gridCL = VectorizedAerodynamics.CalculateCoeff_alpha(grid)[0]
+scalarCL = VectorizedAerodynamics.CalculateCoeff_alpha(0.1)[0]
+evaluateTest(cur_test, gridCL.shape == (181, 3) and numpy.array_equal(gridCL[:, 2], CL) and
+			 math.isclose(float(scalarCL), aeroModel.CalculateCoeff_alpha(0.1)[0], rel_tol=1e-12))
+
+#%% Propeller
+
+print("Beginning testing of VectorizedAerodynamics.CalculatePropForces()")
+
+airspeeds, throttles = numpy.meshgrid(numpy.linspace(0.0, 60.0, 31), numpy.linspace(0.0, 1.0, 21), indexing='ij')
+thrust, torque = VectorizedAerodynamics.CalculatePropForces(airspeeds, throttles)
+scalarForces = numpy.array([[aeroModel.CalculatePropForces(Va, throttle) for Va, throttle in zip(VaRow, throttleRow)]
+							for VaRow, throttleRow in zip(airspeeds, throttles)])
+
+cur_test = "thrust and torque match the scalar model over airspeed and throttle"
+evaluateTest(cur_test, thrust.shape == (31, 21) and numpy.allclose(thrust, scalarForces[:, :, 0], rtol=1e-12, atol=1e-12)
+			 and numpy.allclose(torque, scalarForces[:, :, 1], rtol=1e-12, atol=1e-12))
+
+cur_test = "propeller speed is 100 where the root is imaginary"
+reverseThrust = VectorizedAerodynamics.CalculatePropForces([0.0, 5.0, 25.0], -10.0)
+scalarReverseThrust = [aeroModel.CalculatePropForces(Va, -10.0)[0] for Va in [0.0, 5.0, 25.0]]
+evaluateTest(cur_test, numpy.all(VectorizedAerodynamics.CalculatePropSpeed([0.0, 5.0], -10.0) == 100.0) and
+			 numpy.allclose(reverseThrust[0], scalarReverseThrust, rtol=1e-12))
+
+cur_test = "throttle broadcasts against an array of airspeeds"
+broadcastThrust = VectorizedAerodynamics.CalculatePropForces(airspeeds[:, 0], 0.5)[0]
+evaluateTest(cur_test, numpy.array_equal(broadcastThrust, thrust[:, 10]))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
@@ -0,0 +1,142 @@
+#%% Initialization of test harness and helpers:
+
+import math
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import numpy
+
+import ece163.Containers.Inputs as Inputs
+import ece163.Constants.VehiclePhysicalConstants as VPC
+import ece163.Modeling.VehicleAerodynamicsModel as VAM
+import ece163.Modeling.WindModel as WM
+import ece163.Modeling.VehicleBatchModel as VBM
+
+"""The batch model uses numpy reductions and matrix products which round differently from the
+list based MatrixMath, so the comparisons use a looser tolerance than the other harnesses:"""
+isclose = lambda  a,b : math.isclose(a, b, rel_tol=1e-9, abs_tol= 1e-9)
+
+def compareStates(batch, index, state):
+	"""Compares row index of a VehicleBatchModel to a scalar vehicleState"""
+	batchState = batch.getVehicleState(index)
+	members = VBM.stateNames + ['Va', 'alpha', 'beta', 'chi']
+	if not all([isclose(getattr(batchState, member), getattr(state, member)) for member in members]):
+		return False
+	return all([isclose(batchState.R[i][j], state.R[i][j]) for i in range(3) for j in range(3)])
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+
+#%% Batch against scalar models
+
+print("Beginning testing of VehicleBatchModel.Update()")
+
+controlList = [Inputs.controlInputs(0.6, 0.01, -0.05, 0.0),
+			   Inputs.controlInputs(0.5, -0.02, 0.0, 0.01),
+			   Inputs.controlInputs(0.0, 0.0, 0.1, -0.02),
+			   Inputs.controlInputs(1.0, 0.3, -0.3, 0.2)]
+windList = [(0.0, 0.0, 0.0), (3.0, -2.0, 0.5), (-5.0, 1.0, 0.0), (0.0, 8.0, -1.0)]
+
+scalarModels = []
+for (Wn, We, Wd) in windList:
+	model = VAM.VehicleAerodynamicsModel()
+	model.getWindModel().setWindModelParameters(Wn, We, Wd)
+	scalarModels.append(model)
+
+batch = VBM.VehicleBatchModel(len(controlList), seed=163)
+batch.setWindModelParameters(numpy.array([w[0] for w in windList]), numpy.array([w[1] for w in windList]),
+							 numpy.array([w[2] for w in windList]))
+
+cur_test = "initial state matches VehicleAerodynamicsModel"
+evaluateTest(cur_test, all([compareStates(batch, i, scalarModels[i].getVehicleState()) for i in range(len(scalarModels))]))
+
+for step in range(1000):
+	for model, controls in zip(scalarModels, controlList):
+		model.Update(controls)
+	batch.Update(controlList)
+
+for i in range(len(scalarModels)):
+	cur_test = f"vehicle {i} matches scalar model after 1000 steps"
+	evaluateTest(cur_test, compareStates(batch, i, scalarModels[i].getVehicleState()))
+
+dot = scalarModels[1].getVehicleDynamicsModel().getVehicleDerivative()
+cur_test = "state derivative matches scalar model"
+evaluateTest(cur_test, all([isclose(batch.dot[1][n], getattr(dot, name)) for n, name in enumerate(VBM.stateNames)]))
+
+cur_test = "single controlInputs is applied to every vehicle"
+evaluateTest(cur_test, numpy.array_equal(batch.controlsToArray(controlList[0]), numpy.tile([0.6, 0.01, -0.05, 0.0], (4, 1))))
+
+#%% Gust filters against WindModel
+
+print("Beginning testing of VehicleBatchModel.updateWindGusts()")
+
+gusts = Inputs.drydenParameters()	# Dryden low altitude light turbulence
+windModel = WM.WindModel(drydenParameters=gusts)
+batch = VBM.VehicleBatchModel(2, drydenParameters=gusts, seed=1)
+
+cur_test = "gust filters match WindModel"
+PhiGammaH = windModel.getDrydenTransferFns()
+batchPhiGammaH = [batch.Phi_u, batch.Gamma_u, batch.H_u, batch.Phi_v, batch.Gamma_v, batch.H_v, batch.Phi_w, batch.Gamma_w, batch.H_w]
+evaluateTest(cur_test, all([numpy.allclose(numpy.array(scalar), vector, rtol=1e-12, atol=1e-15) for scalar, vector in zip(PhiGammaH, batchPhiGammaH)]))
+
+gustsMatch = True
+noise = numpy.random.default_rng(5).standard_normal((100, 3))
+for uu, uv, uw in noise:
+	windModel.Update(uu, uv, uw)
+	batch.updateWindGusts(numpy.array([uu, uu]), numpy.array([uv, uv]), numpy.array([uw, uw]))
+	wind = windModel.getWind()
+	gustsMatch = gustsMatch and all([isclose(batch.wind[1][3 + n], getattr(wind, name)) for n, name in enumerate(['Wu', 'Wv', 'Ww'])])
+cur_test = "gusts match WindModel for the same noise"
+evaluateTest(cur_test, gustsMatch)
+
+cur_test = "Va of zero raises an ArithmeticError"
+try:
+	VBM.VehicleBatchModel(1, windVa=0.0, drydenParameters=gusts)
+	evaluateTest(cur_test, False)
+except ArithmeticError:
+	evaluateTest(cur_test, True)
+
+#%% Sensors and reproducibility
+
+print("Beginning testing of VehicleBatchModel sensors")
+
+first = VBM.VehicleBatchModel(3, drydenParameters=gusts, useSensors=True, seed=42)
+second = VBM.VehicleBatchModel(3, drydenParameters=gusts, useSensors=True, seed=42)
+for step in range(250):
+	first.Update(controlList[0])
+	second.Update(controlList[0])
+
+cur_test = "same seed gives the same batch"
+evaluateTest(cur_test, numpy.array_equal(first.state, second.state) and numpy.array_equal(first.sensorsGyro, second.sensorsGyro))
+
+cur_test = "vehicles with gusts diverge from each other"
+evaluateTest(cur_test, not numpy.allclose(first.state[0], first.state[1]))
+
+cur_test = "GPS updates at the GPS rate"
+evaluateTest(cur_test, first.updateTicks == 250 and first.gpsTickUpdate == 100)
+
+cur_test = "noisy gyros are within 1 rad/s of the true rates"
+evaluateTest(cur_test, numpy.all(numpy.abs(first.sensorsGyro - first.state[:, 9:12]) < 1.0))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
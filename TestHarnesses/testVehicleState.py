@@ -0,0 +1,116 @@
+#%% Initialization of test harness and helpers:
+
+import math
+import pickle
+
+import sys
+sys.path.append("..") #python is horrible, no?
+
+import ece163.Containers.States as States
+import ece163.Containers.Inputs as Inputs
+import ece163.Modeling.VehicleDynamicsModel as VDM
+import ece163.Utilities.MatrixMath as mm
+import ece163.Utilities.Rotations as Rotations
+
+failed = []
+passed = []
+def evaluateTest(test_name, boolean):
+	"""evaluateTest prints the output of a test and adds it to one of two
+	global lists, passed and failed, which can be printed later"""
+	if boolean:
+		print(f"   passed {test_name}")
+		passed.append(test_name)
+	else:
+		print(f"   failed {test_name}")
+		failed.append(test_name)
+	return boolean
+
+def eagerFlightAngles(u, v, w, yaw, pitch, roll):
+	"""Va, alpha, beta and chi the way vehicleState computed them in its constructor"""
+	R = Rotations.euler2DCM(yaw, pitch, roll)
+	Va = math.hypot(u, v, w)
+	beta = 0.0 if math.isclose(Va, 0.0) else math.asin(v / Va)
+	pdotned = mm.multiply(mm.transpose(R), [[u], [v], [w]])
+	return R, Va, math.atan2(w, u), beta, math.atan2(pdotned[1][0], pdotned[0][0])
+
+#%% Lazily computed members
+
+print("Beginning testing of vehicleState derived members")
+
+values = [10.0, -5.0, -100.0, 24.0, 1.5, 2.0, 0.3, 0.1, -0.2, 0.01, 0.02, -0.03]
+state = States.vehicleState(*values)
+R, Va, alpha, beta, chi = eagerFlightAngles(*values[3:9])
+
+cur_test = "derived members match the constructor formulas exactly"
+evaluateTest(cur_test, state.R == R and (state.Va, state.alpha, state.beta, state.chi) == (Va, alpha, beta, chi))
+
+cur_test = "derived members use the values given to the constructor"
+state = States.vehicleState()
+state.u = 25.0
+state.yaw = 1.0
+evaluateTest(cur_test, state.Va == 0.0 and state.chi == 0.0 and state.R == Rotations.euler2DCM(0.0, 0.0, 0.0))
+
+cur_test = "assigned members are kept"
+state = States.vehicleState(*values)
+state.Va = 30.0
+state.chi = 1.0
+evaluateTest(cur_test, state.Va == 30.0 and state.chi == 1.0 and state.alpha == alpha and state.beta == beta)
+
+cur_test = "dcm overwrites the Euler angles"
+state = States.vehicleState(*values[0:6], dcm=R)
+evaluateTest(cur_test, (state.yaw, state.pitch, state.roll) == tuple(Rotations.dcm2Euler(R)) and state.R is R)
+
+cur_test = "states have no __dict__"
+evaluateTest(cur_test, not hasattr(States.vehicleState(), '__dict__'))
+
+#%% Copies, arrays and pickles
+
+print("Beginning testing of vehicleState copy, arrays and pickle")
+
+state = States.vehicleState(*values)
+stateCopy = state.copy()
+stateCopy.R[0][0] = 5.0
+stateCopy.pn = 0.0
+cur_test = "copy is equal and independent"
+evaluateTest(cur_test, state.copy() == state and state.R[0][0] != 5.0 and state.pn == values[0])
+
+cur_test = "toArray and fromArray round trip"
+evaluateTest(cur_test, state.toArray() == values and States.vehicleState.fromArray(state.toArray()) == state)
+
+cur_test = "pickle round trip keeps the assigned members"
+state.Va = 30.0
+unpickled = pickle.loads(pickle.dumps(state))
+evaluateTest(cur_test, unpickled == state and unpickled.Va == 30.0 and unpickled.chi == state.chi)
+
+cur_test = "states pickled as a dictionary still load"
+oldState = States.vehicleState.__new__(States.vehicleState)
+oldState.__setstate__(dict(zip(States.vehicleState.arrayNames, values), R=R, Va=Va, alpha=alpha, beta=beta, chi=chi))
+evaluateTest(cur_test, oldState == States.vehicleState(*values) and oldState.chi == chi)
+
+#%% Integration
+
+print("Beginning testing of VehicleDynamicsModel.IntegrateState()")
+
+model = VDM.VehicleDynamicsModel()
+model.setVehicleState(States.vehicleState(*values))
+forcesMoments = Inputs.forcesMoments(10.0, -2.0, 3.0, 0.5, 0.2, -0.1)
+for step in range(100):
+	model.Update(forcesMoments)
+newState = model.getVehicleState()
+cur_test = "integrated Euler angles come from the integrated DCM"
+evaluateTest(cur_test, (newState.yaw, newState.pitch, newState.roll) == tuple(Rotations.dcm2Euler(newState.R)))
+
+cur_test = "integrated course comes from the position derivative"
+dot = model.getVehicleDerivative()
+evaluateTest(cur_test, newState.chi == math.atan2(dot.pe, dot.pn))
+
+
+#%% Print results:
+
+total = len(passed) + len(failed)
+print(f"\n---\nPassed {len(passed)}/{total} tests")
+[print("   " + test) for test in passed]
+
+if failed:
+	print(f"Failed {len(failed)}/{total} tests:")
+	[print("   " + test) for test in failed]
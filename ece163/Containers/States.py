@@ -5,12 +5,25 @@ import math
 testingAbs_tol = 1e-6
 
 class vehicleState:
-    def __init__(self, pn=0.0, pe=0.0, pd=0.0, u=0.0, v=0.0, w=0.0, yaw=0.0, pitch=0.0, roll=0.0, p=0.0, q=0.0, r=0.0, dcm=None):
+    # slots rather than a __dict__: states are built twice per integration step, so keep them small and cheap to create
+    __slots__ = ['pn', 'pe', 'pd', 'u', 'v', 'w', 'yaw', 'pitch', 'roll', 'p', 'q', 'r',
+                 '_R', '_quaternion', '_Va', '_alpha', '_beta', '_chi', '_initial']
+
+    # order of the members in toArray and fromArray
+    arrayNames = ['pn', 'pe', 'pd', 'u', 'v', 'w', 'yaw', 'pitch', 'roll', 'p', 'q', 'r']
+
+    def __init__(self, pn=0.0, pe=0.0, pd=0.0, u=0.0, v=0.0, w=0.0, yaw=0.0, pitch=0.0, roll=0.0, p=0.0, q=0.0, r=0.0, dcm=None, quaternion=None):
         """
         Defines the vehicle states to define the vehicle current position and orientation. Positions are in NED
         coordinates, velocity is ground speed in body coordinates, we carry both the Euler angles and the DCM together,
         and the rotation rates are in the body frame. If DCM is used in initialization then Euler angles are computed from
-        the provided DCM, otherwise the DCM is computed from the Euler Angles (DCM will overwrite Euler Angles).
+        the provided DCM, otherwise the DCM is computed from the Euler Angles (DCM will overwrite Euler Angles). A unit
+        quaternion can be given instead of the DCM, then the Euler angles are computed from it and the DCM is only built
+        from it when it is read.
+
+        The DCM, airspeed, flight angles and course are only computed the first time they are read, from the values
+        given here (so changing u, v, w or the Euler angles afterwards does not change them, as if they had been
+        computed here). Assigning any of them stores the new value as usual.
 
         :param pn: vehicle inertial north position [m]
         :param pe: vehicle inertial east position [m]
@@ -25,6 +38,7 @@ class vehicleState:
         :param q: body pitch rate about body-y axis [rad/s]
         :param r: body yaw rate about body-z axis [rad/s]
         :param dcm: direction cosine matrix (R) which transforms from inertial to body frame
+        :param quaternion: unit quaternion [q0, q1, q2, q3] (scalar first) of the same rotation as R, used if dcm is None
 
         :return: None
         """
@@ -37,31 +51,179 @@ class vehicleState:
         self.v = v
         self.w = w
         # Euler Angles
-        if dcm is None:
+        if dcm is None and quaternion is not None:
+            self.yaw, self.pitch, self.roll = Rotations.quaternion2Euler(quaternion)
+        elif dcm is None:
             self.yaw = yaw
             self.pitch = pitch
             self.roll = roll
-            # Direction Cosine Matrix
-            self.R = Rotations.euler2DCM(yaw, pitch, roll) # R transforms from inertial to body
-                                                           # use transpose to go the other way
-                                                           # Euler angles and R are redundant
         else:
-            self.R = dcm
-            self.yaw, self.pitch, self.roll = Rotations.dcm2Euler(self.R)
+            self.yaw, self.pitch, self.roll = Rotations.dcm2Euler(dcm)
+        # Direction Cosine Matrix, R transforms from inertial to body (use transpose to go the other way)
+        # Euler angles and R are redundant, so R is only built from the Euler angles when it is needed
+        self._R = dcm
+        # attitude quaternion, from R when it is read unless it was given
+        self._quaternion = quaternion
 
         # body rates
         self.p = p
         self.q = q
         self.r = r
-        # Airspeed and Flight Angles (assume wind is zero)
-        self.Va = math.hypot(self.u, self.v, self.w)    # Airspeed
-        self.alpha = math.atan2(self.w, self.u)         # angle of attack
-        if math.isclose(self.Va, 0.0):                  # Sideslip Angle, no airspeed
-            self.beta = 0.0
-        else:
-            self.beta = math.asin(self.v/self.Va)       # Sideslip Angle, normal definition
-        pdotned = MatrixMath.multiply(MatrixMath.transpose(self.R),[[self.u],[self.v],[self.w]])
-        self.chi = math.atan2(pdotned[1][0],pdotned[0][0])
+        # Airspeed and Flight Angles (assume wind is zero), computed on demand from the initial values
+        self._Va = None
+        self._alpha = None
+        self._beta = None
+        self._chi = None
+        self._initial = (u, v, w, self.yaw, self.pitch, self.roll, dcm, quaternion)
+        return
+
+    def _initialDCM(self):
+        """
+        DCM the state was constructed with (given, or from the initial quaternion or Euler angles), built once and cached
+
+        :return: R [3 x 3]
+        """
+        u, v, w, yaw, pitch, roll, dcm, quaternion = self._initial
+        if dcm is None and quaternion is not None:
+            dcm = Rotations.quaternion2DCM(quaternion)
+            self._initial = (u, v, w, yaw, pitch, roll, dcm, quaternion)
+        elif dcm is None:
+            dcm = Rotations.euler2DCM(yaw, pitch, roll)
+            self._initial = (u, v, w, yaw, pitch, roll, dcm, quaternion)
+        return dcm
+
+    def _computeFlightAngles(self):
+        """
+        Fills in whichever of Va, alpha and beta have not been read or assigned yet, from the initial velocities
+
+        :return: None
+        """
+        u, v, w = self._initial[0:3]
+        Va = math.hypot(u, v, w)                    # Airspeed
+        if self._Va is None:
+            self._Va = Va
+        if self._alpha is None:
+            self._alpha = math.atan2(w, u)          # angle of attack
+        if self._beta is None:
+            if math.isclose(Va, 0.0):               # Sideslip Angle, no airspeed
+                self._beta = 0.0
+            else:
+                self._beta = math.asin(v/Va)        # Sideslip Angle, normal definition
+        return
+
+    @property
+    def R(self):
+        if self._R is None:
+            if self._quaternion is not None:    # given to the constructor or assigned since
+                self._R = Rotations.quaternion2DCM(self._quaternion)
+            else:
+                self._R = self._initialDCM()
+        return self._R
+
+    @R.setter
+    def R(self, dcm):
+        self._R = dcm
+        self._quaternion = None
+
+    @property
+    def quaternion(self):
+        if self._quaternion is None:
+            self._quaternion = Rotations.dcm2Quaternion(self.R)
+        return self._quaternion
+
+    @quaternion.setter
+    def quaternion(self, quaternion):
+        # same as constructing with it: the Euler angles follow, and R is built from it when it is next read
+        self._quaternion = quaternion
+        self._R = None
+        self.yaw, self.pitch, self.roll = Rotations.quaternion2Euler(quaternion)
+
+    @property
+    def Va(self):
+        if self._Va is None:
+            self._computeFlightAngles()
+        return self._Va
+
+    @Va.setter
+    def Va(self, Va):
+        self._Va = Va
+
+    @property
+    def alpha(self):
+        if self._alpha is None:
+            self._computeFlightAngles()
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, alpha):
+        self._alpha = alpha
+
+    @property
+    def beta(self):
+        if self._beta is None:
+            self._computeFlightAngles()
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta):
+        self._beta = beta
+
+    @property
+    def chi(self):
+        if self._chi is None:
+            u, v, w = self._initial[0:3]
+            pdotned = MatrixMath.multiply(MatrixMath.transpose(self._initialDCM()),[[u],[v],[w]])
+            self._chi = math.atan2(pdotned[1][0],pdotned[0][0])
+        return self._chi
+
+    @chi.setter
+    def chi(self, chi):
+        self._chi = chi
+
+    def copy(self):
+        """
+        Copy of the state without going through the constructor; the DCM rows are copied so the two do not share them
+
+        :return: vehicleState
+        """
+        newState = vehicleState.__new__(vehicleState)
+        for member in vehicleState.__slots__:
+            setattr(newState, member, getattr(self, member))
+        if self._R is not None:
+            newState._R = [list(row) for row in self._R]
+        if self._quaternion is not None:
+            newState._quaternion = list(self._quaternion)
+        return newState
+
+    def toArray(self):
+        """
+        The twelve states as a flat list in the order of arrayNames
+
+        :return: [pn, pe, pd, u, v, w, yaw, pitch, roll, p, q, r]
+        """
+        return [self.pn, self.pe, self.pd, self.u, self.v, self.w, self.yaw, self.pitch, self.roll, self.p, self.q, self.r]
+
+    @classmethod
+    def fromArray(cls, values, dcm=None, quaternion=None):
+        """
+        Builds a state from a flat sequence in the order of arrayNames (e.g. a list or a numpy row)
+
+        :param values: [pn, pe, pd, u, v, w, yaw, pitch, roll, p, q, r]
+        :param dcm: direction cosine matrix, which overwrites the Euler angles as in the constructor
+        :param quaternion: attitude quaternion, used as in the constructor
+        :return: vehicleState
+        """
+        return cls(*[float(value) for value in values[0:12]], dcm=dcm, quaternion=quaternion)
+
+    def __getstate__(self):
+        # pickle as the dictionary of the public members, the same as the states pickled before the class had slots
+        return {member: getattr(self, member) for member in vehicleState.arrayNames + ['R', 'Va', 'alpha', 'beta', 'chi']}
+
+    def __setstate__(self, state):
+        self._initial = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, None, None)
+        self._R = self._quaternion = self._Va = self._alpha = self._beta = self._chi = None
+        for member, value in state.items():
+            setattr(self, member, value)
         return
 
     def __repr__(self):
@@ -0,0 +1,193 @@
+"""
+Cache of trim solutions for VehicleTrim. Each solution (the state and control vector the trim optimization converged
+to) is stored under its trim conditions, Va*, kappa* and gamma*, quantized so that repeats of the same request hit the
+cache, together with a fingerprint of the physical constants so that changing the aircraft never returns a trim of a
+different one. A request that misses the cache is warm started from the nearest cached solution of the same aircraft,
+which takes the optimizer far fewer iterations than the fixed initial guess.
+
+The cache can be kept in a JSON file; it is loaded when the cache is created and written again after every new
+solution.
+"""
+
+import hashlib
+import json
+import math
+import os
+import struct
+
+from ece163.Constants import VehiclePhysicalConstants as VPC
+
+cacheVersion = 1
+
+# quantization of the trim conditions: airspeed [m/s], curvature [1/m] and climb angle [rad]
+defaultQuanta = (1e-3, 1e-6, 1e-5)
+
+# conditions are compared for the nearest warm start in units of these: airspeed [m/s], curvature [1/m] and climb angle [rad]
+distanceScales = (1.0, 1e-2, 1e-1)
+
+
+def constantsFingerprint(constants=VPC):
+	"""
+	Hash of every number (and list or tuple of numbers) defined in the physical constants module, so that changing any of
+	them gives a different fingerprint
+
+	:param constants: module (or object) holding the constants
+	:return: hex string
+	"""
+	digest = hashlib.sha1()
+	def addValue(value):
+		if isinstance(value, bool):
+			digest.update(b'b' + bytes([value]))
+		elif isinstance(value, (int, float)):
+			digest.update(b'f' + struct.pack('<d', float(value)))
+		elif isinstance(value, (list, tuple)):
+			digest.update(b'[')
+			for item in value:
+				addValue(item)
+			digest.update(b']')
+		else:
+			digest.update(b'?')
+		return
+	for name in sorted(vars(constants)):
+		value = getattr(constants, name)
+		if name.startswith('_') or not isinstance(value, (int, float, list, tuple)):
+			continue
+		digest.update(name.encode('utf-8'))
+		addValue(value)
+	return digest.hexdigest()
+
+
+class TrimCache(object):
+	def __init__(self, filename=None, quanta=defaultQuanta, constants=VPC):
+		"""
+		Trim solutions keyed on the quantized trim conditions and the physical constants
+
+		:param filename: JSON file to load the cache from (if it exists and is readable) and save it to, None to keep it in memory only
+		:param quanta: quantization steps of (Va* [m/s], kappa* [1/m], gamma* [rad])
+		:param constants: module holding the physical constants to fingerprint
+		:return: none
+		"""
+		self.filename = filename
+		self.quanta = tuple(quanta)
+		self.constants = constants
+		self.entries = dict()	# (fingerprint, quantized conditions): (conditions, solution, inRange)
+		self.hits = 0
+		self.warmStarts = 0
+		self.misses = 0
+		if filename is not None and os.path.exists(filename):
+			try:
+				self.load(filename)
+			except (OSError, ValueError, KeyError, TypeError) as e:	# unreadable cache, start empty and overwrite it
+				print(e)
+		return
+
+	def __len__(self):
+		return len(self.entries)
+
+	def quantize(self, Vastar, Kappastar, Gammastar):
+		"""
+		Quantized trim conditions, as integer steps of the quanta
+
+		:param Vastar: trim airspeed [m/s]
+		:param Kappastar: trim curvature [1/m]
+		:param Gammastar: trim climb angle [rad]
+		:return: tuple of three ints
+		"""
+		return tuple([int(round(value / quantum)) for value, quantum in zip((Vastar, Kappastar, Gammastar), self.quanta)])
+
+	def lookup(self, Vastar, Kappastar, Gammastar):
+		"""
+		Cached solution for these trim conditions with the current physical constants
+
+		:param Vastar: trim airspeed [m/s]
+		:param Kappastar: trim curvature [1/m]
+		:param Gammastar: trim climb angle [rad]
+		:return: (solution list of 16, True if the controls were in range) or None if not cached
+		"""
+		entry = self.entries.get((constantsFingerprint(self.constants), self.quantize(Vastar, Kappastar, Gammastar)))
+		if entry is None:
+			return None
+		self.hits += 1
+		conditions, solution, inRange = entry
+		return list(solution), inRange
+
+	def nearest(self, Vastar, Kappastar, Gammastar):
+		"""
+		Cached solution of the same physical constants whose trim conditions are closest to these (distances scaled by
+		distanceScales)
+
+		:param Vastar: trim airspeed [m/s]
+		:param Kappastar: trim curvature [1/m]
+		:param Gammastar: trim climb angle [rad]
+		:return: (conditions (Va*, kappa*, gamma*), solution list of 16) or None if there is nothing cached
+		"""
+		fingerprint = constantsFingerprint(self.constants)
+		best = None
+		bestDistance = math.inf
+		for (entryFingerprint, key), (conditions, solution, inRange) in self.entries.items():
+			if entryFingerprint != fingerprint:
+				continue
+			distance = math.fsum([((value - cached) / scale) ** 2 for value, cached, scale in zip((Vastar, Kappastar, Gammastar), conditions, distanceScales)])
+			if distance < bestDistance:
+				best = (tuple(conditions), list(solution))
+				bestDistance = distance
+		return best
+
+	def store(self, Vastar, Kappastar, Gammastar, solution, inRange):
+		"""
+		Adds a solution for these trim conditions with the current physical constants, and saves the cache if it has a file
+
+		:param Vastar: trim airspeed [m/s]
+		:param Kappastar: trim curvature [1/m]
+		:param Gammastar: trim climb angle [rad]
+		:param solution: the 16 state and control values the trim optimization converged to
+		:param inRange: True if the trim controls were within the control limits
+		:return: none
+		"""
+		key = (constantsFingerprint(self.constants), self.quantize(Vastar, Kappastar, Gammastar))
+		self.entries[key] = ((float(Vastar), float(Kappastar), float(Gammastar)), [float(value) for value in solution], bool(inRange))
+		if self.filename is not None:
+			try:
+				self.save(self.filename)
+			except OSError as e:	# the solution is still cached in memory
+				print(e)
+		return
+
+	def clear(self):
+		"""
+		Forgets every solution (the file, if any, is only rewritten by the next store or save)
+
+		:return: none
+		"""
+		self.entries.clear()
+		return
+
+	def save(self, filename):
+		"""
+		Writes the cache to a JSON file (through a temporary file, so a reader never sees half of it)
+
+		:param filename: path of the file
+		:return: none
+		"""
+		entries = [{'fingerprint': fingerprint, 'key': list(key), 'conditions': list(conditions), 'solution': solution, 'inRange': inRange}
+				   for (fingerprint, key), (conditions, solution, inRange) in self.entries.items()]
+		temporaryName = filename + '.tmp'
+		with open(temporaryName, 'w') as f:
+			json.dump({'version': cacheVersion, 'quanta': list(self.quanta), 'entries': entries}, f)
+		os.replace(temporaryName, filename)
+		return
+
+	def load(self, filename):
+		"""
+		Adds the solutions in a JSON file written by save. Files of another version or quantization are ignored.
+
+		:param filename: path of the file
+		:return: number of solutions loaded
+		"""
+		with open(filename) as f:
+			contents = json.load(f)
+		if contents.get('version') != cacheVersion or tuple(contents.get('quanta', ())) != self.quanta:
+			return 0
+		for entry in contents['entries']:
+			self.entries[(entry['fingerprint'], tuple(entry['key']))] = (tuple(entry['conditions']), entry['solution'], entry['inRange'])
+		return len(contents['entries'])
@@ -306,7 +306,9 @@ class PIDControl:
     
 class VehicleClosedLoopControl:
 
-    def __init__(self, dT=0.01, rudderControlSource='SIDESLIP', useSensors=False, useEstimator=False):
+    def __init__(self, dT=0.01, rudderControlSource='SIDESLIP', useSensors=False, useEstimator=False, rng=None):
+
+        # rng is an optional random.Random instance shared by the wind and sensor models so a run can own its noise (global random module by default)
 
         # Store the given dT
 
@@ -322,7 +324,7 @@ class VehicleClosedLoopControl:
 
         if(self.useSensors): # If the use sensors boolean is true
 
-            self.sensorsModel = SensorsModel.SensorsModel(aeroModel = VehicleAerodynamicsModule.VehicleAerodynamicsModel()) # Assign sensors model param
+            self.sensorsModel = SensorsModel.SensorsModel(aeroModel = VehicleAerodynamicsModule.VehicleAerodynamicsModel(rng = rng), rng = rng) # Assign sensors model param
 
         
         if(self.useEstimator):
@@ -331,7 +333,7 @@ class VehicleClosedLoopControl:
             
 
 
-        self.VAM = VehicleAerodynamicsModule.VehicleAerodynamicsModel() # Give an VAM instance for the class
+        self.VAM = VehicleAerodynamicsModule.VehicleAerodynamicsModel(rng = rng) # Give an VAM instance for the class
 
         #self.state = VehicleAerodynamicsModule.VehicleAerodynamicsModel().getVehicleState()
 
@@ -341,6 +343,8 @@ class VehicleClosedLoopControl:
 
         self.trimInputs = Inputs.controlInputs() # Gets throttle, aileron, elevator, rudder parameters for the trim state
 
+        self.profiler = None # StageProfiler timing the sensors, autopilot and estimator stages, None unless profiling
+
         self.VehicleControlSurfaces = Inputs.controlInputs() # Gets throttle, aileron, elevator, rudder parameters for the vehicle control surfaces that are fed into VAM
 
         # Intialize controller mode for State Machine
@@ -656,10 +660,20 @@ class VehicleClosedLoopControl:
          
     def update(self, referenceCommands=Controls.referenceCommands):
 
+        profiler = self.profiler # Time the stages when profiling (the VAM times its own)
+
+        if(profiler is not None):
+
+            startTime = profiler.start() # Start of the sensors stage
+
         if(self.useSensors): # If we're using sensors
 
             self.sensorsModel.update() # update the senors
 
+            if(profiler is not None):
+
+                startTime = profiler.stop('sensors', startTime) # End of the sensors stage
+
         if(self.useEstimator):
 
             self.VehicleControlSurfaces = self.UpdateControlCommands(referenceCommands = Controls.referenceCommands(), state = self.vehicleEstimator.estState)
@@ -668,12 +682,43 @@ class VehicleClosedLoopControl:
 
         ControlCommands = self.UpdateControlCommands(referenceCommands, state) # Call the autopilot and get the Control Surfaces commands
 
+        if(profiler is not None):
+
+            profiler.stop('autopilot', startTime) # End of the autopilot stage
+
         self.VAM.Update(ControlCommands) # Update VAM with said commands
 
         if(self.useEstimator):
 
+            if(profiler is not None):
+
+                startTime = profiler.start() # Start of the estimator stage
+
             self.vehicleEstimator.Update() # Call vehicle estimator update
 
+            if(profiler is not None):
+
+                profiler.stop('estimator', startTime) # End of the estimator stage
+
+        return # return nothing
+
+    def setProfiler(self, profiler):
+
+        '''Sets the StageProfiler that times the sensors, autopilot and estimator stages of update, and hands it to the VAM
+        for the aeroForces and integration stages. None stops profiling.'''
+
+        self.profiler = profiler # Keep the profiler
+
+        self.VAM.setProfiler(profiler) # Time the forces and integration too
+
+        return # return nothing
+
+    def setAerodynamicsTables(self, aeroTables):
+
+        '''Hands the AerodynamicsTables to the VAM (see VehicleAerodynamicsModel.setAerodynamicsTables), None for the analytic model'''
+
+        self.VAM.setAerodynamicsTables(aeroTables) # Table driven forces for the closed loop
+
         return # return nothing
     
 
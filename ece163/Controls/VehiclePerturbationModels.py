@@ -1,11 +1,14 @@
 import math
 from ece163.Modeling import VehicleAerodynamicsModel as VAM
+from ece163.Modeling import PropulsionModel
 from ece163.Constants import VehiclePhysicalConstants as VPC
 from ece163.Containers import States
 from ece163.Containers import Inputs
 from ece163.Containers import Linearized
 from ece163.Utilities import MatrixMath
 
+propulsionModel = PropulsionModel.PropulsionModel() # Analytic propeller derivatives for the transfer functions
+
 def dThrust_dVa(Va, Throttle, epsilon=0.5):
 
     '''
@@ -109,9 +112,9 @@ def CreateTransferFunction(trimState, trimInputs):
 
     # Get V's from Pg 26 of Beard's supplemental since the textbook equations are aparrently wrong? Also need partials
 
-    dTdT = dThrust_dThrottle(Va, throt_in_trim, 0.01) # Get Partial Deriv w/ resepect to throttle
+    propulsionModel.refresh() # Propeller terms of the current constants
 
-    dTdVa = dThrust_dVa(Va, throt_in_trim, 0.5) # Partial w/ respect to airspeed in trim
+    (dTdVa, dMdVa), (dTdT, dMdT) = propulsionModel.CalculatePropDerivatives(Va, throt_in_trim) # Analytic partials of thrust w/ respect to airspeed and throttle in trim
 
     a_V1 = (((VPC.rho * Va * VPC.S) / m) * (VPC.CD0 + (VPC.CDalpha * alpha_in_trim) + (VPC.CDdeltaE * elev_in_trim))) - ((1 / m) * dTdVa) # Equation for V1 Beard Supl
 
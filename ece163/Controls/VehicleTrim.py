@@ -19,18 +19,28 @@ from ece163.Utilities import MatrixMath
 from ece163.Utilities import Rotations
 from ece163.Constants import VehiclePhysicalConstants as VPC
 import numpy
-from scipy.optimize import minimize
+from scipy.optimize import approx_fprime, minimize
 
 
 class VehicleTrim():
-	def __init__(self):
+	def __init__(self, cache=None):
 		"""
 		Set of functions to compute the trim condition of the non-linear differential equations numerically. Class includes
 		the trim states (and derivatives of the state) along with the trim controls within the structure of the class.
+
+		:param cache: TrimCache to reuse solutions from and add them to (shared between instances is fine), None to always optimize from scratch
 		"""
 		self.VehicleTrimModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel()
 		self.VehicleTrimModel.getWindModel().reset()
 		self.ControlTrim = Inputs.controlInputs()
+		self.cache = cache
+		return
+
+	def getCache(self):
+		return self.cache
+
+	def setCache(self, cache):
+		self.cache = cache
 		return
 
 	def getTrimState(self):
@@ -65,7 +75,7 @@ class VehicleTrim():
 	# 		pickle.dump((trimState, trimControls), f)
 	# 	return
 
-	def computeTrim(self, Vastar=VPC.InitialSpeed, Kappastar=0.0, Gammastar=0.0):
+	def computeTrim(self, Vastar=VPC.InitialSpeed, Kappastar=0.0, Gammastar=0.0, useCache=True):
 		"""
 		Function to compute trim and find the minimum using the inputs and the scipi optimization toolbox rather than do
 		it by hand. Will need to put the entire thing into a numpy array for it to work (and need to use the minimization
@@ -77,15 +87,28 @@ class VehicleTrim():
 		min and max valid ranges also contained within VehiclePhysicalParameters as minControls and maxControls; if the trim
 		values are out of range, the the function returns False.
 
+		With a cache, a solution cached for the same (quantized) conditions and physical constants is used as is, and
+		otherwise the optimization starts from the nearest cached solution and its result is added to the cache. The
+		controls are checked against the current limits either way.
+
 		:param Vastar: trim airspeed in [m/s]
 		:param kappastar: trim curvature (1/R*) in [1/m], use negative for CCW turn
 		:param gammastar: trim climb angle [rad]
+		:param useCache: False to optimize from scratch even with a cache (the result still goes into the cache)
 		:return: True or False (True if control inputs in range, False if not)
 		"""
 
 		self.VehicleTrimModel.getVehicleDynamicsModel().reset()
 		self.VehicleTrimModel.getWindModel().reset()
 
+		if self.cache is not None and useCache:
+			cached = self.cache.lookup(Vastar, Kappastar, Gammastar)
+			if cached is not None:
+				solution = cached[0]
+				self.MapArraytoClass(numpy.array(solution))
+				self.resetTrimPosition()
+				return self.controlsInRange()	# the limits are not part of the fingerprint, so check them again
+
 		if any([math.isclose(Kappastar, 0.0), math.fabs(Kappastar) < (1/VPC.RstarMax)]):
 			phistar = 0.0
 			pstar = 0.0
@@ -160,16 +183,68 @@ class VehicleTrim():
 					   [self.ControlTrim.Rudder]])						#Rudder	[15]
 
 
+		if self.cache is not None and useCache:
+			nearest = self.cache.nearest(Vastar, Kappastar, Gammastar)
+			if nearest is not None:
+				x0 = self.warmStart(nearest[1], nearest[0][2], x0.flatten(), Vastar, Gammastar)
+				self.cache.warmStarts += 1
+			else:
+				self.cache.misses += 1
+
 		# solve the minimization problem to find the trim states and inputs
 		res = minimize(self.trim_objective_fun, x0.flatten(), method='SLSQP', args=(Vastar, Kappastar, Gammastar),
-					   constraints=cons, options={'ftol': 1e-10, 'disp': False})
+					   jac=self.trim_objective_grad, constraints=cons, options={'ftol': 1e-10, 'disp': False})
 		self.MapArraytoClass(res.x)
 		# replace parts of state with initial values
+		self.resetTrimPosition()
+		# check input limits
+		inRange = self.controlsInRange()
+		if self.cache is not None:
+			self.cache.store(Vastar, Kappastar, Gammastar, res.x, inRange)
+		return inRange
+
+	def resetTrimPosition(self):
+		"""
+		Overwrites the position and heading of the trim state with the initial ones in VehiclePhysicalConstants, the trim
+		does not depend on them.
+
+		:return: none
+		"""
 		self.VehicleTrimModel.getVehicleState().pn = VPC.InitialNorthPosition
 		self.VehicleTrimModel.getVehicleState().pe = VPC.InitialEastPosition
 		self.VehicleTrimModel.getVehicleState().pd = VPC.InitialDownPosition
 		self.VehicleTrimModel.getVehicleState().yaw = VPC.InitialYawAngle
-		# check input limits
+		return
+
+	def warmStart(self, solution, cachedGamma, x0, Vastar, Gammastar):
+		"""
+		Initial guess from a cached solution for nearby trim conditions: its body velocities scaled to the new airspeed and
+		its pitch moved by the change in climb angle, with the roll and body rates (fixed by the trim conditions) and the
+		position taken from the default guess x0.
+
+		:param solution: cached solution, 16 values
+		:param cachedGamma: climb angle the solution was cached for [rad]
+		:param x0: default initial guess, 16 values
+		:param Vastar: trim airspeed in [m/s]
+		:param Gammastar: trim climb angle [rad]
+		:return: initial guess as a numpy array of 16
+		"""
+		guess = numpy.array(solution, dtype=float)
+		cachedVa = math.hypot(guess[3], guess[4], guess[5])
+		if cachedVa > 0:
+			guess[3:6] *= Vastar / cachedVa
+		guess[7] += Gammastar - cachedGamma
+		guess[0:3] = x0[0:3]
+		guess[6] = x0[6]
+		guess[8:12] = x0[8:12]
+		return guess
+
+	def controlsInRange(self):
+		"""
+		Checks the trim controls against the minimum and maximum in VehiclePhysicalConstants
+
+		:return: True if every control is within its limits, False if not
+		"""
 		if any([self.ControlTrim.Throttle < VPC.minControls.Throttle,
 				self.ControlTrim.Aileron < VPC.minControls.Aileron,
 				self.ControlTrim.Elevator < VPC.minControls.Elevator,
@@ -214,6 +289,199 @@ class VehicleTrim():
 					   dot.r)
 		return J ** 2
 
+	def trim_objective_grad(self, x, Vastar, Kappastar, Gammastar):
+		"""
+		Analytic gradient of trim_objective_fun with respect to the 16 element state and control vector, so the
+		optimizer does not need to difference the model. J is the sum of the squares of the residuals r (see
+		trimResiduals), so dJ/dx = 2 r' dr/dx, with dr/dx from the chain rule through the equations of motion, the
+		forces and moments (see forcesJacobian) and the airspeed, angle of attack and sideslip angle. Assumes the still
+		air computeTrim trims in.
+
+		:param x: numpy array of state and controls concatenated in one column
+		:param Vastar: desired trim airspeed [m/s]
+		:param Kappastar: desired turn radius (1/R*) in [1/m], use negative kappa for CCW turns
+		:param Gammastar: desired flight path angle [rad]
+		:return: numpy array of the 16 partial derivatives of J
+		"""
+		if math.hypot(x[3], x[5]) == 0.0:	# angle of attack is not differentiable, difference the objective instead
+			return approx_fprime(x, self.trim_objective_fun, 1e-8, Vastar, Kappastar, Gammastar)
+		residuals = self.trimResiduals(x, Vastar, Kappastar, Gammastar)
+		return 2.0 * numpy.dot(residuals, self.residualsJacobian(x))
+
+	def trimResiduals(self, x, Vastar, Kappastar, Gammastar):
+		"""
+		Differences between the state derivative at x and the trim derivative, whose sum of squares is trim_objective_fun
+
+		:param x: numpy array of state and controls concatenated in one column
+		:param Vastar: desired trim airspeed [m/s]
+		:param Kappastar: desired turn radius (1/R*) in [1/m], use negative kappa for CCW turns
+		:param Gammastar: desired flight path angle [rad]
+		:return: numpy array of the residuals of [pd, u, v, w, roll, pitch, yaw, p, q, r]
+		"""
+		self.trim_objective_fun(x, Vastar, Kappastar, Gammastar)
+		dot = self.VehicleTrimModel.getVehicleDynamicsModel().getVehicleDerivative()
+		return numpy.array([dot.pd + Vastar * math.sin(Gammastar), dot.u, dot.v, dot.w, dot.roll, dot.pitch,
+							dot.yaw - Vastar * Kappastar * math.cos(Gammastar), dot.p, dot.q, dot.r])
+
+	def residualsJacobian(self, x):
+		"""
+		Jacobian of trimResiduals with respect to x (the trim derivatives do not depend on x), in still air
+
+		:param x: numpy array of state and controls concatenated in one column
+		:return: numpy array of [10 x 16]
+		"""
+		u, v, w, pitch, roll, p, q, r = [x.item(i) for i in (3, 4, 5, 7, 8, 9, 10, 11)]
+		sinPitch, cosPitch, tanPitch = math.sin(pitch), math.cos(pitch), math.tan(pitch)
+		sinRoll, cosRoll = math.sin(roll), math.cos(roll)
+		forcesJacobian = self.forcesJacobian(x)
+		jacobian = numpy.zeros((10, 16))
+
+		# pd dot = -u sin(pitch) + v sin(roll) cos(pitch) + w cos(roll) cos(pitch)
+		jacobian[0, 3:6] = [-sinPitch, sinRoll * cosPitch, cosRoll * cosPitch]
+		jacobian[0, 7] = -u * cosPitch - v * sinRoll * sinPitch - w * cosRoll * sinPitch
+		jacobian[0, 8] = v * cosRoll * cosPitch - w * sinRoll * cosPitch
+
+		# [u, v, w] dot = F / m - omega x [u, v, w]
+		jacobian[1:4] = forcesJacobian[0:3] / VPC.mass
+		jacobian[1, [4, 5, 10, 11]] += [r, -q, -w, v]
+		jacobian[2, [3, 5, 9, 11]] += [-r, p, w, -u]
+		jacobian[3, [3, 4, 9, 10]] += [q, -p, -v, u]
+
+		# Euler angle rates from the body rates
+		jacobian[4, 7] = (sinRoll * q + cosRoll * r) / cosPitch ** 2
+		jacobian[4, 8] = (cosRoll * q - sinRoll * r) * tanPitch
+		jacobian[4, 9:12] = [1.0, sinRoll * tanPitch, cosRoll * tanPitch]
+		jacobian[5, 8] = -sinRoll * q - cosRoll * r
+		jacobian[5, 10:12] = [cosRoll, -sinRoll]
+		jacobian[6, 7] = (sinRoll * q + cosRoll * r) * sinPitch / cosPitch ** 2
+		jacobian[6, 8] = (cosRoll * q - sinRoll * r) / cosPitch
+		jacobian[6, 10:12] = [sinRoll / cosPitch, cosRoll / cosPitch]
+
+		# [p, q, r] dot = Jinv M - Jinv (omega x J omega)
+		Jinv = numpy.array(VPC.JinvBody)
+		Jbody = numpy.array(VPC.Jbody)
+		omega = numpy.array([p, q, r])
+		momentum = Jbody.dot(omega)
+		jacobian[7:10] = Jinv.dot(forcesJacobian[3:6])
+		jacobian[7:10, 9:12] -= Jinv.dot(self.skewArray(omega).dot(Jbody) - self.skewArray(momentum))
+		return jacobian
+
+	@staticmethod
+	def skewArray(vector):
+		"""
+		Skew symmetric matrix of a 3 vector, such that skewArray(a).dot(b) is a x b
+
+		:param vector: sequence of 3
+		:return: numpy array of [3 x 3]
+		"""
+		return numpy.array([[0.0, -vector[2], vector[1]], [vector[2], 0.0, -vector[0]], [-vector[1], vector[0], 0.0]])
+
+	def forcesJacobian(self, x):
+		"""
+		Jacobian of the body forces and moments of updateForces with respect to x in still air. The aerodynamic forces
+		depend on u, v and w through the airspeed, angle of attack and sideslip angle, the gravity on pitch and roll, and
+		the propeller on the airspeed and throttle.
+
+		:param x: numpy array of state and controls concatenated in one column
+		:return: numpy array of [6 x 16], rows [Fx, Fy, Fz, Mx, My, Mz]
+		"""
+		u, v, w, pitch, roll, p, q, r = [x.item(i) for i in (3, 4, 5, 7, 8, 9, 10, 11)]
+		throttle, aileron, elevator, rudder = [x.item(i) for i in (12, 13, 14, 15)]
+		jacobian = numpy.zeros((6, 16))
+
+		# gravity: mg [-sin(pitch), sin(roll) cos(pitch), cos(roll) cos(pitch)]
+		mg = VPC.mass * VPC.g0
+		jacobian[0:3, 7] = [-mg * math.cos(pitch), -mg * math.sin(roll) * math.sin(pitch), -mg * math.cos(roll) * math.sin(pitch)]
+		jacobian[1:3, 8] = [mg * math.cos(roll) * math.cos(pitch), -mg * math.sin(roll) * math.cos(pitch)]
+
+		Va = math.hypot(u, v, w)
+		uw = u ** 2 + w ** 2
+		alpha = math.atan2(w, u)
+		beta = math.asin(v / Va)
+		# partials of [Va, alpha, beta] with respect to [u, v, w]
+		airJacobian = numpy.array([[u / Va, v / Va, w / Va],
+								   [-w / uw, 0.0, u / uw],
+								   [-v * u / (Va ** 2 * math.sqrt(uw)), math.sqrt(uw) / Va ** 2, -v * w / (Va ** 2 * math.sqrt(uw))]])
+
+		# dynamic pressure times area and the rate terms, q S c / (2 Va) and so on, are linear in Va
+		qbarS = 0.5 * VPC.rho * Va ** 2 * VPC.S
+		dqbarS = VPC.rho * Va * VPC.S
+		rateS = 0.25 * VPC.rho * VPC.S
+		CL, CD, dCL, dCD = self.liftDragDerivatives(alpha)
+
+		# lift and drag, and their partials with respect to [Va, alpha, q, elevator]
+		lift = qbarS * (CL + VPC.CLdeltaE * elevator) + rateS * Va * VPC.c * VPC.CLq * q
+		drag = qbarS * (CD + VPC.CDdeltaE * elevator) + rateS * Va * VPC.c * VPC.CDq * q
+		dLift = [dqbarS * (CL + VPC.CLdeltaE * elevator) + rateS * VPC.c * VPC.CLq * q, qbarS * dCL, rateS * Va * VPC.c * VPC.CLq, qbarS * VPC.CLdeltaE]
+		dDrag = [dqbarS * (CD + VPC.CDdeltaE * elevator) + rateS * VPC.c * VPC.CDq * q, qbarS * dCD, rateS * Va * VPC.c * VPC.CDq, qbarS * VPC.CDdeltaE]
+		cosAlpha, sinAlpha = math.cos(alpha), math.sin(alpha)
+		# Fx = -drag cos(alpha) + lift sin(alpha), Fz = -drag sin(alpha) - lift cos(alpha)
+		dFx = [-dDrag[i] * cosAlpha + dLift[i] * sinAlpha for i in range(4)]
+		dFz = [-dDrag[i] * sinAlpha - dLift[i] * cosAlpha for i in range(4)]
+		dFx[1] += drag * sinAlpha + lift * cosAlpha
+		dFz[1] += -drag * cosAlpha + lift * sinAlpha
+
+		# lateral forces and moments are length (qbarS (C0 + Cbeta beta + Cda aileron + Cdr rudder) + rateS Va b (Cp p + Cr r))
+		def lateral(length, C0, Cbeta, Cp, Cr, CdeltaA, CdeltaR):
+			coefficient = C0 + Cbeta * beta + CdeltaA * aileron + CdeltaR * rudder
+			rateLength = rateS * length * VPC.b
+			return {'Va': length * dqbarS * coefficient + rateLength * (Cp * p + Cr * r), 'beta': length * qbarS * Cbeta,
+					'p': rateLength * Va * Cp, 'r': rateLength * Va * Cr, 'aileron': length * qbarS * CdeltaA, 'rudder': length * qbarS * CdeltaR}
+		dFy = lateral(1.0, VPC.CY0, VPC.CYbeta, VPC.CYp, VPC.CYr, VPC.CYdeltaA, VPC.CYdeltaR)
+		dMx = lateral(VPC.b, VPC.Cl0, VPC.Clbeta, VPC.Clp, VPC.Clr, VPC.CldeltaA, VPC.CldeltaR)
+		dMz = lateral(VPC.b, VPC.Cn0, VPC.Cnbeta, VPC.Cnp, VPC.Cnr, VPC.CndeltaA, VPC.CndeltaR)
+
+		# pitching moment qbarS c (CM0 + CMalpha alpha + CMdeltaE elevator) + rateS Va c^2 CMq q
+		dMy = [VPC.c * dqbarS * (VPC.CM0 + VPC.CMalpha * alpha + VPC.CMdeltaE * elevator) + rateS * VPC.c ** 2 * VPC.CMq * q,
+			   VPC.c * qbarS * VPC.CMalpha, rateS * Va * VPC.c ** 2 * VPC.CMq, VPC.c * qbarS * VPC.CMdeltaE]
+
+		# propeller thrust and torque, on Fx and Mx
+		propulsionModel = self.VehicleTrimModel.getPropulsionModel()
+		propulsionModel.refresh()
+		(dThrustVa, dTorqueVa), (dThrustThrottle, dTorqueThrottle) = propulsionModel.CalculatePropDerivatives(Va, throttle)
+		dFx[0] += dThrustVa
+		dMx['Va'] += dTorqueVa
+
+		# assemble, moving the airspeed, angle of attack and sideslip partials onto u, v, w
+		for row, (dVa, dAlpha, dBeta) in enumerate([(dFx[0], dFx[1], 0.0), (dFy['Va'], 0.0, dFy['beta']), (dFz[0], dFz[1], 0.0),
+												   (dMx['Va'], 0.0, dMx['beta']), (dMy[0], dMy[1], 0.0), (dMz['Va'], 0.0, dMz['beta'])]):
+			jacobian[row, 3:6] += numpy.dot([dVa, dAlpha, dBeta], airJacobian)
+		jacobian[[0, 2, 4], 10] += [dFx[2], dFz[2], dMy[2]]
+		jacobian[[0, 2, 4], 14] += [dFx[3], dFz[3], dMy[3]]
+		jacobian[[1, 3, 5], 9] += [dFy['p'], dMx['p'], dMz['p']]
+		jacobian[[1, 3, 5], 11] += [dFy['r'], dMx['r'], dMz['r']]
+		jacobian[[1, 3, 5], 13] += [dFy['aileron'], dMx['aileron'], dMz['aileron']]
+		jacobian[[1, 3, 5], 15] += [dFy['rudder'], dMx['rudder'], dMz['rudder']]
+		jacobian[0, 12] += dThrustThrottle
+		jacobian[3, 12] += dTorqueThrottle
+		return jacobian
+
+	@staticmethod
+	def liftDragDerivatives(alpha):
+		"""
+		Lift and drag coefficients of VehicleAerodynamicsModel.CalculateCoeff_alpha (blended between attached and separated
+		flow) and their derivatives with respect to the angle of attack
+
+		:param alpha: angle of attack [rad]
+		:return: (CL, CD, dCL/dalpha, dCD/dalpha)
+		"""
+		e1 = math.exp(-VPC.M * (alpha - VPC.alpha0))
+		e2 = math.exp(VPC.M * (alpha + VPC.alpha0))
+		numerator = 1 + e1 + e2
+		denominator = (1 + e1) * (1 + e2)
+		sigma = numerator / denominator
+		dSigma = (VPC.M * (e2 - e1) * denominator - numerator * VPC.M * (e2 * (1 + e1) - e1 * (1 + e2))) / denominator ** 2
+
+		CLattached = VPC.CL0 + VPC.CLalpha * alpha
+		CLseparated = math.sin(2 * alpha)
+		CDattached = VPC.CDp + CLattached ** 2 / (math.pi * VPC.AR * VPC.e)
+		CDseparated = 2 * math.sin(alpha) ** 2
+		CL = (1 - sigma) * CLattached + sigma * CLseparated
+		CD = (1 - sigma) * CDattached + sigma * CDseparated
+		dCL = dSigma * (CLseparated - CLattached) + (1 - sigma) * VPC.CLalpha + sigma * 2 * math.cos(2 * alpha)
+		dCD = dSigma * (CDseparated - CDattached) + (1 - sigma) * 2 * VPC.CLalpha * CLattached / (math.pi * VPC.AR * VPC.e) + sigma * 2 * math.sin(2 * alpha)
+		return CL, CD, dCL, dCD
+
 	def MapArraytoClass(self, x):
 		"""
 		Helper function to map the state vector (numpy array) used in the minimization to the state and controlInput classes
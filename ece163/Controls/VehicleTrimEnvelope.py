@@ -0,0 +1,272 @@
+"""
+Trim envelope: the trim of the vehicle over a grid of airspeed Va*, curvature kappa* (1/R*) and climb angle gamma*,
+computed once (in parallel over a multiprocessing pool) and stored as a small table, so that gain scheduling and
+mission planning can look up the trim anywhere inside the envelope without running the trim optimization.
+
+For every grid point the table holds the trim state (in vehicleState.arrayNames order), the trim controls, the
+transfer function parameters of VehiclePerturbationModels.CreateTransferFunction about that trim, and whether the trim
+controls were within VPC.minControls and VPC.maxControls. Lookups interpolate linearly between the grid points around
+the request (trilinear, axes need not be evenly spaced), and the interpolated trim is only flagged feasible if every one
+of those grid points is.
+
+Usage: python -m ece163.Controls.VehicleTrimEnvelope envelope.npz --airspeeds 18 32 8 --climb-angles -6 6 5 --radii 150 -150 inf
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy
+
+from ece163.Containers import Inputs
+from ece163.Containers import Linearized
+from ece163.Containers import States
+from ece163.Controls import TrimCache
+from ece163.Controls import VehiclePerturbationModels
+from ece163.Controls import VehicleTrim
+
+stateNames = list(States.vehicleState.arrayNames)
+controlNames = ['Throttle', 'Aileron', 'Elevator', 'Rudder']
+transferFunctionNames = ['Va_trim', 'alpha_trim', 'beta_trim', 'gamma_trim', 'theta_trim', 'phi_trim', 'a_phi1', 'a_phi2',
+						 'a_beta1', 'a_beta2', 'a_theta1', 'a_theta2', 'a_theta3', 'a_V1', 'a_V2', 'a_V3']
+
+# trim of the current worker process, kept between grid points so neighbouring points are warm started from each other
+workerTrim = None
+
+
+def trimPoint(conditions):
+	"""
+	Trims one grid point. Top level so that it can be pickled to the pool workers.
+
+	:param conditions: (index, Va* [m/s], kappa* [1/m], gamma* [rad]) with index the flat grid index
+	:return: (index, state list, control list, transfer function list, True if the controls are in range)
+	"""
+	global workerTrim
+	if workerTrim is None:
+		workerTrim = VehicleTrim.VehicleTrim(cache=TrimCache.TrimCache())
+	index, Vastar, Kappastar, Gammastar = conditions
+	feasible = workerTrim.computeTrim(Vastar, Kappastar, Gammastar)
+	trimState = workerTrim.getTrimState()
+	trimControls = workerTrim.getTrimControls()
+	transferFunction = VehiclePerturbationModels.CreateTransferFunction(trimState, trimControls)
+	return (index, trimState.toArray(), [getattr(trimControls, name) for name in controlNames],
+			[getattr(transferFunction, name) for name in transferFunctionNames], feasible)
+
+
+def computeEnvelope(airspeeds, curvatures, climbAngles, processes=None, callback=None):
+	"""
+	Trims every point of the grid and builds the envelope
+
+	:param airspeeds: increasing list of Va* [m/s]
+	:param curvatures: increasing list of kappa* [1/m] (negative for CCW turns, 0 for straight)
+	:param climbAngles: increasing list of gamma* [rad]
+	:param processes: pool size, None for one per CPU, 0 to run serially in this process
+	:param callback: function called with (points done, total points) as the grid points finish, or None
+	:return: TrimEnvelope
+	"""
+	axes = [numpy.asarray(axis, dtype=float) for axis in (airspeeds, curvatures, climbAngles)]
+	for axis in axes:
+		if axis.ndim != 1 or len(axis) == 0 or numpy.any(numpy.diff(axis) <= 0):
+			raise ValueError("Envelope axes must be non-empty and strictly increasing")
+	shape = tuple([len(axis) for axis in axes])
+	states = numpy.zeros(shape + (len(stateNames),))
+	controls = numpy.zeros(shape + (len(controlNames),))
+	transferFunctions = numpy.zeros(shape + (len(transferFunctionNames),))
+	feasible = numpy.zeros(shape, dtype=bool)
+
+	# walk the grid so that consecutive points are neighbours, and hand them out in runs so each worker warm starts
+	points = [(index, float(axes[0][i]), float(axes[1][j]), float(axes[2][k])) for index, (i, j, k) in enumerate(numpy.ndindex(*shape))]
+	def storePoint(result, done):
+		index, state, control, transferFunction, inRange = result
+		position = numpy.unravel_index(index, shape)
+		states[position] = state
+		controls[position] = control
+		transferFunctions[position] = transferFunction
+		feasible[position] = inRange
+		if callback is not None:
+			callback(done, len(points))
+		return
+	if processes == 0:
+		for done, point in enumerate(points, 1):
+			storePoint(trimPoint(point), done)
+	else:
+		with multiprocessing.Pool(processes) as pool:
+			chunksize = max(1, len(points) // (4 * (processes or os.cpu_count() or 1)))
+			for done, result in enumerate(pool.imap_unordered(trimPoint, points, chunksize), 1):
+				storePoint(result, done)
+	return TrimEnvelope(axes[0], axes[1], axes[2], states, controls, transferFunctions, feasible)
+
+
+def loadEnvelope(filename):
+	"""
+	Reads an envelope written by TrimEnvelope.save
+
+	:param filename: path of the .npz file
+	:return: TrimEnvelope
+	"""
+	with numpy.load(filename) as envelopeFile:
+		if envelopeFile['stateNames'].tolist() != stateNames or envelopeFile['controlNames'].tolist() != controlNames or \
+				envelopeFile['transferFunctionNames'].tolist() != transferFunctionNames:
+			raise ValueError("{} was written with different columns".format(filename))
+		return TrimEnvelope(envelopeFile['airspeeds'], envelopeFile['curvatures'], envelopeFile['climbAngles'], envelopeFile['states'],
+							envelopeFile['controls'], envelopeFile['transferFunctions'], envelopeFile['feasible'])
+
+
+class TrimEnvelope(object):
+	def __init__(self, airspeeds, curvatures, climbAngles, states, controls, transferFunctions, feasible):
+		"""
+		Table of trims over a grid of (Va*, kappa*, gamma*), see computeEnvelope to build one and loadEnvelope to read one
+
+		:param airspeeds: increasing Va* of the grid [m/s]
+		:param curvatures: increasing kappa* of the grid [1/m]
+		:param climbAngles: increasing gamma* of the grid [rad]
+		:param states: array of [airspeeds x curvatures x climbAngles x stateNames]
+		:param controls: array of [airspeeds x curvatures x climbAngles x controlNames]
+		:param transferFunctions: array of [airspeeds x curvatures x climbAngles x transferFunctionNames]
+		:param feasible: bool array of [airspeeds x curvatures x climbAngles], True where the trim controls are in range
+		:return: none
+		"""
+		self.axes = [numpy.asarray(axis, dtype=float) for axis in (airspeeds, curvatures, climbAngles)]
+		self.airspeeds, self.curvatures, self.climbAngles = self.axes
+		self.shape = tuple([len(axis) for axis in self.axes])
+		# one table of every value per grid point, so a lookup interpolates all of them at once
+		self.table = numpy.concatenate([numpy.asarray(states, dtype=float), numpy.asarray(controls, dtype=float),
+										numpy.asarray(transferFunctions, dtype=float)], axis=3)
+		self.feasible = numpy.asarray(feasible, dtype=bool)
+		if self.table.shape[0:3] != self.shape or self.feasible.shape != self.shape:
+			raise ValueError("Envelope tables do not match the grid {}".format(self.shape))
+		return
+
+	@property
+	def states(self):
+		return self.table[..., 0:len(stateNames)]
+
+	@property
+	def controls(self):
+		return self.table[..., len(stateNames):len(stateNames) + len(controlNames)]
+
+	@property
+	def transferFunctions(self):
+		return self.table[..., len(stateNames) + len(controlNames):]
+
+	def save(self, filename):
+		"""
+		Writes the envelope to a compressed .npz file
+
+		:param filename: path of the file
+		:return: none
+		"""
+		numpy.savez_compressed(filename, airspeeds=self.airspeeds, curvatures=self.curvatures, climbAngles=self.climbAngles,
+							   states=self.states, controls=self.controls, transferFunctions=self.transferFunctions,
+							   feasible=self.feasible, stateNames=numpy.array(stateNames), controlNames=numpy.array(controlNames),
+							   transferFunctionNames=numpy.array(transferFunctionNames))
+		return
+
+	def contains(self, Vastar, Kappastar, Gammastar):
+		"""
+		Whether the trim conditions are inside the grid
+
+		:param Vastar: trim airspeed [m/s]
+		:param Kappastar: trim curvature [1/m]
+		:param Gammastar: trim climb angle [rad]
+		:return: True or False
+		"""
+		return all([axis[0] <= value <= axis[-1] for axis, value in zip(self.axes, (Vastar, Kappastar, Gammastar))])
+
+	def interpolate(self, Vastar, Kappastar, Gammastar):
+		"""
+		Linear interpolation of every table value between the grid points around the trim conditions. Conditions outside
+		the grid are clamped to its edge.
+
+		:param Vastar: trim airspeed [m/s]
+		:param Kappastar: trim curvature [1/m]
+		:param Gammastar: trim climb angle [rad]
+		:return: (1D array of the state, control and transfer function values, True if every grid point used is feasible)
+		"""
+		corners = list()
+		weights = list()
+		for axis, value in zip(self.axes, (Vastar, Kappastar, Gammastar)):
+			low = min(max(int(numpy.searchsorted(axis, value, 'right')) - 1, 0), max(len(axis) - 2, 0))
+			weight = min(max((value - axis[low]) / (axis[low + 1] - axis[low]), 0.0), 1.0) if len(axis) > 1 else 0.0
+			if weight == 0.0:	# on a grid point (or clamped to one), the point next to it plays no part
+				corners.append(slice(low, low + 1))
+			elif weight == 1.0:
+				corners.append(slice(low + 1, low + 2))
+			else:
+				corners.append(slice(low, low + 2))
+			weights.append(weight)
+		corners = tuple(corners)
+		cube = self.table[corners]
+		feasible = bool(numpy.all(self.feasible[corners]))
+		for weight in weights:	# collapse one axis at a time, the first axis of what is left
+			cube = cube[0] if len(cube) == 1 else cube[0] * (1.0 - weight) + cube[1] * weight
+		return cube, feasible
+
+	def lookup(self, Vastar, Kappastar, Gammastar):
+		"""
+		Interpolated trim for the trim conditions
+
+		:param Vastar: trim airspeed [m/s]
+		:param Kappastar: trim curvature [1/m]
+		:param Gammastar: trim climb angle [rad]
+		:return: (vehicleState, controlInputs, transferFunctions, feasible) where feasible is False outside the grid or
+			next to a grid point whose trim controls are out of range
+		"""
+		values, feasible = self.interpolate(Vastar, Kappastar, Gammastar)
+		values = values.tolist()
+		state = States.vehicleState.fromArray(values[0:len(stateNames)])
+		values = values[len(stateNames):]
+		controls = Inputs.controlInputs(*values[0:len(controlNames)])
+		transferFunction = Linearized.transferFunctions(*values[len(controlNames):])
+		return state, controls, transferFunction, feasible and self.contains(Vastar, Kappastar, Gammastar)
+
+	def getTrimState(self, Vastar, Kappastar, Gammastar):
+		return self.lookup(Vastar, Kappastar, Gammastar)[0]
+
+	def getTrimControls(self, Vastar, Kappastar, Gammastar):
+		return self.lookup(Vastar, Kappastar, Gammastar)[1]
+
+	def getTransferFunction(self, Vastar, Kappastar, Gammastar):
+		return self.lookup(Vastar, Kappastar, Gammastar)[2]
+
+	def isFeasible(self, Vastar, Kappastar, Gammastar):
+		return self.interpolate(Vastar, Kappastar, Gammastar)[1] and self.contains(Vastar, Kappastar, Gammastar)
+
+
+def main(argv=None):
+	"""
+	Entry point of python -m ece163.Controls.VehicleTrimEnvelope
+
+	:param argv: argument list (defaults to sys.argv[1:])
+	:return: process exit code
+	"""
+	parser = argparse.ArgumentParser(prog='python -m ece163.Controls.VehicleTrimEnvelope', description="Trims a grid of flight conditions into an envelope table")
+	parser.add_argument('output', help='.npz file to write the envelope to')
+	parser.add_argument('--airspeeds', type=float, nargs=3, metavar=('FIRST', 'LAST', 'COUNT'), default=(18.0, 32.0, 8),
+						help='evenly spaced airspeeds [m/s] (default 18 32 8)')
+	parser.add_argument('--climb-angles', type=float, nargs=3, metavar=('FIRST', 'LAST', 'COUNT'), default=(-6.0, 6.0, 5),
+						help='evenly spaced climb angles [deg] (default -6 6 5)')
+	parser.add_argument('--radii', type=float, nargs='+', default=[-150.0, -300.0, math.inf, 300.0, 150.0],
+						help='turn radii [m], negative for CCW and inf for straight (default -150 -300 inf 300 150)')
+	parser.add_argument('--processes', type=int, default=None, help='pool size (default one per CPU, 0 for serial)')
+	arguments = parser.parse_args(argv)
+	if 0.0 in arguments.radii:
+		parser.error("--radii must not contain zero, use inf for straight flight")
+
+	airspeeds = numpy.linspace(arguments.airspeeds[0], arguments.airspeeds[1], int(arguments.airspeeds[2]))
+	climbAngles = numpy.radians(numpy.linspace(arguments.climb_angles[0], arguments.climb_angles[1], int(arguments.climb_angles[2])))
+	curvatures = sorted(set([1 / radius for radius in arguments.radii]))
+
+	startTime = time.perf_counter()
+	envelope = computeEnvelope(airspeeds, curvatures, climbAngles, arguments.processes)
+	envelope.save(arguments.output)
+	print("{} trims in {:.2f} s, {} feasible, written to {}".format(envelope.feasible.size, time.perf_counter() - startTime,
+																	  int(numpy.count_nonzero(envelope.feasible)), arguments.output))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
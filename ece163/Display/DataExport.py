@@ -49,6 +49,23 @@ class DataExport(QtWidgets.QWidget):
 		csvSaveButton.clicked.connect(self.saveCSVFile)
 		csvBox.addStretch()
 
+		logBox = QtWidgets.QHBoxLayout()
+		self.usedLayout.addLayout(logBox)
+		logBox.addWidget(QtWidgets.QLabel('Log  '))
+		self.logPath = QtWidgets.QLineEdit()
+		logBox.addWidget(self.logPath)
+		logBrowseButton = QtWidgets.QPushButton('Browse')
+		logBrowseButton.clicked.connect(self.chooseLogPath)
+		logBox.addWidget(logBrowseButton)
+		logRefreshButton = QtWidgets.QPushButton('Refresh')
+		logRefreshButton.clicked.connect(self.updateLogPath)
+		self.updateLogPath()
+		logBox.addWidget(logRefreshButton)
+		logSaveButton = QtWidgets.QPushButton('Save')
+		logBox.addWidget(logSaveButton)
+		logSaveButton.clicked.connect(self.saveLogFile)
+		logBox.addStretch()
+
 		self.usedLayout.addStretch()
 		return
 
@@ -87,6 +104,17 @@ class DataExport(QtWidgets.QWidget):
 		filePath = os.path.join(folder, self.generateFileName('.csv'))
 		self.csvPath.setText(filePath)
 
+	def updateLogPath(self):
+		currentFilePath = self.logPath.text()
+		folderInfo = os.path.split(currentFilePath)
+		if not os.path.exists(folderInfo[0]):
+			folder = sys.path[0]
+		else:
+			folder = folderInfo[0]
+
+		filePath = os.path.join(folder, self.generateFileName('.flog'))
+		self.logPath.setText(filePath)
+
 	def choosePicklePath(self):
 		fileSelect = QtWidgets.QFileDialog(filter='*.pickle')
 		fileSelect.setFileMode(QtWidgets.QFileDialog.AnyFile)
@@ -109,6 +137,17 @@ class DataExport(QtWidgets.QWidget):
 			self.csvPath.setText(os.path.normpath(fileSelect.selectedFiles()[0]))
 		return
 
+	def chooseLogPath(self):
+		fileSelect = QtWidgets.QFileDialog(filter='*.flog')
+		fileSelect.setFileMode(QtWidgets.QFileDialog.AnyFile)
+		fileSelect.setAcceptMode(QtWidgets.QFileDialog.AcceptSave)
+		folder, file = os.path.split(self.logPath.text())
+		fileSelect.setDirectory(folder)
+		fileSelect.selectFile(self.generateFileName('.flog'))
+		if fileSelect.exec():
+			self.logPath.setText(os.path.normpath(fileSelect.selectedFiles()[0]))
+		return
+
 	def saveCSVFile(self):
 		filePath = self.csvPath.text()
 		self.simulateHandle.exportToCSV(filePath)
@@ -118,3 +157,8 @@ class DataExport(QtWidgets.QWidget):
 		filePath = self.picklePath.text()
 		self.simulateHandle.exportToPickle(filePath)
 		return
+
+	def saveLogFile(self):
+		filePath = self.logPath.text()
+		self.simulateHandle.exportToFlightLog(filePath)
+		return
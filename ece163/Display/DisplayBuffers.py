@@ -0,0 +1,238 @@
+"""
+	Fixed size buffers for live plots, independent of Qt. A :class:`RingBuffer` keeps the last capacity samples of a set
+	of lines in preallocated NumPy arrays, so adding a point costs the same however long the simulation has been running,
+	and :func:`decimate` thins what is drawn down to about as many points as a plot has pixels across, keeping the
+	smallest and largest value of every stretch of samples so that spikes still show. A :class:`TrailBuffer` keeps the
+	path flown by the vehicle for the 3D display, only as many points as it takes to draw it.
+"""
+import math
+import numpy
+
+defaultCapacity = 50000	# samples kept per plot
+defaultDisplayPoints = 2000	# points drawn per line at most (about a plot's width in pixels, twice over)
+defaultTrailLength = 100000	# trail points kept at most
+
+
+class RingBuffer:
+	"""
+		Last capacity samples of columns values sharing one time axis, oldest overwritten first
+	"""
+	def __init__(self, columns, capacity=defaultCapacity):
+		"""
+		Allocates the buffer
+
+		:param columns: number of values in each sample (lines in the plot)
+		:param capacity: number of samples kept
+		"""
+		self.columns = columns
+		self.capacity = capacity
+		self.times = numpy.empty(capacity)
+		self.values = numpy.empty((capacity, columns))
+		self.count = 0	# samples added since the last clear, the next one goes in at count % capacity
+		return
+
+	def __len__(self):
+		return min(self.count, self.capacity)
+
+	def clear(self):
+		"""
+		Forgets every sample (the arrays are kept)
+		"""
+		self.count = 0
+		return
+
+	def append(self, t, values):
+		"""
+		Adds one sample
+
+		:param t: time of the sample
+		:param values: sequence of columns values
+		"""
+		index = self.count % self.capacity
+		self.times[index] = t
+		self.values[index] = values
+		self.count += 1
+		return
+
+	def extend(self, times, values):
+		"""
+		Adds several samples at once
+
+		:param times: sequence of n times
+		:param values: [n x columns] values
+		"""
+		times = numpy.asarray(times, dtype=float)
+		values = numpy.asarray(values, dtype=float).reshape(len(times), self.columns)
+		if len(times) > self.capacity:	# only the last capacity of them would be kept
+			skipped = len(times) - self.capacity
+			times, values = times[skipped:], values[skipped:]
+			self.count += skipped
+		start = self.count % self.capacity
+		first = min(len(times), self.capacity - start)	# up to the end of the arrays, then from the start
+		self.times[start:start + first], self.values[start:start + first] = times[:first], values[:first]
+		self.times[:len(times) - first], self.values[:len(times) - first] = times[first:], values[first:]
+		self.count += len(times)
+		return
+
+	def lastTime(self):
+		"""
+		Time of the newest sample
+
+		:return: time, None if the buffer is empty
+		"""
+		if self.count == 0:
+			return None
+		return float(self.times[(self.count - 1) % self.capacity])
+
+	def getData(self, timeWindow=None):
+		"""
+		Samples in the order they were added, optionally only the ones within timeWindow of the newest (times are
+		assumed to increase)
+
+		:param timeWindow: length of time to return [same units as the times], None for everything kept
+		:return: (times [n], values [n x columns]), new arrays
+		"""
+		length = len(self)
+		if self.count <= self.capacity:
+			times, values = self.times[:length].copy(), self.values[:length].copy()
+		else:
+			start = self.count % self.capacity
+			times = numpy.concatenate((self.times[start:], self.times[:start]))
+			values = numpy.concatenate((self.values[start:], self.values[:start]))
+		if timeWindow is not None and length > 0:
+			first = int(numpy.searchsorted(times, times[-1] - timeWindow, side='left'))
+			times, values = times[first:], values[first:]
+		return times, values
+
+
+def decimate(times, values, maxPoints=defaultDisplayPoints):
+	"""
+	Thins samples down to at most about maxPoints per column for drawing. The samples are split into maxPoints / 2
+	consecutive stretches and each column keeps its smallest and largest sample of every stretch (in time order), so the
+	envelope of the data, including single sample spikes, looks the same as with every sample drawn.
+
+	:param times: [n] times
+	:param values: [n x columns] values
+	:param maxPoints: most points to keep per column
+	:return: (x, y), both [m x columns] (x differs between the columns once decimated), m = n if n <= maxPoints
+	"""
+	times = numpy.asarray(times, dtype=float)
+	values = numpy.asarray(values, dtype=float)
+	count, columns = values.shape
+	if count <= maxPoints:
+		return numpy.broadcast_to(times[:, None], (count, columns)), values
+	stretch = int(math.ceil(count / max(maxPoints // 2, 1)))	# samples per stretch
+	full = count // stretch
+	body = values[:full * stretch].reshape(full, stretch, columns)
+	offsets = (numpy.arange(full) * stretch)[:, None]
+	lows, highs = body.argmin(axis=1) + offsets, body.argmax(axis=1) + offsets	# [full x columns] sample indices
+	if full * stretch < count:	# the samples left over make one more, shorter, stretch
+		tail = values[full * stretch:]
+		lows = numpy.vstack((lows, tail.argmin(axis=0) + full * stretch))
+		highs = numpy.vstack((highs, tail.argmax(axis=0) + full * stretch))
+	indices = numpy.stack((numpy.minimum(lows, highs), numpy.maximum(lows, highs)), axis=1).reshape(-1, columns)	# in time order
+	return times[indices], numpy.take_along_axis(values, indices, axis=0)
+
+
+class TrailBuffer:
+	"""
+		Points of a path in preallocated arrays, which grow by doubling up to maxLength points. A new point is only kept
+		if the path has gone minDistance from the last kept point and either turned by maxAngle or gone maxDistance since
+		it (the second point is kept at minDistance, to give the first direction); otherwise it is only the provisional end of the trail (the head), replaced by the next point, so the trail
+		always reaches the vehicle. Once maxLength points are kept the oldest quarter is dropped.
+	"""
+	def __init__(self, minDistance=0.25, maxDistance=10.0, maxAngle=math.radians(2), maxLength=defaultTrailLength, color=(1., 0., 0., 1.),
+				 initialCapacity=1024):
+		"""
+		Allocates the buffer
+
+		:param minDistance: points closer than this to the last kept point are not kept [m]
+		:param maxDistance: a point this far from the last kept point is kept even on a straight path [m]
+		:param maxAngle: a point where the path has turned by this much since the last kept segment is kept [rad]
+		:param maxLength: most points kept
+		:param color: RGBA color of every point
+		:param initialCapacity: points allocated at first
+		"""
+		self.minDistance = minDistance
+		self.maxDistance = maxDistance
+		self.cosMaxAngle = math.cos(maxAngle)
+		self.maxLength = max(maxLength, 4)
+		self.color = color
+		capacity = min(initialCapacity, self.maxLength) + 1	# room for the head
+		self.points = numpy.empty((capacity, 3))
+		self.colors = numpy.tile(numpy.array(color, dtype=float), (capacity, 1))
+		self.count = 0	# points kept
+		self.hasHead = False
+		return
+
+	def __len__(self):
+		return self.count + self.hasHead
+
+	def clear(self):
+		"""
+		Forgets the trail (the arrays are kept)
+		"""
+		self.count = 0
+		self.hasHead = False
+		return
+
+	def addPoint(self, point):
+		"""
+		Moves the end of the trail to point, keeping it if the path has gone far enough or turned enough
+
+		:param point: [x, y, z]
+		:return: True if the point was kept, False if it is only the head
+		"""
+		count = self.count
+		if count > 0:
+			lastX, lastY, lastZ = self.points[count - 1]
+			dX, dY, dZ = point[0] - lastX, point[1] - lastY, point[2] - lastZ
+			distanceSquared = dX * dX + dY * dY + dZ * dZ
+			keep = distanceSquared >= self.maxDistance * self.maxDistance or (count == 1 and distanceSquared >= self.minDistance * self.minDistance)	# the first segment sets the direction
+			if not keep and distanceSquared >= self.minDistance * self.minDistance and count > 1:
+				sX, sY, sZ = lastX - self.points[count - 2, 0], lastY - self.points[count - 2, 1], lastZ - self.points[count - 2, 2]	# last kept segment
+				segmentSquared = sX * sX + sY * sY + sZ * sZ
+				keep = (sX * dX + sY * dY + sZ * dZ) < self.cosMaxAngle * math.sqrt(segmentSquared * distanceSquared)	# turned more than maxAngle
+			if not keep:
+				self.points[count] = point[0:3]
+				self.hasHead = True
+				return False
+		if count + 1 >= len(self.points):	# no room for this point and a head
+			self._makeRoom()
+			count = self.count
+		self.points[count] = point[0:3]
+		self.count = count + 1
+		self.hasHead = False
+		return True
+
+	def _makeRoom(self):
+		"""
+		Doubles the arrays, or drops the oldest quarter of the points once they hold maxLength
+		"""
+		if len(self.points) - 1 < self.maxLength:
+			capacity = min(2 * (len(self.points) - 1), self.maxLength) + 1
+			points = numpy.empty((capacity, 3))
+			points[:self.count] = self.points[:self.count]
+			self.points = points
+			self.colors = numpy.tile(numpy.array(self.color, dtype=float), (capacity, 1))
+		else:
+			dropped = self.maxLength // 4
+			self.points[:self.count - dropped] = self.points[dropped:self.count]
+			self.count -= dropped
+		return
+
+	def getPoints(self):
+		"""
+		Trail in the order it was flown, including the head
+
+		:return: [n x 3] view of the buffer (valid until the next addPoint)
+		"""
+		return self.points[:len(self)]
+
+	def getColors(self):
+		"""
+		Colors of the points of getPoints
+
+		:return: [n x 4] view of the buffer
+		"""
+		return self.colors[:len(self)]
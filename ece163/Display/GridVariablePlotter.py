@@ -8,7 +8,7 @@ import PyQt5.QtWidgets as QtWidgets
 
 
 class GridVariablePlotter(QtWidgets.QWidget):
-	def __init__(self, numRows, numCols, plotNames, titles=list(), xLabels=list(), yLabels=list(), useLegends=list(), parent=None):
+	def __init__(self, numRows, numCols, plotNames, titles=list(), xLabels=list(), yLabels=list(), useLegends=list(), parent=None, **bufferSettings):
 		"""
 		Instantiates a new grid of variables suitable to be added to a gui.
 
@@ -20,6 +20,7 @@ class GridVariablePlotter(QtWidgets.QWidget):
 		:param xLabels: list of optional xLabels. Can insert None into list to skip.
 		:param yLabels: list of optional yLabels. Can insert None into list to skip.
 		:param useLegends: list of True/False indicating for each plot if legend is displayed
+		:param bufferSettings: timeWindow, capacity, maxDisplayPoints and maxFrameRate handed to every variablePlotter
 		"""
 		super().__init__(parent)
 
@@ -59,7 +60,7 @@ class GridVariablePlotter(QtWidgets.QWidget):
 				except TypeError:
 					curLegend = useLegends
 				# print(curLegend)
-				newVariablePlotter = variablePlotter.variablePlotter(curNames, curTitle, curXLabel, curYLabel, curLegend)
+				newVariablePlotter = variablePlotter.variablePlotter(curNames, curTitle, curXLabel, curYLabel, curLegend, **bufferSettings)
 				self.variablePlotters.append(newVariablePlotter)
 				self.usedLayout.addWidget(newVariablePlotter, row, col)
 
@@ -76,6 +77,17 @@ class GridVariablePlotter(QtWidgets.QWidget):
 			plot.addDataPoint(data, curT)
 		return
 
+	def addNewAllDataBlock(self, times, newData):
+		"""
+		adds several points of data to all elements in grid, sharing one set of times.
+
+		:param times: sequence of n x coordinates
+		:param newData: list with one [n x lines] array per plot, in row-major order
+		"""
+		for plot, data in zip(self.variablePlotters, newData):
+			plot.addDataPoints(times, data)
+		return
+
 	def addNewSingleData(self, index, newData, t=None):
 		"""
 		updates a single plot from the grid.
@@ -95,6 +107,16 @@ class GridVariablePlotter(QtWidgets.QWidget):
 			plot.clearDataPoints()
 		return
 
+	def setTimeWindowAll(self, timeWindow):
+		"""
+		Changes the length of x shown by all plots in the grid.
+
+		:param timeWindow: passed to variablePlotter.setTimeWindow
+		"""
+		for plot in self.variablePlotters:
+			plot.setTimeWindow(timeWindow)
+		return
+
 
 if QtCore.__name__ == "__main__":
 	import sys
@@ -0,0 +1,284 @@
+"""
+Window that plays back a recorded flight (see :mod:`ece163.Simulation.FlightReplay`) through the vehicle display and a
+grid of plots for every group of recorded columns, without running any physics. The replay can be played at any of the
+speeds of the simulation windows, paused, and scrubbed with the slider under the display: dragging moves the vehicle,
+letting go also redraws the plots with the rows up to the new time.
+"""
+import datetime
+import math
+import os
+import sys
+import time
+
+import numpy
+import PyQt5.QtCore as QtCore
+import PyQt5.QtWidgets as QtWidgets
+
+from . import baseInterface
+from . import DisplayBuffers
+from . import GridVariablePlotter
+from . import vehicleDisplay
+from ..Simulation import FlightReplay
+
+replayFormats = '*.flog *.csv *.pickle *.npz'
+plotColumns = 3	# plots per row of each grid
+angleNames = ['yaw', 'pitch', 'roll', 'p', 'q', 'r', 'alpha', 'beta', 'chi', 'gps_cog']	# recorded in radians, plotted in degrees
+
+
+class ReplayInterface(QtWidgets.QMainWindow):
+	def __init__(self, filename=None, parent=None):
+		"""
+		Sets up the window, with nothing to replay until a recording is opened
+
+		:param filename: recording to open straight away, None to wait for the Open button
+		"""
+		super().__init__(parent)
+		self.setWindowTitle("ECE163 Flight Replay")
+		self.replay = None
+		self.plotGroups = list()	# (GridVariablePlotter, column index of each plot, scale of each column)
+		self.lastWallTime = None
+		self.plotCapacity = DisplayBuffers.defaultCapacity
+
+		self.replayTimer = QtCore.QTimer()
+		self.replayTimer.setInterval(baseInterface.simulationThreadRate)
+		self.replayTimer.timeout.connect(self.playStep)
+
+		self.mainWidget = QtWidgets.QWidget()
+		self.mainLayout = QtWidgets.QVBoxLayout()
+		self.setCentralWidget(self.mainWidget)
+		self.mainWidget.setLayout(self.mainLayout)
+
+		self.mainSplitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
+		self.mainLayout.addWidget(self.mainSplitter, 10)
+
+		self.vehicleInstance = vehicleDisplay.vehicleDisplay()
+		self.mainSplitter.addWidget(self.vehicleInstance)
+
+		self.outPutTabs = QtWidgets.QTabWidget()
+		self.mainSplitter.addWidget(self.outPutTabs)
+		self.mainSplitter.setStretchFactor(0, 4)
+		self.mainSplitter.setStretchFactor(1, 3)
+
+		self.numericStateGrid = QtWidgets.QGridLayout()
+		self.mainLayout.addLayout(self.numericStateGrid)
+		self.numericStatesDict = dict()
+		for i, name in enumerate(['pn', 'pe', 'pd', 'yaw', 'pitch', 'roll']):
+			newLabel = QtWidgets.QLabel("{}: ".format(name))
+			self.numericStateGrid.addWidget(newLabel, 0, i)
+			self.numericStatesDict[name] = newLabel
+
+		self.scrubSlider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+		self.scrubSlider.setTracking(False)	# valueChanged only when the slider is let go, sliderMoved while dragging
+		self.scrubSlider.sliderMoved.connect(self.scrubMoved)
+		self.scrubSlider.valueChanged.connect(self.seekIndex)
+		self.mainLayout.addWidget(self.scrubSlider)
+
+		self.replayControlsBox = QtWidgets.QHBoxLayout()
+		self.mainLayout.addLayout(self.replayControlsBox, 0)
+
+		self.openButton = QtWidgets.QPushButton("Open")
+		self.refreshButton = QtWidgets.QPushButton("Refresh")
+		self.playButton = QtWidgets.QPushButton("Play")
+		self.pauseButton = QtWidgets.QPushButton("Pause")
+		self.restartButton = QtWidgets.QPushButton("Restart")
+		for button in [self.openButton, self.refreshButton, self.playButton, self.pauseButton, self.restartButton]:
+			self.replayControlsBox.addWidget(button)
+		self.openButton.clicked.connect(self.chooseRecording)
+		self.refreshButton.clicked.connect(self.refreshRecording)
+		self.playButton.clicked.connect(self.PlayReplay)
+		self.pauseButton.clicked.connect(self.PauseReplay)
+		self.restartButton.clicked.connect(self.RestartReplay)
+
+		self.replaySpeedsGroup = QtWidgets.QButtonGroup()
+		for ratio in [20, 8, 4, 2, 1, 1/2, 1/4, 1/8]:
+			newRadio = QtWidgets.QRadioButton("{}x".format(ratio))
+			newRadio.speed = ratio
+			self.replayControlsBox.addWidget(newRadio)
+			self.replaySpeedsGroup.addButton(newRadio)
+			if ratio == 1:
+				newRadio.setChecked(True)
+		self.replaySpeedsGroup.buttonToggled.connect(self.speedChangedResponse)
+
+		self.replayControlsBox.addWidget(QtWidgets.QLabel("Current Time: "))
+		self.currentTimeLabel = QtWidgets.QLabel("-")
+		self.replayControlsBox.addWidget(self.currentTimeLabel)
+		self.fileLabel = QtWidgets.QLabel("No recording open")
+		self.replayControlsBox.addWidget(self.fileLabel)
+		self.replayControlsBox.addStretch()
+
+		self.setControlsEnabled(False)
+		if filename is not None:
+			self.openRecording(filename)
+		return
+
+	def setControlsEnabled(self, playing):
+		"""
+		Enables the controls that make sense with or without a recording open, and playing or not
+
+		:param playing: True while the replay is playing
+		"""
+		haveReplay = self.replay is not None
+		self.playButton.setDisabled(not haveReplay or playing)
+		self.pauseButton.setDisabled(not haveReplay or not playing)
+		for widget in [self.refreshButton, self.restartButton, self.scrubSlider]:
+			widget.setDisabled(not haveReplay)
+		return
+
+	def chooseRecording(self):
+		fileSelect = QtWidgets.QFileDialog(filter=replayFormats)
+		fileSelect.setFileMode(QtWidgets.QFileDialog.ExistingFile)
+		fileSelect.setAcceptMode(QtWidgets.QFileDialog.AcceptOpen)
+		fileSelect.setDirectory(sys.path[0])
+		if fileSelect.exec():
+			self.openRecording(os.path.normpath(fileSelect.selectedFiles()[0]))
+		return
+
+	def openRecording(self, filename):
+		"""
+		Opens a recording and shows its first row, the previous recording is closed
+
+		:param filename: .flog, .csv, .pickle or .npz written by Simulate
+		:return: True if successful, false if not
+		"""
+		self.PauseReplay()
+		try:
+			replay = FlightReplay.FlightReplay(FlightReplay.openLog(filename))
+		except (OSError, ValueError, KeyError) as e:
+			print(e)
+			self.fileLabel.setText("Could not open {}: {}".format(os.path.basename(filename), e))
+			return False
+		self.replay = replay
+		self.replay.setSpeed(self.replaySpeedsGroup.checkedButton().speed)
+		self.fileLabel.setText(os.path.basename(filename))
+		self.buildPlots()
+		self.updateSliderRange()
+		self.setControlsEnabled(False)
+		self.seekIndex(0)
+		return True
+
+	def refreshRecording(self):
+		"""
+		Picks up the rows added to a flight log that is still being written
+		"""
+		self.replay.refresh()
+		self.updateSliderRange()
+		return
+
+	def updateSliderRange(self):
+		self.scrubSlider.blockSignals(True)
+		self.scrubSlider.setRange(0, len(self.replay) - 1)
+		self.scrubSlider.blockSignals(False)
+		return
+
+	def buildPlots(self):
+		"""
+		Replaces the plot tabs with one grid per group of recorded columns (inputs, state, sensors, ...)
+		"""
+		self.outPutTabs.clear()
+		self.plotGroups = list()
+		for groupName, names in FlightReplay.groupColumns(self.replay.log.columnNames, self.replay.timeColumn):
+			titles = [name.split('.', 1)[-1] for name in names]
+			scales = numpy.array([math.degrees(1) if title in angleNames else 1.0 for title in titles])
+			grid = GridVariablePlotter.GridVariablePlotter(int(math.ceil(len(names) / plotColumns)), plotColumns, [[title] for title in titles],
+														   titles=titles, capacity=self.plotCapacity)
+			self.outPutTabs.addTab(grid, groupName)
+			self.plotGroups.append((grid, [self.replay.columnIndex[name] for name in names], scales))
+		return
+
+	def drawRows(self, rows):
+		"""
+		Adds a range of rows to the plots
+
+		:param rows: slice of rows
+		"""
+		if rows.stop <= rows.start:
+			return
+		times = numpy.asarray(self.replay.times[rows])
+		block = numpy.asarray(self.replay.log.rows(rows.start, rows.stop))	# read (and for a csv parsed) once for every tab
+		for grid, indices, scales in self.plotGroups:
+			values = block[:, indices] * scales
+			grid.addNewAllDataBlock(times, [values[:, index:index + 1] for index in range(len(indices))])
+		return
+
+	def showCurrentRow(self):
+		"""
+		Moves the vehicle, the numbers, the time and the slider to the row the replay shows
+		"""
+		curState = self.replay.getState()
+		self.vehicleInstance.updateVehiclePosition(curState)
+		self.updateNumericStateBox(curState)
+		self.currentTimeLabel.setText(str(datetime.timedelta(seconds=self.replay.time)))
+		self.scrubSlider.blockSignals(True)
+		self.scrubSlider.setValue(self.replay.index)
+		self.scrubSlider.blockSignals(False)
+		return
+
+	def updateNumericStateBox(self, newState):
+		for key, label in self.numericStatesDict.items():
+			newVal = float(getattr(newState, key))
+			if key in ['yaw', 'pitch', 'roll']:
+				newVal = math.degrees(newVal)
+			label.setText("{}: {:03.4}".format(key, newVal))
+		return
+
+	def scrubMoved(self, index):
+		"""
+		Follows the slider while it is dragged, moving only the vehicle
+		"""
+		self.replay.seekIndex(index)
+		curState = self.replay.getState()
+		self.vehicleInstance.updateVehiclePosition(curState)
+		self.updateNumericStateBox(curState)
+		self.currentTimeLabel.setText(str(datetime.timedelta(seconds=self.replay.time)))
+		return
+
+	def seekIndex(self, index):
+		"""
+		Moves the replay to a row, starting the trail there and redrawing the plots with the rows up to it
+		"""
+		self.replay.seekIndex(index)
+		for grid, indices, scales in self.plotGroups:
+			grid.clearDataPointsAll()
+		self.drawRows(self.replay.history(self.plotCapacity))
+		self.vehicleInstance.reset(self.replay.getState())
+		self.showCurrentRow()
+		return
+
+	def playStep(self):
+		"""
+		Called by the replay timer, plays the wall clock time since the last call and draws the rows passed
+		"""
+		now = time.perf_counter()
+		rows = self.replay.advance(now - self.lastWallTime)
+		self.lastWallTime = now
+		if rows.stop > rows.start:
+			self.drawRows(rows)
+			self.showCurrentRow()
+		if self.replay.isFinished():
+			self.PauseReplay()
+		return
+
+	def speedChangedResponse(self, checked):
+		if checked.isChecked() and self.replay is not None:
+			self.replay.setSpeed(checked.speed)
+		return
+
+	def PlayReplay(self):
+		"""
+		Plays from the current time, from the start if the replay has finished
+		"""
+		if self.replay.isFinished():
+			self.seekIndex(0)
+		self.lastWallTime = time.perf_counter()
+		self.replayTimer.start()
+		self.setControlsEnabled(True)
+		return
+
+	def PauseReplay(self):
+		self.replayTimer.stop()
+		self.setControlsEnabled(False)
+		return
+
+	def RestartReplay(self):
+		self.seekIndex(0)
+		return
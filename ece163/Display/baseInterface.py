@@ -3,12 +3,14 @@ import PyQt5.QtWidgets as QtWidgets
 import sys
 from . import vehicleDisplay
 from ..Containers import States
+from ..Constants import VehiclePhysicalConstants
+from ..Simulation import SimulationScheduler
 import math
 import traceback
 import os
 import datetime
 
-simulationThreadRate = 20
+simulationThreadRate = 20	# display update interval [ms]
 
 class aboutTab(QtWidgets.QWidget):
 	def __init__(self, parent=None):
@@ -47,13 +49,16 @@ class exceptionTab(QtWidgets.QWidget):
 
 class baseInterface(QtWidgets.QMainWindow):
 	updateVehiclePositionSignal = QtCore.pyqtSignal(list)  # signal for redrawing the vehicle
+	updateInputSlidersSignal = QtCore.pyqtSignal(object)  # signal for moving the input sliders from runUpdate, queued to the gui thread
 
 	def __init__(self, parent = None):
 		"""
 		important elements
 
 		self.stateUpdateDefList contains a list of function pointers that subscribe to state changes
-		runUpdate() overwritten to actually perform one step of the simulation
+		runUpdate() overwritten to actually perform one step of the simulation, called from the scheduler's worker thread, so it
+		must not touch gui elements (emit updateInputSlidersSignal instead)
+		self.scheduler runs runUpdate at a fixed rate (or as fast as it can) while the display timer redraws the latest published state
 		resetSimulationActions() actions taken on simulation reset
 		getvehicleState() overwritten to always return the valid state
 		"""
@@ -62,19 +67,19 @@ class baseInterface(QtWidgets.QMainWindow):
 		# before we set up the gui we need a few data types to store
 		self.simulationPaused = True
 
-		self.curSpeedRate = 1
-		self.newSpeedRate = 1
-		self.threadTick = 0
-		self.curMultiTickRate = 1
-		self.newMultiTickRate = 1
+		self.displayedSnapshot = None
 
 		# we need a set of callbacks for when the state changes and the various gui elements need updating
 		self.stateUpdateDefList = list()
 
-		# after updates these are ones that take no arguments but same idea
+		# after updates these are ones that take no arguments but same idea, reading self.displayedSnapshot (see simulationSnapshot)
 		self.afterUpdateDefList = list()
 
-		# we need to start the thread now, it just runs
+		# physics runs on the scheduler's worker thread, one runUpdate per time step
+		self.scheduler = SimulationScheduler.SimulationScheduler(self.runUpdate, VehiclePhysicalConstants.dT, snapshotFunction=self.simulationSnapshot,
+																 displayRate=1000 / simulationThreadRate)
+
+		# the timer only redraws, with the latest state the scheduler published
 		self.simulationTimedThread = QtCore.QTimer()
 		self.simulationTimedThread.setInterval(simulationThreadRate)
 		self.simulationTimedThread.timeout.connect(self.runSimulation)
@@ -156,19 +161,25 @@ class baseInterface(QtWidgets.QMainWindow):
 		self.simulationControlsBox.addLayout(self.simulationSpeedsBox)
 		self.simulationSpeedsGroup = QtWidgets.QButtonGroup()
 
-		for ratio in [20, 8, 4, 2, 1, 1/2, 1/4, 1/8]:
-			newRatio = 1/(simulationThreadRate/(simulationThreadRate/ratio))
-			newRadio = QtWidgets.QRadioButton("{}x".format(newRatio))
+		for ratio in [20, 8, 4, 2, 1, 1/2, 1/4, 1/8, None]:
+			if ratio is None:
+				newRadio = QtWidgets.QRadioButton("Max")	# as fast as the physics runs
+			else:
+				newRadio = QtWidgets.QRadioButton("{}x".format(1/ratio))
 			newRadio.threadRate = ratio
 			self.simulationSpeedsBox.addWidget(newRadio)
 			self.simulationSpeedsGroup.addButton(newRadio)
-		self.simulationSpeedsGroup.buttons()[-4].setChecked(True)
+			if ratio == 1:
+				newRadio.setChecked(True)
 		self.simulationSpeedsGroup.buttonToggled.connect(self.speedChangedResponse)
 
 		self.currentTime = 0
 		self.simulationControlsBox.addWidget(QtWidgets.QLabel("Current Time: "))
 		self.currentTimeLabel = QtWidgets.QLabel(str(datetime.timedelta(seconds=self.currentTime)))
 		self.simulationControlsBox.addWidget(self.currentTimeLabel)
+		self.simulationControlsBox.addWidget(QtWidgets.QLabel("Real Time Factor: "))
+		self.realTimeFactorLabel = QtWidgets.QLabel("-")
+		self.simulationControlsBox.addWidget(self.realTimeFactorLabel)
 		self.simulationControlsBox.addStretch()
 
 		self.mainLayout.addStretch()
@@ -178,37 +189,51 @@ class baseInterface(QtWidgets.QMainWindow):
 
 	def runSimulation(self):
 		"""
-		internal method called in a thread to handle simulation updates
+		internal method called by the display timer to redraw the latest snapshot the scheduler published. The update
+		callbacks only read the snapshot (and self.currentTime), so they run without the scheduler's lock and never hold up
+		the worker. While the scheduler is stopped it redraws a snapshot of the current state instead, so it can also be
+		called directly after changing the state.
 		"""
-		if self.threadTick % self.curSpeedRate == 0:
-			try:
-				for i in range(self.curMultiTickRate):
-					self.runUpdate()
-					self.runUpdate()  # Only updating the screen at half of the integration rate
-			except Exception as e:
-				self.raiseExceptionToUser(traceback.format_exc())
-				# traceback.print_exc()
-				self.PauseSimulation()
-			self.afterUpdateActions()
-			try:
-				self.currentTime = self.simulateInstance.time
-				self.currentTimeLabel.setText(str(datetime.timedelta(seconds=self.currentTime)))
-			except AttributeError:
-				pass
-			self.curSpeedRate = self.newSpeedRate
-			self.curMultiTickRate = self.newMultiTickRate
-		self.threadTick += 1
+		if self.scheduler.error is not None:
+			self.raiseExceptionToUser(self.scheduler.error)
+			self.PauseSimulation()
+			return
+		if not self.scheduler.isRunning():
+			snapshot = self.simulationSnapshot()
+		else:
+			snapshot = self.scheduler.getLatestSnapshot()
+			if snapshot is None or snapshot is self.displayedSnapshot:	# nothing new since the last redraw
+				return
+		self.displayedSnapshot = snapshot
+		if snapshot['time'] is not None:
+			self.currentTime = snapshot['time']
+		self.afterUpdateActions(snapshot['state'])
+		self.currentTimeLabel.setText(str(datetime.timedelta(seconds=self.currentTime)))
+		if self.scheduler.isRunning():
+			self.realTimeFactorLabel.setText("{:.2f}x".format(self.scheduler.getRealTimeFactor()))
 		return
 
+	def simulationSnapshot(self):
+		"""
+		Everything the update callbacks need from one instant of the simulation, taken by the scheduler between two steps
+		(holding its lock). Overwrite to add what the afterUpdateDefList callbacks read, which then find it in
+		self.displayedSnapshot; anything not copied here would be read while the worker changes it.
+
+		:return: dictionary with 'state' (copy of the vehicle state) and 'time' (simulation time, None without a simulateInstance)
+		"""
+		try:
+			curTime = self.simulateInstance.time
+		except AttributeError:
+			curTime = None
+		return {'state': self.getVehicleState().copy(), 'time': curTime}
+
 	def speedChangedResponse(self, checked):
 		if checked.isChecked():
-			if checked.threadRate >= 1:
-				self.newSpeedRate = checked.threadRate
-				self.newMultiTickRate = 1
+			if checked.threadRate is None:
+				self.scheduler.setMode('MaxSpeed')
 			else:
-				self.newSpeedRate = 1
-				self.newMultiTickRate = int(1/checked.threadRate)
-				print(self.newMultiTickRate)
+				self.scheduler.setMode('RealTime')
+				self.scheduler.setSpeed(1/checked.threadRate)
 		return
 
 
@@ -220,6 +245,7 @@ class baseInterface(QtWidgets.QMainWindow):
 		self.playButton.setDisabled(True)
 		self.pauseButton.setDisabled(False)
 		self.simulationPaused = False
+		self.scheduler.start()
 		self.simulationTimedThread.start()
 		return
 
@@ -232,6 +258,9 @@ class baseInterface(QtWidgets.QMainWindow):
 		self.pauseButton.setDisabled(True)
 		self.simulationPaused = True
 		self.simulationTimedThread.stop()
+		self.scheduler.stop()
+		if self.scheduler.error is None:
+			self.runSimulation()	# show where the worker stopped
 		return
 
 	def ResetSimulation(self):
@@ -242,6 +271,9 @@ class baseInterface(QtWidgets.QMainWindow):
 		self.pauseButton.setDisabled(True)
 		self.simulationPaused = True
 		self.simulationTimedThread.stop()
+		self.scheduler.reset()	# waits for the worker to finish its step
+		self.displayedSnapshot = None
+		self.realTimeFactorLabel.setText("-")
 		self.vehicleInstance.reset()
 		self.resetSimulationActions()
 		# self.updateGuiStateElements()
@@ -256,11 +288,14 @@ class baseInterface(QtWidgets.QMainWindow):
 		"""
 		return
 
-	def afterUpdateActions(self):
+	def afterUpdateActions(self, curState=None):
 		"""
 		Internal method to run all the state updates with gui elements, generally not called directly.
+
+		:param curState: vehicle state to show, the current one from getVehicleState if None
 		"""
-		curState = self.getVehicleState()
+		if curState is None:
+			curState = self.getVehicleState()
 		for updater in self.stateUpdateDefList:
 			updater(curState)
 		for updater in self.afterUpdateDefList:
@@ -1,11 +1,18 @@
 """
 	This module provides a wrapper for the pyqtgraph plotwidget and allowing for a simplified thread safe interface. After
 	initialziation the normal usage only involves invoking :func:`addDataPoint` to add data to a plot.
+
+	Points are kept in a fixed size :class:`.DisplayBuffers.RingBuffer` and the plot is redrawn at most maxFrameRate times a
+	second, with however many points arrived in between, decimated to maxDisplayPoints per line.
 """
+import math
 import PyQt5.QtCore as QtCore
 import PyQt5.QtWidgets as QtWidgets
 import pyqtgraph
 import sys
+from . import DisplayBuffers
+
+defaultFrameRate = 20	# redraws per second at most
 
 
 class variablePlotter(pyqtgraph.PlotWidget):
@@ -14,7 +21,9 @@ class variablePlotter(pyqtgraph.PlotWidget):
 		involves invoking :func:`addDataPoint` to add data to a plot.
 	"""
 	newDataSignal = QtCore.pyqtSignal(list, object)
-	def __init__(self, plotNames, title=None, xLabel=None, yLabel=None, useLegend=True , parent=None):
+	newDataBlockSignal = QtCore.pyqtSignal(object, object)
+	def __init__(self, plotNames, title=None, xLabel=None, yLabel=None, useLegend=True , parent=None, timeWindow=None,
+				 capacity=DisplayBuffers.defaultCapacity, maxDisplayPoints=DisplayBuffers.defaultDisplayPoints, maxFrameRate=defaultFrameRate):
 		"""
 		Creates a new variablePlotter. Only required item is a list containing names for each plot.
 
@@ -23,18 +32,28 @@ class variablePlotter(pyqtgraph.PlotWidget):
 		:param xLabel: Label x-axis if desired, appears on the bottom
 		:param yLabel: Label y-axis if desired, appears on the left
 		:param useLegend: display legend of plots given by plotNames
+		:param timeWindow: length of x shown, the latest points only, None to show every point kept
+		:param capacity: number of points kept per line, the oldest are dropped after that
+		:param maxDisplayPoints: most points drawn per line, more are decimated keeping their minima and maxima
+		:param maxFrameRate: most redraws per second
 		"""
 		super().__init__(parent)
 		self.plotNames = plotNames
 		self.plotHandles = list()
-		self.dataPoints = list()
-		self.timePoints = list()
+		self.dataBuffer = DisplayBuffers.RingBuffer(len(plotNames), capacity)
+		self.timeWindow = timeWindow
+		self.maxDisplayPoints = maxDisplayPoints
 		if useLegend:
 			self.getPlotItem().addLegend()
 		for x, name in enumerate(self.plotNames):
-			self.dataPoints.append(list())
 			self.plotHandles.append(self.getPlotItem().plot(name=name, pen=pyqtgraph.intColor(x)))
 
+		# new points only start this timer, so every point added before it fires is drawn in one redraw
+		self.redrawTimer = QtCore.QTimer()
+		self.redrawTimer.setSingleShot(True)
+		self.redrawTimer.setInterval(int(1000 / maxFrameRate))
+		self.redrawTimer.timeout.connect(self._Redraw)
+
 		if title is not None:
 			self.getPlotItem().setTitle(title)
 		if xLabel is not None:
@@ -43,6 +62,7 @@ class variablePlotter(pyqtgraph.PlotWidget):
 			self.getPlotItem().setLabel('left', yLabel)
 
 		self.newDataSignal.connect(self._ProcessNewPlotData)
+		self.newDataBlockSignal.connect(self._ProcessNewPlotBlock)
 		return
 
 	def addDataPoint(self, newDataPoint, t=None):
@@ -54,27 +74,53 @@ class variablePlotter(pyqtgraph.PlotWidget):
 		"""""
 		self.newDataSignal.emit(newDataPoint, t)
 
+	def addDataPoints(self, times, newDataPoints):
+		"""
+		Adds several points to every line at once via thread safe signal, e.g. a stretch of a recorded flight. Does not
+		update the plot itself.
+
+		:param times: sequence of n x coordinates
+		:param newDataPoints: [n x lines] values, in the order of plotNames
+		"""
+		self.newDataBlockSignal.emit(times, newDataPoints)
+
 	def clearDataPoints(self):
 		"""
 		Clears data for associated lines in plot
 		"""
-		self.timePoints.clear()
-		for dataList, plotHandle in zip(self.dataPoints, self.plotHandles):
-			dataList.clear()
-			plotHandle.setData(self.timePoints, dataList)
+		self.redrawTimer.stop()
+		self.dataBuffer.clear()
+		self._Redraw()
+
+	def setTimeWindow(self, timeWindow):
+		"""
+		Changes the length of x shown
+
+		:param timeWindow: length of x shown, the latest points only, None to show every point kept
+		"""
+		self.timeWindow = timeWindow
+		self._Redraw()
 
 	def _ProcessNewPlotData(self, newDataPoint, t=None):
 		if t is None:
-			try:
-				self.timePoints.append(self.timePoints[-1]+1)
-			except IndexError:
-				self.timePoints.append(0)
-		else:
-			self.timePoints.append(t)
-		for dataPoint, dataList, plotHandle in zip(newDataPoint, self.dataPoints, self.plotHandles):
-			dataList.append(dataPoint)
-			plotHandle.setData(self.timePoints, dataList)
-			# print(dataPoint)
+			lastTime = self.dataBuffer.lastTime()
+			t = 0 if lastTime is None else lastTime + 1
+		newValues = list(newDataPoint[:len(self.plotHandles)])
+		newValues.extend([math.nan] * (len(self.plotHandles) - len(newValues)))	# lines not given a value get a gap
+		self.dataBuffer.append(t, newValues)
+		if not self.redrawTimer.isActive():
+			self.redrawTimer.start()
+
+	def _ProcessNewPlotBlock(self, times, newDataPoints):
+		self.dataBuffer.extend(times, newDataPoints)
+		if not self.redrawTimer.isActive():
+			self.redrawTimer.start()
+
+	def _Redraw(self):
+		times, values = self.dataBuffer.getData(self.timeWindow)
+		x, y = DisplayBuffers.decimate(times, values, self.maxDisplayPoints)
+		for index, plotHandle in enumerate(self.plotHandles):
+			plotHandle.setData(x[:, index], y[:, index], connect='finite')
 
 
 if QtCore.__name__ == "__main__":
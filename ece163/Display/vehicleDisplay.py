@@ -6,8 +6,10 @@ import PyQt5.QtWidgets as QtWidgets
 import pyqtgraph.opengl
 import pyqtgraph
 from ..Modeling import VehicleGeometry
+from . import DisplayBuffers
 import numpy
 from ..Containers import States
+from ..Utilities import Rotations
 import random
 
 defaultZoom = 10
@@ -21,6 +23,7 @@ testLine = [[2, 2, 2], [2, 0, 100], [-2, 0, 100]]
 
 class vehicleDisplay(QtWidgets.QWidget):
 	updateVehiclePositionSignal = QtCore.pyqtSignal(list)
+	updateVehicleBatchSignal = QtCore.pyqtSignal(object, object)
 	def __init__(self, parent=None):
 		"""
 		sets up the full window with the plane along with a row of camera controls
@@ -51,9 +54,10 @@ class vehicleDisplay(QtWidgets.QWidget):
 		# a copy of the vehicle, we assume we will always want a vehicle
 		self.vehicleDrawInstance = VehicleGeometry.VehicleGeometry()
 
-		# we need to grab the vertices for the vehicle each update
-		rawPoints = [[y*metersToPixelRatio for y in x] for x in self.vehicleDrawInstance.getNewPoints(0, 0, 0, 0, 0, 0)]
-		newVertices = numpy.array(rawPoints)
+		# we need to grab the vertices for the vehicle each update, they are written into this array in place
+		newVertices = self.vehicleDrawInstance.getNewPointsArray(0, 0, 0, 0, 0, 0, scale=metersToPixelRatio,
+																 out=numpy.empty((len(self.vehicleDrawInstance.vertices), 3), dtype=numpy.float32))
+		self.vehicleVertices = newVertices
 
 		# faces and colors only need to be done once
 		newFaces = numpy.array(self.vehicleDrawInstance.faces)
@@ -81,7 +85,13 @@ class vehicleDisplay(QtWidgets.QWidget):
 		self.planeTrailLine.setData(color=(1, 0, 0, 1), width=1)
 		self.openGLWindow.addItem(self.planeTrailLine)
 		self.planeTrailLine.mode = 'line_strip'
-		self.planeTrailPoints = list()
+		self.planeTrail = DisplayBuffers.TrailBuffer()	# decimated points of the trail, updated in place
+
+		# a batch of vehicles drawn as one merged mesh, see setVehicleBatch
+		self.batchMeshItem = None
+		self.batchTrails = list()
+		self.batchTrailLines = list()
+		self.updateVehicleBatchSignal.connect(self.drawVehicleBatch)
 
 
 		self.aribtraryLines = list()
@@ -155,21 +165,92 @@ class vehicleDisplay(QtWidgets.QWidget):
 		# print(newPosition)
 		# we simply create a new set of vertices
 
-		rawPoints = self.vehicleDrawInstance.getNewPoints(*newPosition)
-		# print(rawPoints)
-		newVertices = numpy.array([[y * metersToPixelRatio for y in x] for x in rawPoints])
-		# print(newVertices)
+		newVertices = self.vehicleDrawInstance.getNewPointsArray(*newPosition, scale=metersToPixelRatio, out=self.vehicleVertices)
 		self.vehicleMeshData.setVertexes(newVertices)  # update our mesh with them
 		self.openGLVehicle.setMeshData(meshdata=self.vehicleMeshData, smooth=False, computeNormals=False)  # and setMeshData automatically invokes a redraw
 		self.lastPlanePos = pyqtgraph.Vector(newPosition[1], newPosition[0], -newPosition[2])
 		if self.trackPlane:
 			self.openGLWindow.setCameraPosition(pos=self.lastPlanePos)
 		if self.leavePlaneTrail:
-			self.planeTrailPoints.append([newPosition[1], newPosition[0], -newPosition[2]])
-			hmm = numpy.array(self.planeTrailPoints)
-			tempColor = numpy.array([[1., 0., 0., 1]])
-			colors = numpy.tile(tempColor, (hmm.shape[0], 1))
-			self.planeTrailLine.setData(pos=numpy.array(self.planeTrailPoints), color=colors)
+			self.planeTrail.addPoint([newPosition[1], newPosition[0], -newPosition[2]])
+			self.planeTrailLine.setData(pos=self.planeTrail.getPoints(), color=self.planeTrail.getColors())
+		return
+
+	def setVehicleBatch(self, numVehicles, vehicleColors=None, leaveTrails=False):
+		"""
+		Sets up drawing numVehicles more vehicles (a formation, a Monte Carlo batch) from updateVehicleBatch. All of them
+		are copies of the vehicle merged into a single mesh, so each frame is one vertex upload however many there are.
+		Replaces any batch set up before, numVehicles 0 removes it.
+
+		:param numVehicles: number of vehicles in the batch
+		:param vehicleColors: [N x 4] RGBA color of each vehicle, None to draw them all in the vehicle's own colors
+		:param leaveTrails: draw the path of each vehicle as well (one line each)
+		"""
+		self.clearVehicleBatch()
+		if numVehicles == 0:
+			return
+		self.batchVertices = numpy.empty((numVehicles, len(self.vehicleDrawInstance.vertices), 3), dtype=numpy.float32)
+		self.batchVertices[:] = self.vehicleDrawInstance.getVertexArray(metersToPixelRatio)	# every vehicle at the origin until the first update
+		self.batchMeshData = pyqtgraph.opengl.MeshData(vertexes=self.batchVertices.reshape(-1, 3),
+													   faces=self.vehicleDrawInstance.getBatchFaces(numVehicles),
+													   faceColors=self.vehicleDrawInstance.getBatchColors(numVehicles, vehicleColors))
+		self.batchMeshItem = pyqtgraph.opengl.GLMeshItem(meshdata=self.batchMeshData, drawEdges=False, smooth=False, computeNormals=False)
+		self.openGLWindow.addItem(self.batchMeshItem)
+		if leaveTrails:
+			for index in range(numVehicles):
+				color = (1., 0., 0., 1.) if vehicleColors is None else tuple(vehicleColors[index])
+				newTrail = DisplayBuffers.TrailBuffer(color=color)
+				newLine = pyqtgraph.opengl.GLLinePlotItem()
+				newLine.setData(color=color, width=1)
+				newLine.mode = 'line_strip'
+				self.openGLWindow.addItem(newLine)
+				self.batchTrails.append(newTrail)
+				self.batchTrailLines.append(newLine)
+		return
+
+	def clearVehicleBatch(self):
+		"""
+		Removes the batch of vehicles and their trails from the display
+		"""
+		if self.batchMeshItem is not None:
+			self.openGLWindow.removeItem(self.batchMeshItem)
+			self.batchMeshItem = None
+		for line in self.batchTrailLines:
+			self.openGLWindow.removeItem(line)
+		self.batchTrails.clear()
+		self.batchTrailLines.clear()
+		return
+
+	def updateVehicleBatch(self, states, dcms=None):
+		"""
+		Updates the positions of the batch of vehicles set up by setVehicleBatch, straight from structure-of-arrays states
+		(e.g. VehicleBatchModel.state and VehicleBatchModel.R). Safe to call from another thread, the arrays are copied.
+
+		:param states: [N x 12] states with the columns in VehicleBatchModel.stateNames order (pn, pe, pd, u, v, w, yaw, pitch, roll, ...)
+		:param dcms: [N x 3 x 3] DCMs, None to build them from the Euler angles of states
+		"""
+		states = numpy.array(states, dtype=float)
+		dcms = None if dcms is None else numpy.array(dcms, dtype=float)
+		self.updateVehicleBatchSignal.emit(states, dcms)
+		return
+
+	def drawVehicleBatch(self, states, dcms):
+		"""
+		Handles update of the batch of vehicles in the window, NEVER CALLED directly.
+
+		:param states: [N x 12] states
+		:param dcms: [N x 3 x 3] DCMs or None
+		"""
+		if self.batchMeshItem is None or len(states) != len(self.batchVertices):
+			return
+		if dcms is None:
+			dcms = Rotations.euler2DCMArray(states[:, 6], states[:, 7], states[:, 8])
+		self.vehicleDrawInstance.getBatchPointsArray(states[:, 0:3], dcms, scale=metersToPixelRatio, out=self.batchVertices)
+		self.batchMeshData.setVertexes(self.batchVertices.reshape(-1, 3))
+		self.batchMeshItem.setMeshData(meshdata=self.batchMeshData, smooth=False, computeNormals=False)	# one upload for all of them
+		for trail, line, (pn, pe, pd) in zip(self.batchTrails, self.batchTrailLines, states[:, 0:3].tolist()):
+			trail.addPoint([pe, pn, -pd])
+			line.setData(pos=trail.getPoints(), color=trail.getColors())
 		return
 
 	def ZoomIn(self):
@@ -222,7 +303,9 @@ class vehicleDisplay(QtWidgets.QWidget):
 		resets the elements that need to be reset
 		"""
 		self.resetCameraView()
-		self.planeTrailPoints.clear()
+		self.planeTrail.clear()
+		for trail in self.batchTrails:
+			trail.clear()
 		if resetState is not None:
 			self.updateVehiclePosition(resetState)
 		else:
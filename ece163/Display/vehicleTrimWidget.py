@@ -7,6 +7,7 @@ import PyQt5.QtWidgets as QtWidgets
 
 import ece163.Constants.VehiclePhysicalConstants as VehiclePhysicalConstants
 from . import doubleInputWithLabel
+from ..Controls import TrimCache
 from ..Controls import VehicleTrim
 import sys
 import os
@@ -17,6 +18,7 @@ import threading
 
 defaultTrimParameters = [('Airspeed', VehiclePhysicalConstants.InitialSpeed), ('Climb Angle', 0), ('Turn Radius', math.inf)]
 defaultTrimFileName = 'VehicleTrim_Data.pickle'
+defaultTrimCacheFileName = 'VehicleTrim_Cache.json'
 
 
 class vehicleTrimWidget(QtWidgets.QWidget):
@@ -34,7 +36,7 @@ class vehicleTrimWidget(QtWidgets.QWidget):
 		self.guiControls = guiControls
 		self.callBack = callBackOnSuccesfulTrim
 
-		self.trimInstance = VehicleTrim.VehicleTrim()
+		self.trimInstance = VehicleTrim.VehicleTrim(cache=TrimCache.TrimCache(os.path.join(sys.path[0], defaultTrimCacheFileName)))
 
 		try:
 			with open(os.path.join(sys.path[0], defaultTrimFileName), 'rb') as f:
@@ -0,0 +1,265 @@
+import math
+import os
+import numpy
+from ..Constants import VehiclePhysicalConstants as VPC
+from . import VectorizedAerodynamics
+
+# Lookup tables of the blended lift, drag and pitching moment coefficients over the angle of attack, and of the propeller
+# thrust and torque over airspeed and throttle. They are computed once (with VectorizedAerodynamics) on a grid fine enough
+# that linear interpolation stays within the given error of the analytic model, optionally saved to a file so later runs
+# skip the computation, and then looked up by VehicleAerodynamicsModel instead of evaluating the exponentials of the
+# blending function and solving the propeller quadratic every step. Points off the grid use the analytic model.
+
+tableVersion = 1 # Changes whenever the file layout does
+
+constantNames = ['M', 'alpha0', 'CL0', 'CLalpha', 'CDp', 'AR', 'e', 'CM0', 'CMalpha', 'rho', 'D_prop', 'KV', 'V_max', 'R_motor', 'i0',
+                 'C_Q0', 'C_Q1', 'C_Q2', 'C_T0', 'C_T1', 'C_T2'] # Physical constants the tables depend on
+
+coefficientNames = ['CL', 'CD', 'CM'] # Columns of the coefficient table
+
+propellerNames = ['Fx', 'Mx'] # Last axis of the propeller table
+
+
+def tableConstants():
+
+    '''Current values of the constants in constantNames, tables built with others are out of date'''
+
+    return numpy.array([getattr(VPC, name) for name in constantNames], dtype=float) # return constant values
+
+
+class AerodynamicsTables:
+
+    def __init__(self, filename=None, coefficientErrorBound=1e-4, propellerErrorBound=1e-3, alphaStep=math.radians(0.05), VaRange=(0.0, 60.0),
+                 VaStep=0.25, throttleStep=0.005, maxRefinements=8):
+
+        '''Tables over alpha in [-pi, pi] [rad], Va in VaRange [m/s] and throttle in [0, 1].
+        coefficientErrorBound is the largest error allowed in CL, CD and CM, and propellerErrorBound the one in thrust [N] and torque [N-m],
+        both checked against the analytic model halfway between grid points, and at the cell centers, where linear interpolation is furthest off.
+        The steps are halved (up to maxRefinements times) until the tables meet the bounds, ValueError if they never do.
+        filename is an .npz file to load the tables from, if it holds tables of the same grid, bounds and constants, and to save them to
+        otherwise. None keeps them in memory only.'''
+
+        self.filename = filename # File the tables are kept in
+
+        self.coefficientErrorBound = coefficientErrorBound # Error bound of the coefficients
+
+        self.propellerErrorBound = propellerErrorBound # Error bound of the thrust and torque
+
+        self.settings = numpy.array([coefficientErrorBound, propellerErrorBound, alphaStep, VaRange[0], VaRange[1], VaStep, throttleStep, maxRefinements],
+                                    dtype=float) # What the tables were asked for, to check a file against
+
+        self.loaded = False # True if the tables came from the file
+
+        if(filename is not None and os.path.exists(filename)):
+
+            try:
+
+                self.loaded = self.load(filename) # Use the file if it matches
+
+            except (OSError, ValueError, KeyError) as e: # Unreadable file, build the tables and overwrite it
+
+                print(e)
+
+        if(not self.loaded):
+
+            self.build(alphaStep, VaRange, VaStep, throttleStep, maxRefinements) # Compute the tables
+
+            if(filename is not None):
+
+                try:
+
+                    self.save(filename) # Keep them for the next run
+
+                except OSError as e: # Still usable from memory
+
+                    print(e)
+
+        return # return nothing
+
+    def build(self, alphaStep, VaRange, VaStep, throttleStep, maxRefinements):
+
+        '''Computes both tables, refining each grid until it meets its error bound'''
+
+        for refinement in range(maxRefinements + 1): # Coefficient table
+
+            alphaCount = int(math.ceil((2 * math.pi) / alphaStep)) + 1 # Grid points over [-pi, pi]
+
+            alphas = numpy.linspace(-math.pi, math.pi, alphaCount) # Grid
+
+            coefficients = numpy.stack(VectorizedAerodynamics.CalculateCoeff_alpha(alphas), axis=1) # [alphaCount x 3]
+
+            midpoints = (alphas[:-1] + alphas[1:]) / 2 # Furthest from the grid points
+
+            midpointError = numpy.abs(numpy.stack(VectorizedAerodynamics.CalculateCoeff_alpha(midpoints), axis=1) - (coefficients[:-1] + coefficients[1:]) / 2)
+
+            self.coefficientError = float(numpy.max(midpointError)) # Worst error of the table
+
+            if(self.coefficientError <= self.coefficientErrorBound):
+
+                break
+
+            alphaStep = alphaStep / 2 # Too coarse, halve the step
+
+        else:
+
+            raise ValueError("Coefficient table error {} is above the bound {} after {} refinements".format(self.coefficientError, self.coefficientErrorBound, maxRefinements))
+
+        for refinement in range(maxRefinements + 1): # Propeller table
+
+            VaCount = int(math.ceil((VaRange[1] - VaRange[0]) / VaStep)) + 1 # Grid points over the airspeed range
+
+            throttleCount = int(math.ceil(1.0 / throttleStep)) + 1 # Grid points over the throttle range
+
+            airspeeds = numpy.linspace(VaRange[0], VaRange[1], VaCount) # Airspeed grid
+
+            throttles = numpy.linspace(0.0, 1.0, throttleCount) # Throttle grid
+
+            propeller = numpy.stack(VectorizedAerodynamics.CalculatePropForces(airspeeds[:, None], throttles[None, :]), axis=2) # [VaCount x throttleCount x 2]
+
+            halfwayAirspeeds = numpy.linspace(VaRange[0], VaRange[1], 2 * VaCount - 1) # Grid points and the points halfway between them
+
+            halfwayThrottles = numpy.linspace(0.0, 1.0, 2 * throttleCount - 1)
+
+            halfwayValues = numpy.empty((2 * VaCount - 1, 2 * throttleCount - 1, 2)) # Bilinear interpolation of the table at those points
+
+            halfwayValues[::2, ::2] = propeller
+
+            halfwayValues[1::2, ::2] = (propeller[:-1] + propeller[1:]) / 2 # Halfway along airspeed
+
+            halfwayValues[:, 1::2] = (halfwayValues[:, :-1:2] + halfwayValues[:, 2::2]) / 2 # Halfway along throttle, and cell centers
+
+            halfwayError = numpy.abs(numpy.stack(VectorizedAerodynamics.CalculatePropForces(halfwayAirspeeds[:, None], halfwayThrottles[None, :]), axis=2) - halfwayValues)
+
+            self.propellerError = float(numpy.max(halfwayError)) # Worst error of the table
+
+            if(self.propellerError <= self.propellerErrorBound):
+
+                break
+
+            VaStep, throttleStep = VaStep / 2, throttleStep / 2 # Too coarse, halve the steps
+
+        else:
+
+            raise ValueError("Propeller table error {} is above the bound {} after {} refinements".format(self.propellerError, self.propellerErrorBound, maxRefinements))
+
+        self.setTables(alphas, coefficients, airspeeds, throttles, propeller) # Keep the tables
+
+        return # return nothing
+
+    def setTables(self, alphas, coefficients, airspeeds, throttles, propeller):
+
+        '''Keeps the tables as arrays (for saving) and as lists of floats, which index faster for the single values looked up each step'''
+
+        self.alphas, self.coefficients = alphas, coefficients # Coefficient table
+
+        self.airspeeds, self.throttles, self.propeller = airspeeds, throttles, propeller # Propeller table
+
+        self.alphaMin, self.alphaScale, self.alphaCount = float(alphas[0]), (len(alphas) - 1) / float(alphas[-1] - alphas[0]), len(alphas) # Uniform alpha grid
+
+        self.VaMin, self.VaScale, self.VaCount = float(airspeeds[0]), (len(airspeeds) - 1) / float(airspeeds[-1] - airspeeds[0]), len(airspeeds) # Uniform airspeed grid
+
+        self.throttleScale, self.throttleCount = float(len(throttles) - 1), len(throttles) # Uniform throttle grid over [0, 1]
+
+        self.CLtable, self.CDtable, self.CMtable = [coefficients[:, i].tolist() for i in range(3)] # Coefficient columns
+
+        self.thrustTable, self.torqueTable = propeller[:, :, 0].tolist(), propeller[:, :, 1].tolist() # Thrust and torque rows per airspeed
+
+        return # return nothing
+
+    def CalculateCoeff_alpha(self, alpha):
+
+        '''Table version of VehicleAerodynamicsModel.CalculateCoeff_alpha, returns CL, CD, CM at alpha [rad] by linear interpolation'''
+
+        position = (alpha - self.alphaMin) * self.alphaScale # Position on the grid
+
+        if(not (0 <= position <= self.alphaCount - 1)): # Off the grid (or not a number), use the analytic model
+
+            CL, CD, CM = VectorizedAerodynamics.CalculateCoeff_alpha(alpha)
+
+            return float(CL), float(CD), float(CM)
+
+        index = min(int(position), self.alphaCount - 2) # Grid point below alpha (the last interval includes its end)
+
+        fraction = position - index # Distance to the next grid point
+
+        CLtable, CDtable, CMtable = self.CLtable, self.CDtable, self.CMtable # Local lookups
+
+        CL = CLtable[index] + fraction * (CLtable[index + 1] - CLtable[index]) # Interpolated lift
+
+        CD = CDtable[index] + fraction * (CDtable[index + 1] - CDtable[index]) # Interpolated drag
+
+        CM = CMtable[index] + fraction * (CMtable[index + 1] - CMtable[index]) # Interpolated moment
+
+        return CL, CD, CM # return coefficients
+
+    def CalculatePropForces(self, Va, Throttle):
+
+        '''Table version of VehicleAerodynamicsModel.CalculatePropForces, returns the thrust Fx [N] and torque Mx [N-m] at Va [m/s] and
+        Throttle [0-1] by bilinear interpolation'''
+
+        VaPosition = (Va - self.VaMin) * self.VaScale # Position on the airspeed grid
+
+        throttlePosition = Throttle * self.throttleScale # Position on the throttle grid
+
+        if(not (0 <= VaPosition <= self.VaCount - 1 and 0 <= throttlePosition <= self.throttleCount - 1)): # Off the grid, use the analytic model
+
+            Fx, Mx = VectorizedAerodynamics.CalculatePropForces(Va, Throttle)
+
+            return float(Fx), float(Mx)
+
+        VaIndex = min(int(VaPosition), self.VaCount - 2) # Grid points below (the last intervals include their ends)
+
+        throttleIndex = min(int(throttlePosition), self.throttleCount - 2)
+
+        VaFraction = VaPosition - VaIndex # Distances to the next grid points
+
+        throttleFraction = throttlePosition - throttleIndex
+
+        lower, upper = self.thrustTable[VaIndex], self.thrustTable[VaIndex + 1] # Thrust rows around the airspeed
+
+        below = lower[throttleIndex] + throttleFraction * (lower[throttleIndex + 1] - lower[throttleIndex]) # Interpolated along throttle
+
+        above = upper[throttleIndex] + throttleFraction * (upper[throttleIndex + 1] - upper[throttleIndex])
+
+        Fx = below + VaFraction * (above - below) # Interpolated along airspeed
+
+        lower, upper = self.torqueTable[VaIndex], self.torqueTable[VaIndex + 1] # Same for the torque
+
+        below = lower[throttleIndex] + throttleFraction * (lower[throttleIndex + 1] - lower[throttleIndex])
+
+        above = upper[throttleIndex] + throttleFraction * (upper[throttleIndex + 1] - upper[throttleIndex])
+
+        Mx = below + VaFraction * (above - below)
+
+        return Fx, Mx # return thrust and torque
+
+    def save(self, filename):
+
+        '''Writes the tables, the settings they were built with and the constants they depend on to an .npz file'''
+
+        temporaryName = filename + '.tmp.npz' # Write then rename, so a reader never sees half a file
+
+        numpy.savez_compressed(temporaryName, version=tableVersion, settings=self.settings, constants=tableConstants(),
+                               errors=numpy.array([self.coefficientError, self.propellerError]), alphas=self.alphas, coefficients=self.coefficients,
+                               airspeeds=self.airspeeds, throttles=self.throttles, propeller=self.propeller)
+
+        os.replace(temporaryName, filename)
+
+        return # return nothing
+
+    def load(self, filename):
+
+        '''Reads tables written by save, returns False (and keeps nothing) if they were built with other settings or constants'''
+
+        with numpy.load(filename) as contents:
+
+            if(int(contents['version']) != tableVersion or not numpy.array_equal(contents['settings'], self.settings)
+               or not numpy.array_equal(contents['constants'], tableConstants())):
+
+                return False # Out of date
+
+            self.coefficientError, self.propellerError = [float(error) for error in contents['errors']] # Errors the tables were built to
+
+            self.setTables(contents['alphas'], contents['coefficients'], contents['airspeeds'], contents['throttles'], contents['propeller'])
+
+        return True # return loaded
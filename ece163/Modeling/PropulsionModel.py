@@ -0,0 +1,159 @@
+import math
+from ..Constants import VehiclePhysicalConstants as VPC
+
+# Propeller and motor model of VehicleAerodynamicsModel.CalculatePropForces with every term that only depends on the physical
+# constants (the motor constant, the coefficients of the quadratic in the propeller speed, rho D^4 / (4 pi^2) and so on) derived once,
+# and the partial derivatives of the thrust and torque with respect to airspeed and throttle in closed form.
+# See ECE163_PropellerCheatSheet.pdf for the model.
+
+constantNames = ['rho', 'D_prop', 'KV', 'V_max', 'R_motor', 'i0', 'C_Q0', 'C_Q1', 'C_Q2', 'C_T0', 'C_T1', 'C_T2'] # Constants the model depends on
+
+
+class PropulsionModel:
+
+    def __init__(self, constants = VPC):
+
+        '''Derives the constant terms of the propeller model from constants (the VehiclePhysicalConstants module by default).
+        Call refresh after changing any of constantNames to derive them again.'''
+
+        self.constants = constants # Module (or object) holding the physical constants
+
+        self.constantValues = None # Values the terms were derived from
+
+        self.refresh() # Derive the terms
+
+        return # return nothing
+
+    def refresh(self):
+
+        '''Derives the constant terms again if any of constantNames has changed since they were derived, returns True if it did'''
+
+        constants = self.constants # Local handle
+
+        constantValues = tuple([getattr(constants, name) for name in constantNames]) # Current values
+
+        if(constantValues == self.constantValues): # Nothing changed
+
+            return False
+
+        self.constantValues = constantValues # Remember what the terms come from
+
+        KT = 60 / (2 * math.pi * constants.KV) # Motor torque constant, equal to the back EMF constant KE
+
+        self.a = (constants.rho * (constants.D_prop ** 5) * constants.C_Q0) / (4 * (math.pi ** 2)) # Quadratic a
+
+        self.bVa = (constants.rho * (constants.D_prop ** 4) * constants.C_Q1) / (2 * math.pi) # Quadratic b = bVa * Va + b0
+
+        self.b0 = (KT * KT) / constants.R_motor
+
+        self.cVa2 = constants.rho * (constants.D_prop ** 3) * constants.C_Q2 # Quadratic c = cVa2 * Va^2 + cThrottle * Throttle + c0
+
+        self.cThrottle = -1 * KT * constants.V_max / constants.R_motor
+
+        self.c0 = KT * constants.i0
+
+        self.twoA = 2 * self.a # Denominator of the root
+
+        self.fourA = 4 * self.a # Discriminant term
+
+        self.advanceRatio = (2 * math.pi) / constants.D_prop # J = advanceRatio * Va / omega
+
+        self.thrustConstant = (constants.rho * (constants.D_prop ** 4)) / (4 * (math.pi ** 2)) # Thrust = thrustConstant * omega^2 * CT
+
+        self.torqueConstant = -1 * (constants.rho * (constants.D_prop ** 5)) / (4 * (math.pi ** 2)) # Torque = torqueConstant * omega^2 * CQ
+
+        self.CT = (constants.C_T0, constants.C_T1, constants.C_T2) # Thrust coefficient polynomial in J
+
+        self.CQ = (constants.C_Q0, constants.C_Q1, constants.C_Q2) # Torque coefficient polynomial in J
+
+        return True # return derived
+
+    def CalculatePropSpeed(self, Va, Throttle):
+
+        '''Propeller speed omega [rad/s], the positive root of the motor and propeller torque balance, 100 where it would be imaginary.
+        Returns omega and the square root of the discriminant (0 where imaginary).'''
+
+        b = self.bVa * Va + self.b0 # Quadratic b
+
+        c = self.cVa2 * Va * Va + self.cThrottle * Throttle + self.c0 # Quadratic c
+
+        discriminant = (b * b) - (self.fourA * c) # Discriminant of the quadratic
+
+        if(discriminant <= 0): # Imaginary root, hold the propeller speed at 100
+
+            return 100.0, 0.0
+
+        root = math.sqrt(discriminant) # Square root of the discriminant
+
+        return (root - b) / self.twoA, root # return propeller speed
+
+    def CalculatePropForces(self, Va, Throttle):
+
+        '''Propeller thrust Fx [N] and torque Mx [N-m] at airspeed Va [m/s] and Throttle [0-1], as VehicleAerodynamicsModel.CalculatePropForces'''
+
+        omega, root = self.CalculatePropSpeed(Va, Throttle) # Propeller speed
+
+        J = self.advanceRatio * Va / omega # Advance ratio
+
+        CT = self.CT[0] + (self.CT[1] + self.CT[2] * J) * J # Thrust coefficient
+
+        CQ = self.CQ[0] + (self.CQ[1] + self.CQ[2] * J) * J # Torque coefficient
+
+        omegaSquared = omega * omega # Shared by thrust and torque
+
+        return self.thrustConstant * omegaSquared * CT, self.torqueConstant * omegaSquared * CQ # return thrust and torque
+
+    def CalculatePropDerivatives(self, Va, Throttle):
+
+        '''Partial derivatives of the propeller thrust and torque with respect to airspeed and throttle, through the propeller speed and
+        the advance ratio. Where the propeller speed is held at 100 only the advance ratio depends on the airspeed.
+        Returns ((dThrust/dVa, dTorque/dVa), (dThrust/dThrottle, dTorque/dThrottle))'''
+
+        omega, root = self.CalculatePropSpeed(Va, Throttle) # Propeller speed
+
+        b = self.bVa * Va + self.b0 # Quadratic b
+
+        if(root == 0): # Propeller speed held constant
+
+            dOmegadVa, dOmegadThrottle = 0.0, 0.0
+
+        else: # d/dx of (-b + root) / 2a with root = sqrt(b^2 - 4ac)
+
+            dOmegadVa = (-1 * self.bVa + (b * self.bVa - self.fourA * self.cVa2 * Va) / root) / self.twoA
+
+            dOmegadThrottle = -1 * self.cThrottle / root
+
+        J = self.advanceRatio * Va / omega # Advance ratio
+
+        dJdVa = self.advanceRatio / omega - J * dOmegadVa / omega # Advance ratio partials
+
+        dJdThrottle = -1 * J * dOmegadThrottle / omega
+
+        CT = self.CT[0] + (self.CT[1] + self.CT[2] * J) * J # Coefficients and their slopes in J
+
+        CQ = self.CQ[0] + (self.CQ[1] + self.CQ[2] * J) * J
+
+        dCT = self.CT[1] + 2 * self.CT[2] * J
+
+        dCQ = self.CQ[1] + 2 * self.CQ[2] * J
+
+        derivatives = list() # With respect to airspeed, then throttle
+
+        for dOmega, dJ in ((dOmegadVa, dJdVa), (dOmegadThrottle, dJdThrottle)): # Product rule on constant * omega^2 * C(J)
+
+            derivatives.append((self.thrustConstant * (2 * omega * CT * dOmega + omega * omega * dCT * dJ),
+                                self.torqueConstant * (2 * omega * CQ * dOmega + omega * omega * dCQ * dJ)))
+
+        return derivatives[0], derivatives[1] # return partials
+
+    def dThrust_dVa(self, Va, Throttle):
+
+        '''Partial derivative of the propeller thrust with respect to airspeed [N / (m/s)]'''
+
+        return self.CalculatePropDerivatives(Va, Throttle)[0][0] # return dThrust/dVa
+
+    def dThrust_dThrottle(self, Va, Throttle):
+
+        '''Partial derivative of the propeller thrust with respect to throttle [N]'''
+
+        return self.CalculatePropDerivatives(Va, Throttle)[1][0] # return dThrust/dThrottle
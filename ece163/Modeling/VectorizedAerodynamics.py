@@ -0,0 +1,94 @@
+import math
+import numpy
+from ..Constants import VehiclePhysicalConstants as VPC
+
+# Array versions of the coefficient and propeller functions of VehicleAerodynamicsModel. Every argument can be a scalar or a
+# numpy array (of any shape, broadcast against each other), so that a batch of vehicles, a trim sweep or an envelope plot is
+# evaluated in one call instead of a Python loop over CalculateCoeff_alpha and CalculatePropForces.
+
+
+def CalculateCoeff_alpha(alpha, sinAlpha=None, cosAlpha=None):
+
+    '''Vectorized VehicleAerodynamicsModel.CalculateCoeff_alpha, the blended lift and drag coefficients and the pitching moment
+    coefficient over an array of angles of attack [rad]. sinAlpha and cosAlpha can be given if the caller already has them,
+    otherwise they are computed here (once each). Returns the arrays CL, CD, CM'''
+
+    alpha = numpy.asarray(alpha, dtype=float) # Angles of attack as an array
+
+    if(sinAlpha is None): # Trig terms of alpha shared by the separated lift and drag
+
+        sinAlpha = numpy.sin(alpha) # sin alpha
+
+    if(cosAlpha is None):
+
+        cosAlpha = numpy.cos(alpha) # cos alpha
+
+    expMinus = numpy.exp(-1 * VPC.M * (alpha - VPC.alpha0)) # First exponential of the blending function
+
+    expPlus = numpy.exp(VPC.M * (alpha + VPC.alpha0)) # Second exponential of the blending function
+
+    sigma = (1 + expMinus + expPlus) / ((1 + expMinus) * (1 + expPlus)) # Blending function
+
+    CLattached = VPC.CL0 + (VPC.CLalpha * alpha) # Attached lift
+
+    CLseparated = 2 * sinAlpha * cosAlpha # Separated lift
+
+    CDattached = VPC.CDp + (CLattached * CLattached) / (math.pi * VPC.AR * VPC.e) # Attached drag
+
+    CDseparated = 2 * (sinAlpha ** 2) # Separated drag
+
+    CL = ((1 - sigma) * CLattached) + (sigma * CLseparated) # Blended lift
+
+    CD = ((1 - sigma) * CDattached) + (sigma * CDseparated) # Blended drag
+
+    CM = VPC.CM0 + (VPC.CMalpha * alpha) # Pitching moment
+
+    return CL, CD, CM # return coefficients
+
+
+def CalculatePropSpeed(Va, Throttle):
+
+    '''Vectorized propeller speed omega [rad/s] of VehicleAerodynamicsModel.CalculatePropForces, the positive root of the motor and
+    propeller torque balance over arrays of airspeed [m/s] and throttle [0-1], 100 where the root would be imaginary'''
+
+    Va = numpy.asarray(Va, dtype=float) # Airspeeds as an array
+
+    Throttle = numpy.asarray(Throttle, dtype=float) # Throttles as an array
+
+    KT = KE = 60 / (2 * math.pi * VPC.KV) # Motor constants
+
+    Vin = VPC.V_max * Throttle # Motor input voltage
+
+    a = (VPC.rho * (VPC.D_prop ** 5) * VPC.C_Q0) / (4 * (math.pi ** 2)) # Quadratic a
+
+    b = ((VPC.rho * (VPC.D_prop ** 4) * Va * VPC.C_Q1) / (2 * math.pi)) + ((KT * KE) / (VPC.R_motor)) # Quadratic b
+
+    c = (VPC.rho * (VPC.D_prop ** 3) * (Va ** 2) * VPC.C_Q2) - (KT * (Vin / VPC.R_motor)) + (KT * VPC.i0) # Quadratic c
+
+    discriminant = (b ** 2) - (4 * a * c) # Discriminant of the quadratic
+
+    return numpy.where(discriminant > 0, (-1 * b + numpy.sqrt(numpy.abs(discriminant))) / (2 * a), 100.0) # return propeller speed
+
+
+def CalculatePropForces(Va, Throttle):
+
+    '''Vectorized VehicleAerodynamicsModel.CalculatePropForces over arrays of airspeed [m/s] and throttle [0-1], returns the arrays
+    Fx, Mx of the propeller thrust [N] and torque [N-m]'''
+
+    Va = numpy.asarray(Va, dtype=float) # Airspeeds as an array
+
+    omega = CalculatePropSpeed(Va, Throttle) # Propeller speed
+
+    J = (2 * math.pi * Va) / (omega * VPC.D_prop) # Advance ratio
+
+    CT = VPC.C_T0 + (VPC.C_T1 * J) + (VPC.C_T2 * (J ** 2)) # Thrust coefficient
+
+    CQ = VPC.C_Q0 + (VPC.C_Q1 * J) + (VPC.C_Q2 * (J ** 2)) # Torque coefficient
+
+    omegaSquared = omega ** 2 # Shared by thrust and torque
+
+    Fx = (VPC.rho * omegaSquared * (VPC.D_prop ** 4) * CT) / (4 * (math.pi ** 2)) # Propeller thrust
+
+    Mx = (-1) * ((VPC.rho * omegaSquared * (VPC.D_prop ** 5) * CQ) / (4 * (math.pi ** 2))) # Propeller torque
+
+    return Fx, Mx # return thrust and torque
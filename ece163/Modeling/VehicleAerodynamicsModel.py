@@ -3,6 +3,7 @@ from ..Containers import States
 from ..Containers import Inputs
 from ..Modeling import VehicleDynamicsModel as VDM
 from ..Modeling import WindModel as WM
+from ..Modeling import PropulsionModel
 from ..Utilities import MatrixMath as mm
 from ..Utilities import Rotations
 from ..Constants import VehiclePhysicalConstants as VPC
@@ -10,11 +11,21 @@ from ..Constants import VehiclePhysicalConstants as VPC
 
 class VehicleAerodynamicsModel:
 
-    def __init__(self, initialSpeed = VPC.InitialSpeed, initialHeight = VPC.InitialDownPosition):
+    def __init__(self, initialSpeed = VPC.InitialSpeed, initialHeight = VPC.InitialDownPosition, rng = None, dT = VPC.dT, integrator = 'ForwardEuler', attitude = 'DCM'):
 
-        '''Initialization of the internal classes which are used to track the vehicle aerodynamics and dynamics.'''
+        '''Initialization of the internal classes which are used to track the vehicle aerodynamics and dynamics.
+        rng is an optional random.Random instance handed to the wind model (defaults to the global random module).
+        dT, integrator and attitude are handed to the vehicle dynamics model (see VehicleDynamicsModel.setIntegrator and setAttitude).'''
 
-        self.VDynamics = VDM.VehicleDynamicsModel() # Assign self all the parameters of the vehicle state
+        self.rng = rng # Keep the random number generator so reset can hand it to the new wind model
+
+        self.dT = dT # Keep the time step for reset
+
+        self.integrator = integrator # Keep the integrator for reset
+
+        self.attitude = attitude # Keep the attitude representation for reset
+
+        self.VDynamics = VDM.VehicleDynamicsModel(dT, integrator, attitude) # Assign self all the parameters of the vehicle state
 
         self.VDynamics.state.u = initialSpeed # Velocity in x-dir equals the inital speed this assumes the plane is flying straight and level
 
@@ -23,7 +34,13 @@ class VehicleAerodynamicsModel:
        
     # New Intializations 4 Wind Model (Don't Want Wind? comment out):
 
-        self.WindModel = WM.WindModel() # Initialize Wind Model Params
+        self.WindModel = WM.WindModel(rng = rng) # Initialize Wind Model Params
+
+        self.profiler = None # StageProfiler timing the force and integration stages, None unless profiling
+
+        self.aeroTables = None # AerodynamicsTables looked up instead of the analytic coefficients and propeller, None for analytic
+
+        self.propulsionModel = PropulsionModel.PropulsionModel() # Propeller model with its constant terms derived once
 
         return # Return nothing
     
@@ -31,6 +48,10 @@ class VehicleAerodynamicsModel:
     
     def CalculateCoeff_alpha(self, alpha):
 
+        if(self.aeroTables is not None): # Table driven aerodynamics
+
+            return self.aeroTables.CalculateCoeff_alpha(alpha) # Interpolated CL, CD, CM
+
         # CL & CD Blending Equation From Lecture
 
         blender_num = 1 + math.exp(-1 * VPC.M * (alpha - VPC.alpha0)) + math.exp(VPC.M * (alpha + VPC.alpha0)) # Numerator of the blending function
@@ -75,52 +96,12 @@ class VehicleAerodynamicsModel:
         ''' Function to calculate the propeller forces and torques on the aircraft. 
         Uses the fancy propeller model that parameterizes the torque and thrust coefficients of the propeller using the advance ratio. 
         See ECE163_PropellerCheatSheet.pdf for details. Note: if the propo speed Omega is imaginary, then set it to 100.0 '''
-    
-
-    # We need omega for poth the propellor force and the torque so we should first find that
-
-        # Need KT and KV to find omega via the quadratic formula specified in the prop cheat sheet
-
-        KT = KE = 60 / (2 *  math.pi * VPC.KV) # KT equals the equation directly below (6) in the Prop cheat sheet
-
-        # Need Vin as well Vin = Vmax * throttle value according to blurb in the prop cheat sheet
-
-        Vin = VPC.V_max * Throttle
 
-        # Assemble the quadratic equation values a, b, c
+        if(self.aeroTables is not None): # Table driven aerodynamics
 
-        a = (VPC.rho * (VPC.D_prop ** 5) * VPC.C_Q0) / (4 * (math.pi ** 2)) # Given a
-
-        b = ((VPC.rho * (VPC.D_prop ** 4) * Va * VPC.C_Q1) / (2 * math.pi)) + ((KT * KE) / (VPC.R_motor)) # Given b
-
-        c = (VPC.rho * (VPC.D_prop ** 3) * (Va ** 2) * VPC.C_Q2) - (KT * ((Vin) / VPC.R_motor)) + (KT * VPC.i0) # Given c
-
-        # Check for Imaginary omega
-
-        if ((b ** 2) < (4 * a * c) or (b ** 2) == (4 * a * c)): # For the quadratic formula if b^2 < 4ac then omega must be an imaginary num that is omega = (- b +/- j / 2a )
-
-            omega = 100 # If imaginary make omega 100
-
-        else:
-
-            omega = ((-1 * b) + math.sqrt((b ** 2) - (4 * a * c))) / (2 * a) # Otherwise calculate omega using the quadratic formula normally
-
-        # Get J to find CT & CQ
-
-        J = (2 * math.pi * Va) / (omega * VPC.D_prop)
-
-        # Get CQ & CT for final calculation
-
-        CT = VPC.C_T0 + (VPC.C_T1 * J) + (VPC.C_T2 * (J ** 2)) # Equation (3)
-
-        CQ = VPC.C_Q0 + (VPC.C_Q1 * J) + (VPC.C_Q2 * (J ** 2)) # Equation (4)
-
-        
-        Fx_propel = (VPC.rho * (omega ** 2) * (VPC.D_prop ** 4) * CT) / (4 * (math.pi ** 2)) # Equation (1) Force of Prop
+            return self.aeroTables.CalculatePropForces(Va, Throttle) # Interpolated thrust and torque
 
-        Mx_propel = (-1) * ((VPC.rho * (omega ** 2) * (VPC.D_prop ** 5) * CQ) / (4 * (math.pi ** 2))) # Equation (2) Moment of prop
-
-        return Fx_propel, Mx_propel # Return Prop Force and Moment
+        return self.propulsionModel.CalculatePropForces(Va, Throttle) # Thrust and torque from the propulsion model, which holds the constant terms
 
 
 
@@ -154,7 +135,7 @@ class VehicleAerodynamicsModel:
 
         # Basically Just Copy what was in init since were resetting
 
-        self.VDynamics = VDM.VehicleDynamicsModel() # Reset to vanilla vehicle dynamics model
+        self.VDynamics = VDM.VehicleDynamicsModel(self.dT, self.integrator, self.attitude) # Reset to vanilla vehicle dynamics model
 
         self.VDynamics.state.u = VPC.InitialSpeed # Reset intial Speed to default
 
@@ -163,7 +144,9 @@ class VehicleAerodynamicsModel:
 
         # Wind Model Reset
 
-        self.WindModel = WM.WindModel() # Reset Wind Model conditions
+        self.WindModel = WM.WindModel(rng = self.rng) # Reset Wind Model conditions
+
+        self.propulsionModel.refresh() # Derive the propeller terms again if the constants changed
 
         return # return nothing
         
@@ -301,15 +284,34 @@ class VehicleAerodynamicsModel:
         '''Function that uses the current state (internal), wind (internal), and controls (inputs) to calculate the forces, and then do the integration of the full 6-DOF non-linear equations of motion.
           Wraps the VehicleDynamicsModel class as well as the windState internally. The Wind and the vehicleState are maintained internally.'''
         
+        profiler = self.profiler # Time the aeroForces and integration stages when profiling
+
+        if(profiler is not None):
+
+            startTime = profiler.start() # Start of the aeroForces stage
+
         state = VehicleAerodynamicsModel.getVehicleState(self) # Get present vehicle state
 
         wind = VehicleAerodynamicsModel.getWindModel(self).wind # Get Wind
 
         updated_forces = VehicleAerodynamicsModel.updateForces(self, state, controls, wind) # Get current forces on plane
 
-        self.VDynamics.Update(updated_forces) # upadate the forces on our model
+        if(profiler is not None):
+
+            startTime = profiler.stop('aeroForces', startTime) # End of the aeroForces stage, start of the integration
+
+        if self.VDynamics.integrator == 'ForwardEuler': # Forces are only needed at the start of the step
+
+            self.VDynamics.Update(updated_forces) # upadate the forces on our model
+
+        else: # Higher order integrators re-evaluate the forces at their intermediate states, holding controls and wind
+
+            self.VDynamics.Update(updated_forces, lambda stageState: VehicleAerodynamicsModel.updateForces(self, stageState, controls, wind)) # update with forces at every stage
+
+        if(profiler is not None):
+
+            profiler.stop('integration', startTime) # End of the integration stage
 
-        
 
         return # return nothing
     
@@ -408,6 +410,36 @@ class VehicleAerodynamicsModel:
 
         return # return nothing
     
+    def setProfiler(self, profiler):
+
+        '''Sets the StageProfiler that times the aeroForces and integration stages of Update, None stops profiling.
+        The wind handling that runs (reading the wind and adding it to the airspeed) is part of aeroForces.'''
+
+        self.profiler = profiler # Keep the profiler
+
+        return # return nothing
+    
+    def setAerodynamicsTables(self, aeroTables):
+
+        '''Sets the AerodynamicsTables that CalculateCoeff_alpha and CalculatePropForces interpolate instead of evaluating the analytic model.
+        None goes back to the analytic model.'''
+
+        self.aeroTables = aeroTables # Keep the tables, reset keeps them too
+
+        return # return nothing
+
+    def getPropulsionModel(self):
+
+        '''Wrapper function to return the PropulsionModel, call its refresh after changing the propeller or motor constants'''
+
+        return self.propulsionModel # Return propulsion model
+
+    def getAerodynamicsTables(self):
+
+        '''Wrapper function to return the AerodynamicsTables in use, None if analytic'''
+
+        return self.aeroTables # Return current tables
+    
     def CalculateAirspeed(self,state, wind):
 
 
@@ -0,0 +1,553 @@
+import math
+import numpy
+from ..Containers import States
+from ..Containers import Inputs
+from ..Constants import VehiclePhysicalConstants as VPC
+from ..Constants import VehicleSensorConstants as VSC
+from . import VectorizedAerodynamics
+
+# Batched (structure-of-arrays) version of the VehicleAerodynamicsModel + VehicleDynamicsModel + WindModel pipeline.
+# Every quantity that is a scalar attribute in the single vehicle classes is a numpy array with one row per vehicle here,
+# so that N aircraft are advanced with one vectorized call per time step instead of N Python object graphs.
+
+stateNames = ['pn', 'pe', 'pd', 'u', 'v', 'w', 'yaw', 'pitch', 'roll', 'p', 'q', 'r'] # Column order of the state arrays
+
+controlNames = ['Throttle', 'Aileron', 'Elevator', 'Rudder'] # Column order of the control arrays
+
+forcesMomentsNames = ['Fx', 'Fy', 'Fz', 'Mx', 'My', 'Mz'] # Column order of the forces and moments arrays
+
+windNames = ['Wn', 'We', 'Wd', 'Wu', 'Wv', 'Ww'] # Column order of the wind arrays
+
+
+class VehicleBatchModel:
+
+    def __init__(self, numVehicles=1, dT=VPC.dT, initialSpeed=VPC.InitialSpeed, initialHeight=VPC.InitialDownPosition, drydenParameters=VPC.DrydenNoWind, windVa=25.0, updateWind=True, useSensors=False, seed=None):
+
+        '''Initializes the state, wind and sensor arrays for numVehicles aircraft that are stepped together. Each vehicle starts exactly as
+        VehicleAerodynamicsModel does (flying straight and level at initialSpeed and initialHeight), all vehicles share the same Dryden
+        gust parameters, and randomness comes from a numpy Generator seeded with seed so that a batch is reproducible.
+        If updateWind is True the Dryden gust filters are advanced every step, if useSensors is True the gyro and GPS Gauss-Markov
+        states and noisy gyro/GPS readings are advanced every step as well.'''
+
+        self.numVehicles = numVehicles # Number of aircraft in the batch
+
+        self.dT = dT # Time step for all of the vehicles
+
+        self.initialSpeed = initialSpeed # Keep initial speed for reset
+
+        self.initialHeight = initialHeight # Keep initial height for reset
+
+        self.windVa = windVa # Airspeed used to discretize the Dryden gust filters
+
+        self.updateWind = updateWind # Advance the gust filters every step
+
+        self.useSensors = useSensors # Advance the sensor noise states every step
+
+        self.rng = numpy.random.default_rng(seed) # Random number generator for gusts and sensor noise
+
+        self.drydenParameters = drydenParameters # Dryden gust parameters shared by all vehicles
+
+        self.CreateDrydenTransferFns(dT, windVa, drydenParameters) # Create the discrete gust filters
+
+        self.gpsTickUpdate = round((1 / VSC.GPS_rate) / dT) # Number of dT's that fit in a GPS update period
+
+        self.reset() # Create all of the per vehicle arrays
+
+        return # Return nothing
+
+    def reset(self):
+
+        '''Resets every vehicle, wind and sensor state to the initial conditions (does not change the Dryden parameters or the random generator)'''
+
+        N = self.numVehicles # Number of vehicles
+
+        self.state = numpy.zeros((N, 12)) # State of each vehicle, columns in stateNames order
+
+        self.state[:, 3] = self.initialSpeed # u is the initial speed
+
+        self.state[:, 2] = self.initialHeight # pd is the initial height
+
+        self.R = numpy.tile(numpy.eye(3), (N, 1, 1)) # DCM of each vehicle (inertial to body)
+
+        self.dot = numpy.zeros((N, 12)) # Time derivative of the state
+
+        self.Rdot = numpy.zeros((N, 3, 3)) # Time derivative of the DCM
+
+        self.Va = numpy.zeros(N) # Airspeed, zero until the first force update just like vehicleState
+
+        self.alpha = numpy.zeros(N) # Angle of attack
+
+        self.beta = numpy.zeros(N) # Sideslip angle
+
+        self.chi = numpy.zeros(N) # Course angle
+
+        self.controls = numpy.zeros((N, 4)) # Last applied controls, columns in controlNames order
+
+        self.forcesMoments = numpy.zeros((N, 6)) # Last computed forces and moments
+
+        self.wind = numpy.zeros((N, 6)) # Steady wind (NED) and gusts (wind frame), columns in windNames order
+
+        self.x_u = numpy.zeros((N, 1)) # Dryden filter state for u
+
+        self.x_v = numpy.zeros((N, 2)) # Dryden filter state for v
+
+        self.x_w = numpy.zeros((N, 2)) # Dryden filter state for w
+
+        self.gyroBias = self.rng.uniform(-1.0, 1.0, (N, 3)) * VSC.gyro_bias # Turn on biases of the gyros
+
+        self.gyroGM = numpy.zeros((N, 3)) # Gyro Gauss-Markov bias drift
+
+        self.gpsGM = numpy.zeros((N, 3)) # GPS Gauss-Markov drift in north, east and altitude
+
+        self.sensorsGyro = numpy.zeros((N, 3)) # Noisy gyro readings
+
+        self.sensorsGPS = numpy.zeros((N, 3)) # Noisy GPS north, east and altitude readings
+
+        self.updateTicks = 0 # Tick counter used to decide when the GPS updates
+
+        return # return nothing
+
+    def CreateDrydenTransferFns(self, dT, Va, drydenParameters):
+
+        '''Creates the discrete Dryden gust filters exactly as WindModel.CreateDrydenTransferFns does, stored as numpy arrays shared by every vehicle'''
+
+        if(Va <= 0): # Gust models are undefined for zero or negative airspeed
+
+            raise ArithmeticError("Va is Undefined!!! Va must be neither negative nor Zero")
+
+        if(drydenParameters == VPC.DrydenNoWind): # No wind means identity filters with no input
+
+            self.Phi_u = numpy.array([[1.0]])
+
+            self.Gamma_u = numpy.array([[0.0]])
+
+            self.H_u = numpy.array([[1.0]])
+
+            self.Phi_v = numpy.eye(2)
+
+            self.Gamma_v = numpy.zeros((2, 1))
+
+            self.H_v = numpy.array([[1.0, 1.0]])
+
+            self.Phi_w = numpy.eye(2)
+
+            self.Gamma_w = numpy.zeros((2, 1))
+
+            self.H_w = numpy.array([[1.0, 1.0]])
+
+            return # return nothing
+
+        Lu = drydenParameters.Lu # Spatial frequency forward
+
+        self.Phi_u = numpy.array([[math.exp(-1 * (Va / Lu) * dT)]]) # Phi u from dryden handout
+
+        self.Gamma_u = numpy.array([[(Lu / Va) * (1 - (math.exp(-1 * (Va / Lu) * dT)))]]) # Gamma u from dryden handout
+
+        self.H_u = numpy.array([[drydenParameters.sigmau * math.sqrt((2 * Va) / (math.pi * Lu))]]) # H_u from dryden handout
+
+        self.Phi_v, self.Gamma_v, self.H_v = self._secondOrderGustFilter(dT, Va, drydenParameters.Lv, drydenParameters.sigmav) # v filter
+
+        self.Phi_w, self.Gamma_w, self.H_w = self._secondOrderGustFilter(dT, Va, drydenParameters.Lw, drydenParameters.sigmaw) # w filter
+
+        return # return nothing
+
+    def _secondOrderGustFilter(self, dT, Va, L, sigma):
+
+        '''Discrete second order Dryden filter (used for both v and w) from the Dryden handout'''
+
+        expTerm = math.exp(-1 * (Va / L) * dT) # exp constant term
+
+        sigmaTerm = sigma * math.sqrt((3 * Va) / (math.pi * L)) # sigma constant term
+
+        Phi = expTerm * numpy.array([[1 - ((Va / L) * dT), -1 * ((Va / L) ** 2) * dT], [dT, 1 + ((Va / L) * dT)]]) # Phi from handout
+
+        Gamma = expTerm * numpy.array([[dT], [(((L / Va) ** 2) * (math.exp((Va / L) * dT) - 1)) - ((L / Va) * dT)]]) # Gamma from handout
+
+        H = sigmaTerm * numpy.array([[1, Va / (math.sqrt(3) * L)]]) # H from handout
+
+        return Phi, Gamma, H # return the discrete filter
+
+    def setWindModelParameters(self, Wn=0.0, We=0.0, Wd=0.0, drydenParameters=VPC.DrydenNoWind):
+
+        '''Sets the steady wind (scalars apply to all vehicles, arrays of length N set each vehicle) and the Dryden gust parameters'''
+
+        self.wind[:, 0] = Wn # Steady north wind
+
+        self.wind[:, 1] = We # Steady east wind
+
+        self.wind[:, 2] = Wd # Steady down wind
+
+        self.drydenParameters = drydenParameters # New gust parameters
+
+        self.CreateDrydenTransferFns(self.dT, self.windVa, drydenParameters) # Update the gust filters
+
+        return # return nothing
+
+    def setVehicleState(self, index, state):
+
+        '''Copies a single vehicleState into row index of the batch'''
+
+        self.state[index] = [getattr(state, name) for name in stateNames] # Copy the 12 states
+
+        self.R[index] = state.R # Copy the DCM
+
+        self.Va[index] = state.Va # Copy airspeed
+
+        self.alpha[index] = state.alpha # Copy angle of attack
+
+        self.beta[index] = state.beta # Copy sideslip
+
+        self.chi[index] = state.chi # Copy course
+
+        return # return nothing
+
+    def getVehicleState(self, index):
+
+        '''Returns row index of the batch as a vehicleState (Va, alpha, beta and chi as carried by the dynamics, like VehicleDynamicsModel)'''
+
+        pn, pe, pd, u, v, w, yaw, pitch, roll, p, q, r = self.state[index].tolist() # Unpack the row
+
+        state = States.vehicleState(pn, pe, pd, u, v, w, yaw, pitch, roll, p, q, r) # Build the state
+
+        state.R = self.R[index].tolist() # Use the integrated DCM rather than the one rebuilt from the Euler angles
+
+        state.Va = float(self.Va[index]) # Copy airspeed
+
+        state.alpha = float(self.alpha[index]) # Copy angle of attack
+
+        state.beta = float(self.beta[index]) # Copy sideslip
+
+        state.chi = float(self.chi[index]) # Copy course
+
+        return state # return the state
+
+    def controlsToArray(self, controls):
+
+        '''Converts controls to an [N x 4] array. Accepts a single controlInputs (applied to every vehicle), a list of controlInputs, or an array'''
+
+        if isinstance(controls, Inputs.controlInputs): # Same controls for every vehicle
+
+            return numpy.tile([controls.Throttle, controls.Aileron, controls.Elevator, controls.Rudder], (self.numVehicles, 1))
+
+        if len(controls) > 0 and isinstance(controls[0], Inputs.controlInputs): # One controlInputs per vehicle
+
+            return numpy.array([[c.Throttle, c.Aileron, c.Elevator, c.Rudder] for c in controls])
+
+        return numpy.broadcast_to(numpy.asarray(controls, dtype=float), (self.numVehicles, 4)) # Already an array
+
+    def updateWindGusts(self, uu=None, uv=None, uw=None):
+
+        '''Advances the Dryden gust filters of every vehicle using white noise from the generator (or the given arrays), as WindModel.Update does.
+        Like WindModel.Update, the u filter state is not carried forward from step to step.'''
+
+        N = self.numVehicles # Number of vehicles
+
+        if uu is None:
+
+            uu = self.rng.standard_normal(N) # Noise for u
+
+        if uv is None:
+
+            uv = self.rng.standard_normal(N) # Noise for v
+
+        if uw is None:
+
+            uw = self.rng.standard_normal(N) # Noise for w
+
+        uu = numpy.asarray(uu, dtype=float).reshape(N, 1) # Column of noise for u
+
+        uv = numpy.asarray(uv, dtype=float).reshape(N, 1) # Column of noise for v
+
+        uw = numpy.asarray(uw, dtype=float).reshape(N, 1) # Column of noise for w
+
+        newXu = self.x_u @ self.Phi_u.T + uu * self.Gamma_u.T # x_u+ = Phi_u x_u + Gamma_u uu
+
+        self.wind[:, 3] = (newXu @ self.H_u.T)[:, 0] # Wu = H_u x_u+
+
+        newXv = self.x_v @ self.Phi_v.T + uv * self.Gamma_v.T # x_v+ = Phi_v x_v + Gamma_v uv
+
+        self.wind[:, 4] = (newXv @ self.H_v.T)[:, 0] # Wv = H_v x_v+
+
+        self.x_v = newXv # Keep the v state
+
+        newXw = self.x_w @ self.Phi_w.T + uw * self.Gamma_w.T # x_w+ = Phi_w x_w + Gamma_w uw
+
+        self.wind[:, 5] = (newXw @ self.H_w.T)[:, 0] # Ww = H_w x_w+
+
+        self.x_w = newXw # Keep the w state
+
+        return # return nothing
+
+    def updateSensors(self):
+
+        '''Advances the gyro and GPS Gauss-Markov states and the noisy gyro and GPS readings of every vehicle (GPS at its own update rate)'''
+
+        N = self.numVehicles # Number of vehicles
+
+        if (self.updateTicks % self.gpsTickUpdate) == 0: # Time for a GPS update
+
+            gpsEta = numpy.array([VSC.GPS_etaHorizontal, VSC.GPS_etaHorizontal, VSC.GPS_etaVertical]) # GM driving noise
+
+            gpsSigma = numpy.array([VSC.GPS_sigmaHorizontal, VSC.GPS_sigmaHorizontal, VSC.GPS_sigmaVertical]) # White noise
+
+            self.gpsGM = math.exp(-(self.gpsTickUpdate * self.dT) / VSC.GPS_tau) * self.gpsGM + self.rng.normal(0.0, 1.0, (N, 3)) * gpsEta # GM update
+
+            gpsTrue = numpy.column_stack((self.state[:, 0], self.state[:, 1], -self.state[:, 2])) # North, east and altitude
+
+            self.sensorsGPS = gpsTrue + self.gpsGM + self.rng.normal(0.0, 1.0, (N, 3)) * gpsSigma # Noisy GPS
+
+        self.gyroGM = math.exp(-(self.dT / VSC.gyro_tau)) * self.gyroGM + self.rng.normal(0.0, VSC.gyro_eta, (N, 3)) # Gyro GM update
+
+        self.sensorsGyro = self.state[:, 9:12] + self.gyroBias + self.gyroGM + self.rng.normal(0.0, VSC.gyro_sigma, (N, 3)) # Noisy gyros
+
+        self.updateTicks += 1 # Increment tick counter
+
+        return # return nothing
+
+    def _calculateAirspeed(self, state, R, wind):
+
+        '''Vectorized VehicleAerodynamicsModel.CalculateAirspeed, returns the arrays Va, alpha, beta'''
+
+        Wn, We, Wd = wind[:, 0], wind[:, 1], wind[:, 2] # Steady wind components
+
+        Wsteady = numpy.sqrt(Wn ** 2 + We ** 2 + Wd ** 2) # Total steady wind speed
+
+        Xw = numpy.arctan2(We, Wn) # Wind course angle
+
+        ratio = numpy.divide(Wd, Wsteady, out=numpy.zeros_like(Wd), where=(Wsteady != 0)) # Wd / Wsteady, zero when there is no wind
+
+        GammaW = -1 * numpy.arcsin(ratio) # Wind flight path angle (zero when there is no wind)
+
+        cX, sX, cG, sG = numpy.cos(Xw), numpy.sin(Xw), numpy.cos(GammaW), numpy.sin(GammaW) # Trig terms
+
+        Wu, Wv, Ww = wind[:, 3], wind[:, 4], wind[:, 5] # Gusts in the wind frame
+
+        gustN = cX * cG * Wu - sX * Wv + cX * sG * Ww # R_AZEV' * gusts, north
+
+        gustE = sX * cG * Wu + cX * Wv + sX * sG * Ww # R_AZEV' * gusts, east
+
+        gustD = -sG * Wu + cG * Ww # R_AZEV' * gusts, down
+
+        windInertial = numpy.column_stack((Wn + gustN, We + gustE, Wd + gustD)) # Total wind in the inertial frame
+
+        windBody = numpy.einsum('nij,nj->ni', R, windInertial) # Total wind in the body frame
+
+        airspeed = state[:, 3:6] - windBody # [ur, vr, wr]
+
+        Va = numpy.sqrt(numpy.sum(airspeed ** 2, axis=1)) # Airspeed
+
+        alpha = numpy.arctan2(airspeed[:, 2], airspeed[:, 0]) # Angle of attack
+
+        beta = numpy.arcsin(numpy.divide(airspeed[:, 1], Va, out=numpy.zeros_like(Va), where=(Va != 0))) # Sideslip, zero when Va is zero
+
+        return Va, alpha, beta # return airspeed, angle of attack and sideslip
+
+    def updateForces(self, controls):
+
+        '''Vectorized VehicleAerodynamicsModel.updateForces: updates Va, alpha and beta of every vehicle and returns the [N x 6] forces and moments
+        (gravity, aerodynamic and control forces) in forcesMomentsNames order'''
+
+        state = self.state # Current states
+
+        controls = self.controlsToArray(controls) # Controls as an array
+
+        Va, alpha, beta = self._calculateAirspeed(state, self.R, self.wind) # Air data with wind
+
+        self.Va, self.alpha, self.beta = Va, alpha, beta # Store the air data like updateForces does on the state
+
+        p, q, r = state[:, 9], state[:, 10], state[:, 11] # Body rates
+
+        Throttle, Aileron, Elevator, Rudder = controls[:, 0], controls[:, 1], controls[:, 2], controls[:, 3] # Controls
+
+        flying = Va != 0 # Aerodynamic forces are zero when there is no airspeed
+
+        VaSafe = numpy.where(flying, Va, 1.0) # Avoid dividing by zero where not flying
+
+        forceConst = (1 / 2) * VPC.rho * (Va ** 2) * VPC.S # Dynamic pressure times wing area
+
+        cosAlpha, sinAlpha = numpy.cos(alpha), numpy.sin(alpha) # Rotation from stability to body
+
+        # Aerodynamic forces without control surfaces
+
+        CL, CD, CM = VectorizedAerodynamics.CalculateCoeff_alpha(alpha, sinAlpha, cosAlpha) # Lift, drag and moment coefficients
+
+        qTerm = (VPC.c * q) / (2 * VaSafe) # Normalized pitch rate
+
+        pTerm = (VPC.b * p) / (2 * VaSafe) # Normalized roll rate
+
+        rTerm = (VPC.b * r) / (2 * VaSafe) # Normalized yaw rate
+
+        Fdrag = forceConst * (CD + (VPC.CDq * qTerm)) # Drag
+
+        Flift = forceConst * (CL + (VPC.CLq * qTerm)) # Lift
+
+        aeroFx = numpy.where(flying, -cosAlpha * Fdrag + sinAlpha * Flift, 0.0) # Aero Fx
+
+        aeroFz = numpy.where(flying, -sinAlpha * Fdrag - cosAlpha * Flift, 0.0) # Aero Fz
+
+        aeroFy = numpy.where(flying, forceConst * (VPC.CY0 + (VPC.CYbeta * beta) + (VPC.CYp * pTerm) + (VPC.CYr * rTerm)), 0.0) # Aero Fy
+
+        aeroMx = numpy.where(flying, forceConst * VPC.b * (VPC.Cl0 + (VPC.Clbeta * beta) + (VPC.Clp * pTerm) + (VPC.Clr * rTerm)), 0.0) # Roll moment
+
+        aeroMy = numpy.where(flying, forceConst * VPC.c * (VPC.CM0 + (VPC.CMalpha * alpha) + (VPC.CMq * qTerm)), 0.0) # Pitch moment
+
+        aeroMz = numpy.where(flying, forceConst * VPC.b * (VPC.Cn0 + (VPC.Cnbeta * beta) + (VPC.Cnp * pTerm) + (VPC.Cnr * rTerm)), 0.0) # Yaw moment
+
+        # Control surface and propeller forces
+
+        FdragControl = forceConst * (VPC.CDdeltaE * Elevator) # Drag from the elevator
+
+        FliftControl = forceConst * (VPC.CLdeltaE * Elevator) # Lift from the elevator
+
+        propFx, propMx = VectorizedAerodynamics.CalculatePropForces(Va, Throttle) # Propeller thrust and torque
+
+        controlFx = -cosAlpha * FdragControl + sinAlpha * FliftControl + propFx # Control Fx
+
+        controlFz = -sinAlpha * FdragControl - cosAlpha * FliftControl # Control Fz
+
+        controlFy = forceConst * ((VPC.CYdeltaA * Aileron) + (VPC.CYdeltaR * Rudder)) # Control Fy
+
+        controlMx = forceConst * VPC.b * ((VPC.CldeltaA * Aileron) + (VPC.CldeltaR * Rudder)) + propMx # Control roll moment
+
+        controlMy = forceConst * VPC.c * (VPC.CMdeltaE * Elevator) # Control pitch moment
+
+        controlMz = forceConst * VPC.b * ((VPC.CndeltaA * Aileron) + (VPC.CndeltaR * Rudder)) # Control yaw moment
+
+        # Gravity is the third column of R times m*g
+
+        gravity = self.R[:, :, 2] * (VPC.mass * VPC.g0) # Gravity in the body frame
+
+        forcesMoments = numpy.column_stack((gravity[:, 0] + aeroFx + controlFx,
+                                            gravity[:, 1] + aeroFy + controlFy,
+                                            gravity[:, 2] + aeroFz + controlFz,
+                                            aeroMx + controlMx,
+                                            aeroMy + controlMy,
+                                            aeroMz + controlMz)) # Sum of all forces and moments
+
+        return forcesMoments # return forces and moments
+
+    def derivative(self, forcesMoments):
+
+        '''Vectorized VehicleDynamicsModel.derivative, returns the [N x 12] state derivative and the [N x 3 x 3] DCM derivative'''
+
+        state = self.state # Current states
+
+        R = self.R # Current DCMs
+
+        u, v, w = state[:, 3], state[:, 4], state[:, 5] # Body velocities
+
+        pitch, roll = state[:, 7], state[:, 8] # Euler angles needed for the angle rates
+
+        p, q, r = state[:, 9], state[:, 10], state[:, 11] # Body rates
+
+        dot = numpy.empty_like(state) # Derivative to fill
+
+        dot[:, 0:3] = numpy.einsum('nji,nj->ni', R, state[:, 3:6]) # R' * [u, v, w]
+
+        dot[:, 3] = forcesMoments[:, 0] / VPC.mass + (r * v) - (q * w) # u dot
+
+        dot[:, 4] = forcesMoments[:, 1] / VPC.mass + (p * w) - (r * u) # v dot
+
+        dot[:, 5] = forcesMoments[:, 2] / VPC.mass + (q * u) - (p * v) # w dot
+
+        sinRoll, cosRoll = numpy.sin(roll), numpy.cos(roll) # Roll trig
+
+        tanPitch, cosPitch = numpy.tan(pitch), numpy.cos(pitch) # Pitch trig
+
+        dot[:, 8] = p + (sinRoll * tanPitch * q) + (cosRoll * tanPitch * r) # roll dot
+
+        dot[:, 7] = (cosRoll * q) - (sinRoll * r) # pitch dot
+
+        dot[:, 6] = ((sinRoll / cosPitch) * q) + ((cosRoll / cosPitch) * r) # yaw dot
+
+        pqr = state[:, 9:12] # Body rates as rows
+
+        Jpqr = pqr @ numpy.array(VPC.Jbody).T # J * [p, q, r]
+
+        gyroscopic = numpy.cross(pqr, Jpqr) # [w x] J w
+
+        dot[:, 9:12] = (forcesMoments[:, 3:6] - gyroscopic) @ numpy.array(VPC.JinvBody).T # J^-1 (M - [w x] J w)
+
+        Rdot = -1 * (self._skew(p, q, r) @ R) # -[w x] R
+
+        return dot, Rdot # return the derivatives
+
+    def _skew(self, x, y, z):
+
+        '''Stack of [N x 3 x 3] skew symmetric matrices'''
+
+        zero = numpy.zeros_like(x) # Zero entries
+
+        return numpy.stack((numpy.stack((zero, -z, y), axis=-1),
+                            numpy.stack((z, zero, -x), axis=-1),
+                            numpy.stack((-y, x, zero), axis=-1)), axis=-2) # Rows of the skew matrix
+
+    def Rexp(self, dT, state, dot):
+
+        '''Vectorized VehicleDynamicsModel.Rexp, the [N x 3 x 3] matrix exponentials exp(-dT*[omega x]) using the series approximation when ||omega|| <= 0.2'''
+
+        omega = state[:, 9:12] + (dT / 2) * dot[:, 9:12] # Mid step body rates
+
+        magW = numpy.sqrt(numpy.sum(omega ** 2, axis=1)) # ||omega||
+
+        small = magW <= 0.2 # Use the series approximation here
+
+        magSafe = numpy.where(small, 1.0, magW) # Avoid dividing by zero where the approximation is used
+
+        sinTerm = numpy.where(small, dT - (((dT ** 3) * (magW ** 2)) / 6) + (((dT ** 5) * (magW ** 4)) / 120),
+                              numpy.sin(magSafe * dT) / magSafe) # sin term of the exponential
+
+        cosTerm = numpy.where(small, ((dT ** 2) / 2) - (((dT ** 4) * (magW ** 2)) / 24) + (((dT ** 6) * (magW ** 4)) / 720),
+                              (1 - numpy.cos(magSafe * dT)) / (magSafe ** 2)) # cos term of the exponential
+
+        W = self._skew(omega[:, 0], omega[:, 1], omega[:, 2]) # [omega x]
+
+        return numpy.eye(3) - sinTerm[:, None, None] * W + cosTerm[:, None, None] * (W @ W) # I - sin [w x] + cos [w x]^2
+
+    def IntegrateState(self, dT, dot):
+
+        '''Vectorized VehicleDynamicsModel.IntegrateState: forward Euler for positions, velocities and rates, matrix exponential for the DCM,
+        Euler angles from the new DCM and course from the position derivative'''
+
+        newState = self.state + dot * dT # Forward integration of everything
+
+        newR = self.Rexp(dT, self.state, dot) @ self.R # DCM propagation
+
+        sinPitch = numpy.clip(newR[:, 0, 2], -1.0, 1.0) # Bound the arcsin
+
+        newState[:, 6] = numpy.arctan2(newR[:, 0, 1], newR[:, 0, 0]) # yaw
+
+        newState[:, 7] = -1 * numpy.arcsin(sinPitch) # pitch
+
+        newState[:, 8] = numpy.arctan2(newR[:, 1, 2], newR[:, 2, 2]) # roll
+
+        self.chi = numpy.arctan2(dot[:, 1], dot[:, 0]) # Course from the derivative
+
+        self.state = newState # Keep the new state
+
+        self.R = newR # Keep the new DCM
+
+        return # return nothing
+
+    def Update(self, controls):
+
+        '''Advances every vehicle one time step with the given controls (single controlInputs, list of controlInputs or [N x 4] array):
+        sensors (if used) on the current state, then forces with the current wind, derivative and integration, then the gust filters (if used).'''
+
+        if self.useSensors: # Sensors see the state before the step, as in VehicleClosedLoopControl
+
+            self.updateSensors() # Update the sensor noise states
+
+        self.controls = self.controlsToArray(controls) # Keep the controls
+
+        self.forcesMoments = self.updateForces(self.controls) # Forces and moments for every vehicle
+
+        self.dot, self.Rdot = self.derivative(self.forcesMoments) # State derivatives
+
+        self.IntegrateState(self.dT, self.dot) # Integrate every vehicle
+
+        if self.updateWind: # Advance the gusts for the next step
+
+            self.updateWindGusts() # Update the gust filters
+
+        return # return nothing
@@ -8,12 +8,30 @@ from ..Constants import VehiclePhysicalConstants as VPC
 
 # Assignment: Lab 1: Vehicle Dynamics Module
 
+integratorNames = ['ForwardEuler', 'RK4', 'DormandPrince'] # Integrators that Update can use
+
+attitudeNames = ['DCM', 'Quaternion'] # Attitude representations the integrators can propagate
+
+# Butcher tableau of the classic fourth order Runge-Kutta
+
+RK4_A = [[], [1/2], [0, 1/2], [0, 0, 1]] # Stage weights
+
+RK4_B = [1/6, 1/3, 1/3, 1/6] # Solution weights
+
+# Butcher tableau of Dormand-Prince 5(4), the last stage is evaluated at the fifth order solution (first same as last)
+
+DP_A = [[], [1/5], [3/40, 9/40], [44/45, -56/15, 32/9], [19372/6561, -25360/2187, 64448/6561, -212/729],
+        [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656], [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]] # Stage weights
+
+DP_E = [35/384 - 5179/57600, 0, 500/1113 - 7571/16695, 125/192 - 393/640, -2187/6784 + 92097/339200, 11/84 - 187/2100, -1/40] # Fifth minus fourth order solution weights
+
 class VehicleDynamicsModel:
 
 
-    def __init__(self, dT = VPC.dT):
+    def __init__(self, dT = VPC.dT, integrator = 'ForwardEuler', attitude = 'DCM'):
 
-        '''Initializes the class, and sets the time step (needed for Rexp and integration). Instantiates attributes for vehicle state, and time derivative of vehicle state.'''
+        '''Initializes the class, and sets the time step (needed for Rexp and integration). Instantiates attributes for vehicle state, and time derivative of vehicle state.
+           integrator is one of integratorNames (see setIntegrator), attitude one of attitudeNames (see setAttitude).'''
 
         self.dT = dT # Assign time step as the given dT in VPC
 
@@ -21,8 +39,73 @@ class VehicleDynamicsModel:
 
         self.dot = States.vehicleState() # Instantiates dot (time derivative) as an instance of States.vehicleState()
 
+        self.setIntegrator(integrator) # Forward Euler with Rexp for the DCM unless told otherwise
+
+        self.setAttitude(attitude) # DCM propagation unless told otherwise
+
         return # Return nothing
 
+    def setIntegrator(self, integrator, rtol = 1e-6, atol = 1e-8, hmin = 1e-9, maxSteps = 10000):
+
+        '''Selects the integrator used by Update:
+           ForwardEuler: forward Euler for positions, velocities and rates, Rexp for the DCM (the original integration)
+           RK4: classic fourth order Runge-Kutta, one step of dT
+           DormandPrince: adaptive Dormand-Prince 5(4), as many sub-steps as the error control needs to cross dT
+           RK4 and DormandPrince are Runge-Kutta-Munthe-Kaas methods, the DCM is carried as R = exp(-[theta x]) R0 so it stays on SO(3)
+           (or the quaternion as q0 * exp(theta / 2), see setAttitude).
+           rtol and atol are the relative and absolute error tolerances of DormandPrince, hmin its smallest sub-step and maxSteps the
+           most sub-steps (accepted or rejected) it tries in one Update before giving up with an ArithmeticError.'''
+
+        if integrator not in integratorNames: # Unknown integrator
+
+            raise ValueError("Unknown integrator '{}', expected one of {}".format(integrator, integratorNames))
+
+        self.integrator = integrator # Store integrator name
+
+        self.rtol = rtol # Relative tolerance of the adaptive step
+
+        self.atol = atol # Absolute tolerance of the adaptive step
+
+        self.hmin = hmin # Smallest adaptive sub-step
+
+        self.maxSteps = maxSteps # Most sub-steps tried per Update
+
+        self.adaptiveStep = self.dT # First adaptive sub-step tried is the whole step
+
+        self.stepCount = 0 # Sub-steps taken by the last Update
+
+        self.evaluationCount = 0 # Derivative evaluations made by the last Update
+
+        return # return nothing
+
+    def getIntegrator(self):
+
+        '''Getter method to read the name of the integrator used by Update'''
+
+        return self.integrator # Return integrator name
+
+    def setAttitude(self, attitude):
+
+        '''Selects how the integrators propagate the attitude:
+           DCM: the 3x3 DCM is multiplied by the matrix exponential of the rotation over the step and the Euler angles are extracted from it (the original propagation)
+           Quaternion: the unit quaternion of the state is multiplied by the exact quaternion exponential of the rotation over the step and normalized,
+           the Euler angles are computed from it and the DCM is only built from it when it is read (States.vehicleState quaternion).
+           Both use the same body rates over the step with every integrator. The representation is kept through reset.'''
+
+        if attitude not in attitudeNames: # Unknown representation
+
+            raise ValueError("Unknown attitude representation '{}', expected one of {}".format(attitude, attitudeNames))
+
+        self.attitude = attitude # Store representation name
+
+        return # return nothing
+
+    def getAttitude(self):
+
+        '''Getter method to read the name of the attitude representation propagated by the integrators'''
+
+        return self.attitude # Return representation name
+
 
     def getVehicleDerivative(self):
 
@@ -123,17 +206,7 @@ class VehicleDynamicsModel:
 
         # Derivatives NED (Pn, Pe, Pd)
 
-        velocity_vector = [[state.u], [state.v], [state.w]] # Get u, v, w matrix
-
-        R_transp = mm.transpose(state.R) # Transpose R inertial to body
-
-        dot_pos_vector = mm.multiply(R_transp, velocity_vector) # multiply R trans by u,v,w to get the position derivative
-
-        pn_dot = dot_pos_vector [0][0] # Get Pn dot
-
-        pe_dot = dot_pos_vector [1][0] # Get Pe dot
-
-        pd_dot = dot_pos_vector [2][0] # Get Pd dot
+        pn_dot, pe_dot, pd_dot = Rotations.bodyToInertial(state.R, state.u, state.v, state.w) # multiply R trans by u,v,w to get the position derivative
 
         # Derivatives of velocities (u, v, w)
 
@@ -192,7 +265,7 @@ class VehicleDynamicsModel:
 
         # Derivative of R
 
-        R_dot = mm.scalarMultiply(-1, (mm.multiply(omega_cross, state.R)))
+        R_dot = mm.scalarMultiply(-1, Rotations.multiply3x3(omega_cross, state.R))
 
         dot = States.vehicleState(pn_dot, pe_dot, pd_dot, u_dot, v_dot, w_dot, yaw_dot, roll_dot, pitch_dot, p_dot, q_dot, r_dot)
 
@@ -230,17 +303,27 @@ class VehicleDynamicsModel:
 
         r_int = state.r + (dot.r * dT)
 
-        # Integrate R using matrix exponetial
+        if self.attitude == 'Quaternion': # Integrate the quaternion with the exponential of the same rotation Rexp uses
 
-        Rexp = VehicleDynamicsModel.Rexp(self, dT, state, dot)
+            theta = [dT * (state.p + (dT / 2) * dot.p), dT * (state.q + (dT / 2) * dot.q), dT * (state.r + (dT / 2) * dot.r)] # Rotation over the step
 
-        R_int = mm.multiply(Rexp, state.R)
+            quaternion_int = self.RotateQuaternion(state.quaternion, theta) # q_{k+1}
 
-        # Integrate yaw, pitch, roll using R_{k+1}
+            # yaw, pitch, roll come from q_{k+1} inside the vehicleState constructor, R only when it is read
 
-        yaw_int, pitch_int, roll_int = Rotations.dcm2Euler(R_int)
+            newState = States.vehicleState(pn_int, pe_int, pd_int, u_int, v_int, w_int, p = p_int, q = q_int, r = r_int, quaternion = quaternion_int)
 
-        newState = States.vehicleState(pn_int, pe_int, pd_int, u_int, v_int, w_int, yaw_int, pitch_int, roll_int, p_int, q_int, r_int, R_int)
+        else:
+
+            # Integrate R using matrix exponetial
+
+            Rexp = VehicleDynamicsModel.Rexp(self, dT, state, dot)
+
+            R_int = Rotations.multiply3x3(Rexp, state.R)
+
+            # yaw, pitch, roll come from R_{k+1} inside the vehicleState constructor, so they are not extracted here as well
+
+            newState = States.vehicleState(pn_int, pe_int, pd_int, u_int, v_int, w_int, p = p_int, q = q_int, r = r_int, dcm = R_int)
 
         newState.Va = state.Va # Copy Va
 
@@ -258,11 +341,245 @@ class VehicleDynamicsModel:
 
         return newState # return the new state
     
-    def Update(self, forcesMoments):
+    def ExpSO3(self, theta):
+
+        '''Rotation matrix exp(-[theta x]) for a rotation vector theta [[x], [y], [z]] given as a list [x, y, z] (Rodrigues formula)'''
+
+        angle = math.hypot(theta[0], theta[1], theta[2]) # Rotation angle
+
+        if angle < 1e-3: # Small angles use the series so we don't divide by ~0
+
+            sin_term = 1 - ((angle ** 2) / 6) + ((angle ** 4) / 120) # sin(angle) / angle
+
+            cos_term = (1 / 2) - ((angle ** 2) / 24) + ((angle ** 4) / 720) # (1 - cos(angle)) / angle^2
+
+        else: # Otherwise
+
+            sin_term = math.sin(angle) / angle # Use Sin term as normal
+
+            cos_term = (1 - math.cos(angle)) / (angle ** 2) # Use Cos term as normal
+
+        skew_sym_mtrx = mm.skew(theta[0], theta[1], theta[2]) # [theta x]
+
+        I_matrix = [[1, 0, 0], [0, 1, 0], [0, 0, 1]] # Identity
+
+        return mm.add(mm.subtract(I_matrix, mm.scalarMultiply(sin_term, skew_sym_mtrx)), mm.scalarMultiply(cos_term, mm.multiply(skew_sym_mtrx, skew_sym_mtrx))) # I - sin[theta x] + (1 - cos)[theta x]^2
+
+    def ExpQuaternion(self, theta):
+
+        '''Unit quaternion [cos(angle / 2), sin(angle / 2) * theta / angle] of a rotation vector theta given as a list [x, y, z], the
+           quaternion counterpart of ExpSO3 (exact, no truncation beyond the small angle series)'''
+
+        angle = math.hypot(theta[0], theta[1], theta[2]) # Rotation angle
+
+        if angle < 1e-3: # Small angles use the series so we don't divide by ~0
+
+            sin_term = (1 / 2) - ((angle ** 2) / 48) + ((angle ** 4) / 3840) # sin(angle / 2) / angle
+
+        else: # Otherwise
+
+            sin_term = math.sin(angle / 2) / angle # Use Sin term as normal
+
+        return [math.cos(angle / 2), sin_term * theta[0], sin_term * theta[1], sin_term * theta[2]] # Scalar first
+
+    def RotateQuaternion(self, quaternion, theta):
+
+        '''Attitude quaternion after the body frame rotation theta [x, y, z], quaternion * exp(theta / 2), normalized so rounding
+           errors don't build up over long runs'''
+
+        q0, q1, q2, q3 = Rotations.quaternionMultiply(quaternion, self.ExpQuaternion(theta)) # Rotate
+
+        norm = math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3) # Magnitude, 1 up to rounding
+
+        return [q0 / norm, q1 / norm, q2 / norm, q3 / norm] # Unit quaternion
+
+    def DerivativeVector(self, state, dot, theta):
+
+        '''Flattens a state derivative into [pn, pe, pd, u, v, w, p, q, r, theta] rates, where the rate of the rotation vector theta
+           follows from the body rates through the inverse of the exponential map's derivative (truncated after the third order term)'''
+
+        omega = [state.p, state.q, state.r] # Body rates
+
+        theta_x_omega = [theta[1] * omega[2] - theta[2] * omega[1], theta[2] * omega[0] - theta[0] * omega[2], theta[0] * omega[1] - theta[1] * omega[0]] # theta x omega
+
+        theta_x_theta_x_omega = [theta[1] * theta_x_omega[2] - theta[2] * theta_x_omega[1], theta[2] * theta_x_omega[0] - theta[0] * theta_x_omega[2],
+                                 theta[0] * theta_x_omega[1] - theta[1] * theta_x_omega[0]] # theta x (theta x omega)
+
+        theta_dot = [omega[i] + (theta_x_omega[i] / 2) + (theta_x_theta_x_omega[i] / 12) for i in range(3)] # dexp^-1 series
+
+        return [dot.pn, dot.pe, dot.pd, dot.u, dot.v, dot.w, dot.p, dot.q, dot.r] + theta_dot # Return all rates
+
+    def StageState(self, h, state, stages, weights):
+
+        '''Builds the Runge-Kutta stage state from the base state and the weighted stage derivatives. Returns (stage state, theta)'''
+
+        rates = [sum([weight * stage[1][i] for weight, stage in zip(weights, stages)]) for i in range(12)] # Weighted sum of the stage rates
+
+        values = [state.pn, state.pe, state.pd, state.u, state.v, state.w, state.p, state.q, state.r] # Base state
+
+        new_values = [values[i] + (h * rates[i]) for i in range(9)] # Positions, velocities and rates
+
+        theta = [h * rates[9 + i] for i in range(3)] # Rotation away from the base DCM
+
+        if self.attitude == 'Quaternion': # Stage quaternion, still a unit quaternion
+
+            quaternion_stage = self.RotateQuaternion(state.quaternion, theta)
+
+            stageState = States.vehicleState(*new_values[0:6], p = new_values[6], q = new_values[7], r = new_values[8], quaternion = quaternion_stage) # Build the stage state
+
+        else:
+
+            R_stage = Rotations.multiply3x3(self.ExpSO3(theta), state.R) # Stage DCM, still on SO(3)
+
+            stageState = States.vehicleState(*new_values[0:6], p = new_values[6], q = new_values[7], r = new_values[8], dcm = R_stage) # Build the stage state
+
+        return stageState, theta # Return state and rotation
+
+    def StageDerivative(self, h, state, stages, weights, forcesFunction):
+
+        '''Builds the Runge-Kutta stage state and evaluates the derivative there. Returns (stage state, derivative vector)'''
+
+        stageState, theta = self.StageState(h, state, stages, weights) # Build the stage state
+
+        stageDot = self.derivative(stageState, forcesFunction(stageState)) # Evaluate the derivative with the forces at the stage
+
+        return stageState, self.DerivativeVector(stageState, stageDot, theta) # Return state and rates
+
+    def RungeKutta4(self, dT, state, dot, forcesFunction):
+
+        '''One classic fourth order Runge-Kutta-Munthe-Kaas step of dT from state, whose derivative dot is already known.
+           forcesFunction(state) returns the forcesMoments at the intermediate states.'''
+
+        stages = [(state, self.DerivativeVector(state, dot, [0.0, 0.0, 0.0]))] # First stage is the derivative at the start
+
+        for weights in RK4_A[1:]: # Remaining stages
+
+            stages.append(self.StageDerivative(dT, state, stages, weights, forcesFunction)) # Evaluate stage
+
+        newState = self.StageState(dT, state, stages, RK4_B)[0] # Solution
+
+        newState.Va = state.Va # Copy Va
+
+        newState.alpha = state.alpha # Copy alpha
+
+        newState.beta = state.beta # Copy beta
+
+        self.stepCount = 1 # One step
+
+        self.evaluationCount = 4 # Four derivative evaluations
+
+        return newState # chi is left to be computed from the new state
+
+    def DormandPrince(self, dT, state, dot, forcesFunction):
+
+        '''Integrates over dT with adaptive Dormand-Prince 5(4) Runge-Kutta-Munthe-Kaas sub-steps, keeping the local error estimate
+           within rtol and atol. The sub-step size carries over between calls. forcesFunction(state) returns the forcesMoments at the
+           intermediate states. Raises an ArithmeticError if the error estimate is not finite (e.g. NaN forces), the sub-step
+           would fall below hmin, or more than maxSteps sub-steps are tried.'''
+
+        k1 = self.DerivativeVector(state, dot, [0.0, 0.0, 0.0]) # Derivative at the start
+
+        time_done = 0.0 # Time integrated so far
+
+        h = min(self.adaptiveStep, dT) # Sub-step size to try
+
+        self.stepCount = 0 # Accepted sub-steps
+
+        self.evaluationCount = 1 # Derivative evaluations
+
+        attempts = 0 # Sub-steps tried, accepted or not
+
+        while (dT - time_done) > (1e-12 * dT): # Until the whole step is covered
+
+            attempts += 1 # Count the try
+
+            if attempts > self.maxSteps: # Error control is not converging
+
+                self.adaptiveStep = dT # Start afresh on the next call
+
+                raise ArithmeticError("DormandPrince tried more than {} sub-steps at t = {} of {} s".format(self.maxSteps, time_done, dT))
+
+            h_try = min(h, dT - time_done) # Don't step past the end
+
+            stages = [(state, k1)] # First stage
+
+            for weights in DP_A[1:]: # Remaining stages, the last one is the fifth order solution
+
+                stages.append(self.StageDerivative(h_try, state, stages, weights, forcesFunction)) # Evaluate stage
+
+            self.evaluationCount += 6 # Six new evaluations
+
+            newState, k7 = stages[-1] # Fifth order solution and its derivative
+
+            error = [h_try * sum([weight * stage[1][i] for weight, stage in zip(DP_E, stages)]) for i in range(12)] # Error estimate
+
+            old_values = [state.pn, state.pe, state.pd, state.u, state.v, state.w, state.p, state.q, state.r, 0.0, 0.0, 0.0] # Base values
+
+            new_values = [newState.pn, newState.pe, newState.pd, newState.u, newState.v, newState.w, newState.p, newState.q, newState.r,
+                          h_try * k7[9], h_try * k7[10], h_try * k7[11]] # Solution values (rotation as a small angle)
+
+            scaled = [error[i] / (self.atol + self.rtol * max(abs(old_values[i]), abs(new_values[i]))) for i in range(12)] # Error over tolerance
+
+            error_norm = math.sqrt(sum([x ** 2 for x in scaled]) / 12) # RMS error norm
+
+            if not math.isfinite(error_norm): # NaN or inf in the state or forces, no step size can fix it
+
+                self.adaptiveStep = dT # Start afresh on the next call
+
+                raise ArithmeticError("DormandPrince error estimate is {} at t = {} of {} s, check the state and forces".format(error_norm, time_done, dT))
+
+            if error_norm <= 1.0: # Accept the sub-step
+
+                time_done += h_try # Advance time
+
+                state = newState # Move to the solution
+
+                k1 = k7[0:9] + [state.p, state.q, state.r] # First same as last, theta restarts at zero from the new state
+
+                self.stepCount += 1 # Count step
+
+                factor = 5.0 if error_norm == 0.0 else min(5.0, 0.9 * error_norm ** (-1 / 5)) # Grow the step
+
+            else: # Reject and shrink the step
+
+                factor = max(0.2, 0.9 * error_norm ** (-1 / 5)) # Shrink factor
+
+                if h_try * factor < self.hmin: # Step size underflow
+
+                    self.adaptiveStep = dT # Start afresh on the next call
+
+                    raise ArithmeticError("DormandPrince sub-step fell below hmin = {} s at t = {} of {} s".format(self.hmin, time_done, dT))
+
+            h = h_try * factor # Next sub-step size
+
+            self.adaptiveStep = h # Carry over to the next call
+
+        return state # Va, alpha and beta were set on the solution by the forces at its stage, chi is computed from it
+
+    def Update(self, forcesMoments, forcesFunction = None):
+
+        '''Integrates the state over dT with the selected integrator. forcesFunction(state) returns the forcesMoments at an
+           intermediate state for RK4 and DormandPrince; if it is None forcesMoments are held over the whole step.'''
 
         self.dot = self.derivative(self.state, forcesMoments) # Get derivative of the state
-       
-        self.state = self.IntegrateState(self.dT, self.state, self.dot) # Then integrate the state
+
+        if self.integrator == 'ForwardEuler': # Original integration
+
+            self.state = self.IntegrateState(self.dT, self.state, self.dot) # Then integrate the state
+
+            return
+
+        if forcesFunction is None: # No way to get forces at the intermediate states
+
+            forcesFunction = lambda stageState: forcesMoments # Hold the forces
+
+        if self.integrator == 'RK4': # Fourth order Runge Kutta
+
+            self.state = self.RungeKutta4(self.dT, self.state, self.dot, forcesFunction) # Single step
+
+        else: # Adaptive
+
+            self.state = self.DormandPrince(self.dT, self.state, self.dot, forcesFunction) # Adaptive sub-steps
 
         return
 
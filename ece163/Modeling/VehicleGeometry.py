@@ -1,10 +1,11 @@
 """
 Holds the vehicle graphics, only operation on it is to return a set of points and meshes with the appropriate rotation/translation
 currently just returns the modified points, does not update the base ones. Module uses its baseUnit variable to scale the model to an
-arbitrary size for good rendering in the display window.
+arbitrary size for good rendering in the display window. getNewPointsArray is the NumPy version for the display, which
+transforms a cached array of the vertices into a reusable output array every frame.
 """
+import numpy
 
-from ..Utilities import MatrixMath
 from ..Utilities import Rotations
 from ..Constants import VehiclePhysicalConstants as VPC
 
@@ -116,8 +117,24 @@ class VehicleGeometry():
 					   green, green, green, green,
 					   blue]
 
+		self.vertexArrays = dict()	# vertices as [n x 3] arrays, one per scale asked for, built on first use
 		return
 
+	def getVertexArray(self, scale=1.0):
+		"""
+		The vertices as an [n x 3] NumPy array multiplied by scale, built from self.vertices the first time each scale is
+		asked for and cached after that
+
+		:param scale: factor on every coordinate (e.g. meters to display units)
+		:return: [n x 3] array, shared, not to be modified
+		"""
+		vertexArray = self.vertexArrays.get(scale)
+		if vertexArray is None:
+			vertexArray = numpy.array(self.vertices, dtype=float) * scale
+			vertexArray.setflags(write=False)
+			self.vertexArrays[scale] = vertexArray
+		return vertexArray
+
 	def getNewPoints(self, x, y, z, yaw, pitch, roll):
 		"""
 		Function to get new ENU points of the vehicle in inertial space from Euler angles, NED displacements, and base
@@ -131,20 +148,76 @@ class VehicleGeometry():
 		:param roll: rotation about body x-axis [rad]
 		:return: Points in inertial EAST-NORTH-UP frame (for plotting)
 		"""
-		newPoints = self.vertices
-
 		rmatrix = Rotations.euler2DCM(yaw, pitch, roll) # Get the rotation matrix from the euler angles using euler2dcm()
 
-		coords_rotated = MatrixMath.multiply(newPoints,rmatrix) # multiply aircraft points by the rotation matrix to apply the appropriate rotation in NED
+		newPoints = Rotations.bodyToENU(self.vertices, rmatrix, x, y, z) # Rotate the aircraft points in NED, displace them by x, y, z and convert to ENU coords
 
-		displacements = [x,y,z] # Given x, y, z NED displacements
+		return newPoints # Return new ENU matrix of vehicle points
 
-		for row in range(len(coords_rotated[0])): # Go through the rows of the vehicle points matrix
+	def getNewPointsArray(self, x, y, z, yaw, pitch, roll, scale=1.0, out=None):
+		"""
+		NumPy version of getNewPoints: the same ENU points, multiplied by scale, computed with one [n x 3] by [3 x 3]
+		product and one addition on the cached vertex array. The rotation, the swap to ENU and the flip of down are folded
+		into the 3 x 3 matrix, so nothing the size of the mesh is allocated when out is given.
+
+		:param x: North Displacement (Pn) in [m]
+		:param y: East Displacement (Pe) in [m]
+		:param z: Down Displacement (Pd) in [m]
+		:param yaw: rotation about inertial down [rad]
+		:param pitch: rotation about intermediate y-axis [rad]
+		:param roll: rotation about body x-axis [rad]
+		:param scale: factor on every coordinate of the result, as multiplying the points of getNewPoints
+		:param out: [n x 3] array to write the points into (e.g. float32 for OpenGL), a new float array if None
+		:return: Points in inertial EAST-NORTH-UP frame, out if it was given
+		"""
+		(R00, R01, R02), (R10, R11, R12), (R20, R21, R22) = Rotations.euler2DCM(yaw, pitch, roll)
+		enuMatrix = numpy.array([[R01, R00, -R02], [R11, R10, -R12], [R21, R20, -R22]])	# points * R, then columns to E, N, -D
+		vertexArray = self.getVertexArray(scale)
+		if out is None:
+			out = numpy.empty(vertexArray.shape)
+		numpy.matmul(vertexArray, enuMatrix, out=out)
+		out += (y * scale, x * scale, -z * scale)
+		return out
+
+	def getBatchPointsArray(self, positions, dcms, scale=1.0, out=None):
+		"""
+		getNewPointsArray for a batch of vehicles at once: every vehicle's copy of the mesh is rotated, moved and converted
+		to ENU by one broadcast [n x 3] by [N x 3 x 3] product and one addition.
+
+		:param positions: [N x 3] NED positions [m] (e.g. the first three columns of a VehicleBatchModel state array)
+		:param dcms: [N x 3 x 3] DCMs, inertial to body
+		:param scale: factor on every coordinate of the result
+		:param out: [N x n x 3] array to write the points into, a new float array if None
+		:return: [N x n x 3] points in inertial EAST-NORTH-UP frame, out if it was given
+		"""
+		positions = numpy.asarray(positions)
+		enuMatrices = numpy.asarray(dcms)[:, :, [1, 0, 2]] * (1.0, 1.0, -1.0)	# points * R, then columns to E, N, -D
+		vertexArray = self.getVertexArray(scale)
+		if out is None:
+			out = numpy.empty((len(enuMatrices),) + vertexArray.shape)
+		numpy.matmul(vertexArray, enuMatrices, out=out)
+		out += (positions[:, None, [1, 0, 2]] * (scale, scale, -scale))
+		return out
+
+	def getBatchFaces(self, numVehicles):
+		"""
+		Faces of numVehicles copies of the mesh merged into one, for the points of getBatchPointsArray flattened to [N n x 3]
 
-			for col in range((len(coords_rotated))): # Go through the cols of the vehicle points matrix
+		:param numVehicles: number of copies
+		:return: [N m x 3] vertex indices
+		"""
+		faces = numpy.array(self.faces, dtype=numpy.uint32)
+		offsets = numpy.arange(numVehicles, dtype=numpy.uint32) * len(self.vertices)
+		return (faces[None, :, :] + offsets[:, None, None]).reshape(-1, 3)
 
-				coords_rotated[col][row] += displacements[row] # Add the x displacement to col 1, y to 2, and z to 3 for each row in nx3
-		
-		newPoints = Rotations.ned2enu(coords_rotated) # Convert dispalced NED matrix to ENU coords
+	def getBatchColors(self, numVehicles, vehicleColors=None):
+		"""
+		Face colors of numVehicles copies of the mesh merged into one
 
-		return newPoints # Return new ENU matrix of vehicle points
+		:param numVehicles: number of copies
+		:param vehicleColors: [N x 4] RGBA color of each vehicle, painted on all of its faces, None to keep the mesh colors
+		:return: [N m x 4] colors
+		"""
+		if vehicleColors is None:
+			return numpy.tile(numpy.array(self.colors, dtype=float), (numVehicles, 1))
+		return numpy.repeat(numpy.asarray(vehicleColors, dtype=float), len(self.faces), axis=0)
@@ -9,17 +9,20 @@ class WindModel:
 
 
 
-   def __init__(self, dT = 0.01, Va = 25.0, drydenParameters = VPC.DrydenNoWind):
+   def __init__(self, dT = 0.01, Va = 25.0, drydenParameters = VPC.DrydenNoWind, rng = None):
 
     '''
     function to initialize the wind model code. Will load the appropriate constants that parameterize the wind gusts from the Dryden gust model. 
     Creates the discrete transfer functions for the gust models that are used to update the local wind gusts in the wind frame.
     These are added to the inertial wind (Wn, We, Wd) that are simply constants. Discrete models are held in self and used in the Update function.
+    rng is an optional random.Random instance used for the gust white noise (defaults to the global random module).
     '''
       
 
     self.dT = dT # Set Time Step for Wind Model to given time step 0.01 by default
 
+    self.rng = random if rng is None else rng # Random number generator for the gust noise, global random module by default
+
     self.Va = Va # Initialize Airspeed with given airspeed 25 m/s by defauly
 
     self.drydenParameters = drydenParameters # Intialize dryden parameters with the given dryden parmaeters which are windless by default
@@ -199,15 +202,15 @@ class WindModel:
 
     if(uu is None):
       
-      uu = random.gauss(0.0, 1.0) # Generate Random noise for mu in u
+      uu = self.rng.gauss(0.0, 1.0) # Generate Random noise for mu in u
 
     if(uv is None):
       
-      uv = random.gauss(0.0, 1.0) # Generate Random noise for mu in v
+      uv = self.rng.gauss(0.0, 1.0) # Generate Random noise for mu in v
 
     if(uw is None):
       
-      uw = random.gauss(0.0, 1.0) # Generate Random noise for mu in w
+      uw = self.rng.gauss(0.0, 1.0) # Generate Random noise for mu in w
 
     # Get previous states
 
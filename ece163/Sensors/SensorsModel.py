@@ -12,10 +12,14 @@ from ..Containers import States
 
 class GaussMarkov:
 
-    def __init__(self, dT = 0.01, tau = 1.0e6, eta = 0.0):
+    def __init__(self, dT = 0.01, tau = 1.0e6, eta = 0.0, rng = None):
 
         # Sets Inital Parameters to Compute the Gauss Markov Model
 
+        # rng is an optional random.Random instance so that each model can own its noise stream, defaults to the global random module
+
+        self.rng = random if rng is None else rng # Random number generator for the driving noise
+
 
         self.tau = tau # Get tau parameter
 
@@ -56,7 +60,7 @@ class GaussMarkov:
             w = 0.0 # w is 0 this is the random number from GM
         else:
 
-            w = random.gauss(0, self.eta) # Otherwise random.gauss(0, eta)
+            w = self.rng.gauss(0, self.eta) # Otherwise random.gauss(0, eta)
 
         
         if(vnoise == None): # If were not driving with a known value 
@@ -74,7 +78,7 @@ class GaussMarkov:
 
 class GaussMarkovXYZ:
 
-    def __init__(self, dT=VPC.dT, tauX=1e6, etaX=0.0, tauY=None, etaY=None, tauZ=None, etaZ=None):
+    def __init__(self, dT=VPC.dT, tauX=1e6, etaX=0.0, tauY=None, etaY=None, tauZ=None, etaZ=None, rng=None):
 
         # Function creates three Gauss Markov models one for each axis X Y or Z
 
@@ -125,11 +129,11 @@ class GaussMarkovXYZ:
         # Create GM Objects for each axis
 
 
-        self.GM_XYZ_X = GaussMarkov(self.dT_XYZ, self.tauX, self.etaX) # Create X axis Gauss Markov Object
+        self.GM_XYZ_X = GaussMarkov(self.dT_XYZ, self.tauX, self.etaX, rng) # Create X axis Gauss Markov Object
 
-        self.GM_XYZ_Y = GaussMarkov(self.dT_XYZ, self.tauY, self.etaY) # Create Y axis Gauss Markov Object
+        self.GM_XYZ_Y = GaussMarkov(self.dT_XYZ, self.tauY, self.etaY, rng) # Create Y axis Gauss Markov Object
 
-        self.GM_XYZ_Z = GaussMarkov(self.dT_XYZ, self.tauY, self.etaZ) # Create Z axis Gauss Markov Object
+        self.GM_XYZ_Z = GaussMarkov(self.dT_XYZ, self.tauY, self.etaZ, rng) # Create Z axis Gauss Markov Object
 
         return # Return nothing
     
@@ -163,7 +167,9 @@ class GaussMarkovXYZ:
 
 class SensorsModel:
 
-    def __init__(self, aeroModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel(), taugyro = VSC.gyro_tau, etagyro = VSC.gyro_eta, tauGPS = VSC.GPS_tau, etaGPSHorizontal = VSC.GPS_etaHorizontal, etaGPSVertical = VSC.GPS_etaVertical, gpsUpdateHz = VSC.GPS_rate):
+    def __init__(self, aeroModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel(), taugyro = VSC.gyro_tau, etagyro = VSC.gyro_eta, tauGPS = VSC.GPS_tau, etaGPSHorizontal = VSC.GPS_etaHorizontal, etaGPSVertical = VSC.GPS_etaVertical, gpsUpdateHz = VSC.GPS_rate, rng = None):
+
+        self.rng = random if rng is None else rng # Random number generator for biases and noise (random.Random instance), global random module by default
 
         self.VAM = aeroModel # Keep an instance of Vehicle Aerodynamics Module.
 
@@ -183,11 +189,11 @@ class SensorsModel:
 
         # Intialize Gauss Markov for both Gyro & GPS. Use GM XYZ since they both measure in 3-D
 
-        self.Gyro_GM_XYZ = GaussMarkovXYZ(self.dT, taugyro, etagyro) # Create a GM XYZ for the GPS using the passed in tau and eta for the gyro
+        self.Gyro_GM_XYZ = GaussMarkovXYZ(self.dT, taugyro, etagyro, rng=self.rng) # Create a GM XYZ for the GPS using the passed in tau and eta for the gyro
 
         self.gps_dT = (1 / gpsUpdateHz) # Period or timestep of the GPS
 
-        self.GPS_GM_XYZ = GaussMarkovXYZ(self.gps_dT, tauGPS, etaGPSHorizontal, tauGPS, etaGPSHorizontal, tauGPS, etaGPSVertical)
+        self.GPS_GM_XYZ = GaussMarkovXYZ(self.gps_dT, tauGPS, etaGPSHorizontal, tauGPS, etaGPSHorizontal, tauGPS, etaGPSVertical, rng=self.rng)
 
         # Create a GM XYZ for the GPS using tau gps for tau and the appropriate etas for X,Y, and Z
         
@@ -263,33 +269,33 @@ class SensorsModel:
 
         # Get Gyro Biases for X, Y, and Z
 
-        sensorBiases.gyro_x = random.uniform(-limit, limit) * gyroBias
+        sensorBiases.gyro_x = self.rng.uniform(-limit, limit) * gyroBias
 
-        sensorBiases.gyro_y = random.uniform(-limit, limit) * gyroBias
+        sensorBiases.gyro_y = self.rng.uniform(-limit, limit) * gyroBias
 
-        sensorBiases.gyro_z = random.uniform(-limit, limit) * gyroBias
+        sensorBiases.gyro_z = self.rng.uniform(-limit, limit) * gyroBias
 
         # Get Accelerometer Biases for X, Y, and Z
 
-        sensorBiases.accel_x = random.uniform(-limit, limit) * accelBias
+        sensorBiases.accel_x = self.rng.uniform(-limit, limit) * accelBias
 
-        sensorBiases.accel_y = random.uniform(-limit, limit) * accelBias
+        sensorBiases.accel_y = self.rng.uniform(-limit, limit) * accelBias
 
-        sensorBiases.accel_z = random.uniform(-limit, limit) * accelBias
+        sensorBiases.accel_z = self.rng.uniform(-limit, limit) * accelBias
 
         # Get Magnetometer biases for X, Y, and Z
 
-        sensorBiases.mag_x = random.uniform(-limit, limit) * magBias
+        sensorBiases.mag_x = self.rng.uniform(-limit, limit) * magBias
 
-        sensorBiases.mag_y = random.uniform(-limit, limit) * magBias
+        sensorBiases.mag_y = self.rng.uniform(-limit, limit) * magBias
 
-        sensorBiases.mag_z = random.uniform(-limit, limit) * magBias
+        sensorBiases.mag_z = self.rng.uniform(-limit, limit) * magBias
 
         # Get Baro and Pitot biases
 
-        sensorBiases.baro = random.uniform(-limit, limit) * baroBias
+        sensorBiases.baro = self.rng.uniform(-limit, limit) * baroBias
 
-        sensorBiases.pitot = random.uniform(-limit, limit) * pitotBias
+        sensorBiases.pitot = self.rng.uniform(-limit, limit) * pitotBias
 
         # Get GPS Biases
 
@@ -481,25 +487,25 @@ class SensorsModel:
 
             # Update GPS with colored noise and white noise GPS is unbiased
 
-             SN.gps_n = trueSensors.gps_n + C_noise_GPSN + random.gauss(0, sensorSigmas.gps_n) # Update GPS N
+             SN.gps_n = trueSensors.gps_n + C_noise_GPSN + self.rng.gauss(0, sensorSigmas.gps_n) # Update GPS N
 
-             SN.gps_e = trueSensors.gps_e + C_noise_GPS_E + random.gauss(0, sensorSigmas.gps_e)  # Update GPS E
+             SN.gps_e = trueSensors.gps_e + C_noise_GPS_E + self.rng.gauss(0, sensorSigmas.gps_e)  # Update GPS E
 
-             SN.gps_alt = trueSensors.gps_alt + C_noise_GPS_alt + random.gauss(0, sensorSigmas.gps_alt)  # Update GPS alt
+             SN.gps_alt = trueSensors.gps_alt + C_noise_GPS_alt + self.rng.gauss(0, sensorSigmas.gps_alt)  # Update GPS alt
 
-             SN.gps_sog = trueSensors.gps_sog + random.gauss(0, sensorSigmas.gps_sog) # No Colored noise for sog
+             SN.gps_sog = trueSensors.gps_sog + self.rng.gauss(0, sensorSigmas.gps_sog) # No Colored noise for sog
 
             # Deal with and Trap COG
 
              if(math.isclose(0, trueSensors.gps_sog)): # If numerator of trap term is near or at 0 we need to trap it
                  
-                 SN.gps_cog = trueSensors.gps_cog + random.gauss(0, sensorSigmas.gps_cog) # If trap needed just use sigma COG
+                 SN.gps_cog = trueSensors.gps_cog + self.rng.gauss(0, sensorSigmas.gps_cog) # If trap needed just use sigma COG
 
              else:
                  
                  Trap_term = (sensorSigmas.gps_cog * VPC.InitialSpeed) / trueSensors.gps_sog # Term to check and trap if necessary from lecture
                  
-                 SN.gps_cog = trueSensors.gps_cog + random.gauss(0, Trap_term) # Otherwise use the trap term
+                 SN.gps_cog = trueSensors.gps_cog + self.rng.gauss(0, Trap_term) # Otherwise use the trap term
 
             # Wrap within Pi
 
@@ -531,34 +537,34 @@ class SensorsModel:
 
         C_gx, C_gy, C_gz = self.Gyro_GM_XYZ.update() # Get GM colored noise
 
-        SN.gyro_x = trueSensors.gyro_x + sensorBiases.gyro_x + C_gx + random.gauss(0, sensorSigmas.gyro_x) # Add noise gyro x
+        SN.gyro_x = trueSensors.gyro_x + sensorBiases.gyro_x + C_gx + self.rng.gauss(0, sensorSigmas.gyro_x) # Add noise gyro x
 
-        SN.gyro_y = trueSensors.gyro_y + sensorBiases.gyro_y + C_gy + random.gauss(0, sensorSigmas.gyro_y) # Add noise gyro y
+        SN.gyro_y = trueSensors.gyro_y + sensorBiases.gyro_y + C_gy + self.rng.gauss(0, sensorSigmas.gyro_y) # Add noise gyro y
 
-        SN.gyro_z = trueSensors.gyro_z + sensorBiases.gyro_z + C_gz + random.gauss(0, sensorSigmas.gyro_z) # Add noise gyro z
+        SN.gyro_z = trueSensors.gyro_z + sensorBiases.gyro_z + C_gz + self.rng.gauss(0, sensorSigmas.gyro_z) # Add noise gyro z
 
 
         # Update Accelerometers No Colored Noise
 
-        SN.accel_x = trueSensors.accel_x + sensorBiases.accel_x + random.gauss(0, sensorSigmas.accel_x) # Add noise accel x
+        SN.accel_x = trueSensors.accel_x + sensorBiases.accel_x + self.rng.gauss(0, sensorSigmas.accel_x) # Add noise accel x
 
-        SN.accel_y = trueSensors.accel_y + sensorBiases.accel_y + random.gauss(0, sensorSigmas.accel_y) # Add noise accel y
+        SN.accel_y = trueSensors.accel_y + sensorBiases.accel_y + self.rng.gauss(0, sensorSigmas.accel_y) # Add noise accel y
 
-        SN.accel_z = trueSensors.accel_z + sensorBiases.accel_z + random.gauss(0, sensorSigmas.accel_z) # Add noise accel z
+        SN.accel_z = trueSensors.accel_z + sensorBiases.accel_z + self.rng.gauss(0, sensorSigmas.accel_z) # Add noise accel z
 
         # Update Magnetometers No Colored Noise
 
-        SN.mag_x = trueSensors.mag_x + sensorBiases.mag_x + random.gauss(0, sensorSigmas.mag_x) # Add noise mag x
+        SN.mag_x = trueSensors.mag_x + sensorBiases.mag_x + self.rng.gauss(0, sensorSigmas.mag_x) # Add noise mag x
 
-        SN.mag_y = trueSensors.mag_y + sensorBiases.mag_y + random.gauss(0, sensorSigmas.mag_y) # Add noise mag y
+        SN.mag_y = trueSensors.mag_y + sensorBiases.mag_y + self.rng.gauss(0, sensorSigmas.mag_y) # Add noise mag y
 
-        SN.mag_z = trueSensors.mag_z + sensorBiases.mag_z + random.gauss(0, sensorSigmas.mag_z) # Add noise mag z
+        SN.mag_z = trueSensors.mag_z + sensorBiases.mag_z + self.rng.gauss(0, sensorSigmas.mag_z) # Add noise mag z
 
         # Update Baro and Pitot Again No colored Noise
 
-        SN.baro = trueSensors.baro  + sensorBiases.baro + random.gauss(0, sensorSigmas.baro) # Add noise to Barot
+        SN.baro = trueSensors.baro  + sensorBiases.baro + self.rng.gauss(0, sensorSigmas.baro) # Add noise to Barot
 
-        SN.pitot = trueSensors.pitot  + sensorBiases.pitot + random.gauss(0, sensorSigmas.pitot) # Add noise to Pitot
+        SN.pitot = trueSensors.pitot  + sensorBiases.pitot + self.rng.gauss(0, sensorSigmas.pitot) # Add noise to Pitot
 
         return SN # Return sensors Noisy
     
@@ -24,4 +24,4 @@ class Chapter3Simulate(Simulate.Simulate):
 	def reset(self):
 		self.time = 0
 		self.underlyingModel.reset()
-		self.takenData.clear()
\ No newline at end of file
+		self.clearData()
\ No newline at end of file
@@ -3,10 +3,10 @@ from ..Modeling import VehicleAerodynamicsModel
 from ..Constants import VehiclePhysicalConstants
 
 class Chapter4Simulate(Simulate.Simulate):
-	def __init__(self):
+	def __init__(self, rng=None):
 		super().__init__()
 		self.inputNames.extend(['Throttle', 'Aileron', 'Elevator', 'Rudder'])
-		self.underlyingModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel()
+		self.underlyingModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel(rng=rng)
 
 		# self.variableList.append((self.underlyingModel.getForcesMoments, 'ForceMoments',
 		# 							['Fx', 'Fy', 'Fz', 'Mx', 'My', 'Mz']))
@@ -28,4 +28,4 @@ class Chapter4Simulate(Simulate.Simulate):
 	def reset(self):
 		self.time = 0
 		self.underlyingModel.reset()
-		self.takenData.clear()
\ No newline at end of file
+		self.clearData()
\ No newline at end of file
@@ -4,10 +4,10 @@ from ..Containers.Inputs import controlInputs
 from ..Constants import VehiclePhysicalConstants
 
 class Chapter5Simulate(Simulate.Simulate):
-	def __init__(self):
+	def __init__(self, rng=None):
 		super().__init__()
 		self.inputNames.extend(['Throttle', 'Aileron', 'Elevator', 'Rudder'])
-		self.underlyingModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel()
+		self.underlyingModel = VehicleAerodynamicsModel.VehicleAerodynamicsModel(rng=rng)
 
 		# self.variableList.append((self.underlyingModel.getForcesMoments, 'ForceMoments',
 		# 							['Fx', 'Fy', 'Fz', 'Mx', 'My', 'Mz']))
@@ -32,4 +32,4 @@ class Chapter5Simulate(Simulate.Simulate):
 	def reset(self):
 		self.time = 0
 		self.underlyingModel.reset()
-		self.takenData.clear()
\ No newline at end of file
+		self.clearData()
\ No newline at end of file
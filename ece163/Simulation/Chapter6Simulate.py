@@ -5,10 +5,10 @@ from ece163.Controls.VehicleTrim import VehicleTrim
 from ..Constants import VehiclePhysicalConstants
 
 class Chapter6Simulate(Simulate.Simulate):
-	def __init__(self):
+	def __init__(self, rng=None):
 		super().__init__()
 		self.inputNames.extend(['commandedCourse', 'commandedAltitude', 'commandedAirspeed'])
-		self.underlyingModel = VehicleClosedLoopControl.VehicleClosedLoopControl()
+		self.underlyingModel = VehicleClosedLoopControl.VehicleClosedLoopControl(rng=rng)
 
 		# self.variableList.append((self.underlyingModel.getForcesMoments, 'ForceMoments',
 		# 							['Fx', 'Fy', 'Fz', 'Mx', 'My', 'Mz']))
@@ -33,4 +33,4 @@ class Chapter6Simulate(Simulate.Simulate):
 	def reset(self):
 		self.time = 0
 		self.underlyingModel.reset()
-		self.takenData.clear()
\ No newline at end of file
+		self.clearData()
\ No newline at end of file
@@ -6,10 +6,10 @@ from ..Constants import VehiclePhysicalConstants
 from ..Sensors import SensorsModel
 
 class Chapter7Simulate(Simulate.Simulate):
-	def __init__(self):
+	def __init__(self, rng=None):
 		super().__init__()
 		self.inputNames.extend(['commandedCourse', 'commandedAltitude', 'commandedAirspeed'])
-		self.underlyingModel = VehicleClosedLoopControl.VehicleClosedLoopControl(useSensors=True)
+		self.underlyingModel = VehicleClosedLoopControl.VehicleClosedLoopControl(useSensors=True, rng=rng)
 		self.sensorModel = self.underlyingModel.getSensorsModel()
 
 		# self.variableList.append((self.underlyingModel.getForcesMoments, 'ForceMoments',
@@ -39,4 +39,4 @@ class Chapter7Simulate(Simulate.Simulate):
 	def reset(self):
 		self.time = 0
 		self.underlyingModel.reset()
-		self.takenData.clear()
\ No newline at end of file
+		self.clearData()
\ No newline at end of file
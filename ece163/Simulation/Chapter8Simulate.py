@@ -6,10 +6,10 @@ from ..Constants import VehiclePhysicalConstants
 from ..Sensors import SensorsModel
 
 class Chapter8Simulate(Simulate.Simulate):
-	def __init__(self):
+	def __init__(self, rng=None):
 		super().__init__()
 		self.inputNames.extend(['commandedCourse', 'commandedAltitude', 'commandedAirspeed'])
-		self.underlyingModel = VehicleClosedLoopControl.VehicleClosedLoopControl(rudderControlSource='YAW', useSensors=True, useEstimator=True)
+		self.underlyingModel = VehicleClosedLoopControl.VehicleClosedLoopControl(rudderControlSource='YAW', useSensors=True, useEstimator=True, rng=rng)
 		self.sensorModel = self.underlyingModel.getSensorsModel()
 		self.vehicleEstimator = self.underlyingModel.getVehicleEstimator()
 
@@ -41,4 +41,4 @@ class Chapter8Simulate(Simulate.Simulate):
 	def reset(self):
 		self.time = 0
 		self.underlyingModel.reset()
-		self.takenData.clear()
\ No newline at end of file
+		self.clearData()
\ No newline at end of file
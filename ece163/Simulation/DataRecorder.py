@@ -0,0 +1,213 @@
+"""
+Columnar recorder for the Simulate classes. Rows are written into preallocated NumPy blocks of chunkSize rows (a new
+block is added when the last one is full, so nothing is ever copied while recording), and the result can be read back
+as named columns. It also behaves enough like the list of lists it replaces (len, clear, indexing and iterating rows)
+that existing users of Simulate.takenData keep working.
+
+Sinks (see DataSinks) can be added to stream the rows to disk: each chunk is handed to the sinks when it fills (and
+any partial chunk on flush and closeSinks), and with keepRows False the written chunks are dropped so the memory used
+stays at one chunk however long the run is (droppedRows counts them). clear closes the sinks, so a file only ever holds
+one run and its time column never goes back.
+"""
+import numpy
+
+class DataRecorder(object):
+	def __init__(self, columnNames=None, chunkSize=4096):
+		"""
+		Creates an empty recorder
+
+		:param columnNames: list of the names of the columns, or None to take the width from the first row appended
+		:param chunkSize: rows preallocated at a time
+		:return: none
+		"""
+		self.chunkSize = chunkSize
+		self.columnNames = list(columnNames) if columnNames is not None else list()
+		self.chunks = list()
+		self.rowCount = 0
+		self.chunkRow = chunkSize	# row to write in the last chunk, chunkSize when a new chunk is needed
+		self.sinks = list()
+		self.keepRows = True
+		self.sinkRow = 0	# rows of the last chunk already handed to the sinks
+		self.droppedRows = 0	# rows only the sinks have, since the last clear
+		return
+
+	def addSink(self, sink, keepRows=True):
+		"""
+		Streams rows to sink from now on; rows already held are written to it first, so it gets the whole run
+
+		:param sink: object with write(columnNames, rows) and close(), e.g. DataSinks.CSVSink
+		:param keepRows: False to drop the rows from memory once every sink has them
+		:return: none
+		"""
+		if self.chunks:
+			heldRows = self.asArray()[:self.rowCount - (self.chunkRow - self.sinkRow)]	# the rest goes out with the next flush
+			if len(heldRows):
+				sink.write(self.columnNames, heldRows)
+		self.sinks.append(sink)
+		self.keepRows = self.keepRows and keepRows
+		return
+
+	def flush(self):
+		"""
+		Hands the rows not yet written to the sinks
+
+		:return: none
+		"""
+		if not self.sinks or not self.chunks:
+			return
+		rows = self.chunks[-1][self.sinkRow:self.chunkRow]
+		if len(rows):
+			for sink in self.sinks:
+				sink.write(self.columnNames, rows)
+		self.sinkRow = self.chunkRow
+		return
+
+	def closeSinks(self):
+		"""
+		Flushes and closes every sink (each writes the column names if it got no rows), and stops streaming
+
+		:return: none
+		"""
+		self.flush()
+		for sink in self.sinks:
+			sink.close(self.columnNames)
+		self.sinks = list()
+		self.keepRows = True
+		return
+
+	def setChunkSize(self, chunkSize):
+		"""
+		Rows per chunk, which is also how often the sinks are written; can only change while the recorder is empty
+
+		:param chunkSize: rows preallocated at a time
+		:return: none
+		"""
+		if self.chunks:
+			raise ValueError("Cannot change the chunk size of a recorder holding {} rows".format(self.rowCount))
+		self.chunkSize = chunkSize
+		self.chunkRow = chunkSize
+		return
+
+	def setColumnNames(self, columnNames):
+		"""
+		Names the columns, which can only change while the recorder is empty
+
+		:param columnNames: list of column names
+		:return: none
+		"""
+		columnNames = list(columnNames)
+		if self.rowCount and columnNames != self.columnNames:
+			raise ValueError("Cannot change the columns of a recorder holding {} rows".format(self.rowCount))
+		self.columnNames = columnNames
+		return
+
+	def append(self, row):
+		"""
+		Stores one row, which must have one value per column
+
+		:param row: sequence of numbers
+		:return: none
+		"""
+		if self.chunkRow == self.chunkSize:
+			self.chunks.append(numpy.empty((self.chunkSize, len(self.columnNames) or len(row))))
+			self.chunkRow = 0
+			self.sinkRow = 0
+		self.chunks[-1][self.chunkRow] = row
+		self.chunkRow += 1
+		self.rowCount += 1
+		if self.sinks and self.chunkRow == self.chunkSize:
+			self.flush()
+			if not self.keepRows:
+				self.droppedRows += self.rowCount
+				self.chunks = list()
+				self.rowCount = 0
+		return
+
+	def clear(self):
+		"""
+		Drops all of the rows, keeping the column names. The sinks are handed any rows they do not have yet and closed,
+		so rows appended after this need a new sink rather than starting over in the same file.
+
+		:return: none
+		"""
+		self.closeSinks()
+		self.chunks = list()
+		self.rowCount = 0
+		self.chunkRow = self.chunkSize
+		self.sinkRow = 0
+		self.droppedRows = 0
+		return
+
+	def __len__(self):
+		return self.rowCount
+
+	def filledChunks(self):
+		"""
+		The chunks trimmed to the rows that were written
+
+		:return: list of 2D arrays (views, not copies)
+		"""
+		if not self.chunks:
+			return list()
+		return self.chunks[:-1] + [self.chunks[-1][:self.chunkRow]]
+
+	def asArray(self):
+		"""
+		All of the data as a single array
+
+		:return: array of [rows x columns]
+		"""
+		if not self.chunks:
+			return numpy.empty((0, len(self.columnNames)))
+		return numpy.concatenate(self.filledChunks())
+
+	def column(self, name):
+		"""
+		One column of the data
+
+		:param name: column name (e.g. 'time' or 'state.pn')
+		:return: 1D array with a value per row
+		"""
+		index = self.columnNames.index(name)
+		if not self.chunks:
+			return numpy.empty(0)
+		return numpy.concatenate([chunk[:, index] for chunk in self.filledChunks()])
+
+	def columns(self):
+		"""
+		Every column by name
+
+		:return: dictionary of name: 1D array
+		"""
+		data = self.asArray()
+		return {name: data[:, index] for index, name in enumerate(self.columnNames)}
+
+	def toList(self):
+		"""
+		The data as a list of rows, the format Simulate used to keep
+
+		:return: list of lists of floats
+		"""
+		return self.asArray().tolist()
+
+	def nbytes(self):
+		"""
+		Memory held by the buffers, including the unused part of the last chunk
+
+		:return: bytes
+		"""
+		return sum([chunk.nbytes for chunk in self.chunks])
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(self.rowCount))]
+		if index < 0:
+			index += self.rowCount
+		if not 0 <= index < self.rowCount:
+			raise IndexError("recorder index out of range")
+		return self.chunks[index // self.chunkSize][index % self.chunkSize].tolist()
+
+	def __iter__(self):
+		for chunk in self.filledChunks():
+			for row in chunk.tolist():
+				yield row
@@ -0,0 +1,151 @@
+"""
+Sinks that a DataRecorder streams its rows to while a simulation runs, so that long runs do not need to hold all of
+their data in memory and the files can be read while the run is in progress. Each sink receives the column names
+(the header Simulate builds from its variableList) and blocks of rows as they are flushed by the recorder, and the
+column names again when it is closed, so that a run that streamed no rows still leaves a file with its header.
+
+CSVSink writes the same layout as Simulate.exportToCSV. NpzSink writes a .npz (zip) file with the header in the
+member 'columnNames' and every flushed block as its own member 'chunkNNNNNN' [rows x columns]; the zip is closed
+after every block so the file is always complete, and loadNpz reads it back as named columns. Flight logs (.flog) are
+streamed by FlightLog.FlightLogSink.
+"""
+import csv
+import io
+import os
+import zipfile
+
+import numpy
+
+from . import FlightLog
+
+class CSVSink(object):
+	def __init__(self, filename):
+		"""
+		Streams rows to a csv file, header first
+
+		:param filename: path of the csv file (overwritten)
+		:return: none
+		"""
+		self.filename = filename
+		self.csvFile = open(filename, 'w', newline='')
+		self.dataFileWriter = csv.writer(self.csvFile)
+		self.headerWritten = False
+		return
+
+	def write(self, columnNames, rows):
+		"""
+		Appends a block of rows and flushes them to disk
+
+		:param columnNames: list of the column names, written before the first block
+		:param rows: 2D array of [rows x columns]
+		:return: none
+		"""
+		if not self.headerWritten:
+			self.dataFileWriter.writerow(columnNames)
+			self.headerWritten = True
+		self.dataFileWriter.writerows(rows.tolist())
+		self.csvFile.flush()
+		return
+
+	def close(self, columnNames=None):
+		"""
+		Closes the file, writing the header first if no rows were written
+
+		:param columnNames: list of the column names, None to leave the file as it is
+		:return: none
+		"""
+		if not self.headerWritten and columnNames is not None:
+			self.dataFileWriter.writerow(columnNames)
+			self.headerWritten = True
+		self.csvFile.close()
+		return
+
+
+class NpzSink(object):
+	def __init__(self, filename):
+		"""
+		Streams rows to a .npz file as one member per block
+
+		:param filename: path of the npz file (overwritten)
+		:return: none
+		"""
+		self.filename = filename
+		self.chunkCount = 0
+		with zipfile.ZipFile(filename, 'w'):
+			pass
+		return
+
+	def writeArray(self, name, array):
+		"""
+		Adds one array to the file as the member name.npy
+
+		:param name: member name
+		:param array: array to store
+		:return: none
+		"""
+		buffer = io.BytesIO()
+		numpy.lib.format.write_array(buffer, numpy.asanyarray(array), allow_pickle=False)
+		with zipfile.ZipFile(self.filename, 'a') as npzFile:
+			npzFile.writestr(name + '.npy', buffer.getvalue())
+		return
+
+	def write(self, columnNames, rows):
+		"""
+		Appends a block of rows as a new member
+
+		:param columnNames: list of the column names, written with the first block
+		:param rows: 2D array of [rows x columns]
+		:return: none
+		"""
+		if self.chunkCount == 0:
+			self.writeArray('columnNames', numpy.array(columnNames))
+		self.writeArray('chunk{:06d}'.format(self.chunkCount), rows)
+		self.chunkCount += 1
+		return
+
+	def close(self, columnNames=None):
+		"""
+		Writes the column names if no rows were written, otherwise nothing to do as the file is complete after every block
+
+		:param columnNames: list of the column names, None to leave the file as it is
+		:return: none
+		"""
+		if self.chunkCount == 0 and columnNames is not None:
+			self.writeArray('columnNames', numpy.array(columnNames))
+		return
+
+
+def openSink(filename):
+	"""
+	Sink matching the file extension
+
+	:param filename: .csv, .npz or .flog path
+	:return: CSVSink, NpzSink or FlightLog.FlightLogSink
+	"""
+	extension = os.path.splitext(filename)[1].lower()
+	if extension == '.csv':
+		return CSVSink(filename)
+	if extension == '.npz':
+		return NpzSink(filename)
+	if extension == '.flog':
+		return FlightLog.FlightLogSink(filename)
+	raise ValueError("Unknown stream format '{}', use .csv, .npz or .flog".format(extension))
+
+
+def loadNpz(filename):
+	"""
+	Reads a file written by NpzSink, including one that is still being written
+
+	:param filename: path of the npz file
+	:return: (list of column names, dictionary of name: 1D array)
+	"""
+	with numpy.load(filename) as npzFile:
+		if 'columnNames' not in npzFile.files:
+			return list(), dict()
+		columnNames = npzFile['columnNames'].tolist()
+		chunkNames = sorted([name for name in npzFile.files if name.startswith('chunk')])
+		if chunkNames:
+			data = numpy.concatenate([npzFile[name] for name in chunkNames])
+		else:
+			data = numpy.empty((0, len(columnNames)))
+	return columnNames, {name: data[:, index] for index, name in enumerate(columnNames)}
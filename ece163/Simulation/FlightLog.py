@@ -0,0 +1,224 @@
+"""
+Fixed record binary flight log (.flog): a short header naming the columns (the header Simulate builds from its
+variableList) followed by the rows as little endian float64, one fixed size record per simulation step. The number of
+rows is not stored, it follows from the file size, so the log can be appended to while it is being read.
+
+File layout:
+	magic b'ECE163FL', uint32 version, uint32 number of columns, uint32 length of the column names
+	column names as a JSON list (utf-8), zero padded so the rows start on a multiple of 64 bytes
+	rows of [columns] float64
+
+FlightLog opens a log with numpy.memmap, so columns, row ranges and time ranges are views into the file and only the
+parts that are touched get read, however large the log is.
+"""
+import json
+import os
+import struct
+
+import numpy
+
+fileMagic = b'ECE163FL'
+fileVersion = 1
+headerStruct = struct.Struct('<8sIII')
+dataAlignment = 64
+rowType = numpy.dtype('<f8')
+
+
+def buildHeader(columnNames):
+	"""
+	Bytes of the log header, padded to the start of the rows
+
+	:param columnNames: list of column names
+	:return: bytes
+	"""
+	names = json.dumps(list(columnNames)).encode('utf-8')
+	header = headerStruct.pack(fileMagic, fileVersion, len(columnNames), len(names)) + names
+	return header + bytes(-len(header) % dataAlignment)
+
+
+def readHeader(logFile):
+	"""
+	Reads the header of an open log
+
+	:param logFile: file opened in binary mode, positioned at the start
+	:return: (list of column names, byte offset of the first row)
+	"""
+	fixedPart = logFile.read(headerStruct.size)
+	if len(fixedPart) < headerStruct.size:
+		raise ValueError("File is too short to be a flight log")
+	magic, version, columnCount, namesLength = headerStruct.unpack(fixedPart)
+	if magic != fileMagic:
+		raise ValueError("Not a flight log (magic {!r})".format(magic))
+	if version != fileVersion:
+		raise ValueError("Flight log version {} is not supported, expected {}".format(version, fileVersion))
+	columnNames = json.loads(logFile.read(namesLength).decode('utf-8'))
+	if len(columnNames) != columnCount:
+		raise ValueError("Flight log header names {} columns but has {} names".format(columnCount, len(columnNames)))
+	headerLength = headerStruct.size + namesLength
+	return columnNames, headerLength + (-headerLength % dataAlignment)
+
+
+class FlightLogSink(object):
+	def __init__(self, filename):
+		"""
+		Streams rows to a flight log (a DataRecorder sink, see DataSinks)
+
+		:param filename: path of the log (overwritten)
+		:return: none
+		"""
+		self.filename = filename
+		self.logFile = open(filename, 'wb')
+		self.headerWritten = False
+		return
+
+	def write(self, columnNames, rows):
+		"""
+		Appends a block of rows and flushes them to disk
+
+		:param columnNames: list of the column names, written before the first block
+		:param rows: 2D array of [rows x columns]
+		:return: none
+		"""
+		if not self.headerWritten:
+			self.logFile.write(buildHeader(columnNames))
+			self.headerWritten = True
+		self.logFile.write(numpy.ascontiguousarray(rows, dtype=rowType).tobytes())
+		self.logFile.flush()
+		return
+
+	def close(self, columnNames=None):
+		"""
+		Closes the file, writing the header first if no rows were written
+
+		:param columnNames: list of the column names, None to leave the file as it is
+		:return: none
+		"""
+		if not self.headerWritten and columnNames is not None:
+			self.logFile.write(buildHeader(columnNames))
+			self.headerWritten = True
+		self.logFile.close()
+		return
+
+
+def writeFlightLog(filename, columnNames, data):
+	"""
+	Writes a whole flight log at once
+
+	:param filename: path of the log (overwritten)
+	:param columnNames: list of column names
+	:param data: rows of [columns] (2D array or list of lists)
+	:return: none
+	"""
+	sink = FlightLogSink(filename)
+	try:
+		sink.write(columnNames, numpy.asarray(data, dtype=rowType).reshape(-1, len(columnNames)))
+	finally:
+		sink.close()
+	return
+
+
+class FlightLog(object):
+	def __init__(self, filename):
+		"""
+		Opens a flight log for reading without loading it
+
+		:param filename: path of the log
+		:return: none
+		"""
+		self.filename = filename
+		with open(filename, 'rb') as logFile:
+			self.columnNames, self.dataOffset = readHeader(logFile)
+		self.columnIndex = {name: index for index, name in enumerate(self.columnNames)}
+		self.data = None
+		self.refresh()
+		return
+
+	def refresh(self):
+		"""
+		Maps the rows again, to pick up any appended since the log was opened (a partly written last row is left out)
+
+		:return: number of rows
+		"""
+		rowBytes = rowType.itemsize * len(self.columnNames)
+		rowCount = max(os.path.getsize(self.filename) - self.dataOffset, 0) // rowBytes if rowBytes else 0
+		if rowCount == 0:
+			self.data = numpy.empty((0, len(self.columnNames)), dtype=rowType)
+		else:
+			self.data = numpy.memmap(self.filename, dtype=rowType, mode='r', offset=self.dataOffset, shape=(rowCount, len(self.columnNames)))
+		return rowCount
+
+	def close(self):
+		"""
+		Releases the mapping; views taken from the log keep it alive until they are gone
+
+		:return: none
+		"""
+		self.data = None
+		return
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		self.close()
+		return False
+
+	def __len__(self):
+		return len(self.data)
+
+	def column(self, name):
+		"""
+		One column as a view into the file
+
+		:param name: column name (e.g. 'time' or 'state.pn')
+		:return: 1D array view
+		"""
+		if name not in self.columnIndex:
+			raise KeyError("No column '{}' in {}".format(name, self.filename))
+		return self.data[:, self.columnIndex[name]]
+
+	def __getitem__(self, name):
+		return self.column(name)
+
+	def columns(self, rows=slice(None)):
+		"""
+		Every column by name, optionally for a range of rows only
+
+		:param rows: slice of rows
+		:return: dictionary of name: 1D array view
+		"""
+		data = self.data[rows]
+		return {name: data[:, index] for index, name in enumerate(self.columnNames)}
+
+	def rows(self, start=None, stop=None):
+		"""
+		A range of rows as a view into the file
+
+		:param start: first row
+		:param stop: one past the last row
+		:return: 2D array view of [rows x columns]
+		"""
+		return self.data[start:stop]
+
+	def timeRange(self, startTime=-numpy.inf, endTime=numpy.inf, timeColumn='time'):
+		"""
+		Rows with startTime <= time < endTime, found by bisection (the time column must not decrease)
+
+		:param startTime: start of the range [s]
+		:param endTime: end of the range [s]
+		:param timeColumn: name of the time column
+		:return: slice of rows
+		"""
+		times = self.column(timeColumn)
+		return slice(int(numpy.searchsorted(times, startTime, 'left')), int(numpy.searchsorted(times, endTime, 'left')))
+
+	def timeSlice(self, startTime=-numpy.inf, endTime=numpy.inf, timeColumn='time'):
+		"""
+		Every column by name for the rows with startTime <= time < endTime
+
+		:param startTime: start of the range [s]
+		:param endTime: end of the range [s]
+		:param timeColumn: name of the time column
+		:return: dictionary of name: 1D array view
+		"""
+		return self.columns(self.timeRange(startTime, endTime, timeColumn))
@@ -0,0 +1,303 @@
+"""
+Plays back a recorded flight without running any physics. The recording is whatever Simulate exported or streamed
+(DataExport's .csv, .pickle and .flog, or a streamed .npz), opened by openLog as an object with the same reading
+interface as FlightLog.FlightLog (columnNames, len, column and rows), and FlightReplay keeps a replay time that can be
+advanced at any speed or moved to any time, handing back the rows passed so a display can draw them.
+
+Seeking is a bisection of the time column, which serves as the index of the recording:
+	.flog     the file is memory mapped, so the time column and the rows drawn are the only parts ever read
+	.csv      opening reads each line once, keeping only its time and byte offset; rows are parsed when asked for
+	.pickle   loaded whole, the format cannot be read in parts
+	.npz      loaded whole with DataSinks.loadNpz
+"""
+import io
+import os
+import pickle
+
+import numpy
+
+from ..Containers import States
+from . import DataSinks
+from . import FlightLog
+
+
+class ArrayLog(object):
+	def __init__(self, columnNames, data, filename=''):
+		"""
+		Recording held in memory, read like a FlightLog
+
+		:param columnNames: list of column names
+		:param data: rows of [columns] (2D array or list of lists)
+		:param filename: file the rows came from, for error messages
+		:return: none
+		"""
+		self.filename = filename
+		self.columnNames = list(columnNames)
+		self.columnIndex = {name: index for index, name in enumerate(self.columnNames)}
+		self.data = numpy.asarray(data, dtype=float).reshape(-1, len(self.columnNames))
+		return
+
+	def __len__(self):
+		return len(self.data)
+
+	def column(self, name):
+		"""
+		One column
+
+		:param name: column name (e.g. 'time' or 'state.pn')
+		:return: 1D array view
+		"""
+		if name not in self.columnIndex:
+			raise KeyError("No column '{}' in {}".format(name, self.filename))
+		return self.data[:, self.columnIndex[name]]
+
+	def rows(self, start=None, stop=None):
+		"""
+		A range of rows
+
+		:param start: first row
+		:param stop: one past the last row
+		:return: 2D array view of [rows x columns]
+		"""
+		return self.data[start:stop]
+
+
+class CSVLog(object):
+	def __init__(self, filename, timeColumn='time'):
+		"""
+		Opens a csv recording (header line then one row per line, as written by Simulate.exportToCSV) by reading the
+		time and byte offset of every row, without parsing the rest
+
+		:param filename: path of the csv file
+		:param timeColumn: name of the time column
+		:return: none
+		"""
+		self.filename = filename
+		times = list()
+		offsets = list()
+		with open(filename, 'rb') as csvFile:
+			header = csvFile.readline()
+			self.columnNames = header.decode('utf-8').strip().split(',')
+			self.columnIndex = {name: index for index, name in enumerate(self.columnNames)}
+			if timeColumn not in self.columnIndex:
+				raise ValueError("No time column '{}' in {}".format(timeColumn, filename))
+			timeIndex = self.columnIndex[timeColumn]
+			offset = len(header)
+			for line in csvFile:
+				if line.strip():
+					times.append(float(line.split(b',', timeIndex + 1)[timeIndex]))
+					offsets.append(offset)
+				offset += len(line)
+		self.timeColumn = timeColumn
+		self.times = numpy.array(times, dtype=float)
+		self.offsets = numpy.array(offsets + [offset], dtype=numpy.int64)	# one past the last row is the end of the file
+		return
+
+	def __len__(self):
+		return len(self.times)
+
+	def column(self, name):
+		"""
+		One column, parsing every row unless it is the time column
+
+		:param name: column name (e.g. 'time' or 'state.pn')
+		:return: 1D array
+		"""
+		if name not in self.columnIndex:
+			raise KeyError("No column '{}' in {}".format(name, self.filename))
+		if name == self.timeColumn:
+			return self.times
+		return self.rows()[:, self.columnIndex[name]]
+
+	def rows(self, start=None, stop=None):
+		"""
+		A range of rows, read from the file and parsed
+
+		:param start: first row
+		:param stop: one past the last row
+		:return: 2D array of [rows x columns]
+		"""
+		start, stop, step = slice(start, stop).indices(len(self))
+		if stop <= start:
+			return numpy.empty((0, len(self.columnNames)))
+		with open(self.filename, 'rb') as csvFile:
+			csvFile.seek(self.offsets[start])
+			block = csvFile.read(self.offsets[stop] - self.offsets[start])
+		return numpy.loadtxt(io.BytesIO(block), delimiter=',', ndmin=2).reshape(-1, len(self.columnNames))
+
+
+def loadPickle(filename):
+	"""
+	Reads a file written by Simulate.exportToPickle
+
+	:param filename: path of the pickle file
+	:return: ArrayLog
+	"""
+	with open(filename, 'rb') as f:
+		columnNames, data = pickle.load(f)
+	return ArrayLog(columnNames, data, filename)
+
+
+def openLog(filename):
+	"""
+	Opens a recording for replay, matching the file extension
+
+	:param filename: .flog, .csv, .pickle or .npz path
+	:return: FlightLog.FlightLog, CSVLog or ArrayLog
+	"""
+	extension = os.path.splitext(filename)[1].lower()
+	if extension == '.flog':
+		return FlightLog.FlightLog(filename)
+	if extension == '.csv':
+		return CSVLog(filename)
+	if extension == '.pickle':
+		return loadPickle(filename)
+	if extension == '.npz':
+		columnNames, columns = DataSinks.loadNpz(filename)
+		if not columnNames:
+			raise ValueError("No rows written to {} yet".format(filename))
+		return ArrayLog(columnNames, numpy.stack([columns[name] for name in columnNames], axis=1), filename)
+	raise ValueError("Unknown recording format '{}', use .flog, .csv, .pickle or .npz".format(extension))
+
+
+def groupColumns(columnNames, timeColumn='time'):
+	"""
+	Groups the columns by the model they were recorded from, the part of the name before the '.' (inputs have none)
+
+	:param columnNames: list of column names
+	:param timeColumn: name of the time column, left out
+	:return: list of (group name, list of column names) in the order of the columns
+	"""
+	groups = dict()
+	for name in columnNames:
+		if name == timeColumn:
+			continue
+		groupName = name.split('.', 1)[0] if '.' in name else 'inputs'
+		groups.setdefault(groupName, list()).append(name)
+	return list(groups.items())
+
+
+class FlightReplay(object):
+	def __init__(self, log, timeColumn='time', statePrefix='state.'):
+		"""
+		Replay of a recording, starting at its first row
+
+		:param log: recording opened by openLog (or anything read like a FlightLog)
+		:param timeColumn: name of the time column, whose values must not decrease
+		:param statePrefix: prefix of the columns of the vehicle state, state members not recorded are zero
+		:return: none
+		"""
+		self.log = log
+		self.timeColumn = timeColumn
+		self.columnIndex = {name: index for index, name in enumerate(log.columnNames)}
+		self.stateIndices = [self.columnIndex.get(statePrefix + name) for name in States.vehicleState.arrayNames]
+		self.speed = 1.0
+		self.refresh()
+		if len(self.times) == 0:
+			raise ValueError("Recording {} has no rows to replay".format(getattr(log, 'filename', '')))
+		self.index = 0
+		self.time = float(self.times[0])
+		return
+
+	def refresh(self):
+		"""
+		Picks up rows appended to a recording that is still being written (only flight logs can be)
+
+		:return: number of rows
+		"""
+		if hasattr(self.log, 'refresh'):
+			self.log.refresh()
+		self.times = self.log.column(self.timeColumn)
+		return len(self.times)
+
+	def __len__(self):
+		return len(self.times)
+
+	def getStartTime(self):
+		return float(self.times[0])
+
+	def getEndTime(self):
+		return float(self.times[-1])
+
+	def setSpeed(self, speed):
+		"""
+		Sets the recorded seconds played per wall clock second
+
+		:param speed: replay speed, > 0
+		"""
+		if not speed > 0:
+			raise ValueError("Replay speed must be positive, not {}".format(speed))
+		self.speed = speed
+		return
+
+	def getSpeed(self):
+		return self.speed
+
+	def isFinished(self):
+		return self.time >= self.times[-1]
+
+	def seek(self, time):
+		"""
+		Moves the replay to time, which shows the last row recorded at or before it
+
+		:param time: replay time, clamped to the recording [s]
+		:return: index of the row shown
+		"""
+		self.time = min(max(float(time), float(self.times[0])), float(self.times[-1]))
+		self.index = max(int(numpy.searchsorted(self.times, self.time, 'right')) - 1, 0)
+		return self.index
+
+	def seekIndex(self, index):
+		"""
+		Moves the replay to a row
+
+		:param index: row to show, clamped to the recording
+		:return: index of the row shown
+		"""
+		self.index = min(max(int(index), 0), len(self.times) - 1)
+		self.time = float(self.times[self.index])
+		return self.index
+
+	def advance(self, wallTime):
+		"""
+		Plays wallTime of wall clock time at the replay speed
+
+		:param wallTime: wall clock time since the last advance [s]
+		:return: slice of the rows passed, the row now shown last (empty if no new row was reached)
+		"""
+		previousIndex = self.index
+		self.seek(self.time + wallTime * self.speed)
+		return slice(previousIndex + 1, self.index + 1)
+
+	def history(self, maxRows=None):
+		"""
+		Rows up to the one shown, e.g. to draw the plots again after a seek
+
+		:param maxRows: most rows to return (the latest), None for every row from the start
+		:return: slice of rows
+		"""
+		start = 0 if maxRows is None else max(self.index + 1 - maxRows, 0)
+		return slice(start, self.index + 1)
+
+	def getValues(self, names, rows):
+		"""
+		Times and some columns of a range of rows
+
+		:param names: list of column names
+		:param rows: slice of rows (from advance or history)
+		:return: (times [n], values [n x len(names)])
+		"""
+		indices = [self.columnIndex[name] for name in names]
+		return numpy.asarray(self.times[rows]), numpy.asarray(self.log.rows(rows.start, rows.stop))[:, indices]
+
+	def getState(self, index=None):
+		"""
+		Vehicle state recorded in a row
+
+		:param index: row, the one shown if None
+		:return: vehicleState
+		"""
+		if index is None:
+			index = self.index
+		row = self.log.rows(index, index + 1)[0]
+		return States.vehicleState.fromArray([0.0 if column is None else float(row[column]) for column in self.stateIndices])
@@ -0,0 +1,251 @@
+"""
+Monte Carlo dispersion sweep of the Chapter8Simulate closed loop: fans independent runs out across a multiprocessing
+pool and streams a summary of each run back to the parent as it finishes.
+
+Every run owns a random.Random seeded from the base seed and its run index, which is threaded into the wind model and
+the sensor noise (WindModel, GaussMarkov/GaussMarkovXYZ and SensorsModel), so a run never touches the global random
+module and its results do not depend on the number of processes, the order the runs finish, or what else ran in the
+same worker. Trim and gains are computed once in the parent and shipped to the workers.
+
+Each run is dispersed by a steady wind drawn uniformly from [-maxSteadyWind, maxSteadyWind] in north and east (and a
+fifth of that in down), plus Dryden gusts when drydenParameters is given. With a log directory every run also streams
+its full recording to a flight log (see FlightLog) for later querying.
+
+Usage: python -m ece163.Simulation.MonteCarloSweep 1000 --seed 7 --duration 60 --processes 8 --output sweep.csv
+"""
+
+import argparse
+import csv
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from ..Constants import VehiclePhysicalConstants as VPC
+from ..Containers import Controls
+from . import Chapter8Simulate
+from .__main__ import loadSchedule, setupTrimAndGains
+
+# columns of the per run summary, in the order they are written to the csv
+summaryNames = ['index', 'seed', 'Wn', 'We', 'Wd', 'rmsAltitudeError', 'maxAltitudeError', 'rmsCourseError',
+				'maxCourseError', 'rmsAirspeedError', 'maxAirspeedError', 'minAltitude', 'finalNorth', 'finalEast',
+				'finalAltitude', 'wallTime']
+
+
+def runSeed(baseSeed, index):
+	"""
+	Seed of a single run, derived from the sweep seed and the run index only so any run can be repeated on its own
+
+	:param baseSeed: seed of the whole sweep
+	:param index: run number within the sweep
+	:return: string seed for random.Random
+	"""
+	return "{}-{}".format(baseSeed, index)
+
+
+def wrapAngle(angle):
+	"""
+	Wraps an angle into [-pi, pi)
+
+	:param angle: angle [rad]
+	:return: wrapped angle [rad]
+	"""
+	return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def runSample(sample):
+	"""
+	Runs one dispersed Chapter8Simulate flight. Top level so that it can be pickled to the pool workers.
+
+	:param sample: (index, baseSeed, settings) where settings is the dictionary built by buildSettings
+	:return: dictionary of the summaryNames for this run
+	"""
+	index, baseSeed, settings = sample
+	seed = runSeed(baseSeed, index)
+	rng = random.Random(seed)
+	startTime = time.perf_counter()
+
+	simulateInstance = Chapter8Simulate.Chapter8Simulate(rng=rng)
+	simulateInstance.underlyingModel.setTrimInputs(settings['trimControls'])
+	simulateInstance.underlyingModel.setControlGains(settings['gains'])
+	if settings['logDirectory'] is not None:	# full recording of the run, streamed so the worker holds one chunk
+		simulateInstance.streamToFile(os.path.join(settings['logDirectory'], 'run_{:06d}.flog'.format(index)), keepData=False)
+
+	maxSteadyWind = settings['maxSteadyWind']
+	Wn = rng.uniform(-maxSteadyWind, maxSteadyWind)
+	We = rng.uniform(-maxSteadyWind, maxSteadyWind)
+	Wd = rng.uniform(-maxSteadyWind, maxSteadyWind) / 5
+	windModel = simulateInstance.underlyingModel.getVehicleAerodynamicsModel().getWindModel()
+	drydenParameters = settings['drydenParameters']
+	windModel.setWindModelParameters(Wn, We, Wd, VPC.DrydenNoWind if drydenParameters is None else drydenParameters)
+
+	commands = Controls.referenceCommands()
+	for name, value in settings['commands'].items():
+		setattr(commands, name, value)
+	schedule = settings['schedule']
+	nextEntry = 0
+
+	numSteps = int(round(settings['duration'] / VPC.dT))
+	sumSquares = [0.0, 0.0, 0.0]
+	maxErrors = [0.0, 0.0, 0.0]
+	minAltitude = math.inf
+	for step in range(numSteps):
+		simTime = step * VPC.dT
+		while nextEntry < len(schedule) and schedule[nextEntry][0] <= simTime + VPC.dT / 2:
+			for name, value in schedule[nextEntry][1].items():
+				setattr(commands, name, value)
+			nextEntry += 1
+		if drydenParameters is not None:
+			windModel.Update()	# the aerodynamics model does not step the gusts itself
+		simulateInstance.takeStep(commands)
+
+		state = simulateInstance.getVehicleState()
+		errors = [-state.pd - commands.commandedAltitude, wrapAngle(state.chi - commands.commandedCourse),
+				  state.Va - commands.commandedAirspeed]
+		for n, error in enumerate(errors):
+			sumSquares[n] += error ** 2
+			maxErrors[n] = max(maxErrors[n], abs(error))
+		minAltitude = min(minAltitude, -state.pd)
+
+	if settings['logDirectory'] is not None:
+		simulateInstance.closeStream()
+
+	state = simulateInstance.getVehicleState()
+	rms = [math.sqrt(total / max(numSteps, 1)) for total in sumSquares]
+	return {'index': index, 'seed': seed, 'Wn': Wn, 'We': We, 'Wd': Wd,
+			'rmsAltitudeError': rms[0], 'maxAltitudeError': maxErrors[0],
+			'rmsCourseError': rms[1], 'maxCourseError': maxErrors[1],
+			'rmsAirspeedError': rms[2], 'maxAirspeedError': maxErrors[2],
+			'minAltitude': minAltitude, 'finalNorth': state.pn, 'finalEast': state.pe, 'finalAltitude': -state.pd,
+			'wallTime': time.perf_counter() - startTime}
+
+
+def buildSettings(duration=60.0, commands=None, schedule=None, trimParameters=None, gains=None, tuning=None,
+				  maxSteadyWind=5.0, drydenParameters=None, logDirectory=None):
+	"""
+	Trims the vehicle and computes the gains once, and packs everything a run needs into a picklable dictionary
+
+	:param duration: simulated time of each run [s]
+	:param commands: dictionary of referenceCommands attributes held from the start, defaults to the trim altitude and airspeed
+	:param schedule: list of (time, {attribute: value}) as returned by loadSchedule, or None
+	:param trimParameters: (airspeed [m/s], climb angle [deg], turn radius [m]), defaults to straight and level at VPC.InitialSpeed
+	:param gains: controlGains to use, takes priority over tuning
+	:param tuning: controlTuning used to compute the gains, defaults to the runner's defaultTuning
+	:param maxSteadyWind: half width of the uniform steady wind dispersion [m/s]
+	:param drydenParameters: Dryden gust parameters, or None for steady wind only
+	:param logDirectory: directory to write a flight log of every run to (run_NNNNNN.flog), or None for summaries only
+	:return: settings dictionary for runSample
+	"""
+	if logDirectory is not None:
+		os.makedirs(logDirectory, exist_ok=True)
+	templateInstance = Chapter8Simulate.Chapter8Simulate()
+	setupTrimAndGains(templateInstance, 8, trimParameters, gains, tuning)
+	if commands is None:
+		commands = {'commandedAirspeed': VPC.InitialSpeed if trimParameters is None else trimParameters[0]}
+	return {'duration': duration, 'commands': dict(commands), 'schedule': list(schedule) if schedule is not None else list(),
+			'trimControls': templateInstance.underlyingModel.getTrimInputs(),
+			'gains': templateInstance.underlyingModel.getControlGains(),
+			'maxSteadyWind': maxSteadyWind, 'drydenParameters': drydenParameters, 'logDirectory': logDirectory}
+
+
+def iterateSweep(numRuns, baseSeed=0, settings=None, processes=None, chunksize=1):
+	"""
+	Runs the sweep and yields each run summary as soon as it finishes (not in index order when run in a pool)
+
+	:param numRuns: number of runs
+	:param baseSeed: seed of the whole sweep
+	:param settings: dictionary from buildSettings, defaults to buildSettings()
+	:param processes: pool size, None for one per CPU, 0 to run serially in this process
+	:param chunksize: runs handed to a worker at a time
+	:return: generator of run summary dictionaries
+	"""
+	if settings is None:
+		settings = buildSettings()
+	samples = [(index, baseSeed, settings) for index in range(numRuns)]
+	if processes == 0:
+		for sample in samples:
+			yield runSample(sample)
+		return
+	with multiprocessing.Pool(processes) as pool:
+		for summary in pool.imap_unordered(runSample, samples, chunksize):
+			yield summary
+	return
+
+
+def runSweep(numRuns, baseSeed=0, settings=None, processes=None, chunksize=1, output=None, callback=None):
+	"""
+	Runs the sweep, optionally writing each run summary to a csv file as it arrives
+
+	:param numRuns: number of runs
+	:param baseSeed: seed of the whole sweep
+	:param settings: dictionary from buildSettings, defaults to buildSettings()
+	:param processes: pool size, None for one per CPU, 0 to run serially in this process
+	:param chunksize: runs handed to a worker at a time
+	:param output: csv filename for the run summaries (in the order they finished), or None
+	:param callback: function called with each run summary as it arrives, or None
+	:return: list of run summaries sorted by index
+	"""
+	results = list()
+	csvFile = open(output, 'w', newline='') if output is not None else None
+	try:
+		if csvFile is not None:
+			writer = csv.DictWriter(csvFile, fieldnames=summaryNames)
+			writer.writeheader()
+		for summary in iterateSweep(numRuns, baseSeed, settings, processes, chunksize):
+			results.append(summary)
+			if csvFile is not None:
+				writer.writerow(summary)
+				csvFile.flush()
+			if callback is not None:
+				callback(summary)
+	finally:
+		if csvFile is not None:
+			csvFile.close()
+	results.sort(key=lambda summary: summary['index'])
+	return results
+
+
+def main(argv=None):
+	"""
+	Entry point of python -m ece163.Simulation.MonteCarloSweep
+
+	:param argv: argument list (defaults to sys.argv[1:])
+	:return: process exit code
+	"""
+	parser = argparse.ArgumentParser(prog='python -m ece163.Simulation.MonteCarloSweep', description="Monte Carlo dispersion sweep of Chapter8Simulate")
+	parser.add_argument('runs', type=int, help='number of runs')
+	parser.add_argument('--seed', default='0', help='sweep seed, each run is seeded with "<seed>-<index>"')
+	parser.add_argument('--duration', type=float, default=60.0, help='simulated time of each run [s] (default 60)')
+	parser.add_argument('--schedule', default=None, help='JSON reference command schedule (see python -m ece163.Simulation)')
+	parser.add_argument('--trim', type=float, nargs=3, metavar=('AIRSPEED', 'CLIMB_DEG', 'TURN_RADIUS'), default=None,
+						help='trim condition (turn radius inf for straight flight)')
+	parser.add_argument('--wind', type=float, default=5.0, help='half width of the steady wind dispersion [m/s] (default 5)')
+	parser.add_argument('--gusts', default=None, choices=[name for name, parameters in VPC.GustWinds],
+						help='add Dryden gusts of this type')
+	parser.add_argument('--processes', type=int, default=None, help='pool size (default one per CPU, 0 for serial)')
+	parser.add_argument('--output', default=None, help='write the run summaries to this .csv file as they finish')
+	parser.add_argument('--logs', default=None, help='directory to write a flight log (.flog) of every run to')
+	arguments = parser.parse_args(argv)
+
+	drydenParameters = dict(VPC.GustWinds)[arguments.gusts] if arguments.gusts else None
+	schedule = loadSchedule(arguments.schedule, 8) if arguments.schedule else None
+	settings = buildSettings(arguments.duration, schedule=schedule, trimParameters=tuple(arguments.trim) if arguments.trim else None,
+							 maxSteadyWind=arguments.wind, drydenParameters=drydenParameters, logDirectory=arguments.logs)
+
+	startTime = time.perf_counter()
+	results = runSweep(arguments.runs, arguments.seed, settings, arguments.processes, output=arguments.output)
+	wallTime = time.perf_counter() - startTime
+
+	print("{} runs of {:.1f} s in {:.2f} s wall clock ({:.1f} s of run time)".format(
+		len(results), arguments.duration, wallTime, sum([summary['wallTime'] for summary in results])))
+	for name in ['rmsAltitudeError', 'maxAltitudeError', 'rmsCourseError', 'rmsAirspeedError', 'minAltitude']:
+		values = [summary[name] for summary in results]
+		if values:
+			print("   {:18s} mean {: 10.4f}  min {: 10.4f}  max {: 10.4f}".format(name, sum(values) / len(values), min(values), max(values)))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
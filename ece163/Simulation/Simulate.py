@@ -3,7 +3,12 @@ For consistency we need a class to actually run the simulation. This stub class
 Useless without subclassing.
 """
 import csv
+import operator
 import pickle
+from . import DataRecorder
+from . import DataSinks
+from . import FlightLog
+from ..Utilities import StageProfiler
 
 class Simulate(object):
 	def __init__(self):
@@ -13,7 +18,10 @@ class Simulate(object):
 		self.variableList = list()
 		self.inputNames = list()
 		self.underlyingModel = None
-		self.takenData = list()
+		self.takenData = DataRecorder.DataRecorder()
+		self.recordAccessors = None	# built from variableList when recording starts
+		self.streamFilenames = list()	# files opened by streamToFile since the last reset
+		self.profiler = None	# StageProfiler of enableProfiling, None unless profiling
 		return
 
 	def takeStep(self, **kwargs):
@@ -32,10 +40,35 @@ class Simulate(object):
 		:return:
 		"""
 		self.time = 0
-		self.takenData.clear()
+		self.clearData()
 		self.underlyingModel.reset()
 		return
 
+	def clearData(self):
+		"""
+		Drops the data taken and closes the streams (a new run needs a new streamToFile, so no file holds two runs with
+		the time starting over). Used by reset.
+
+		:return:
+		"""
+		self.closeStream()
+		self.takenData.clear()
+		self.recordAccessors = None
+		self.streamFilenames = list()
+		return
+
+	def checkAllRowsKept(self):
+		"""
+		Raises a ValueError if rows were dropped from memory by streamToFile(keepData=False), which an export would
+		silently leave out
+
+		:return:
+		"""
+		if self.takenData.droppedRows:
+			raise ValueError("{} rows were only streamed to {} (keepData=False), read the run back from there (FlightReplay.openLog)"
+							 .format(self.takenData.droppedRows, ', '.join(self.streamFilenames)))
+		return
+
 	def exportToPickle(self, filename):
 		"""
 		exports taken data as tuple, first item in tuple is a string list of recorded variables followed by the data
@@ -43,9 +76,10 @@ class Simulate(object):
 		:param filename: valid file path to write to
 		:return: True if successful, false if not
 		"""
+		self.checkAllRowsKept()
 		try:
 			with open(filename, 'wb') as f:
-				pickle.dump((self.__buildHeader(), self.takenData), f)
+				pickle.dump((self.__buildHeader(), self.takenData.toList()), f)
 		except OSError as e:
 			print(e)
 			return False
@@ -58,6 +92,7 @@ class Simulate(object):
 		:param filename: valid file path to write to
 		:return: True if successful, false if not
 		"""
+		self.checkAllRowsKept()
 		try:
 			with open(filename, 'w', newline='') as csvFile:
 				dataFileWriter = csv.writer(csvFile)
@@ -68,6 +103,95 @@ class Simulate(object):
 			return False
 		return True
 
+	def exportToFlightLog(self, filename):
+		"""
+		exports taken data as a binary flight log (header of variable names then float64 rows), read it back with
+		FlightLog.FlightLog
+
+		:param filename: valid file path to write to
+		:return: True if successful, false if not
+		"""
+		self.checkAllRowsKept()
+		try:
+			FlightLog.writeFlightLog(filename, self.__buildHeader(), self.takenData.asArray())
+		except OSError as e:
+			print(e)
+			return False
+		return True
+
+	def streamToFile(self, filename, keepData=True, chunkSize=None):
+		"""
+		Streams the recorded data to a file while the simulation runs, a chunk of rows (takenData.chunkSize) at a time,
+		with the same header as the exports. Call closeStream when done to write the last rows.
+
+		:param filename: valid file path to write to, .csv, .npz (read back with DataSinks.loadNpz) or .flog (FlightLog.FlightLog)
+		:param keepData: False to drop the rows from memory once written, so memory stays bounded on long runs
+		:param chunkSize: rows written at a time (smaller to tail the file more closely), only before recording starts
+		:return: True if successful, false if not
+		"""
+		try:
+			if chunkSize is not None:
+				self.takenData.setChunkSize(chunkSize)
+			self.takenData.addSink(DataSinks.openSink(filename), keepData)
+			self.streamFilenames.append(filename)
+		except OSError as e:
+			print(e)
+			return False
+		return True
+
+	def closeStream(self):
+		"""
+		Writes the rows not yet streamed and closes every file opened by streamToFile, which get the header even if
+		nothing was recorded
+
+		:return:
+		"""
+		if self.recordAccessors is None:	# nothing recorded, so the columns are not named yet
+			self.takenData.setColumnNames(self.__buildHeader())
+		self.takenData.closeSinks()
+		return
+
+	def enableProfiling(self, profiler=None):
+		"""
+		Times the stages of every step from now on (see StageProfiler): the recording here, and whichever stages the
+		underlying model times once handed the profiler.
+
+		:param profiler: StageProfiler to accumulate into, a new one by default
+		:return: the profiler, call its report() at the end of the run
+		"""
+		self.profiler = StageProfiler.StageProfiler() if profiler is None else profiler
+		if hasattr(self.underlyingModel, 'setProfiler'):
+			self.underlyingModel.setProfiler(self.profiler)
+		return self.profiler
+
+	def disableProfiling(self):
+		"""
+		Stops timing the stages, the profiler keeps what it has timed so far
+
+		:return: the profiler that was in use, or None
+		"""
+		profiler = self.profiler
+		self.profiler = None
+		if hasattr(self.underlyingModel, 'setProfiler'):
+			self.underlyingModel.setProfiler(None)
+		return profiler
+
+	def getProfiler(self):
+		return self.profiler
+
+	def setAerodynamicsTables(self, aeroTables):
+		"""
+		Makes the underlying model interpolate the aerodynamic coefficients and propeller forces from tables (see
+		AerodynamicsTables) instead of evaluating them, if it computes forces at all
+
+		:param aeroTables: AerodynamicsTables to use, None to go back to the analytic model
+		:return: True if the underlying model uses them, False if it has no aerodynamics
+		"""
+		if not hasattr(self.underlyingModel, 'setAerodynamicsTables'):
+			return False
+		self.underlyingModel.setAerodynamicsTables(aeroTables)
+		return True
+
 	def recordData(self, inputs):
 		"""
 		used within takeStep. Stores current data to internal list.
@@ -75,19 +199,45 @@ class Simulate(object):
 		:param inputs: Same set of inputs in same order is passed as list to recordData for their storage
 		:return:
 		"""
+		profiler = self.profiler
+		if profiler is not None:
+			startTime = profiler.start()
+
+		if self.recordAccessors is None:
+			self.buildRecordAccessors()
+
 		newDataLine = [self.time] # each line starts with the current time
 
 		# we handle inputs first
 		newDataLine.extend(inputs)
 
 		# and then use the variable list to store everything else wanted
-		for model, name, variableNames in self.variableList:
-			newValues = model()
-			for variableName in variableNames:
-				newDataLine.append(getattr(newValues, variableName))
+		for model, getValues in self.recordAccessors:
+			newDataLine.extend(getValues(model()))
 
 		# print(newDataLine)
 		self.takenData.append(newDataLine)
+
+		if profiler is not None:
+			profiler.stop('recording', startTime)
+		return
+
+	def buildRecordAccessors(self):
+		"""
+		Resolves the variable list into one getter per model, which fetches all of its recorded attributes in one call,
+		and names the recorder columns. Done when the first row is recorded after construction or reset, so variableList
+		can be changed before that.
+
+		:return:
+		"""
+		self.recordAccessors = list()
+		for model, name, variableNames in self.variableList:
+			if len(variableNames) == 1:
+				getValue = operator.attrgetter(variableNames[0])
+				self.recordAccessors.append((model, lambda values, getValue=getValue: (getValue(values),)))
+			else:
+				self.recordAccessors.append((model, operator.attrgetter(*variableNames)))
+		self.takenData.setColumnNames(self.__buildHeader())
 		return
 
 	def __buildHeader(self):
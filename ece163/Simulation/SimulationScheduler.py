@@ -0,0 +1,180 @@
+"""Runs a simulation step function on a worker thread, decoupled from whatever displays it. Two modes:
+
+    RealTime   steps are due at fixed times start + n * dT / speed on the wall clock; the worker sleeps until the next one is
+               due and, if it falls behind (a slow step, the machine busy), runs the late steps back to back to catch up, so
+               the simulated time does not drift from the wall clock. If it falls more than maxLag behind it gives up on the
+               missed time and starts counting again from now rather than running a long burst.
+    MaxSpeed   steps are run back to back, as fast as the step function allows.
+
+Every step runs holding lock, so other threads can change the simulation between steps (with scheduler.lock: ...). A
+snapshot of the simulation (snapshotFunction, e.g. a copy of the vehicle state) is published at most displayRate times a
+second for the display to read with getLatestSnapshot, so the display neither waits for nor slows down the physics, and
+the real-time factor actually achieved (simulated seconds per wall clock second) is measured over reportInterval."""
+import threading
+import time
+import traceback
+
+schedulerModes = ['RealTime', 'MaxSpeed']
+
+class SimulationScheduler:
+	def __init__(self, stepFunction, dT, mode='RealTime', speed=1.0, snapshotFunction=None, displayRate=30.0, reportInterval=0.5,
+				 maxLag=0.25, clock=time.perf_counter):
+		"""
+		Scheduler of stepFunction, which advances the simulation by dT, on a worker thread started by start
+
+		:param stepFunction: function of no arguments taking one simulation step
+		:param dT: simulated time of one step [s]
+		:param mode: one of schedulerModes
+		:param speed: simulated seconds per wall clock second in RealTime mode
+		:param snapshotFunction: function of no arguments returning what the display needs (called holding lock), None to publish nothing
+		:param displayRate: most snapshots published per wall clock second [Hz]
+		:param reportInterval: wall clock time the real-time factor is measured over [s]
+		:param maxLag: how far behind RealTime mode can fall before it drops the missed time [s]
+		:param clock: function returning the current wall clock time in seconds
+		"""
+		self.stepFunction = stepFunction
+		self.dT = dT
+		self.snapshotFunction = snapshotFunction
+		self.displayRate = displayRate
+		self.reportInterval = reportInterval
+		self.maxLag = maxLag
+		self.clock = clock
+		self.lock = threading.Lock()	# held while stepping
+		self.setMode(mode)
+		self.setSpeed(speed)
+		self.thread = None
+		self.stopEvent = threading.Event()
+		self.stepCount = 0	# steps since the scheduler was made (or reset)
+		self.droppedTime = 0.0	# wall clock time given up on by RealTime mode [s]
+		self.realTimeFactor = 0.0	# simulated over wall clock time of the last reportInterval
+		self.latestSnapshot = None
+		self.error = None	# traceback of the exception that stopped the worker, None if it has not failed
+		return
+
+	def setMode(self, mode):
+		"""
+		Selects RealTime or MaxSpeed, takes effect from the next step
+
+		:param mode: one of schedulerModes
+		"""
+		if mode not in schedulerModes:
+			raise ValueError("Unknown scheduler mode '{}', expected one of {}".format(mode, schedulerModes))
+		self.mode = mode
+		self.rescheduled = True
+		return
+
+	def getMode(self):
+		return self.mode
+
+	def setSpeed(self, speed):
+		"""
+		Sets the simulated seconds per wall clock second of RealTime mode, takes effect from the next step
+
+		:param speed: real-time factor to run at, > 0
+		"""
+		if not speed > 0:
+			raise ValueError("Scheduler speed must be positive, not {}".format(speed))
+		self.speed = speed
+		self.rescheduled = True
+		return
+
+	def getSpeed(self):
+		return self.speed
+
+	def start(self):
+		"""
+		Starts the worker thread if it is not running
+		"""
+		if self.isRunning():
+			return
+		self.stopEvent.clear()
+		self.error = None
+		self.rescheduled = True
+		self.thread = threading.Thread(target=self.run, name='SimulationScheduler', daemon=True)
+		self.thread.start()
+		return
+
+	def stop(self):
+		"""
+		Stops the worker thread after the step it is taking, and waits for it
+		"""
+		self.stopEvent.set()
+		if self.thread is not None and self.thread is not threading.current_thread():
+			self.thread.join()
+		self.thread = None
+		return
+
+	def isRunning(self):
+		return self.thread is not None and self.thread.is_alive()
+
+	def reset(self):
+		"""
+		Stops the worker and forgets the step count, the measured real-time factor and the last snapshot
+		"""
+		self.stop()
+		self.stepCount = 0
+		self.droppedTime = 0.0
+		self.realTimeFactor = 0.0
+		self.latestSnapshot = None
+		self.error = None
+		return
+
+	def getLatestSnapshot(self):
+		"""
+		Latest snapshot published by the worker
+
+		:return: return value of snapshotFunction, None before the first one
+		"""
+		return self.latestSnapshot
+
+	def getRealTimeFactor(self):
+		"""
+		Simulated seconds per wall clock second over the last reportInterval
+
+		:return: real-time factor
+		"""
+		return self.realTimeFactor
+
+	def publish(self):
+		"""
+		Takes a snapshot for the display, holding the lock so it is from between two steps
+		"""
+		if self.snapshotFunction is not None:
+			with self.lock:
+				self.latestSnapshot = self.snapshotFunction()
+		return
+
+	def run(self):
+		"""
+		Worker loop, runs until stop or until stepFunction raises (the traceback is kept in error)
+		"""
+		now = self.clock()
+		reportTime, reportSteps = now, self.stepCount
+		publishTime = now - 1.0 / self.displayRate
+		try:
+			while not self.stopEvent.is_set():
+				if self.rescheduled:	# count the due times from here with the current speed
+					self.rescheduled = False
+					startTime, startSteps = self.clock(), self.stepCount
+				with self.lock:
+					self.stepFunction()
+					self.stepCount += 1
+				now = self.clock()
+				if now - publishTime >= 1.0 / self.displayRate:
+					self.publish()
+					publishTime = now
+				if now - reportTime >= self.reportInterval:
+					self.realTimeFactor = ((self.stepCount - reportSteps) * self.dT) / (now - reportTime)
+					reportTime, reportSteps = now, self.stepCount
+				if self.mode == 'RealTime':
+					dueTime = startTime + ((self.stepCount - startSteps) * self.dT) / self.speed	# when the next step is due
+					if now - dueTime > self.maxLag:	# too far behind, drop the missed time
+						self.droppedTime += now - dueTime
+						startTime, startSteps = now, self.stepCount
+					elif dueTime > now:
+						self.stopEvent.wait(dueTime - now)
+		except Exception:
+			self.error = traceback.format_exc()
+			return
+		self.publish()	# the display gets the state the worker stopped at
+		return
@@ -0,0 +1,280 @@
+"""
+Headless command line runner for the ChapterNSimulate classes: builds the simulation for a chapter, optionally trims the
+vehicle and sets the autopilot gains, steps it through a scripted input schedule for the requested duration as fast as
+the CPU allows (no GUI timer), writes the recorded data, and reports the timing.
+
+Usage: python -m ece163.Simulation 8 --duration 60 --schedule commands.json --output flight.csv
+
+The schedule is a JSON list of entries, each with a "time" in [s] and any of the attributes of the chapter's input
+class (forcesMoments for chapter 3, controlInputs for chapters 4-5, referenceCommands for chapters 6-8) in the units of
+that class (angles in radians). An entry takes effect at its time and holds until a later entry changes the attribute:
+
+	[{"time": 0.0, "commandedAltitude": 100.0},
+	 {"time": 20.0, "commandedCourse": 0.5, "commandedAirspeed": 28.0}]
+"""
+
+import argparse
+import json
+import math
+import os
+import pickle
+import random
+import sys
+import time
+
+from ..Constants import VehiclePhysicalConstants as VPC
+from ..Containers import Controls
+from ..Containers import Inputs
+from ..Controls import VehicleControlGains
+from ..Controls import VehiclePerturbationModels
+from ..Controls import TrimCache
+from ..Controls import VehicleTrim
+from ..Modeling import AerodynamicsTables
+from . import Chapter3Simulate
+from . import Chapter4Simulate
+from . import Chapter5Simulate
+from . import Chapter6Simulate
+from . import Chapter7Simulate
+from . import Chapter8Simulate
+
+simulateClasses = {3: Chapter3Simulate.Chapter3Simulate,
+				   4: Chapter4Simulate.Chapter4Simulate,
+				   5: Chapter5Simulate.Chapter5Simulate,
+				   6: Chapter6Simulate.Chapter6Simulate,
+				   7: Chapter7Simulate.Chapter7Simulate,
+				   8: Chapter8Simulate.Chapter8Simulate}
+
+closedLoopChapters = [6, 7, 8]
+
+# tuning used when neither --gains nor --tuning is given: inner loops 5-10x faster than the outer ones, which holds
+# altitude, course and airspeed about the straight and level trim
+defaultTuning = Controls.controlTuning(Wn_roll=15.0, Zeta_roll=0.707, Wn_course=1.5, Zeta_course=1.0, Wn_sideslip=5.0,
+									   Zeta_sideslip=0.707, Wn_pitch=20.0, Zeta_pitch=0.707, Wn_altitude=1.5,
+									   Zeta_altitude=1.0, Wn_SpeedfromThrottle=2.0, Zeta_SpeedfromThrottle=1.0,
+									   Wn_SpeedfromElevator=1.0, Zeta_SpeedfromElevator=1.0)
+
+
+def defaultInput(chapter):
+	"""
+	Input object that the chapter's takeStep expects, at its default values
+
+	:param chapter: chapter number [3-8]
+	:return: forcesMoments, controlInputs or referenceCommands
+	"""
+	if chapter == 3:
+		return Inputs.forcesMoments()
+	if chapter in closedLoopChapters:
+		return Controls.referenceCommands()
+	return Inputs.controlInputs()
+
+
+def loadSchedule(filename, chapter):
+	"""
+	Reads a JSON input schedule and checks every attribute against the chapter's input class
+
+	:param filename: path to the JSON schedule (list of dictionaries with a "time" key)
+	:param chapter: chapter number [3-8]
+	:return: list of (time, {attribute: value}) sorted by time
+	"""
+	with open(filename, 'r') as f:
+		entries = json.load(f)
+	validNames = set(vars(defaultInput(chapter)).keys())
+	schedule = list()
+	for entry in entries:
+		entry = dict(entry)
+		entryTime = float(entry.pop('time', 0.0))
+		unknownNames = set(entry.keys()) - validNames
+		if unknownNames:
+			raise ValueError("Schedule entry at t={} has unknown inputs {} for chapter {}, expected some of {}".format(
+				entryTime, sorted(unknownNames), chapter, sorted(validNames)))
+		schedule.append((entryTime, {name: float(value) for name, value in entry.items()}))
+	schedule.sort(key=lambda timeAndValues: timeAndValues[0])
+	return schedule
+
+
+def loadPickle(filename):
+	"""
+	Loads a single object saved by one of the GUI widgets (controlGains or controlTuning)
+
+	:param filename: path to the pickle
+	:return: the unpickled object
+	"""
+	with open(filename, 'rb') as f:
+		return pickle.load(f)
+
+
+def setupTrimAndGains(simulateInstance, chapter, trimParameters=None, gains=None, tuning=None, trimCache=None):
+	"""
+	Trims the vehicle and, for the closed loop chapters, sets the trim inputs and the autopilot gains the same way the
+	Trim and Gains tabs of the GUI do. Chapters 4 and 5 start from the trim state with the trim controls as inputs.
+
+	:param simulateInstance: ChapterNSimulate instance
+	:param chapter: chapter number [3-8]
+	:param trimParameters: (airspeed [m/s], climb angle [deg], turn radius [m]) or None for no trim
+	:param gains: controlGains to use (closed loop only), takes priority over tuning
+	:param tuning: controlTuning used with the linearized model to compute the gains (closed loop only), defaults to defaultTuning
+	:param trimCache: TrimCache to reuse a trim from, or None to always compute it
+	:return: controlInputs of the trim, or None if no trim was computed
+	"""
+	if chapter in closedLoopChapters and trimParameters is None:
+		trimParameters = (VPC.InitialSpeed, 0.0, math.inf)	# gains need a linear model, so always trim
+	if trimParameters is None:
+		return None
+	Vastar, climbAngle, turnRadius = trimParameters
+	if turnRadius == 0:
+		raise ValueError("Trim turn radius must not be zero, use inf for straight flight")
+	trimInstance = VehicleTrim.VehicleTrim(cache=trimCache)
+	if not trimInstance.computeTrim(Vastar, 1 / turnRadius, math.radians(climbAngle)):
+		raise ValueError("Trim parameters given are not possible: {}".format(trimParameters))
+	trimState = trimInstance.getTrimState()
+	trimControls = trimInstance.getTrimControls()
+	if chapter in closedLoopChapters:
+		if gains is None:
+			if tuning is None:
+				tuning = defaultTuning
+			linearModel = VehiclePerturbationModels.CreateTransferFunction(trimState, trimControls)
+			gains = VehicleControlGains.computeGains(tuning, linearModel)
+		simulateInstance.underlyingModel.setTrimInputs(trimControls)
+		simulateInstance.underlyingModel.setControlGains(gains)
+	elif chapter in [4, 5]:
+		simulateInstance.underlyingModel.setVehicleState(trimState)
+	return trimControls
+
+
+def runSimulation(simulateInstance, chapter, duration, schedule=None, startInput=None):
+	"""
+	Steps the simulation for duration seconds, applying the schedule entries as their times are reached
+
+	:param simulateInstance: ChapterNSimulate instance
+	:param chapter: chapter number [3-8]
+	:param duration: simulated time [s]
+	:param schedule: list of (time, {attribute: value}) from loadSchedule, or None
+	:param startInput: input object to start from (e.g. the trim controls), defaults to defaultInput(chapter)
+	:return: (number of steps, wall clock time [s])
+	"""
+	currentInput = startInput if startInput is not None else defaultInput(chapter)
+	schedule = list(schedule) if schedule is not None else list()
+	numSteps = int(round(duration / VPC.dT))
+	nextEntry = 0
+	startTime = time.perf_counter()
+	for step in range(numSteps):
+		simTime = step * VPC.dT
+		while nextEntry < len(schedule) and schedule[nextEntry][0] <= simTime + VPC.dT / 2:
+			for name, value in schedule[nextEntry][1].items():
+				setattr(currentInput, name, value)
+			nextEntry += 1
+		simulateInstance.takeStep(currentInput)
+	return numSteps, time.perf_counter() - startTime
+
+
+def buildSimulate(chapter, seed=None):
+	"""
+	Builds the chapter's simulation, with its own random generator (as MonteCarloSweep does) when seeded so the run is
+	reproducible whatever else uses the random module
+
+	:param chapter: 3 to 8
+	:param seed: seed of the wind and sensor noise, None for the random module
+	:return: ChapterNSimulate instance
+	"""
+	if chapter == 3:	# rigid body only, nothing random
+		return simulateClasses[chapter]()
+	return simulateClasses[chapter](rng=None if seed is None else random.Random(seed))
+
+
+def exportData(simulateInstance, filename):
+	"""
+	Writes the recorded data with the exporter that matches the file extension (.csv, .pickle/.pkl or .flog)
+
+	:param simulateInstance: ChapterNSimulate instance
+	:param filename: output path
+	:return: True if successful, False if not
+	"""
+	extension = os.path.splitext(filename)[1].lower()
+	if extension == '.csv':
+		return simulateInstance.exportToCSV(filename)
+	if extension in ['.pickle', '.pkl']:
+		return simulateInstance.exportToPickle(filename)
+	if extension == '.flog':
+		return simulateInstance.exportToFlightLog(filename)
+	raise ValueError("Unknown output format '{}', use .csv, .pickle or .flog".format(extension))
+
+
+def buildParser():
+	"""
+	Command line arguments of the runner
+
+	:return: argparse.ArgumentParser
+	"""
+	parser = argparse.ArgumentParser(prog='python -m ece163.Simulation', description="Run a ChapterNSimulate headless, as fast as possible")
+	parser.add_argument('chapter', type=int, choices=sorted(simulateClasses.keys()), help='which ChapterNSimulate to run')
+	parser.add_argument('--duration', type=float, default=10.0, help='simulated time [s] (default 10)')
+	parser.add_argument('--schedule', default=None, help='JSON input schedule (see module docstring)')
+	parser.add_argument('--trim', type=float, nargs=3, metavar=('AIRSPEED', 'CLIMB_DEG', 'TURN_RADIUS'), default=None,
+						help='trim before running (turn radius inf for straight flight); always done for chapters 6-8')
+	parser.add_argument('--gains', default=None, help='pickled controlGains (as saved by the Gains tab), chapters 6-8')
+	parser.add_argument('--tuning', default=None, help='pickled controlTuning used to compute the gains, chapters 6-8')
+	parser.add_argument('--trim-cache', default=None, help='JSON trim cache file, reused and added to across runs')
+	parser.add_argument('--aero-tables', default=None, metavar='FILE',
+						help='interpolate the aerodynamics from lookup tables, kept in this .npz file across runs')
+	parser.add_argument('--seed', type=int, default=None, help='seed of the random generator of the wind and sensor noise')
+	parser.add_argument('--output', default=None, help='write the recorded data to this .csv, .pickle or .flog file')
+	parser.add_argument('--stream', default=None, help='stream the recorded data to this .csv, .npz or .flog file while running')
+	parser.add_argument('--stream-chunk', type=int, default=None, help='rows per streamed chunk (default 4096)')
+	parser.add_argument('--profile', action='store_true', help='time the stages of every step and print a summary at the end')
+	return parser
+
+
+def main(argv=None):
+	"""
+	Entry point of python -m ece163.Simulation
+
+	:param argv: argument list (defaults to sys.argv[1:])
+	:return: process exit code
+	"""
+	parser = buildParser()
+	arguments = parser.parse_args(argv)
+	if arguments.trim is not None and arguments.trim[2] == 0:
+		parser.error("--trim turn radius must not be zero, use inf for straight flight")
+	simulateInstance = buildSimulate(arguments.chapter, arguments.seed)
+	schedule = loadSchedule(arguments.schedule, arguments.chapter) if arguments.schedule else None
+	gains = loadPickle(arguments.gains) if arguments.gains else None
+	tuning = loadPickle(arguments.tuning) if arguments.tuning else None
+	trimParameters = tuple(arguments.trim) if arguments.trim else None
+
+	trimCache = TrimCache.TrimCache(arguments.trim_cache) if arguments.trim_cache else None
+	trimControls = setupTrimAndGains(simulateInstance, arguments.chapter, trimParameters, gains, tuning, trimCache)
+	startInput = trimControls if (trimControls is not None and arguments.chapter in [4, 5]) else None
+
+	if arguments.aero_tables:	# after the trim, which stays on the analytic model
+		if not simulateInstance.setAerodynamicsTables(AerodynamicsTables.AerodynamicsTables(arguments.aero_tables)):
+			print("Chapter{}Simulate has no aerodynamics, --aero-tables ignored".format(arguments.chapter))
+
+	if arguments.stream:	# only keep the rows in memory if they are exported at the end as well
+		if not simulateInstance.streamToFile(arguments.stream, arguments.output is not None, arguments.stream_chunk):
+			return 1
+
+	if arguments.profile:
+		simulateInstance.enableProfiling()
+
+	numSteps, wallTime = runSimulation(simulateInstance, arguments.chapter, arguments.duration, schedule, startInput)
+
+	if arguments.stream:
+		simulateInstance.closeStream()
+
+	print("Chapter{}Simulate: {} steps ({:.2f} s simulated) in {:.3f} s wall clock, {:.1f} us/step, {:.1f}x real time".format(
+		arguments.chapter, numSteps, numSteps * VPC.dT, wallTime, 1e6 * wallTime / max(numSteps, 1),
+		(numSteps * VPC.dT) / wallTime if wallTime > 0 else math.inf))
+	if arguments.profile:
+		print(simulateInstance.getProfiler().report(wallTime))
+
+	if arguments.stream:
+		print("Recorded data streamed to {}".format(arguments.stream))
+	if arguments.output:
+		if not exportData(simulateInstance, arguments.output):
+			return 1
+		print("Recorded data written to {}".format(arguments.output))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
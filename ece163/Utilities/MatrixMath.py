@@ -1,6 +1,7 @@
 """Matrix Library in Native Python, using lists of lists as a row-major representation of matrices.
    That is: [[1,2,3],[4,5,6]] is a 2x3 matrix and they are indexed from [0]. Thus A[1][2] is 6, and A[0][1] is 2."""
 import math
+import os
 
 def multiply(A,B):
     """
@@ -165,6 +166,38 @@ def matrixPrint(A):
     return
 
 
+# Optional faster backends with identical signatures, selected at import time through the environment variable
+# ECE163_MATRIXMATH: 'native' (default, the functions above), 'unrolled' (fixed size [3 x 3]/[3 x 1] kernels on lists,
+# bit identical to native) or 'numpy' (functions return 2D numpy arrays). The selected module's functions replace the
+# ones defined above (which stay available in nativeFunctions), so "from ..Utilities import MatrixMath" callers do not change.
+nativeFunctions = {function.__name__: function for function in [multiply, transpose, add, subtract, scalarMultiply,
+                                                                 scalarDivide, dotProduct, skew, crossProduct, offset,
+                                                                 vectorNorm, size, matrixPrint]}
+backendName = os.environ.get('ECE163_MATRIXMATH', 'native').strip().lower()
+if backendName == 'unrolled':
+    from . import MatrixMathUnrolled as _backend
+elif backendName == 'numpy':
+    from . import MatrixMathNumpy as _backend
+elif backendName == 'native':
+    _backend = None
+else:
+    raise ValueError("Unknown ECE163_MATRIXMATH backend '{}', expected native, unrolled or numpy".format(backendName))
+if _backend is not None:
+    multiply = _backend.multiply
+    transpose = _backend.transpose
+    add = _backend.add
+    subtract = _backend.subtract
+    scalarMultiply = _backend.scalarMultiply
+    scalarDivide = _backend.scalarDivide
+    dotProduct = _backend.dotProduct
+    skew = _backend.skew
+    crossProduct = _backend.crossProduct
+    offset = _backend.offset
+    vectorNorm = _backend.vectorNorm
+    size = _backend.size
+    matrixPrint = _backend.matrixPrint
+
+
 
 
 # Test Harness -- test the code with known good examples
@@ -0,0 +1,171 @@
+"""NumPy backend for MatrixMath with the same function signatures. Inputs may be lists of lists or 2D arrays, and every
+   matrix returned is a fresh 2D float ndarray, so A[i][j] indexing and len() keep working for existing callers. Note
+   that NumPy carries a fixed per-call overhead that is larger than the arithmetic on a [3 x 3], so this backend is
+   intended for larger matrices (e.g. the vehicle geometry points) and for comparison timings.
+   Select it with the environment variable ECE163_MATRIXMATH=numpy (see MatrixMath.py)."""
+import math
+import numpy
+
+def multiply(A,B):
+    """
+    Matrix multiplication, raises arithmetic error if inner dimensions don't match
+
+    :param A: matrix (list of lists or array) of [m x n]
+    :param B: matrix (list of lists or array) of [n x r]
+    :return: A*B matrix of [m x r]
+    """
+    A = numpy.asarray(A, dtype=float)
+    B = numpy.asarray(B, dtype=float)
+    if A.shape[1] != B.shape[0]:
+        raise ArithmeticError('Inner dimensions do not match')
+    return A @ B
+
+def transpose(A):
+    """
+    Matrix transpose, swaps rows and columns. Returns a copy (not a view) so that callers which modify the result in
+    place do not alter the original.
+
+    :param A: Matrix (list of lists or array) of [m x n]
+    :return: A' matrix [n x m]
+    """
+    return numpy.array(A, dtype=float).T.copy()
+
+def add(A,B):
+    """
+    Matrix addition, raises arithmetic error if matrix dimensions don't match
+
+    :param A: matrix (list of lists or array) [m x n]
+    :param B: matrix (list of lists or array) [m x n]
+    :return: A+B [m x n]
+    """
+    A = numpy.asarray(A, dtype=float)
+    B = numpy.asarray(B, dtype=float)
+    if A.shape != B.shape:
+        raise ArithmeticError('Matrices do not have same dimension')
+    return A + B
+
+def subtract(A,B):
+    """
+    Matrix subtraction, raises arithmetic error if matrix dimensions don't match
+
+    :param A: matrix (list of lists or array) [m x n]
+    :param B: matrix (list of lists or array) [m x n]
+    :return: A-B [m x n]
+    """
+    A = numpy.asarray(A, dtype=float)
+    B = numpy.asarray(B, dtype=float)
+    if A.shape != B.shape:
+        raise ArithmeticError('Matrices do not have same dimension')
+    return A - B
+
+def scalarMultiply(alpha,A):
+    """
+    Multiply every element of a matrix by a scalar number
+
+    :param alpha: scalar
+    :param A: Matrix (list of lists or array) [m x n]
+    :return: alpha*A [m x n]
+    """
+    return alpha * numpy.asarray(A, dtype=float)
+
+def scalarDivide(alpha, A):
+    """
+    Divide every element of a matrix by a scalar number; raises arithmetic error of alpha is zero
+
+    :param alpha: scalar (cannot be zero)
+    :param A: Matrix (list of lists or array) [m x n]
+    :return: A / alpha [m x n]
+    """
+    if math.isclose(alpha,0.0):
+        raise ArithmeticError('Cannot divide by zero')
+    return numpy.asarray(A, dtype=float) / alpha
+
+def dotProduct(A,B):
+    """
+    Matrix inner product, raises arithmetic error if dimensions don't match
+
+    :param A: matrix (list of lists or array) [m x n]
+    :param B: matrix (list of lists or array) [m x n]
+    :return: (A')*B [n x n]
+    """
+    A = numpy.asarray(A, dtype=float)
+    B = numpy.asarray(B, dtype=float)
+    if A.shape != B.shape:
+        raise ArithmeticError('Vectors must have same dimension')
+    return A.T @ B
+
+def skew(x,y,z):
+    """
+    Defines the skew symmetric matrix (also known as cross product matrix)
+
+    :param x: (float) x-component of vector
+    :param y: (float) y-component of vector
+    :param z: (float) z-component of vector
+    :return: [Ax] skew symmetric matrix [3 x 3]
+    """
+    return numpy.array([[0, -z, y], [z, 0, -x], [-y, x, 0]], dtype=float)
+
+def crossProduct(A,B):
+    """
+    Vector cross product, raises arithmetic error if vectors are not [3 x 1]
+
+    :param A: vector (list of lists or array) [3 x 1]
+    :param B: vector (list of lists or array) [3 x 1]
+    :return: A x B vector [3 x 1]
+    """
+    A = numpy.asarray(A, dtype=float)
+    B = numpy.asarray(B, dtype=float)
+    if A.shape != (3, 1) or B.shape != (3, 1):
+        raise ArithmeticError('Cross Product only defined for 3x1 vectors')
+    return numpy.cross(A, B, axis=0)
+
+def offset(A,x,y,z):
+    """
+    Shift each column of matrix A by the corresponding entry x,y,z; raises arithmetic error if the matrix A is not [nx3]
+
+    :param A: Matrix to be shifted [n x 3]
+    :param x: First column offset
+    :param y: Second column offset
+    :param z: Third column offset
+    :return: Shifted matrix [n x 3]
+    """
+    A = numpy.asarray(A, dtype=float)
+    if A.shape[1] != 3:
+        raise ArithmeticError('Offset only works on [n x 3] matrices')
+    return A + numpy.array([x, y, z], dtype=float)
+
+def vectorNorm(v):
+    """
+    Return a unit vector in the same direction as the input vector; raises arithmetic error if the vector v is not [nx1].
+    If the vector norm is zero (e.g.: all elements are zero), then returns the zero vector.
+
+    :param v: [nx1] vector to be scaled
+    :return: vbar = v/||v||, same dimensions as v
+    """
+    v = numpy.array(v, dtype=float)
+    if v.shape[1] != 1:
+        raise ArithmeticError('VectorNorm only works on [n x 1] vectors')
+    norm = math.sqrt(float(numpy.sum(v * v)))
+    if math.isclose(norm, 0.0):
+        return v
+    return v / norm
+
+def size(A):
+    """
+    Size of a matrix as [row, column]
+
+    :param A: input matrix
+    :return: list of [row, column]
+    """
+    return [len(A),len(A[0])]
+
+def matrixPrint(A):
+    """
+    Prints the matrix in a tabbed column format to the output
+
+    :param A: matrix (list of lists or array) to be printed
+    :return: none
+    """
+    for A_row in A:
+        print('\t'.join(['{: 7.3f}'.format(a) for a in A_row]))
+    return
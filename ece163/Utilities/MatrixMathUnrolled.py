@@ -0,0 +1,198 @@
+"""Drop-in replacement backend for MatrixMath that keeps the list of lists representation, but unrolls the fixed size
+   [3 x 3] and [3 x 1] cases that dominate the simulator (DCM products, body vectors, skew matrices). Any other size falls
+   through to the same generic code used by MatrixMath, so results are identical to the native backend.
+   Select it with the environment variable ECE163_MATRIXMATH=unrolled (see MatrixMath.py)."""
+import math
+
+def multiply(A,B):
+    """
+    Matrix multiplication with unrolled [3 x 3]*[3 x 3] and [3 x 3]*[3 x 1] kernels, raises arithmetic error if inner
+    dimensions don't match
+
+    :param A: matrix (list of lists) of [m x n]
+    :param B: matrix (list of lists) of [n x r]
+    :return: A*B matrix of [m x r]
+    """
+    if len(A[0]) != len(B):
+        raise ArithmeticError('Inner dimensions do not match')
+    if len(A) == 3 and len(B) == 3:
+        a0, a1, a2 = A
+        if len(B[0]) == 1:
+            b0 = B[0][0]
+            b1 = B[1][0]
+            b2 = B[2][0]
+            return [[a0[0] * b0 + a0[1] * b1 + a0[2] * b2],
+                    [a1[0] * b0 + a1[1] * b1 + a1[2] * b2],
+                    [a2[0] * b0 + a2[1] * b1 + a2[2] * b2]]
+        if len(B[0]) == 3:
+            b0, b1, b2 = B
+            return [[a0[0] * b0[0] + a0[1] * b1[0] + a0[2] * b2[0],
+                     a0[0] * b0[1] + a0[1] * b1[1] + a0[2] * b2[1],
+                     a0[0] * b0[2] + a0[1] * b1[2] + a0[2] * b2[2]],
+                    [a1[0] * b0[0] + a1[1] * b1[0] + a1[2] * b2[0],
+                     a1[0] * b0[1] + a1[1] * b1[1] + a1[2] * b2[1],
+                     a1[0] * b0[2] + a1[1] * b1[2] + a1[2] * b2[2]],
+                    [a2[0] * b0[0] + a2[1] * b1[0] + a2[2] * b2[0],
+                     a2[0] * b0[1] + a2[1] * b1[1] + a2[2] * b2[1],
+                     a2[0] * b0[2] + a2[1] * b1[2] + a2[2] * b2[2]]]
+    result = [[sum(a * b for a, b in zip(A_row, B_col)) for B_col in zip(*B)] for A_row in A]
+    return result
+
+def transpose(A):
+    """
+    Matrix transpose, swaps rows and columns (unrolled for [3 x 3])
+
+    :param A: Matrix (lists of list) of [m x n]
+    :return: A' matrix [n x m]
+    """
+    if len(A) == 3 and len(A[0]) == 3:
+        a0, a1, a2 = A
+        return [[a0[0], a1[0], a2[0]], [a0[1], a1[1], a2[1]], [a0[2], a1[2], a2[2]]]
+    result = [[A[j][i] for j in range(len(A))] for i in range(len(A[0]))]
+    return result
+
+def add(A,B):
+    """
+    Matrix addition (unrolled for [3 x 1]), raises arithmetic error if matrix dimensions don't match
+
+    :param A: matrix (list of lists) [m x n]
+    :param B: matrix (list of lists) [m x n]
+    :return: A+B [m x n]
+    """
+    if any([len(A) != len(B), len(A[0]) != len(B[0])]):
+        raise ArithmeticError('Matrices do not have same dimension')
+    if len(A) == 3 and len(A[0]) == 1:
+        return [[A[0][0] + B[0][0]], [A[1][0] + B[1][0]], [A[2][0] + B[2][0]]]
+    result = [[A[i][j] + B[i][j] for j in range(len(A[0]))] for i in range(len(A))]
+    return result
+
+def subtract(A,B):
+    """
+    Matrix subtraction (unrolled for [3 x 1]), raises arithmetic error if matrix dimensions don't match
+
+    :param A: matrix (list of lists) [m x n]
+    :param B: matrix (list of lists) [m x n]
+    :return: A-B [m x n]
+    """
+    if any([len(A) != len(B), len(A[0]) != len(B[0])]):
+        raise ArithmeticError('Matrices do not have same dimension')
+    if len(A) == 3 and len(A[0]) == 1:
+        return [[A[0][0] - B[0][0]], [A[1][0] - B[1][0]], [A[2][0] - B[2][0]]]
+    result = [[A[i][j] - B[i][j] for j in range(len(A[0]))] for i in range(len(A))]
+    return result
+
+def scalarMultiply(alpha,A):
+    """
+    Multiply every element of a matrix by a scalar number
+
+    :param alpha: scalar
+    :param A: Matrix (list of lists) [m x n]
+    :return: alpha*A [m x n]
+    """
+    result = [[alpha * a for a in A_row] for A_row in A]
+    return result
+
+def scalarDivide(alpha, A):
+    """
+    Divide every element of a matrix by a scalar number; raises arithmetic error of alpha is zero
+
+    :param alpha: scalar (cannot be zero)
+    :param A: Matrix (list of lists) [m x n]
+    :return: A / alpha [m x n]
+    """
+    if math.isclose(alpha,0.0):
+        raise ArithmeticError('Cannot divide by zero')
+    result = [[a / alpha for a in A_row] for A_row in A]
+    return result
+
+def dotProduct(A,B):
+    """
+    Matrix inner product, raises arithmetic error if dimensions don't match
+
+    :param A: matrix (list of lists) [m x n]
+    :param B: matrix (list of lists) [m x n]
+    :return: (A')*B [n x n]
+    """
+    if any([len(A)!=len(B),len(A[0])!=len(B[0])]):
+        raise ArithmeticError('Vectors must have same dimension')
+    result = multiply(transpose(A),B)
+    return result
+
+def skew(x,y,z):
+    """
+    Defines the skew symmetric matrix (also known as cross product matrix)
+
+    :param x: (float) x-component of vector
+    :param y: (float) y-component of vector
+    :param z: (float) z-component of vector
+    :return: [Ax] skew symmetric matrix [3 x 3]
+    """
+    result = [[0, -z, y], [z, 0, -x], [-y, x, 0]]
+    return result
+
+def crossProduct(A,B):
+    """
+    Vector cross product written out directly rather than through the skew matrix, raises arithmetic error if vectors
+    are not [3 x 1]
+
+    :param A: vector (list of lists) [3 x 1]
+    :param B: vector (list of lists) [3 x 1]
+    :return: A x B vector [3 x 1]
+    """
+    if any([len(A) != 3, len(A[0]) != 1,len(B) != 3, len(B[0]) != 1]):
+        raise ArithmeticError('Cross Product only defined for 3x1 vectors')
+    x = A[0][0]
+    y = A[1][0]
+    z = A[2][0]
+    return [[-z * B[1][0] + y * B[2][0]], [z * B[0][0] + -x * B[2][0]], [-y * B[0][0] + x * B[1][0]]]
+
+def offset(A,x,y,z):
+    """
+    Shift each column of matrix A by the corresponding entry x,y,z; raises arithmetic error if the matrix A is not [nx3]
+
+    :param A: Matrix to be shifted [n x 3]
+    :param x: First column offset
+    :param y: Second column offset
+    :param z: Third column offset
+    :return: Shifted matrix [n x 3]
+    """
+    if len(A[0]) != 3:
+        raise ArithmeticError('Offset only works on [n x 3] matrices')
+    result = [[pts[0] + x, pts[1] + y, pts[2] + z] for pts in A]
+    return result
+
+def vectorNorm(v):
+    """
+    Return a unit vector in the same direction as the input vector; raises arithmetic error if the vector v is not [nx1].
+    If the vector norm is zero (e.g.: all elements are zero), then returns the zero vector.
+
+    :param v: [nx1] vector to be scaled
+    :return: vbar = v/||v||, same dimensions as v
+    """
+    if len(v[0]) != 1:
+        raise ArithmeticError('VectorNorm only works on [n x 1] vectors')
+    normlist = [row[0] for row in v]
+    norm = math.sqrt(sum(x**2 for x in normlist))
+    if math.isclose(norm, 0.0):
+        return v
+    return scalarDivide(norm,v)
+
+def size(A):
+    """
+    Size of a matrix as [row, column]
+
+    :param A: input matrix
+    :return: list of [row, column]
+    """
+    return [len(A),len(A[0])]
+
+def matrixPrint(A):
+    """
+    Prints the matrix in a tabbed column format to the output
+
+    :param A: matrix (list of lists) to be printed
+    :return: none
+    """
+    for A_row in A:
+        print('\t'.join(['{: 7.3f}'.format(a) for a in A_row]))
+    return
@@ -1,46 +1,255 @@
 import math
-from . import MatrixMath
 
+import numpy
+
+# Rotation kernels written out element by element for the fixed 3x3 case (no list-of-lists matrix products), each sine and
+# cosine computed once. ned2enu, bodyToENU and the quaternion conversions also take numpy arrays of points or angles, and
+# euler2DCMArray is euler2DCM for arrays of angles.
 
 
 def ned2enu(points):
 
-    MTRX_TO_ENU = [[0, 1, 0], [1, 0, 0], [0, 0, -1]] # Given NED to ENU conversion matrix
+    '''Converts [n x 3] NED points to ENU: swaps north and east and negates down. Lists of lists give lists, numpy arrays give arrays.'''
 
-    result = MatrixMath.multiply(MTRX_TO_ENU, MatrixMath.transpose(points)) # Convert NED to ENU coordinates do the transpose to get cols of x, y, z
+    if(isinstance(points, numpy.ndarray)): # Vectorized over the rows
 
-    result = MatrixMath.transpose(result) # Transpose again to get rows of x, y, z
+        return points[..., [1, 0, 2]] * numpy.array([1.0, 1.0, -1.0]) # Permute and flip down
 
-    return result # return converted coordinate matrix
+    return [[point[1], point[0], -point[2]] for point in points] # return converted coordinate matrix, the NED to ENU matrix is a permutation
 
 def euler2DCM (yaw, pitch, roll):
 
-    
-    DCM = [[(math.cos(pitch) * math.cos(yaw)), (math.cos(pitch) * math.sin(yaw)), (-1*math.sin(pitch))],
-           [((math.sin(roll) * math.sin(pitch) * math.cos(yaw)) - (math.cos(roll) * math.sin(yaw))), ((math.sin(roll) * math.sin(pitch) * math.sin(yaw)) + (math.cos(roll) * math.cos(yaw))), (math.sin(roll) * math.cos(pitch))],
-           [((math.cos(roll) * math.sin(pitch) * math.cos(yaw)) + (math.sin(roll) * math.sin(yaw))), ((math.cos(roll) * math.sin(pitch) * math.sin(yaw)) - (math.sin(roll) * math.cos(yaw))), (math.cos(roll) * math.cos(pitch))]]
-    
+    cosYaw, sinYaw = math.cos(yaw), math.sin(yaw) # Trig of each angle, once
+
+    cosPitch, sinPitch = math.cos(pitch), math.sin(pitch)
+
+    cosRoll, sinRoll = math.cos(roll), math.sin(roll)
+
+    DCM = [[(cosPitch * cosYaw), (cosPitch * sinYaw), (-1*sinPitch)],
+           [((sinRoll * sinPitch * cosYaw) - (cosRoll * sinYaw)), ((sinRoll * sinPitch * sinYaw) + (cosRoll * cosYaw)), (sinRoll * cosPitch)],
+           [((cosRoll * sinPitch * cosYaw) + (sinRoll * sinYaw)), ((cosRoll * sinPitch * sinYaw) - (sinRoll * cosYaw)), (cosRoll * cosPitch)]]
+
     # Given DCM matrix from class. We fill in each point with the appropriate trig operration given yaw, pitch, and roll euler angles
 
     return DCM # Return DCM
 
 
+def euler2DCMArray (yaw, pitch, roll):
+
+    '''euler2DCM for numpy arrays of angles (broadcast together), gives an array of [... x 3 x 3] DCMs. Kept apart from euler2DCM so the
+    scalar version stays plain math calls.'''
+
+    cosYaw, sinYaw = numpy.cos(yaw), numpy.sin(yaw) # Trig of each angle array, once
+
+    cosPitch, sinPitch = numpy.cos(pitch), numpy.sin(pitch)
+
+    cosRoll, sinRoll = numpy.cos(roll), numpy.sin(roll)
+
+    DCM = numpy.empty(numpy.broadcast(cosYaw, cosPitch, cosRoll).shape + (3, 3)) # One DCM per set of angles
+
+    DCM[..., 0, 0], DCM[..., 0, 1], DCM[..., 0, 2] = (cosPitch * cosYaw), (cosPitch * sinYaw), (-1*sinPitch) # Same entries as euler2DCM
+
+    DCM[..., 1, 0] = (sinRoll * sinPitch * cosYaw) - (cosRoll * sinYaw)
+
+    DCM[..., 1, 1] = (sinRoll * sinPitch * sinYaw) + (cosRoll * cosYaw)
+
+    DCM[..., 1, 2] = sinRoll * cosPitch
+
+    DCM[..., 2, 0] = (cosRoll * sinPitch * cosYaw) + (sinRoll * sinYaw)
+
+    DCM[..., 2, 1] = (cosRoll * sinPitch * sinYaw) - (sinRoll * cosYaw)
+
+    DCM[..., 2, 2] = cosRoll * cosPitch
+
+    return DCM # Return the array of DCMs
+
+
 def dcm2Euler (DCM):
 
-    # Bound checking for arcsin(pitch)
+    # Bound checking for arcsin(pitch), done on the sine alone so the DCM given is not changed
+
+    sinPitch = DCM[0][2] # Sine of the pitch, clamped below
 
-    if DCM[0][2] > 1: # If greater than 1
+    if sinPitch > 1: # If greater than 1
 
-        DCM[0][2] = 1 # Make it 1
+        sinPitch = 1 # Make it 1
 
-    elif DCM[0][2] < -1: # If less than 1
+    elif sinPitch < -1: # If less than -1
+
+        sinPitch = -1 # Make -1
 
-        DCM[0][2] = -1 # Make -1
-    
     yaw = math.atan2(DCM[0][1], DCM[0][0]) # Yaw formula from class
 
-    pitch = -1 * math.asin(DCM[0][2]) # Typo in lecture should be a negative arcsin?
+    pitch = -1 * math.asin(sinPitch) # Typo in lecture should be a negative arcsin?
 
     roll = math.atan2(DCM[1][2], DCM[2][2]) # Roll formula
-    
+
     return yaw, pitch, roll # Return Euler Angles
+
+
+def bodyToENU(points, DCM, pn = 0.0, pe = 0.0, pd = 0.0):
+
+    '''Rotates [n x 3] body frame points into the inertial frame with the DCM (R transforms inertial to body, so each point is multiplied by
+    its rows, as points * R), moves them by the NED position (pn, pe, pd) and converts them to ENU in one pass.
+    Lists of lists give lists, numpy arrays give arrays.'''
+
+    if(isinstance(points, numpy.ndarray)): # Vectorized over the rows
+
+        return ned2enu(points @ numpy.asarray(DCM, dtype=float) + numpy.array([pn, pe, pd], dtype=float))
+
+    (R00, R01, R02), (R10, R11, R12), (R20, R21, R22) = DCM # Unpack the rotation
+
+    return [[x * R01 + y * R11 + z * R21 + pe, x * R00 + y * R10 + z * R20 + pn, -(x * R02 + y * R12 + z * R22 + pd)] for x, y, z in points] # return ENU points
+
+
+def multiply3x3(A, B):
+
+    '''Product of two 3x3 matrices (lists of lists), written out, the same sums as MatrixMath.multiply'''
+
+    (A00, A01, A02), (A10, A11, A12), (A20, A21, A22) = A # Unpack the left matrix
+
+    (B00, B01, B02), (B10, B11, B12), (B20, B21, B22) = B # Unpack the right matrix
+
+    return [[A00 * B00 + A01 * B10 + A02 * B20, A00 * B01 + A01 * B11 + A02 * B21, A00 * B02 + A01 * B12 + A02 * B22],
+            [A10 * B00 + A11 * B10 + A12 * B20, A10 * B01 + A11 * B11 + A12 * B21, A10 * B02 + A11 * B12 + A12 * B22],
+            [A20 * B00 + A21 * B10 + A22 * B20, A20 * B01 + A21 * B11 + A22 * B21, A20 * B02 + A21 * B12 + A22 * B22]] # return A*B
+
+
+def bodyToInertial(DCM, x, y, z):
+
+    '''Body frame vector (x, y, z) in the inertial NED frame, R' [x y z]', returned as a tuple of three'''
+
+    (R00, R01, R02), (R10, R11, R12), (R20, R21, R22) = DCM # Unpack the rotation
+
+    return R00 * x + R10 * y + R20 * z, R01 * x + R11 * y + R21 * z, R02 * x + R12 * y + R22 * z # return inertial vector
+
+
+def euler2Quaternion(yaw, pitch, roll):
+
+    '''Unit quaternion [q0, q1, q2, q3] (scalar first) of the yaw, pitch, roll rotation, with q0 >= 0. Angles can be numpy arrays.'''
+
+    if(any([isinstance(angle, numpy.ndarray) for angle in (yaw, pitch, roll)])): # Vectorized
+
+        trig = numpy
+
+    else:
+
+        trig = math
+
+    cosYaw, sinYaw = trig.cos(yaw / 2), trig.sin(yaw / 2) # Half angle trig, once each
+
+    cosPitch, sinPitch = trig.cos(pitch / 2), trig.sin(pitch / 2)
+
+    cosRoll, sinRoll = trig.cos(roll / 2), trig.sin(roll / 2)
+
+    q0 = cosYaw * cosPitch * cosRoll + sinYaw * sinPitch * sinRoll # Scalar part
+
+    q1 = cosYaw * cosPitch * sinRoll - sinYaw * sinPitch * cosRoll # Vector part
+
+    q2 = cosYaw * sinPitch * cosRoll + sinYaw * cosPitch * sinRoll
+
+    q3 = sinYaw * cosPitch * cosRoll - cosYaw * sinPitch * sinRoll
+
+    if(trig is math):
+
+        return [q0, q1, q2, q3] if q0 >= 0 else [-q0, -q1, -q2, -q3] # return quaternion
+
+    quaternion = numpy.stack(numpy.broadcast_arrays(q0, q1, q2, q3), axis=-1) # [... x 4]
+
+    return numpy.where(quaternion[..., :1] < 0, -quaternion, quaternion) # return quaternions
+
+
+def quaternion2Euler(quaternion):
+
+    '''Yaw, pitch and roll [rad] of a unit quaternion [q0, q1, q2, q3] (scalar first), or of a numpy array of them [... x 4]'''
+
+    if(isinstance(quaternion, numpy.ndarray)): # Vectorized
+
+        q0, q1, q2, q3 = numpy.moveaxis(quaternion, -1, 0)
+
+        yaw = numpy.arctan2(2 * (q0 * q3 + q1 * q2), q0 * q0 + q1 * q1 - q2 * q2 - q3 * q3)
+
+        pitch = numpy.arcsin(numpy.clip(2 * (q0 * q2 - q1 * q3), -1, 1))
+
+        roll = numpy.arctan2(2 * (q0 * q1 + q2 * q3), q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3)
+
+        return yaw, pitch, roll # return Euler angles
+
+    q0, q1, q2, q3 = quaternion # Scalar first
+
+    yaw = math.atan2(2 * (q0 * q3 + q1 * q2), q0 * q0 + q1 * q1 - q2 * q2 - q3 * q3) # Yaw, the same as atan2(R01, R00)
+
+    pitch = math.asin(min(max(2 * (q0 * q2 - q1 * q3), -1), 1)) # Pitch, -asin(R02) clamped
+
+    roll = math.atan2(2 * (q0 * q1 + q2 * q3), q0 * q0 - q1 * q1 - q2 * q2 + q3 * q3) # Roll, atan2(R12, R22)
+
+    return yaw, pitch, roll # return Euler angles
+
+
+def quaternion2DCM(quaternion):
+
+    '''DCM (inertial to body, as euler2DCM) of a unit quaternion [q0, q1, q2, q3] (scalar first)'''
+
+    q0, q1, q2, q3 = quaternion # Scalar first
+
+    q00, q11, q22, q33 = q0 * q0, q1 * q1, q2 * q2, q3 * q3 # Squares
+
+    q01, q02, q03, q12, q13, q23 = q0 * q1, q0 * q2, q0 * q3, q1 * q2, q1 * q3, q2 * q3 # Products
+
+    return [[q00 + q11 - q22 - q33, 2 * (q12 + q03), 2 * (q13 - q02)],
+            [2 * (q12 - q03), q00 - q11 + q22 - q33, 2 * (q23 + q01)],
+            [2 * (q13 + q02), 2 * (q23 - q01), q00 - q11 - q22 + q33]] # return DCM
+
+
+def dcm2Quaternion(DCM):
+
+    '''Unit quaternion [q0, q1, q2, q3] (scalar first, q0 >= 0) of a DCM, using the largest of the four diagonal combinations for accuracy'''
+
+    (R00, R01, R02), (R10, R11, R12), (R20, R21, R22) = DCM # Unpack
+
+    trace = R00 + R11 + R22 # Trace of the DCM
+
+    if(trace >= max(R00, R11, R22)): # q0 is the largest
+
+        s = 2 * math.sqrt(max(1 + trace, 0.0)) # 4 q0
+
+        quaternion = [s / 4, (R12 - R21) / s, (R20 - R02) / s, (R01 - R10) / s]
+
+    elif(R00 >= R11 and R00 >= R22): # q1 is the largest
+
+        s = 2 * math.sqrt(max(1 + R00 - R11 - R22, 0.0)) # 4 q1
+
+        quaternion = [(R12 - R21) / s, s / 4, (R01 + R10) / s, (R02 + R20) / s]
+
+    elif(R11 >= R22): # q2 is the largest
+
+        s = 2 * math.sqrt(max(1 - R00 + R11 - R22, 0.0)) # 4 q2
+
+        quaternion = [(R20 - R02) / s, (R01 + R10) / s, s / 4, (R12 + R21) / s]
+
+    else: # q3 is the largest
+
+        s = 2 * math.sqrt(max(1 - R00 - R11 + R22, 0.0)) # 4 q3
+
+        quaternion = [(R01 - R10) / s, (R02 + R20) / s, (R12 + R21) / s, s / 4]
+
+    if(quaternion[0] < 0): # Same rotation, keep the scalar part positive
+
+        quaternion = [-q for q in quaternion]
+
+    return quaternion # return quaternion
+
+
+def quaternionMultiply(quaternion, other):
+
+    '''Hamilton product quaternion * other of two quaternions [q0, q1, q2, q3] (scalar first). With the DCMs of quaternion2DCM,
+    quaternion2DCM(quaternion * other) = quaternion2DCM(other) * quaternion2DCM(quaternion), other being a rotation in the body frame.'''
+
+    a0, a1, a2, a3 = quaternion # Left quaternion
+
+    b0, b1, b2, b3 = other # Right quaternion
+
+    return [a0 * b0 - a1 * b1 - a2 * b2 - a3 * b3,
+            a0 * b1 + a1 * b0 + a2 * b3 - a3 * b2,
+            a0 * b2 - a1 * b3 + a2 * b0 + a3 * b1,
+            a0 * b3 + a1 * b2 - a2 * b1 + a3 * b0] # return product
@@ -0,0 +1,86 @@
+"""Opt-in wall clock profiling of the stages of a simulation step. A StageProfiler is handed to the models with
+setProfiler (or to a whole simulation with Simulate.enableProfiling), and each model then times its own stages:
+
+    sensors      SensorsModel.update, called from VehicleClosedLoopControl.update
+    autopilot    VehicleClosedLoopControl.UpdateControlCommands (both calls of a step with the estimator)
+    aeroForces   VehicleAerodynamicsModel.updateForces at the start of the step, including adding the wind to the airspeed
+    integration  VehicleDynamicsModel.Update, including the force evaluations of the higher order integrators
+    estimator    VehicleEstimator.Update
+    recording    Simulate.recordData
+
+There is no wind stage: nothing in the simulation step calls WindModel.Update, so the Dryden gusts are not stepped and
+the wind is whatever was last set on the wind model, which costs nothing beyond the airspeed calculation.
+
+Models hold profiler = None unless profiling, and only test for it around each stage, so there is nothing else to pay
+for when profiling is off."""
+import time
+
+stageNames = ['sensors', 'autopilot', 'aeroForces', 'integration', 'estimator', 'recording']
+
+class StageProfiler:
+    def __init__(self, clock=time.perf_counter):
+        """
+        Accumulates the time and the number of calls of every stage
+
+        :param clock: function returning the current time in seconds
+        """
+        self.clock = clock
+        self.totals = dict()
+        self.counts = dict()
+        return
+
+    def reset(self):
+        """
+        Forgets everything timed so far
+        """
+        self.totals.clear()
+        self.counts.clear()
+        return
+
+    def start(self):
+        """
+        Start of a timed stage
+
+        :return: current clock time, to hand to stop
+        """
+        return self.clock()
+
+    def stop(self, name, startTime):
+        """
+        End of a timed stage, adds the time since startTime to the stage
+
+        :param name: stage name
+        :param startTime: clock time from start (or from the stop of the stage just before)
+        :return: current clock time, so the next stage can start from it
+        """
+        now = self.clock()
+        self.totals[name] = self.totals.get(name, 0.0) + (now - startTime)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        return now
+
+    def summary(self):
+        """
+        Time and calls of every stage timed so far, the known stages first in stageNames order
+
+        :return: dictionary of name: (calls, total seconds)
+        """
+        names = [name for name in stageNames if name in self.counts] + sorted([name for name in self.counts if name not in stageNames])
+        return {name: (self.counts[name], self.totals[name]) for name in names}
+
+    def report(self, wallTime=None):
+        """
+        Table of the stages: calls, total time, time per call and share of the profiled time (and of wallTime if given)
+
+        :param wallTime: wall clock time of the whole run [s], adds a line for the time spent outside the stages
+        :return: string
+        """
+        summary = self.summary()
+        profiledTime = sum([total for calls, total in summary.values()])
+        referenceTime = wallTime if wallTime else profiledTime
+        lines = ["{:14s} {:>10s} {:>12s} {:>12s} {:>7s}".format('stage', 'calls', 'total [s]', 'us/call', '%')]
+        for name, (calls, total) in summary.items():
+            lines.append("{:14s} {:10d} {:12.4f} {:12.2f} {:7.1f}".format(name, calls, total, 1e6 * total / max(calls, 1),
+                                                                        100 * total / referenceTime if referenceTime else 0.0))
+        if wallTime:
+            lines.append("{:14s} {:>10s} {:12.4f} {:>12s} {:7.1f}".format('other', '', wallTime - profiledTime, '', 100 * (wallTime - profiledTime) / wallTime))
+        return "\n".join(lines)